@@ -42,6 +42,7 @@ from creme.persons.models import Civility
 
 from .. import constants
 from ..models import Calendar
+from ..utils import CollisionCheck, find_activity_collisions
 from . import fields as act_fields
 from .fields import ActivitySubTypeField
 
@@ -743,4 +744,18 @@ def get_massimport_form_builder(header_dict, choices):
                 ) for subject in subjects
             )
 
+            # Collisions ----
+            # NB: the activity is already saved, so the collisions are just
+            #     reported (all the participants are checked with one query).
+            for collision in find_activity_collisions([
+                CollisionCheck(
+                    start=instance.start,
+                    end=instance.end,
+                    participants=[*self.user_participants, *dyn_participants],
+                    busy=instance.busy,
+                    exclude_activity_id=instance.id,
+                ),
+            ]):
+                self.append_error(str(collision))
+
     return ActivityMassImportForm
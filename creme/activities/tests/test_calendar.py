@@ -20,6 +20,7 @@ from creme.creme_core.creme_jobs import deletor_type
 from creme.creme_core.models import DeletionCommand, Job, Relation
 from creme.creme_core.tests.base import CremeTestCase
 from creme.creme_core.tests.views.base import BrickTestCaseMixin
+from creme.creme_core.utils.secure_filename import secure_filename
 
 from .. import constants, get_activity_model
 from ..bricks import CalendarsBrick
@@ -1239,6 +1240,204 @@ class CalendarTestCase(BrickTestCaseMixin, _ActivitiesTestCase):
             [(d['id'], d['calendar']) for d in response.json()],
         )
 
+    @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=None)
+    def test_activities_data_conditional(self):
+        "Headers ETag/Last-Modified."
+        user = self.login_as_root_and_get()
+        cal = Calendar.objects.get_default_calendar(user)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        end = self.create_datetime(year=2013, month=4, day=30)
+
+        sub_type = self._get_sub_type(constants.UUID_SUBTYPE_PHONECALL_OUTGOING)
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=sub_type.type_id, sub_type=sub_type,
+        )
+        act1 = create(
+            title='Act#1', start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act1.calendars.set([cal])
+
+        url = reverse('activities__calendars_activities')
+        data = {
+            'calendar_id': [str(cal.id)],
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+        }
+        response1 = self.assertGET200(url, data=data)
+        self.assertEqual(1, len(response1.json()))
+
+        etag = response1.get('ETag')
+        self.assertTrue(etag)
+        self.assertTrue(response1.get('Last-Modified'))
+        self.assertIn('no-cache', response1.get('Cache-Control', ''))
+
+        # Not modified ---
+        response2 = self.client.get(url, data=data, headers={'If-None-Match': etag})
+        self.assertEqual(304, response2.status_code)
+        self.assertEqual(etag, response2.get('ETag'))
+
+        # Other range ---
+        response3 = self.client.get(
+            url,
+            data={**data, 'end': (end + timedelta(days=1)).isoformat()},
+            headers={'If-None-Match': etag},
+        )
+        self.assertEqual(200, response3.status_code)
+
+        # New activity ---
+        act2 = create(
+            title='Act#2', start=start + timedelta(days=3), end=start + timedelta(days=4),
+        )
+        act2.calendars.set([cal])
+
+        response4 = self.client.get(url, data=data, headers={'If-None-Match': etag})
+        self.assertEqual(200, response4.status_code)
+        self.assertEqual(2, len(response4.json()))
+
+        etag4 = response4.get('ETag')
+        self.assertNotEqual(etag, etag4)
+
+        # Removed activity ---
+        act2.calendars.set([])
+
+        response5 = self.client.get(url, data=data, headers={'If-None-Match': etag4})
+        self.assertEqual(200, response5.status_code)
+        self.assertEqual(1, len(response5.json()))
+
+    @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=None)
+    def test_activities_data_conditional__related(self):
+        "Headers ETag; changes which do not modify the activities."
+        user = self.login_as_activities_user()
+        self.add_credentials(user.role, own=['VIEW', 'CHANGE'], all=['VIEW'])
+
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.create(user=user, name='Other calendar')
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        sub_type = self._get_sub_type(constants.UUID_SUBTYPE_PHONECALL_OUTGOING)
+        act = Activity.objects.create(
+            user=self.get_root_user(), title='Act#1',
+            type_id=sub_type.type_id, sub_type=sub_type,
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act.calendars.set([cal1])
+
+        url = reverse('activities__calendars_activities')
+        data = {
+            'calendar_id': [str(cal1.id), str(cal2.id)],
+            'start': start.isoformat(),
+            'end': (start + timedelta(days=29)).isoformat(),
+        }
+
+        def assertModified(etag):
+            response = self.client.get(url, data=data, headers={'If-None-Match': etag})
+            self.assertEqual(200, response.status_code)
+
+            new_etag = response.get('ETag')
+            self.assertNotEqual(etag, new_etag)
+
+            return new_etag, response.json()
+
+        etag1 = self.assertGET200(url, data=data).get('ETag')
+
+        # Other calendar ---
+        act.calendars.set([cal2])
+        etag2, data2 = assertModified(etag1)
+        self.assertListEqual([cal2.id], [d['calendar'] for d in data2])
+
+        # Type renamed ---
+        atype = sub_type.type
+        atype.name = f'{atype.name} (renamed)'
+        atype.save()
+        etag3, data3 = assertModified(etag2)
+        self.assertListEqual([atype.name], [d['type'] for d in data3])
+
+        # Permissions ---
+        self.assertListEqual([False], [d['editable'] for d in data3])
+        self.add_credentials(user.role, all=['CHANGE'])
+        data4 = assertModified(etag3)[1]
+        self.assertListEqual([True], [d['editable'] for d in data4])
+
+    @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=None)
+    def test_activities_data_not_editable(self):
+        user = self.login_as_activities_user()
+        self.add_credentials(user.role, own=['VIEW', 'CHANGE'], all=['VIEW'])
+
+        cal = Calendar.objects.get_default_calendar(user)
+        start = self.create_datetime(year=2013, month=4, day=1)
+
+        sub_type = self._get_sub_type(constants.UUID_SUBTYPE_PHONECALL_OUTGOING)
+        create = partial(
+            Activity.objects.create, type_id=sub_type.type_id, sub_type=sub_type,
+        )
+        act1 = create(
+            user=user, title='Act#1',
+            start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act2 = create(
+            user=self.get_root_user(), title='Act#2',
+            start=start + timedelta(days=2), end=start + timedelta(days=3),
+        )
+
+        for act in (act1, act2):
+            act.calendars.set([cal])
+
+        response = self._get_cal_activities([cal], start=start.isoformat())
+        self.assertDictEqual(
+            {act1.id: True, act2.id: False},
+            {d['id']: d['editable'] for d in response.json()},
+        )
+
+    @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=False)
+    def test_dl_calendar_ical(self):
+        user = self.login_as_root_and_get()
+        other_user = self.create_user()
+
+        cal1 = Calendar.objects.get_default_calendar(user)
+        cal2 = Calendar.objects.get_default_calendar(other_user)
+        self.assertFalse(cal2.is_public)
+
+        start = self.create_datetime(year=2013, month=4, day=1)
+        sub_type = self._get_sub_type(constants.UUID_SUBTYPE_MEETING_MEETING)
+        create = partial(
+            Activity.objects.create,
+            user=user, type_id=sub_type.type_id, sub_type=sub_type,
+        )
+        act1 = create(
+            title='Act#1', start=start + timedelta(days=1), end=start + timedelta(days=2),
+        )
+        act2 = create(
+            title='Act#2', start=start + timedelta(days=2), end=start + timedelta(days=3),
+        )
+        act3 = create(
+            title='Act#3', start=start + timedelta(days=3), end=start + timedelta(days=4),
+            is_deleted=True,
+        )
+        act1.calendars.set([cal1])
+        act2.calendars.set([cal2])
+        act3.calendars.set([cal1])
+
+        response = self.assertGET200(
+            reverse('activities__dl_calendar_ical', args=(cal1.id,)),
+        )
+        self.assertEqual('text/calendar', response['Content-Type'])
+        self.assertEqual(
+            'attachment; filename="{}"'.format(secure_filename(f'{cal1.name}.ics')),
+            response['Content-Disposition'],
+        )
+
+        content = b''.join(response.streaming_content).decode()
+        self.assertStartsWith(content, 'BEGIN:VCALENDAR\n')
+        self.assertIn(f'UID:{act1.uuid}\n', content)
+        self.assertNotIn(f'UID:{act2.uuid}\n', content)
+        self.assertNotIn(f'UID:{act3.uuid}\n', content)
+        self.assertEndsWith(content, 'END:VCALENDAR')
+
+        # Private calendar of another user
+        self.assertGET404(reverse('activities__dl_calendar_ical', args=(cal2.id,)))
+
     @override_settings(ACTIVITIES_DEFAULT_CALENDAR_IS_PUBLIC=False)
     def test_selected_calendars_in_session(self):
         user = self.login_as_root_and_get()
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.utils.timezone import get_current_timezone
 from django.utils.timezone import override as override_tz
 from django.utils.timezone import zoneinfo
+from django.utils.translation import gettext as _
 from django.utils.translation import pgettext
 
 from creme import __version__ as creme_version
@@ -14,9 +15,12 @@ from creme.persons.tests.base import skipIfCustomContact
 from .. import constants
 from ..models import Status
 from ..utils import (
+    ActivityCollision,
+    CollisionCheck,
     ICalEncoder,
     ZoneinfoToVtimezone,
     check_activity_collisions,
+    find_activity_collisions,
     get_last_day_of_a_month,
 )
 from .base import Activity, Contact, _ActivitiesTestCase, skipIfCustomActivity
@@ -192,6 +196,97 @@ class UtilsTestCase(_ActivitiesTestCase):
             busy=False, participants=[c1, c2],
         )
 
+    @skipIfCustomContact
+    def test_collision02(self):
+        "All the collisions are returned, with one query."
+        user = self.get_root_user()
+
+        sub_type = self._get_sub_type(constants.UUID_SUBTYPE_MEETING_MEETING)
+        create_activity = partial(
+            Activity.objects.create,
+            user=user, type_id=sub_type.type_id, sub_type=sub_type, busy=True,
+        )
+        create_dt = partial(self.create_datetime, year=2010, month=10, day=1)
+        act1 = create_activity(
+            title='meet01', start=create_dt(hour=14), end=create_dt(hour=15),
+        )
+        act2 = create_activity(
+            title='meet02', start=create_dt(hour=12), end=create_dt(hour=13),
+        )
+        act3 = create_activity(
+            title='meet03', start=create_dt(hour=16), end=create_dt(hour=17),
+        )
+        act4 = create_activity(
+            title='meet04', start=create_dt(hour=12), end=create_dt(hour=13),
+            is_deleted=True,
+        )
+
+        create_contact = partial(Contact.objects.create, user=user)
+        c1 = create_contact(first_name='Spike', last_name='Spiegel')
+        c2 = create_contact(first_name='Jet',   last_name='Black')
+        c3 = create_contact(first_name='Faye',  last_name='Valentine')
+
+        create_rel = partial(
+            Relation.objects.create, type_id=constants.REL_SUB_PART_2_ACTIVITY, user=user,
+        )
+        create_rel(subject_entity=c1, object_entity=act1)
+        create_rel(subject_entity=c1, object_entity=act2)
+        create_rel(subject_entity=c2, object_entity=act1)
+        create_rel(subject_entity=c2, object_entity=act3)
+        create_rel(subject_entity=c3, object_entity=act4)
+
+        check1 = CollisionCheck(
+            start=create_dt(hour=11), end=create_dt(hour=16),
+            participants=[c1, c2, c3],
+        )
+        check2 = CollisionCheck(
+            start=create_dt(hour=14, minute=30), end=create_dt(hour=18),
+            participants=[c2],
+            exclude_activity_id=act3.id,
+        )
+        check3 = CollisionCheck(start=None, end=None, participants=[c1])
+
+        with self.assertNumQueries(1):
+            collisions = find_activity_collisions([check1, check2, check3])
+
+        self.assertListEqual(
+            [
+                ActivityCollision(check=check1, participant=c1, activity=act2),
+                ActivityCollision(check=check1, participant=c1, activity=act1),
+                ActivityCollision(check=check1, participant=c2, activity=act1),
+                ActivityCollision(check=check2, participant=c2, activity=act1),
+            ],
+            collisions,
+        )
+        self.assertEqual(
+            _(
+                '{participant} already participates in the activity '
+                '«{activity}» between {start} and {end}.'
+            ).format(
+                participant=c2, activity=act1, start='14:30:00', end='15:00:00',
+            ),
+            str(collisions[3]),
+        )
+
+        # Compatibility function
+        self.assertEqual(
+            3,
+            len(check_activity_collisions(
+                activity_start=check1.start, activity_end=check1.end,
+                participants=[c1, c2, c3],
+            )),
+        )
+
+        # No query
+        with self.assertNumQueries(0):
+            self.assertListEqual([], find_activity_collisions([check3]))
+            self.assertListEqual(
+                [],
+                find_activity_collisions([
+                    CollisionCheck(start=check1.start, end=check1.end, participants=[]),
+                ]),
+            )
+
 
 @skipIfCustomActivity
 class ICalEncoderTestCase(_ActivitiesTestCase):
@@ -391,3 +486,39 @@ END:VTIMEZONE""",
         self.assertIn(f'UID:{act1.uuid}\n', content)
         self.assertCountOccurrences('UID:', content, 2)
         self.assertEndsWith(content, 'END:VEVENT\nEND:VCALENDAR')
+
+    @override_tz('Europe/Paris')
+    def test_iter_encode(self):
+        user = self.get_root_user()
+
+        sub_type = self._get_sub_type(constants.UUID_SUBTYPE_MEETING_MEETING)
+        create_act = partial(
+            Activity.objects.create,
+            user=user, busy=True,
+            type_id=sub_type.type_id,
+            sub_type=sub_type,
+        )
+        create_dt = self.create_datetime
+        act1 = create_act(
+            title='Act#1',
+            start=create_dt(year=2023, month=4, day=1, hour=9),
+            end=create_dt(year=2023, month=4, day=1, hour=10),
+        )
+        act2 = create_act(
+            title='Act#2',
+            start=create_dt(year=2024, month=4, day=2, hour=9),
+            end=create_dt(year=2024, month=4, day=2, hour=10),
+        )
+
+        encoder = ICalEncoder()
+        activities = Activity.objects.filter(id__in=[act1.id, act2.id])
+        self.assertEqual(
+            encoder.encode(activities),
+            ''.join(encoder.iter_encode(activities, chunk_size=1)),
+        )
+
+        # Empty
+        activities = Activity.objects.none()
+        self.assertEqual(
+            encoder.encode(activities), ''.join(encoder.iter_encode(activities)),
+        )
@@ -16,6 +16,11 @@ calendar_patterns = [
         calendar.ActivitiesData.as_view(),
         name='activities__calendars_activities',
     ),
+    re_path(
+        r'^(?P<calendar_id>\d+)/ical[/]?$',
+        calendar.CalendarICalExport.as_view(),
+        name='activities__dl_calendar_ical',
+    ),
     re_path(
         r'^select[/]?$',
         calendar.CalendarsSelection.as_view(),
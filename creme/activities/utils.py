@@ -18,9 +18,11 @@
 
 import collections
 import logging
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 
-from django.db.models import Q, QuerySet
+from django.db.models import F, Max, Min, Q, QuerySet
 from django.utils.timezone import (
     get_current_timezone,
     localtime,
@@ -29,12 +31,12 @@ from django.utils.timezone import (
 )
 from django.utils.translation import gettext as _
 
-from creme.creme_core.models import Relation, SettingValue
+from creme.creme_core.models import CremeEntity, SettingValue
 from creme.creme_core.utils.dates import to_utc
 
 from . import get_activity_model
 # from .constants import FLOATING_TIME, NARROW
-from .constants import REL_SUB_PART_2_ACTIVITY
+from .constants import REL_OBJ_PART_2_ACTIVITY
 from .setting_keys import auto_subjects_key
 
 logger = logging.getLogger(__name__)
@@ -57,75 +59,141 @@ def get_current_utc_offset():
     return int(tz.utcoffset(now()).total_seconds() / 60)
 
 
-def check_activity_collisions(
-        activity_start,
-        activity_end,
-        participants,
-        busy=True,
-        exclude_activity_id=None):
-    if not activity_start:
-        return
+@dataclass(frozen=True)
+class CollisionCheck:
+    """The dates & the participants of an activity (being created/modified)
+    which must not collide with the existing activities of the participants.
+    See find_activity_collisions().
+    """
+    start: datetime
+    end: datetime
+    participants: Iterable[CremeEntity]
+    # <False> means that only the busy existing activities are colliding.
+    busy: bool = True
+    # ID of the modified activity (it does not collide with itself).
+    exclude_activity_id: int | None = None
+
+
+@dataclass(frozen=True)
+class ActivityCollision:
+    "A participant of a checked activity already participates in an activity."
+    check: CollisionCheck
+    participant: CremeEntity
+    activity: CremeEntity  # Colliding Activity
+
+    def __str__(self):
+        activity = self.activity
+
+        return _(
+            '{participant} already participates in the activity '
+            '«{activity}» between {start} and {end}.'
+        ).format(
+            participant=self.participant,
+            activity=activity,
+            start=max(self.check.start.time(), localtime(activity.start).time()),
+            end=min(self.check.end.time(), localtime(activity.end).time()),
+        )
 
-    collision_test = ~(Q(end__lte=activity_start) | Q(start__gte=activity_end))
-    collisions = []
 
-    for participant in participants:
-        # Find activities of participant
-        activity_req = Relation.objects.filter(
-            subject_entity=participant.id, type=REL_SUB_PART_2_ACTIVITY,
+def find_activity_collisions(checks: Iterable[CollisionCheck]) -> list[ActivityCollision]:
+    """Find all the collisions between some activities & the existing
+    activities of their participants.
+    All the checks are performed with one query (whatever the numbers of
+    activities & participants).
+    @param checks: Instances of CollisionCheck ; the ones without start are ignored.
+    @return: List of ActivityCollision, ordered by check, then by participant
+             (order of CollisionCheck.participants), then by starting date.
+    """
+    Activity = get_activity_model()
+    checks = [check for check in checks if check.start]
+    participants_per_check = [
+        {participant.id: participant for participant in check.participants}
+        for check in checks
+    ]
+
+    q = Q()
+    for check, participants in zip(checks, participants_per_check):
+        if not participants:
+            continue
+
+        check_q = Q(relations__object_entity__in=[*participants.keys()]) & ~(
+            Q(end__lte=check.start) | Q(start__gte=check.end)
         )
 
-        # Exclude current activity if asked
-        if exclude_activity_id is not None:
-            activity_req = activity_req.exclude(object_entity=exclude_activity_id)
-
-        # Get id of activities of participant
-        activity_ids = activity_req.values_list('object_entity__id', flat=True)
-
-        # Do collision request
-        # TODO: can be done with less queries ?
-        #           Activity.objects.filter(
-        #               relations__object_entity=participant.id,
-        #               relations__object_entity__type=REL_OBJ_PART_2_ACTIVITY,
-        #           ).filter(collision_test)
-        busy_args = {} if busy else {'busy': True}
-        # TODO: test is_deleted=True
-        Activity = get_activity_model()
-        colliding_activity = Activity.objects.filter(
-            collision_test,
-            is_deleted=False,
-            pk__in=activity_ids,
-            # floating_type__in=(NARROW, FLOATING_TIME),
-            floating_type__in=(
-                Activity.FloatingType.NARROW,
-                Activity.FloatingType.FLOATING_TIME,
-            ),
-            **busy_args
-        ).first()
-
-        if colliding_activity is not None:
-            collision_start = max(
-                activity_start.time(), localtime(colliding_activity.start).time(),
-            )
-            collision_end = min(
-                activity_end.time(), localtime(colliding_activity.end).time(),
-            )
+        if not check.busy:
+            check_q &= Q(busy=True)
+
+        if check.exclude_activity_id is not None:
+            check_q &= ~Q(id=check.exclude_activity_id)
+
+        q |= check_q
+
+    if not q:
+        return []
+
+    # NB: one row per couple (activity, participant) ; the filters on
+    #     "relations" are in the same filter() call, so they use the same
+    #     JOIN, which is re-used by the annotation too.
+    # TODO: test is_deleted=True
+    activities_per_participant = collections.defaultdict(list)
+    for activity in Activity.objects.filter(
+        q,
+        relations__type=REL_OBJ_PART_2_ACTIVITY,
+        is_deleted=False,
+        floating_type__in=(
+            Activity.FloatingType.NARROW,
+            Activity.FloatingType.FLOATING_TIME,
+        ),
+    ).annotate(
+        collision_participant_id=F('relations__object_entity'),
+    ).order_by('start', 'id'):
+        activities_per_participant[activity.collision_participant_id].append(activity)
 
-            collisions.append(
-                _(
-                    '{participant} already participates in the activity '
-                    '«{activity}» between {start} and {end}.'
-                ).format(
-                    participant=participant,
-                    activity=colliding_activity,
-                    start=collision_start,
-                    end=collision_end,
-                )
+    collisions = []
+    for check, participants in zip(checks, participants_per_check):
+        start = check.start
+        end = check.end
+
+        for participant_id, participant in participants.items():
+            collisions.extend(
+                ActivityCollision(check=check, participant=participant, activity=activity)
+                for activity in activities_per_participant.get(participant_id, ())
+                if activity.end > start
+                and activity.start < end
+                and (check.busy or activity.busy)
+                and activity.id != check.exclude_activity_id
             )
 
     return collisions
 
 
+def check_activity_collisions(
+        activity_start,
+        activity_end,
+        participants,
+        busy=True,
+        exclude_activity_id=None):
+    """Get the messages describing the collisions between an activity & the
+    existing activities of its participants.
+    See find_activity_collisions().
+    """
+    if not activity_start:
+        return []
+
+    return [
+        str(collision)
+        for collision in find_activity_collisions([
+            CollisionCheck(
+                start=activity_start,
+                end=activity_end,
+                participants=participants,
+                busy=busy,
+                exclude_activity_id=exclude_activity_id,
+            ),
+        ])
+    ]
+
+
 def is_auto_orga_subject_enabled():
     return SettingValue.objects.get_4_key(auto_subjects_key, default=False).value
 
@@ -181,6 +249,21 @@ CATEGORIES:{activity.type.name},{activity.sub_type.name}
 STATUS:{activity.status or ''}
 END:VEVENT"""
 
+    def _encode_header(self, tz, start_year: int, end_year: int) -> str:
+        return """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:{product_id}
+CALSCALE:GREGORIAN
+{vtimezone}
+""".format(
+            product_id=self.product_id,
+            vtimezone=ZoneinfoToVtimezone.generate_vtimezone(
+                timezone=tz,
+                date_from=datetime(year=start_year, month=1, day=1),
+                date_to=datetime(year=end_year, month=12, day=31),
+            ),
+        )
+
     def encode(self, activities: QuerySet) -> str:
         """Return a normalized iCalendar string."""
         tz = get_current_timezone()
@@ -194,22 +277,35 @@ END:VEVENT"""
             default=start_year + 10,
         )
 
-        return """BEGIN:VCALENDAR
-VERSION:2.0
-PRODID:{product_id}
-CALSCALE:GREGORIAN
-{vtimezone}
-{vevents}
-END:VCALENDAR""".format(
-            product_id=self.product_id,
-            vtimezone=ZoneinfoToVtimezone.generate_vtimezone(
-                timezone=tz,
-                date_from=datetime(year=start_year, month=1, day=1),
-                date_to=datetime(year=end_year, month=12, day=31),
-            ),
+        return '{header}{vevents}\nEND:VCALENDAR'.format(
+            header=self._encode_header(tz=tz, start_year=start_year, end_year=end_year),
             vevents='\n'.join(self.encode_activity(a, tz) for a in activities),
         )
 
+    def iter_encode(self, activities: QuerySet, chunk_size: int = 256) -> Iterator[str]:
+        """Generate a normalized iCalendar string piece by piece ; the
+        activities are retrieved by chunks, so the memory usage does not
+        depend on the number of activities (useful with a StreamingHttpResponse).
+        The result is the same as encode().
+        """
+        tz = get_current_timezone()
+        years = activities.aggregate(start=Min('start'), end=Max('end'))
+        start = years['start']
+        start_year = start.date().year if start else 2000
+        end = years['end']
+        end_year = end.date().year if end else start_year + 10
+
+        yield self._encode_header(tz=tz, start_year=start_year, end_year=end_year)
+
+        encode_activity = self.encode_activity
+        for i, activity in enumerate(
+            activities.prefetch_related(*self.prefetched_fields)
+                      .iterator(chunk_size=chunk_size)
+        ):
+            yield f'\n{encode_activity(activity, tz)}' if i else encode_activity(activity, tz)
+
+        yield '\nEND:VCALENDAR'
+
 
 ################################################################################
 # PUBLIC DOMAIN
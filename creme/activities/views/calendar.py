@@ -18,19 +18,20 @@
 
 import logging
 from collections import defaultdict
-from copy import copy
 from datetime import datetime, timedelta
-from functools import partial
+from hashlib import md5
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Max, Q, Sum
 from django.db.transaction import atomic
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
 from django.utils.timezone import get_current_timezone, make_naive, now
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
@@ -44,6 +45,7 @@ from creme.creme_core.core.exceptions import ConflictError
 from creme.creme_core.http import CremeJsonResponse
 from creme.creme_core.models import DeletionCommand, EntityCredentials, Job
 from creme.creme_core.utils import bool_from_str_extended, get_from_POST_or_404
+from creme.creme_core.utils.secure_filename import secure_filename
 from creme.creme_core.utils.unicode_collation import collator
 from creme.creme_core.views import generic
 from creme.creme_core.views.decorators import workflow_engine
@@ -51,9 +53,11 @@ from creme.creme_core.views.decorators import workflow_engine
 from .. import constants, get_activity_model
 from ..forms import calendar as calendar_forms
 from ..forms import config as config_forms
-from ..models import Calendar, CalendarConfigItem
+from ..models import ActivityType, Calendar, CalendarConfigItem
 from ..utils import (
-    check_activity_collisions,
+    CollisionCheck,
+    ICalEncoder,
+    find_activity_collisions,
     get_current_utc_offset,
     get_last_day_of_a_month,
 )
@@ -229,6 +233,12 @@ class CalendarsMixin:
 
 
 class ActivitiesData(CalendarsMixin, generic.CheckedView):
+    """Get the activities of some calendars (& in a range of dates) as JSON,
+    for the calendar view.
+    The response is conditional (headers "ETag" & "Last-Modified"): when the
+    activities of the range have not been modified since the previous request,
+    the response is a "304 Not Modified" (& the activities are not retrieved).
+    """
     response_class = CremeJsonResponse
     start_arg = 'start'
     end_arg = 'end'
@@ -239,15 +249,44 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
     calendar_ids_session_key = CalendarView.calendar_ids_session_key
 
     def get(self, request, *args, **kwargs):
-        return self.response_class(
-            self.get_activities_data(request),
-            safe=False,  # Result is not a dictionary
+        user = request.user
+
+        calendars = {cal.id: cal for cal in self.get_calendars(request)}
+        self.save_calendar_ids(request, [*calendars.keys()])
+
+        start = self.get_start(request)
+        end   = self.get_end(request=request, start=start)
+
+        links = self.get_links_queryset(
+            user=user, calendar_ids=[*calendars.keys()], start=start, end=end,
         )
+        etag, last_modified = self.get_etag_n_last_modified(
+            links=links, user=user, calendars=calendars.values(), start=start, end=end,
+        )
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            response = self.response_class(
+                self.get_activities_data(links=links, calendars=calendars, user=user),
+                safe=False,  # Result is not a dictionary
+            )
+
+        response.headers['ETag'] = etag
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified)
+
+        # NB: the browser must check that the data are up-to-date before
+        #     re-using them.
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return response
 
     def get_activity_label(self, activity):
         return self.label.format(activity=activity)
 
-    def _activity_2_dict(self, activity, user):
+    def _activity_2_dict(self, activity, calendar, editable):
         "Returns a 'jsonifiable' dictionary."
         start = activity.start
         end = activity.end
@@ -255,9 +294,6 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
         if activity.is_all_day:
             end += timedelta(minutes=1)
 
-        # NB: _get_one_activity_per_calendar() adds this 'attribute'
-        calendar = activity.calendar
-
         return {
             'id':    activity.id,
             'title': self.get_activity_label(activity),
@@ -269,7 +305,7 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             'url': reverse('activities__view_activity_popup', args=(activity.id,)),
 
             'color':    f'#{calendar.color}',
-            'editable': user.has_perm_to_change(activity),
+            'editable': editable,
             'calendar': calendar.id,
             'type':     activity.type.name,
             'busy':     activity.busy,
@@ -285,48 +321,140 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             except Exception:
                 logger.exception('ActivitiesData._get_datetime(key=%s)', key)
 
-    @staticmethod
-    def _get_one_activity_per_calendar(activities):
-        for activity in activities:
-            # "concerned_calendars" is added by get_activities_data()
-            for calendar in activity.concerned_calendars:
-                copied = copy(activity)
-                copied.calendar = calendar
-                yield copied
-
-    def get_activities_data(self, request):
-        user = request.user
-
-        calendar_ids = [cal.id for cal in self.get_calendars(request)]
-        self.save_calendar_ids(request, calendar_ids)
-
-        start = self.get_start(request)
-        end   = self.get_end(request=request, start=start)
-
-        # TODO: label when no calendar related to the participant of an unavailability
-        activities = EntityCredentials.filter(
+    def get_activities_queryset(self, *, user, start, end):
+        "Get the (viewable) activities of the range of dates."
+        return EntityCredentials.filter(
             user,
             Activity.objects
                     .filter(is_deleted=False)
-                    .filter(self.get_date_q(start=start, end=end))
-                    .filter(calendars__in=calendar_ids)
-                    .distinct()
-            # NB: we already filter by calendars ; maybe a future Django version
-            #     will allow us to annotate the calendar ID directly
-            #     (distinct() would have to be removed of course)
-                    .prefetch_related(Prefetch(
-                        'calendars',
-                        queryset=Calendar.objects.filter(id__in=calendar_ids),
-                        to_attr='concerned_calendars',
-                    ))
+                    .filter(self.get_date_q(start=start, end=end)),
         )
 
-        activity_2_dict = partial(self._activity_2_dict, user=user)
-
-        return [
-            activity_2_dict(activity=a)
-            for a in self._get_one_activity_per_calendar(activities)
+    def get_links_queryset(self, *, user, calendar_ids, start, end):
+        """Get a queryset on the M2M table between Activity & Calendar ;
+        there is one instance per couple (activity, calendar) to display.
+        """
+        field = Activity._meta.get_field('calendars')
+        activity_fname = field.m2m_field_name()
+        calendar_fname = field.m2m_reverse_field_name()
+
+        # NB: we keep the ordering of the activities, then the calendars are
+        #     ordered like before (i.e. with the ordering of Calendar).
+        ordering = [
+            f'-{activity_fname}__{order[1:]}'
+            if order.startswith('-') else
+            f'{activity_fname}__{order}'
+            for order in Activity._meta.ordering
         ]
+        ordering.append(activity_fname)
+        ordering.extend(
+            f'-{calendar_fname}__{order[1:]}'
+            if order.startswith('-') else
+            f'{calendar_fname}__{order}'
+            for order in Calendar._meta.ordering
+        )
+
+        # TODO: label when no calendar related to the participant of an unavailability
+        return field.remote_field.through.objects.filter(**{
+            f'{calendar_fname}__in': calendar_ids,
+            f'{activity_fname}__in': self.get_activities_queryset(
+                user=user, start=start, end=end,
+            ),
+        }).select_related(
+            activity_fname, f'{activity_fname}__type',
+        ).order_by(*ordering)
+
+    def get_etag_n_last_modified(self, *, links, user, calendars, start, end):
+        """Compute the values of the headers "ETag" & "Last-Modified" with an
+        aggregation query (& a query on the types of Activity).
+        @return: A tuple (etag, last_modified) ; 'last_modified' is a timestamp
+                 or <None> (no activity).
+        """
+        activity_fname = Activity._meta.get_field('calendars').m2m_field_name()
+        editable_q = Q(**{
+            f'{activity_fname}__in': EntityCredentials.filter(
+                user, Activity.objects.all(), EntityCredentials.CHANGE,
+            ),
+        })
+        # NB: the links are not modified (an activity which is moved to another
+        #     calendar gets a new link), so the count, the sum & the maximum
+        #     of their IDs detect the changes of calendars (& the removed
+        #     activities). The link of the activities which can be edited are
+        #     aggregated too, to detect the changes of permissions.
+        state = links.aggregate(
+            count=Count('pk'),
+            ids_sum=Sum('pk'),
+            max_id=Max('pk'),
+            editable_count=Count('pk', filter=editable_q),
+            editable_ids_sum=Sum('pk', filter=editable_q),
+            last_modified=Max(f'{activity_fname}__modified'),
+        )
+        last_modified = state['last_modified']
+
+        # NB: the types have no modification date (& there are few of them)
+        types = ActivityType.objects.order_by('id').values_list('id', 'name')
+
+        hasher = md5(usedforsecurity=False)
+        hasher.update(
+            '#'.join([
+                str(user.id),
+                str(user.role_id),
+                str(user.is_superuser),
+                ','.join(f'{cal.id}:{cal.color}' for cal in calendars),
+                start.isoformat(),
+                end.isoformat(),
+                str(state['count']),
+                str(state['ids_sum']),
+                str(state['max_id']),
+                str(state['editable_count']),
+                str(state['editable_ids_sum']),
+                last_modified.isoformat() if last_modified else '',
+                ','.join(f'{type_id}:{name}' for type_id, name in types),
+                self.label,
+            ]).encode()
+        )
+
+        return (
+            quote_etag(hasher.hexdigest()),
+            int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    def get_activities_data(self, *, links, calendars, user):
+        """Get the 'jsonifiable' data of the activities.
+        @param links: see get_links_queryset().
+        @param calendars: Dictionary of Calendars (keys are IDs).
+        @param user: Current user.
+        """
+        field = Activity._meta.get_field('calendars')
+        activity_fname = field.m2m_field_name()
+        calendar_fname = field.m2m_reverse_field_name()
+
+        links = [*links]
+        activities = [getattr(link, activity_fname) for link in links]
+
+        # NB: the permissions are evaluated with one query
+        editable_ids = {
+            *EntityCredentials.filter(
+                user,
+                Activity.objects.filter(id__in={activity.id for activity in activities}),
+                EntityCredentials.CHANGE,
+            ).values_list('id', flat=True),
+        } if activities else set()
+
+        activity_2_dict = self._activity_2_dict
+        data = []
+
+        for link, activity in zip(links, activities):
+            calendar = calendars[getattr(link, f'{calendar_fname}_id')]
+            # NB: compatibility with the label format
+            activity.calendar = calendar
+            data.append(activity_2_dict(
+                activity=activity,
+                calendar=calendar,
+                editable=activity.id in editable_ids,
+            ))
+
+        return data
 
     @staticmethod
     def get_date_q(start, end):
@@ -353,6 +481,46 @@ class ActivitiesData(CalendarsMixin, generic.CheckedView):
             session[key] = calendar_ids
 
 
+class CalendarICalExport(generic.CheckedView):
+    """Export the activities of a Calendar as an iCalendar file (.ics) ; the
+    content is streamed.
+    """
+    permissions = 'activities'
+    calendar_id_url_kwarg = 'calendar_id'
+    encoder_class = ICalEncoder
+
+    def get_calendar(self):
+        user = self.request.user
+
+        return get_object_or_404(
+            Calendar,
+            Q(is_public=True) | Q(user=user),
+            id=self.kwargs[self.calendar_id_url_kwarg],
+        )
+
+    def get_activities(self, calendar):
+        return EntityCredentials.filter(
+            self.request.user,
+            Activity.objects.filter(calendars=calendar, is_deleted=False),
+        )
+
+    def get_encoder(self):
+        return self.encoder_class()
+
+    def get(self, request, *args, **kwargs):
+        calendar = self.get_calendar()
+
+        return StreamingHttpResponse(
+            self.get_encoder().iter_encode(activities=self.get_activities(calendar)),
+            headers={
+                'Content-Type': 'text/calendar',
+                'Content-Disposition': 'attachment; filename="{}"'.format(
+                    secure_filename(f'{calendar.name}.ics'),
+                ),
+            },
+        )
+
+
 class CalendarsSelection(CalendarsMixin, generic.CheckedView):
     """View which can add & remove selected calendar IDs in the session.
     It's mostly useful to remove IDs without retrieving Activities data
@@ -395,6 +563,18 @@ class ActivityDatesSetting(generic.base.EntityRelatedMixin, generic.CheckedView)
     def get_related_entity_id(self):
         return get_from_POST_or_404(self.request.POST, key=self.activity_id_arg, cast=int)
 
+    def get_collisions(self, activity):
+        "Get all the collisions (see activities.utils.ActivityCollision) with the new dates."
+        return find_activity_collisions([
+            CollisionCheck(
+                start=activity.start,
+                end=activity.end,
+                participants=[r.object_entity for r in activity.get_participant_relations()],
+                busy=activity.busy,
+                exclude_activity_id=activity.id,
+            ),
+        ])
+
     @atomic
     @method_decorator(workflow_engine)
     def post(self, request, *args, **kwargs):
@@ -424,15 +604,10 @@ class ActivityDatesSetting(generic.base.EntityRelatedMixin, generic.CheckedView)
 
         activity.handle_all_day()
 
-        collisions = check_activity_collisions(
-            activity.start, activity.end,
-            participants=[r.object_entity for r in activity.get_participant_relations()],
-            busy=activity.busy,
-            exclude_activity_id=activity.id,
-        )
-
+        collisions = self.get_collisions(activity)
         if collisions:
-            raise ConflictError(', '.join(collisions))  # TODO: improve message?
+            # TODO: improve message?
+            raise ConflictError(', '.join(str(collision) for collision in collisions))
 
         activity.save()
 
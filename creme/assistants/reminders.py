@@ -38,6 +38,9 @@ class AssistantReminder(Reminder):
     def get_users(self, instance):
         return [instance.user or instance.entity.user]
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('user', 'entity__user')
+
 
 class ReminderAlert(AssistantReminder):
     id = Reminder.generate_id('assistants', 'alert')
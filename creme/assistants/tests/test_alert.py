@@ -1,5 +1,6 @@
 from datetime import date, datetime, timedelta
 from functools import partial
+from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
@@ -58,6 +59,7 @@ from ..forms.alert import (
 )
 from ..models import Alert
 from ..notification import AlertReminderContent
+from ..reminders import ReminderAlert
 from .base import AssistantsTestCase
 
 
@@ -1590,6 +1592,52 @@ class AlertTestCase(BrickTestCaseMixin, AssistantsTestCase):
         self.assertTrue(self.refresh(alert1).reminded)
         self.assertFalse(self.refresh(alert2).reminded)
 
+    @override_settings(DEFAULT_TIME_ALERT_REMIND=60)
+    def test_reminder__several_chunks(self):
+        user1 = self.get_root_user()
+        user2 = self.create_user()
+        entity1 = self.create_entity(user=user1)
+        entity2 = self.create_entity(user=user2)
+        now_value = now()
+
+        create_alert = partial(Alert.objects.create, trigger_date=now_value)
+        alerts = [
+            create_alert(title='Alert#1', real_entity=entity1, user=user1),
+            create_alert(title='Alert#2', real_entity=entity1, user=user2),
+            create_alert(title='Alert#3', real_entity=entity2),  # Dynamic user
+            create_alert(title='Alert#4', real_entity=entity1),  # Dynamic user
+            create_alert(title='Alert#5', real_entity=entity2, user=user2),
+        ]
+
+        with patch.object(ReminderAlert, 'chunk_size', 2):
+            self.execute_reminder_job()
+
+        self.assertCountEqual(
+            [
+                (user1.id, alerts[0].id),
+                (user2.id, alerts[1].id),
+                (user2.id, alerts[2].id),
+                (user1.id, alerts[3].id),
+                (user2.id, alerts[4].id),
+            ],
+            [
+                (notif.user_id, notif.content_data['instance'])
+                for notif in Notification.objects.filter(
+                    channel__uuid=UUID_CHANNEL_REMINDERS, content_id=AlertReminderContent.id,
+                )
+            ],
+        )
+        self.assertFalse(Alert.objects.filter(reminded=False))
+
+        # Not reminded twice
+        self.execute_reminder_job()
+        self.assertEqual(
+            5,
+            Notification.objects.filter(
+                channel__uuid=UUID_CHANNEL_REMINDERS, content_id=AlertReminderContent.id,
+            ).count(),
+        )
+
     def test_reminder__null_trigger_date(self):
         user = self.get_root_user()
         job = self.get_reminder_job()
@@ -396,6 +396,13 @@ class BillingConfig(CremeAppConfig):
             self.SalesOrder, get_import_form_builder,
         )
 
+    def register_notification(self, notification_registry):
+        from . import notification
+
+        notification_registry.register_content(
+            content_cls=notification.BulkExportDoneContent,
+        )
+
     def register_menu_entries(self, menu_registry):
         from . import menu
 
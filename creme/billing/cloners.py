@@ -25,6 +25,8 @@ from creme.creme_core.core import copying
 from creme.creme_core.core.cloning import EntityCloner
 from creme.creme_core.utils.collections import FluentList
 
+from .core.totals import defer_totals_update
+
 if typing.TYPE_CHECKING:
     from .models import Line
 
@@ -97,9 +99,11 @@ class LinesCopier(copying.PostSaveCopier):
         default_cloner_class = self.default_line_cloner_class
         user = self._user
 
-        for line in self._source.iter_all_lines():
-            cloner_cls = get_cloner_cls(type(line), default_cloner_class)
-            cloner_cls(related_document=target).perform(user=user, entity=line)
+        # NB: the totals of the target are computed once
+        with defer_totals_update():
+            for line in self._source.iter_all_lines():
+                cloner_cls = get_cloner_cls(type(line), default_cloner_class)
+                cloner_cls(related_document=target).perform(user=user, entity=line)
 
 
 class BillingBaseCloner(EntityCloner):
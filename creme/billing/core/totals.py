@@ -0,0 +1,109 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import ContextDecorator
+from typing import TYPE_CHECKING
+
+from creme.creme_core.global_info import get_per_request_cache
+
+if TYPE_CHECKING:
+    from ..models import Base
+
+DEFERRED_TOTALS_CACHE_KEY = 'billing-deferred_totals'
+
+
+def refresh_totals(document: Base) -> None:
+    """Save a billing document in order to update its totals (with & without VAT).
+    If the update is deferred (see 'defer_totals_update'), the document is
+    just marked to be updated later.
+    """
+    documents = get_per_request_cache().get(DEFERRED_TOTALS_CACHE_KEY)
+
+    if documents is None:
+        document.save()
+    else:
+        # NB: we keep the first instance (it's generally the one used by the
+        #     caller, so its totals are up-to-date at the end).
+        documents.setdefault(document.id, document)
+
+
+class defer_totals_update(ContextDecorator):
+    """Decorator and context manager designed to update the totals of the
+    billing documents only once, when several of their lines (or credit
+    notes) are created/edited/deleted.
+
+    Usages:
+
+    @defer_totals_update()
+    def do_something():
+        do()
+
+    or
+
+    with defer_totals_update():
+        do_something()
+
+    The nested usages use the documents of the outermost one. The totals are
+    updated when the outermost context is left (so you should use it inside
+    the transaction which modifies the lines) ; nothing is updated if an
+    exception is raised.
+    """
+    def _recreate_cm(self):
+        # NB: a new instance is used by each call of the decorated function,
+        #     because the instance stores the documents.
+        return type(self)()
+
+    def __enter__(self):
+        cache = get_per_request_cache()
+
+        if DEFERRED_TOTALS_CACHE_KEY in cache:
+            self.documents = None
+        else:
+            self.documents = cache[DEFERRED_TOTALS_CACHE_KEY] = {}
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        documents = self.documents
+
+        if documents is not None:
+            del get_per_request_cache()[DEFERRED_TOTALS_CACHE_KEY]
+
+            if exc_type is None:
+                self._flush(documents.values())
+
+        return False  # Exceptions are not captured
+
+    @staticmethod
+    def _flush(documents) -> None:
+        # NB: the documents which have been deleted in the meantime are ignored
+        docs_per_model = defaultdict(list)
+        for document in documents:
+            docs_per_model[type(document)].append(document)
+
+        for model, model_docs in docs_per_model.items():
+            existing_ids = {
+                *model._base_manager.filter(
+                    id__in=[doc.id for doc in model_docs],
+                ).values_list('id', flat=True),
+            }
+
+            for document in model_docs:
+                if document.id in existing_ids:
+                    document.save()
@@ -0,0 +1,5 @@
+from .bulk_export import bulk_export_type
+
+jobs = (
+    bulk_export_type,
+)
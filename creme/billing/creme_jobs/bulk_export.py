@@ -0,0 +1,318 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+import multiprocessing
+from os import path
+from zipfile import ZIP_STORED, ZipFile
+
+import django
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
+
+from creme.creme_core.constants import UUID_CHANNEL_JOBS
+from creme.creme_core.creme_jobs.base import JobProgress, JobType
+from creme.creme_core.models import (
+    EntityCredentials,
+    EntityFilter,
+    EntityJobResult,
+    FileRef,
+    Job,
+    Notification,
+)
+from creme.creme_core.models.utils import model_verbose_name
+from creme.creme_core.utils.file_handling import FileCreator
+from creme.creme_core.utils.secure_filename import secure_filename
+
+from ..exporters import BillingExportEngineManager
+from ..exporters.cache import ExportCache
+from ..models import ExporterConfigItem
+from ..notification import BulkExportDoneContent
+
+logger = logging.getLogger(__name__)
+
+
+def _export_documents(job_id: int, entity_ids: list[int]) -> list[int]:
+    """Export some documents of a bulk export.
+    It's executed by the worker processes (Django is already set up).
+    """
+    close_old_connections()
+
+    try:
+        return bulk_export_type._export_documents(
+            Job.objects.get(id=job_id), entity_ids=entity_ids,
+        )
+    finally:
+        close_old_connections()
+
+
+class _BulkExportType(JobType):
+    """Export the billing documents of a filter (generally PDF files), & build
+    a ZIP file containing all the exported files.
+    The files generated by the exporters are cached (see
+    'creme.billing.exporters.cache.ExportCache'), so running again the job
+    on the same documents is fast.
+    """
+    id = JobType.generate_id('billing', 'bulk_export')
+    verbose_name = _('Bulk export of billing documents')
+
+    # Number of documents which are loaded (& which results are created) at once.
+    chunk_size = 50
+
+    def _get_efilter(self, job_data, raise_exception=True):
+        efilter = None
+        efilter_id = job_data.get('efilter')
+
+        if efilter_id:
+            try:
+                efilter = EntityFilter.objects.get(id=efilter_id)
+            except EntityFilter.DoesNotExist as e:
+                if raise_exception:
+                    raise self.Error(gettext('The filter does not exist anymore')) from e
+
+        return efilter
+
+    def _get_model(self, job_data):
+        return ContentType.objects.get_for_id(job_data['ctype']).model_class()
+
+    def _get_exporter(self, model):
+        config_item = ExporterConfigItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+        ).first()
+
+        exporter = None if config_item is None or not config_item.engine_id else \
+            BillingExportEngineManager().exporter(
+                engine_id=config_item.engine_id,
+                flavour_id=config_item.flavour_id,
+                model=model,
+            )
+
+        if exporter is None:
+            raise self.Error(gettext(
+                'The exporter is not configured or invalid; '
+                'go to the configuration of the app «Billing».'
+            ))
+
+        return exporter
+
+    def _get_entity_ids(self, job) -> list[int]:
+        job_data = job.data
+        entities = self._get_model(job_data).objects.filter(is_deleted=False)
+
+        efilter = self._get_efilter(job_data)
+        if efilter is not None:
+            entities = efilter.filter(entities)
+
+        return [
+            *EntityCredentials.filter(job.user, entities)
+                              .order_by('id')
+                              .values_list('id', flat=True),
+        ]
+
+    def _response_to_fileref(self, *, response, entity, user) -> FileRef:
+        "Store the content of a HttpResponse returned by an exporter in a file."
+        basename = secure_filename(f'{entity._meta.verbose_name}_{entity.id}.pdf')
+        final_path = FileCreator(
+            dir_path=path.join(settings.MEDIA_ROOT, 'billing'),
+            name=basename,
+        ).create()
+
+        with open(final_path, 'wb') as f:
+            f.write(response.content)
+
+        return FileRef.objects.create(
+            user=user,
+            filedata=f'billing/{path.basename(final_path)}',
+            basename=basename,
+            description=gettext('Export for «{}»').format(entity),
+        )
+
+    def _export_documents(self, job, entity_ids: list[int]) -> list[int]:
+        """Export some documents.
+        @return: The IDs of the exported FileRefs.
+        """
+        user = job.user
+        model = self._get_model(job.data)
+        exporter = self._get_exporter(model)
+        cache = ExportCache()
+        fileref_ids = []
+
+        for i in range(0, len(entity_ids), self.chunk_size):
+            results = []
+
+            for entity in model.objects.filter(
+                id__in=entity_ids[i:i + self.chunk_size],
+            ).order_by('id'):
+                messages = None
+
+                if not (user.has_perm_to_view(entity.source)
+                        and user.has_perm_to_view(entity.target)):
+                    messages = [
+                        gettext('You are not allowed to view the source or the target'),
+                    ]
+                else:
+                    try:
+                        export_result = cache.export(
+                            entity=entity, exporter=exporter, user=user,
+                        )
+
+                        if isinstance(export_result, HttpResponse):
+                            export_result = self._response_to_fileref(
+                                response=export_result, entity=entity, user=user,
+                            )
+                    except Exception as e:
+                        logger.exception(
+                            'BulkExport: error when exporting the entity id=%s', entity.id,
+                        )
+                        messages = [
+                            gettext('The export has failed'),
+                            gettext('Original error: {}').format(e),
+                        ]
+                    else:
+                        fileref_ids.append(export_result.id)
+
+                results.append(EntityJobResult(
+                    job=job, real_entity=entity, messages=messages,
+                ))
+
+            EntityJobResult.objects.bulk_create(results)
+
+        return fileref_ids
+
+    def _build_zip(self, job, fileref_ids: list[int]) -> FileRef:
+        model = self._get_model(job.data)
+        basename = secure_filename(f'{model._meta.verbose_name_plural}.zip')
+        final_path = FileCreator(
+            dir_path=path.join(settings.MEDIA_ROOT, 'billing'),
+            name=basename,
+        ).create()
+
+        file_refs = FileRef.objects.in_bulk(fileref_ids)
+        arcnames = set()
+
+        # NB: the PDF files are already compressed.
+        with ZipFile(final_path, 'w', compression=ZIP_STORED) as archive:
+            for fileref_id in fileref_ids:
+                file_ref = file_refs.get(fileref_id)
+                if file_ref is None:
+                    continue
+
+                arcname = file_ref.basename
+                if arcname in arcnames:
+                    arcname = f'{fileref_id}_{arcname}'
+                arcnames.add(arcname)
+
+                archive.write(file_ref.filedata.path, arcname=arcname)
+
+        return FileRef.objects.create(
+            user=job.user,
+            filedata=f'billing/{path.basename(final_path)}',
+            basename=basename,
+            description=gettext('Bulk export of «{model}»').format(
+                model=model_verbose_name(model),
+            ),
+        )
+
+    def _execute(self, job):
+        entity_ids = self._get_entity_ids(job)
+        workers = min(settings.BILLING_BULK_EXPORT_WORKERS, len(entity_ids))
+
+        if workers > 1:
+            logger.info('BulkExport: job %s is processed by %s workers', job.id, workers)
+
+            # NB: the IDs are split in contiguous slices to keep the order.
+            slice_size = -(-len(entity_ids) // workers)
+
+            # NB: the processes are spawned (not forked) so the workers do
+            #     not share the DB connection of the current process
+            #     (see creme_core.core.job.pool.JobWorkerPool).
+            with multiprocessing.get_context('spawn').Pool(
+                processes=workers, initializer=django.setup,
+            ) as pool:
+                fileref_ids = [
+                    fileref_id
+                    for ids in pool.starmap(
+                        _export_documents,
+                        [
+                            (job.id, entity_ids[i:i + slice_size])
+                            for i in range(0, len(entity_ids), slice_size)
+                        ],
+                    )
+                    for fileref_id in ids
+                ]
+        else:
+            fileref_ids = self._export_documents(job, entity_ids=entity_ids)
+
+        Notification.objects.send(
+            channel=UUID_CHANNEL_JOBS,
+            users=[job.user],
+            content=BulkExportDoneContent(instance=self._build_zip(job, fileref_ids)),
+        )
+
+    def progress(self, job):
+        count = EntityJobResult.objects.filter(job=job).count()
+        return JobProgress(
+            percentage=None,
+            label=ngettext(
+                '{count} document has been processed.',
+                '{count} documents have been processed.',
+                count
+            ).format(count=count),
+        )
+
+    @property
+    def results_bricks(self):
+        from creme.creme_core.bricks import EntityJobErrorsBrick
+        return [EntityJobErrorsBrick()]
+
+    def get_description(self, job):
+        try:
+            job_data = job.data
+            desc = [
+                gettext('Export «{model}»').format(
+                    model=model_verbose_name(self._get_model(job_data)),
+                ),
+            ]
+
+            efilter = self._get_efilter(job_data, raise_exception=False)
+            if efilter is not None:
+                desc.append(gettext('Filter: {}').format(efilter))
+        except Exception:
+            logger.exception('Error in _BulkExportType.get_description')
+            desc = ['?']
+
+        return desc
+
+    def get_stats(self, job):
+        count = EntityJobResult.objects.filter(job=job, messages__isnull=True).count()
+
+        return [
+            ngettext(
+                '{count} document has been successfully exported.',
+                '{count} documents have been successfully exported.',
+                count
+            ).format(count=count),
+        ]
+
+
+bulk_export_type = _BulkExportType()
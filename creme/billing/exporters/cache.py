@@ -0,0 +1,180 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from hashlib import sha256
+from os.path import exists
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+from creme.creme_core.models import FileRef
+
+if TYPE_CHECKING:
+    from django.http import HttpResponse
+
+    from creme.creme_core.models import CremeEntity
+
+    from .base import BillingExporter
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+    """Cache for the files generated by the exporters.
+
+    The FileRefs created by an export are tagged with a key built from the
+    document (ID, modification date, lines, totals...) & from the exporter
+    (engine & flavour). Exporting again an unmodified document with the same
+    exporter returns the existing FileRef, instead of generating a new file.
+
+    Notice that:
+      - the FileRefs are only reused for the same user (a user can only
+        download its own FileRefs).
+      - the FileRefs are generally temporary ones, so the cached files are
+        removed by the job "Temporary files cleaner".
+      - the exporters which return a HttpResponse (instead of a FileRef) are
+        not cached.
+    """
+    extra_data_key = 'billing_export'
+
+    def __init__(self, enabled: bool | None = None):
+        """Constructor.
+        @param enabled: <False> means that the files are always generated.
+               <None> means that the setting "BILLING_EXPORT_CACHE" is used.
+        """
+        self.enabled = settings.BILLING_EXPORT_CACHE if enabled is None else enabled
+
+    def fingerprint_items(self, entity: CremeEntity) -> Iterator:
+        """Get the values describing the content of the exported document ;
+        a modification of one of them produces a new export.
+        Hint: extend this method if your templates use other data.
+        """
+        yield entity.modified.isoformat()
+
+        for name in ('total_no_vat', 'total_vat'):
+            yield getattr(entity, name, None)
+
+        # NB: the lines are generally modified with their document (its totals
+        #     are updated), but the lines can be modified without changing the
+        #     totals (e.g. the description).
+        iter_all_lines = getattr(entity, 'iter_all_lines', None)
+        if iter_all_lines is not None:
+            for line in iter_all_lines():
+                yield line.id
+                yield line.modified.isoformat()
+
+        for name in ('source', 'target'):
+            related = getattr(entity, name, None)
+            if related is not None:
+                yield related.id
+                yield related.modified.isoformat()
+
+        # NB: the logo can be modified (new file) without changing the source.
+        image = getattr(getattr(entity, 'source', None), 'image', None)
+        if image is not None:
+            yield image.id
+            yield image.modified.isoformat()
+
+        for name in ('billing_address', 'shipping_address'):
+            address = getattr(entity, name, None)
+            if address is not None:
+                yield str(address)
+
+        # NB: these instances have no modification date.
+        status = getattr(entity, 'status', None)
+        if status is not None:
+            yield status.id
+            yield status.name
+
+        payment_info = getattr(entity, 'payment_info', None)
+        if payment_info is not None:
+            yield payment_info.id
+
+            for field in payment_info._meta.concrete_fields:
+                yield field.value_from_object(payment_info)
+
+    def key(self, *, entity: CremeEntity, exporter: BillingExporter) -> str:
+        "Get the key identifying the export of a document by an exporter."
+        hasher = sha256()
+        hasher.update(f'{entity.id}#{exporter.id}'.encode())
+
+        for item in self.fingerprint_items(entity):
+            hasher.update(b'#')
+            hasher.update(str(item).encode())
+
+        return hasher.hexdigest()
+
+    def get(self, *,
+            entity: CremeEntity,
+            exporter: BillingExporter,
+            user,
+            ) -> FileRef | None:
+        """Get the FileRef of a previous export of a document.
+        @return: A FileRef instance, or <None> if there is no valid cached file.
+        """
+        if not self.enabled:
+            return None
+
+        return self._get(key=self.key(entity=entity, exporter=exporter), user=user)
+
+    def _get(self, *, key: str, user) -> FileRef | None:
+        for file_ref in FileRef.objects.filter(
+            user=user, **{f'extra_data__{self.extra_data_key}': key},
+        ).order_by('-id'):
+            if exists(file_ref.filedata.path):
+                return file_ref
+
+            logger.warning(
+                'ExportCache: the file of the FileRef id=%s has been deleted',
+                file_ref.id,
+            )
+
+        return None
+
+    def export(self, *,
+               entity: CremeEntity,
+               exporter: BillingExporter,
+               user,
+               ) -> FileRef | HttpResponse:
+        "Export a document, or get the result of a previous export."
+        if not self.enabled:
+            return exporter.export(entity=entity, user=user)
+
+        key = self.key(entity=entity, exporter=exporter)
+        file_ref = self._get(key=key, user=user)
+
+        if file_ref is None:
+            export_result = exporter.export(entity=entity, user=user)
+
+            if not isinstance(export_result, FileRef):
+                return export_result
+
+            file_ref = export_result
+            file_ref.extra_data[self.extra_data_key] = key
+            file_ref.save()
+        else:
+            logger.debug(
+                'ExportCache: the FileRef id=%s is used to export the entity id=%s',
+                file_ref.id, entity.id,
+            )
+
+        return file_ref
@@ -20,15 +20,19 @@ from collections import defaultdict
 from json import dumps as json_dump
 
 from django import forms
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import pgettext_lazy
 
 from creme.creme_core.forms import CremeModelForm
 from creme.creme_core.forms.fields import JSONField
 from creme.creme_core.forms.widgets import ChainedInput, CremeRadioSelect
+from creme.creme_core.models import EntityFilter, Job
 from creme.creme_core.utils.l10n import countries
 from creme.creme_core.utils.unicode_collation import collator
 
+from ..creme_jobs import bulk_export_type
 from ..exporters.base import AGNOSTIC, BillingExportEngineManager
 from ..models import Base, ExporterConfigItem
 
@@ -400,3 +404,37 @@ class ExporterThemeStep(CremeModelForm):
         instance.flavour_id = exporter.flavour.as_id()
 
         return super().save(*args, **kwargs)
+
+
+class BulkExportForm(CremeModelForm):
+    filter = forms.ModelChoiceField(
+        label=pgettext_lazy('creme_core-noun', 'Filter'),
+        queryset=EntityFilter.objects.none(),
+        empty_label=pgettext_lazy('creme_core-filter', 'All'),
+        required=False,
+    )
+
+    class Meta(CremeModelForm.Meta):
+        model = Job
+        fields = ()
+
+    def __init__(self, model, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ctype = ctype = ContentType.objects.get_for_model(model)
+        self.fields['filter'].queryset = EntityFilter.objects.filter_by_user(
+            self.user,
+        ).filter(entity_type=ctype)
+
+    def save(self, *args, **kwargs):
+        job_data = {'ctype': self.ctype.id}
+
+        efilter = self.cleaned_data.get('filter')
+        if efilter:
+            job_data['efilter'] = efilter.id
+
+        instance = self.instance
+        instance.type = bulk_export_type
+        instance.user = self.user
+        instance.data = job_data
+
+        return super().save(*args, **kwargs)
@@ -73,8 +73,8 @@ class _LineMultipleAddForm(core_forms.CremeForm):
     def save(self):
         cdata = self.cleaned_data
         line_class = self._get_line_class()
-        create_item = partial(
-            line_class.objects.create,
+        build_line = partial(
+            line_class,
             related_document=self.billing_document,
             quantity=cdata['quantity'],
             discount=cdata['discount_value'],
@@ -86,10 +86,11 @@ class _LineMultipleAddForm(core_forms.CremeForm):
             default=0
         ) + 1
 
-        for order, item in enumerate(cdata['items'], order_start):
-            create_item(
-                related_item=item, unit_price=item.unit_price, unit=item.unit, order=order
-            )
+        line_class.multi_create(
+            build_line(
+                related_item=item, unit_price=item.unit_price, unit=item.unit, order=order,
+            ) for order, item in enumerate(cdata['items'], order_start)
+        )
 
 
 class ProductLineMultipleAddForm(_LineMultipleAddForm):
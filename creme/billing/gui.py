@@ -17,10 +17,15 @@
 ################################################################################
 
 from creme import recurrents
-from creme.creme_core.gui.listview import CreationButton
+from creme.creme_core.gui.listview import CreationButton, ListViewButton
 
 
 # TODO: limit generator to billing models ?
 class GeneratorCreationButton(CreationButton):
     def get_model(self, lv_context):
         return recurrents.get_rgenerator_model()
+
+
+class BulkExportButton(ListViewButton):
+    "Button to export the documents of the list-view (with its filter) in a ZIP file."
+    template_name = 'billing/listview/buttons/bulk-export.html'
@@ -291,7 +291,7 @@ class Base(CremeEntity):
             lines = cache[klass] = klass.objects.filter(
                 relations__object_entity=self.id,
                 relations__type=REL_OBJ_HAS_LINE,
-            ).order_by('order')
+            ).select_related('vat_value').order_by('order')
 
         return lines
 
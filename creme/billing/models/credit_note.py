@@ -92,10 +92,12 @@ class AbstractCreditNote(Base):
         return super().build(template)
 
     def _update_linked_docs(self):
+        from ..core.totals import refresh_totals
+
         for rel in Relation.objects.filter(
             subject_entity=self.id, type=REL_SUB_CREDIT_NOTE_APPLIED,
         ).prefetch_related('real_object'):
-            rel.real_object.save()
+            refresh_totals(rel.real_object)
 
     def restore(self):
         super().restore()
@@ -16,8 +16,11 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
 import logging
 import warnings
+from collections.abc import Iterable
 from functools import partial
 
 from django.core.exceptions import ValidationError
@@ -35,8 +38,6 @@ from ..utils import round_to_2
 logger = logging.getLogger(__name__)
 
 
-# TODO: use a smarter system to update the BillingModel only once when
-#  several lines are edited for the moment when have to re-save the model manually.
 class Line(CremeEntity):
     class Discount(models.IntegerChoices):
         PERCENT     = 1, _('Percent'),
@@ -241,33 +242,83 @@ class Line(CremeEntity):
         """
         raise NotImplementedError
 
+    def _check_creation(self) -> None:
+        assert self._related_document, 'Line.related_document is required'
+        assert bool(self._related_item) ^ bool(self.on_the_fly_item), \
+            'Line.related_item or Line.on_the_fly_item is required'
+
+    def _build_relations(self) -> list[Relation]:
+        "Build the relationships (not saved) of a line which has just been created."
+        build_relation = partial(Relation, subject_entity=self, user=self.user)
+        relations = [
+            build_relation(
+                type_id=constants.REL_OBJ_HAS_LINE,
+                object_entity=self._related_document,
+            ),
+        ]
+
+        if self._related_item:
+            relations.append(build_relation(
+                type_id=constants.REL_SUB_LINE_RELATED_ITEM,
+                object_entity=self._related_item,
+            ))
+
+        return relations
+
     @atomic
     def save(self, *args, **kwargs):
+        from ..core.totals import refresh_totals
+
         if not self.pk:  # Creation
-            assert self._related_document, 'Line.related_document is required'
-            assert bool(self._related_item) ^ bool(self.on_the_fly_item), \
-                'Line.related_item or Line.on_the_fly_item is required'
+            self._check_creation()
 
             self.user = self._related_document.user
 
             super().save(*args, **kwargs)
 
-            create_relation = partial(
-                Relation.objects.create, subject_entity=self, user=self.user,
-            )
-            create_relation(
-                type_id=constants.REL_OBJ_HAS_LINE,
-                object_entity=self._related_document,
-            )
-
-            if self._related_item:
-                create_relation(
-                    type_id=constants.REL_SUB_LINE_RELATED_ITEM,
-                    object_entity=self._related_item,
-                )
+            for relation in self._build_relations():
+                relation.save()
         else:
             super().save(*args, **kwargs)
 
-        # TODO: problem, if several lines are added/edited at once, lots of
-        #  useless queries (workflow engine ??)
-        self.related_document.save()  # Update totals
+        # NB: see 'billing.core.totals.defer_totals_update()' to update the
+        #     totals only once when several lines are saved.
+        refresh_totals(self.related_document)
+
+    @classmethod
+    @atomic
+    def multi_create(cls, lines: Iterable[Line]) -> list[Line]:
+        """Create several lines (not saved yet ; their related document must be
+        set) with grouped queries for their relationships ; the totals of each
+        related document are updated only once.
+        The lines can be instances of different classes of line (e.g.
+        ProductLine & ServiceLine).
+
+        @param lines: Instances of Line.
+        @return: The list of created lines.
+        """
+        from ..core.totals import defer_totals_update, refresh_totals
+
+        lines = [*lines]
+        relations = []
+
+        with defer_totals_update():
+            for line in lines:
+                if line.pk is not None:
+                    raise ValueError(
+                        f'Line.multi_create(): the instance pk={line.pk} is already saved.'
+                    )
+
+                line._check_creation()
+                line.user = line._related_document.user
+
+                # NB: the relationships are created below
+                super(Line, line).save()
+                relations.extend(line._build_relations())
+
+            Relation.objects.safe_multi_save(relations, check_existing=False)
+
+            for line in lines:
+                refresh_totals(line._related_document)
+
+        return lines
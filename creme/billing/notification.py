@@ -0,0 +1,29 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from creme.creme_core.core.notification import RelatedToModelBaseContent
+from creme.creme_core.models import FileRef
+
+
+class BulkExportDoneContent(RelatedToModelBaseContent):
+    id = RelatedToModelBaseContent.generate_id('billing', 'bulk_export_done')
+    subject_template_name = 'billing/notifications/bulk_export/subject.txt'
+    body_template_name = 'billing/notifications/bulk_export/body.txt'
+    html_body_template_name = 'billing/notifications/bulk_export/body.html'
+
+    model = FileRef
@@ -32,6 +32,7 @@ from creme.creme_core.models.utils import assign_2_charfield
 
 from . import constants
 from .core.number_generation import number_generator_registry
+from .core.totals import refresh_totals
 # from .models import ConfigBillingAlgo, SimpleBillingAlgo
 from .models import Base, NumberGeneratorItem
 
@@ -173,10 +174,11 @@ def handle_replace_statuses(sender, model_field, replacing_instance, **kwargs):
 def manage_linked_credit_notes(sender, instance, **kwargs):
     "The calculated totals of Invoices have to be refreshed."
     if instance.type_id == constants.REL_SUB_CREDIT_NOTE_APPLIED:
-        instance.real_object.save()
+        refresh_totals(instance.real_object)
 
 
-# TODO: problem, if several lines are deleted at once, lots of useless queries (workflow engine ??)
+# NB: see 'billing.core.totals.defer_totals_update()' to update the totals
+#     only once when several lines are deleted.
 @receiver(signals.post_delete, sender=Relation, dispatch_uid='billing-manage_line_deletion')
 def manage_line_deletion(sender, instance, **kwargs):
     "The calculated totals (Invoice, Quote...) have to be refreshed."
@@ -187,7 +189,7 @@ def manage_line_deletion(sender, instance, **kwargs):
         # NB: see billing.models.base.Base._pre_delete() for this ugly hack
         and not getattr(instance, '_avoid_billing_total_update', False)
     ):
-        instance.subject_entity.get_real_entity().save()
+        refresh_totals(instance.subject_entity.get_real_entity())
 
 
 # _WORKFLOWS = {
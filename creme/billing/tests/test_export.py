@@ -5,6 +5,7 @@ from json import dumps as json_dump
 from pathlib import Path
 from shutil import which
 from unittest import skipIf
+from zipfile import ZipFile
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
@@ -12,9 +13,12 @@ from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.formats import date_format
 from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
 
 from creme.billing.bricks import BillingExportersBrick
+from creme.billing.creme_jobs import bulk_export_type
 from creme.billing.exporters import BillingExportEngineManager, ExporterFlavour
+from creme.billing.exporters.cache import ExportCache
 from creme.billing.exporters.latex import LatexExportEngine, LatexExporter
 from creme.billing.exporters.xls import XLSExportEngine, XLSExporter
 from creme.billing.models import (
@@ -23,9 +27,18 @@ from creme.billing.models import (
     PaymentInformation,
     SettlementTerms,
 )
-from creme.creme_core.models import FileRef, Vat
+from creme.creme_core.constants import UUID_CHANNEL_JOBS
+from creme.creme_core.models import (
+    EntityFilter,
+    EntityJobResult,
+    FileRef,
+    Job,
+    Notification,
+    Vat,
+)
 from creme.creme_core.tests.views.base import BrickTestCaseMixin
 from creme.creme_core.utils.xlrd_utils import XlrdReader
+from creme.documents.tests.base import DocumentsTestCaseMixin
 from creme.persons.tests.base import (
     skipIfCustomAddress,
     skipIfCustomOrganisation,
@@ -35,6 +48,7 @@ from creme.products.models import SubCategory
 from creme.products.tests.base import skipIfCustomProduct, skipIfCustomService
 
 from ..forms.export import ExporterLocalisationField
+from ..notification import BulkExportDoneContent
 from .base import (
     Address,
     CreditNote,
@@ -314,7 +328,7 @@ class ExporterLocalisationFieldTestCase(_BillingTestCase):
 
 
 @skipIfCustomOrganisation
-class ExportTestCase(BrickTestCaseMixin, _BillingTestCase):
+class ExportTestCase(BrickTestCaseMixin, DocumentsTestCaseMixin, _BillingTestCase):
     @staticmethod
     def _build_conf_url(ctype):
         return reverse('billing__edit_exporter_config', args=(ctype.id,))
@@ -1575,3 +1589,303 @@ class ExportTestCase(BrickTestCaseMixin, _BillingTestCase):
             content_type=invoice.entity_type,
         ).update(engine_id=LatexExportEngine.id)
         self.assertGET403(self._build_export_url(invoice))
+
+    @skipIfCustomInvoice
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'],
+        BILLING_EXPORT_CACHE=True,
+    )
+    def test_export_cache(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='My Invoice', discount=0)[0]
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(engine_id=XLSExportEngine.id)
+
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+        url = self._build_export_url(invoice)
+        self.assertGET200(url, follow=True)
+
+        fileref = self.get_alone_element(FileRef.objects.exclude(id__in=existing_fileref_ids))
+        config_item = ExporterConfigItem.objects.get(content_type=invoice.entity_type)
+        exporter = XLSExportEngine(Invoice).exporter(
+            flavour=ExporterFlavour.from_id(config_item.flavour_id),
+        )
+        cache = ExportCache()
+        invoice = self.refresh(invoice)
+        self.assertDictEqual(
+            {cache.extra_data_key: cache.key(entity=invoice, exporter=exporter)},
+            fileref.extra_data,
+        )
+        self.assertEqual(
+            fileref, cache.get(entity=invoice, exporter=exporter, user=user),
+        )
+
+        # Same document => same file
+        response2 = self.assertGET200(url, follow=True)
+        self.assertEqual('application/vnd.ms-excel', response2['Content-Type'])
+        self.assertEqual(
+            fileref, self.get_alone_element(FileRef.objects.exclude(id__in=existing_fileref_ids)),
+        )
+
+        # Other user => other file
+        other_user = self.create_user()
+        self.assertIsNone(cache.get(entity=invoice, exporter=exporter, user=other_user))
+
+        # Modified document => new file
+        create_line = partial(
+            ProductLine.objects.create, user=user, related_document=invoice,
+        )
+        create_line(on_the_fly_item='Flyyy product', unit_price=Decimal('10'))
+
+        invoice = self.refresh(invoice)
+        self.assertIsNone(cache.get(entity=invoice, exporter=exporter, user=user))
+
+        self.assertGET200(url, follow=True)
+        self.assertEqual(
+            2, FileRef.objects.exclude(id__in=existing_fileref_ids).count(),
+        )
+
+    @skipIfCustomInvoice
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'],
+        BILLING_EXPORT_CACHE=True,
+    )
+    def test_export_cache__deleted_file(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='My Invoice', discount=0)[0]
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(engine_id=XLSExportEngine.id)
+
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+        url = self._build_export_url(invoice)
+        self.assertGET200(url, follow=True)
+
+        fileref = self.get_alone_element(FileRef.objects.exclude(id__in=existing_fileref_ids))
+        Path(fileref.filedata.path).unlink()
+
+        self.assertGET200(url, follow=True)
+        self.assertEqual(
+            2, FileRef.objects.exclude(id__in=existing_fileref_ids).count(),
+        )
+
+    @skipIfCustomInvoice
+    def test_export_cache__related_data(self):
+        "Data displayed in the document which do not change its modification date."
+        user = self.login_as_root_and_get()
+        invoice, source, target = self.create_invoice_n_orgas(
+            user=user, name='My Invoice', discount=0,
+        )
+        source.image = self._create_image(user=user)
+        source.save()
+
+        invoice.payment_info = payment_info = PaymentInformation.objects.create(
+            organisation=source, name='RIB #1', iban='FR76 0000',
+        )
+        invoice.save()
+
+        build_key = partial(
+            ExportCache().key,
+            exporter=XLSExportEngine(Invoice).exporter(flavour=ExporterFlavour.agnostic()),
+        )
+        key1 = build_key(entity=self.refresh(invoice))
+
+        # Status ---
+        status = invoice.status
+        status.name = f'{status.name} (renamed)'
+        status.save()
+
+        key2 = build_key(entity=self.refresh(invoice))
+        self.assertNotEqual(key1, key2)
+
+        # Payment information ---
+        payment_info.iban = 'FR76 1111'
+        payment_info.save()
+
+        key3 = build_key(entity=self.refresh(invoice))
+        self.assertNotEqual(key2, key3)
+
+        # Logo ---
+        image = source.image
+        image.description = 'New version of the logo'
+        image.save()
+
+        self.assertNotEqual(key3, build_key(entity=self.refresh(invoice)))
+
+    @skipIfCustomInvoice
+    @override_settings(
+        BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'],
+        BILLING_EXPORT_CACHE=False,
+    )
+    def test_export_cache__disabled(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='My Invoice', discount=0)[0]
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(engine_id=XLSExportEngine.id)
+
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+        url = self._build_export_url(invoice)
+        self.assertGET200(url, follow=True)
+        self.assertGET200(url, follow=True)
+
+        filerefs = FileRef.objects.exclude(id__in=existing_fileref_ids)
+        self.assertEqual(2, len(filerefs))
+        self.assertDictEqual({}, filerefs[0].extra_data)
+
+
+@skipIfCustomInvoice
+class BulkExportTestCase(_BillingTestCase):
+    @staticmethod
+    def _build_bulk_export_url(model, efilter_id=None):
+        url = reverse(
+            'billing__bulk_export',
+            args=(ContentType.objects.get_for_model(model).id,),
+        )
+
+        return f'{url}?efilter={efilter_id}' if efilter_id else url
+
+    def test_creation(self):
+        user = self.login_as_root_and_get()
+
+        efilter = EntityFilter.objects.smart_update_or_create(
+            'test-filter_invoices', 'Invoices', Invoice, is_custom=True,
+        )
+
+        url = self._build_bulk_export_url(Invoice, efilter_id=efilter.id)
+        response1 = self.assertGET200(url)
+
+        context = response1.context
+        self.assertEqual(
+            _('Bulk export of «{model}»').format(model=_('Invoices')), context.get('title'),
+        )
+        self.assertEqual(_('Export'), context.get('submit_label'))
+
+        with self.assertNoException():
+            form = context['form']
+            filter_qs = form.fields['filter'].queryset
+
+        self.assertIn(efilter, filter_qs)
+        self.assertEqual(str(efilter.id), form.initial.get('filter'))
+
+        response2 = self.client.post(url, follow=True, data={'filter': efilter.id})
+        self.assertNoFormError(response2)
+
+        job = self.get_alone_element(Job.objects.filter(type_id=bulk_export_type.id))
+        self.assertRedirects(response2, job.get_absolute_url())
+        self.assertEqual(user, job.user)
+        self.assertEqual(Job.STATUS_WAIT, job.status)
+        self.assertDictEqual(
+            {'ctype': ContentType.objects.get_for_model(Invoice).id, 'efilter': efilter.id},
+            job.data,
+        )
+        self.assertListEqual(
+            [
+                _('Export «{model}»').format(model=_('Invoice')),
+                _('Filter: {}').format(efilter),
+            ],
+            job.description,
+        )
+
+    def test_creation__not_billing_model(self):
+        self.login_as_root()
+        self.assertGET409(self._build_bulk_export_url(Organisation))
+
+    @override_settings(BILLING_EXPORTERS=['creme.billing.exporters.xls.XLSExportEngine'])
+    def test_execute(self):
+        user = self.login_as_root_and_get()
+        invoice1 = self.create_invoice_n_orgas(user=user, name='Invoice #1', discount=0)[0]
+        invoice2 = self.create_invoice_n_orgas(user=user, name='Invoice #2', discount=0)[0]
+        invoice3 = self.create_invoice_n_orgas(user=user, name='Invoice #3', discount=0)[0]
+        invoice3.trash()
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice1.entity_type,
+        ).update(engine_id=XLSExportEngine.id)
+
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+
+        job = Job.objects.create(
+            user=user,
+            type_id=bulk_export_type.id,
+            language='en',
+            data={'ctype': invoice1.entity_type_id},
+        )
+        bulk_export_type.execute(job)
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_OK, job.status)
+        self.assertIsNone(job.error)
+
+        results = EntityJobResult.objects.filter(job=job)
+        self.assertCountEqual([invoice1.id, invoice2.id], [r.entity_id for r in results])
+        self.assertListEqual([None, None], [r.messages for r in results])
+        self.assertListEqual(
+            [
+                ngettext(
+                    '{count} document has been successfully exported.',
+                    '{count} documents have been successfully exported.',
+                    2
+                ).format(count=2),
+            ],
+            bulk_export_type.get_stats(job),
+        )
+
+        filerefs = FileRef.objects.exclude(id__in=existing_fileref_ids)
+        self.assertEqual(3, len(filerefs))
+
+        zip_fileref = filerefs.get(basename=f"{_('Invoices')}.zip")
+        self.assertEqual(user, zip_fileref.user)
+        self.assertTrue(zip_fileref.temporary)
+
+        with ZipFile(zip_fileref.filedata.path) as archive:
+            self.assertCountEqual(
+                [
+                    f"{_('Invoice')}_{invoice1.id}.xls",
+                    f"{_('Invoice')}_{invoice2.id}.xls",
+                ],
+                archive.namelist(),
+            )
+
+        notif = self.get_object_or_fail(
+            Notification, user=user, channel__uuid=UUID_CHANNEL_JOBS,
+        )
+        self.assertEqual(BulkExportDoneContent.id, notif.content_id)
+        self.assertDictEqual({'instance': zip_fileref.id}, notif.content_data)
+
+        # The exported files are re-used
+        EntityJobResult.objects.filter(job=job).delete()
+        bulk_export_type.execute(job)
+        self.assertEqual(
+            4, FileRef.objects.exclude(id__in=existing_fileref_ids).count(),
+        )
+
+    def test_execute__not_configured(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='Invoice #1', discount=0)[0]
+
+        ExporterConfigItem.objects.filter(
+            content_type=invoice.entity_type,
+        ).update(engine_id='')
+
+        job = Job.objects.create(
+            user=user,
+            type_id=bulk_export_type.id,
+            language='en',
+            data={'ctype': invoice.entity_type_id},
+        )
+        bulk_export_type.execute(job)
+
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_ERROR, job.status)
+        self.assertEqual(
+            _(
+                'The exporter is not configured or invalid; '
+                'go to the configuration of the app «Billing».'
+            ),
+            job.error,
+        )
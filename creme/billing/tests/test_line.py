@@ -18,6 +18,7 @@ from creme.products.models import Product, Service, SubCategory
 from creme.products.tests.base import skipIfCustomProduct, skipIfCustomService
 
 from ..constants import REL_SUB_HAS_LINE, REL_SUB_LINE_RELATED_ITEM
+from ..core.totals import defer_totals_update
 from .base import (
     Invoice,
     ProductLine,
@@ -1683,3 +1684,130 @@ class LineTestCase(BrickTestCaseMixin, _BillingTestCase):
         self.assertEqual(comment, self.refresh(pline).comment)
 
         self.assertGET404(build_uri(pline, 'on_the_fly_item'))
+
+    @skipIfCustomProductLine
+    @skipIfCustomServiceLine
+    def test_multi_create(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='Invoice001', discount=0)[0]
+        product = self.create_product(user=user)
+
+        vat = Vat.objects.get_or_create(value=Decimal('10'))[0]
+        build_pline = partial(ProductLine, related_document=invoice, vat_value=vat)
+        lines = [
+            build_pline(related_item=product, unit_price=Decimal('10'), order=1),
+            build_pline(on_the_fly_item='Flyyy', unit_price=Decimal('20'), order=2),
+            ServiceLine(
+                related_document=invoice, vat_value=vat,
+                on_the_fly_item='Help', unit_price=Decimal('30'), quantity=2,
+            ),
+        ]
+
+        original_update = Invoice._update_totals
+        with patch.object(
+            Invoice, '_update_totals', autospec=True, side_effect=original_update,
+        ) as update_mock:
+            created = ProductLine.multi_create(lines)
+
+        self.assertListEqual(lines, created)
+        self.assertEqual(1, update_mock.call_count)
+
+        invoice = self.refresh(invoice)
+        plines = invoice.get_lines(ProductLine)
+        self.assertEqual(2, len(plines))
+        self.assertEqual(1, len(invoice.get_lines(ServiceLine)))
+        self.assertEqual(user, plines[0].user)
+
+        for line in lines:
+            self.assertHaveRelation(subject=invoice, type=REL_SUB_HAS_LINE, object=line)
+        self.assertHaveRelation(
+            subject=plines[0], type=REL_SUB_LINE_RELATED_ITEM, object=product,
+        )
+        self.assertFalse(
+            Relation.objects.filter(subject_entity=plines[1].id, type=REL_SUB_LINE_RELATED_ITEM)
+        )
+
+        self.assertEqual(Decimal('90'), invoice.total_no_vat)
+        self.assertEqual(Decimal('99'), invoice.total_vat)
+
+        # ---
+        with self.assertRaises(ValueError):
+            ProductLine.multi_create([plines[0]])
+
+    @skipIfCustomProductLine
+    def test_defer_totals_update(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='Invoice001', discount=0)[0]
+
+        create_pline = partial(
+            ProductLine.objects.create,
+            user=user, related_document=invoice, vat_value=Vat.objects.get_or_create(
+                value=Decimal('10'),
+            )[0],
+        )
+
+        original_update = Invoice._update_totals
+        with patch.object(
+            Invoice, '_update_totals', autospec=True, side_effect=original_update,
+        ) as update_mock:
+            with defer_totals_update():
+                line1 = create_pline(on_the_fly_item='Fly #1', unit_price=Decimal('10'))
+
+                with defer_totals_update():  # Nested
+                    create_pline(on_the_fly_item='Fly #2', unit_price=Decimal('20'))
+
+                self.assertEqual(0, update_mock.call_count)
+                self.assertEqual(Decimal('0'), self.refresh(invoice).total_no_vat)
+
+                line1.quantity = 2
+                line1.save()
+
+        self.assertEqual(1, update_mock.call_count)
+
+        invoice = self.refresh(invoice)
+        self.assertEqual(Decimal('40'), invoice.total_no_vat)
+        self.assertEqual(Decimal('44'), invoice.total_vat)
+
+    @skipIfCustomProductLine
+    def test_defer_totals_update__deletion(self):
+        "Deleted lines & deleted document."
+        user = self.login_as_root_and_get()
+        invoice1, source, target = self.create_invoice_n_orgas(
+            user=user, name='Invoice001', discount=0,
+        )
+        invoice2 = self.create_invoice(
+            user=user, name='Invoice002', source=source, target=target,
+        )
+
+        create_pline = partial(
+            ProductLine.objects.create, user=user, unit_price=Decimal('10'),
+        )
+        line1 = create_pline(related_document=invoice1, on_the_fly_item='Fly #1')
+        create_pline(related_document=invoice1, on_the_fly_item='Fly #2')
+        line3 = create_pline(related_document=invoice2, on_the_fly_item='Fly #3')
+        self.assertEqual(Decimal('20'), self.refresh(invoice1).total_no_vat)
+
+        with defer_totals_update():
+            line1.delete()
+            self.assertEqual(Decimal('20'), self.refresh(invoice1).total_no_vat)
+
+            line3.save()
+            invoice2.delete()
+
+        self.assertEqual(Decimal('10'), self.refresh(invoice1).total_no_vat)
+        self.assertDoesNotExist(invoice2)
+
+    @skipIfCustomProductLine
+    def test_defer_totals_update__error(self):
+        user = self.login_as_root_and_get()
+        invoice = self.create_invoice_n_orgas(user=user, name='Invoice001', discount=0)[0]
+
+        with self.assertRaises(ValueError):
+            with defer_totals_update():
+                ProductLine.objects.create(
+                    user=user, related_document=invoice,
+                    on_the_fly_item='Fly', unit_price=Decimal('10'),
+                )
+                raise ValueError('Invalid data')
+
+        self.assertEqual(Decimal('0'), self.refresh(invoice).total_no_vat)
@@ -38,6 +38,11 @@ urlpatterns = [
         export.Export.as_view(),
         name='billing__export',
     ),
+    re_path(
+        r'^export/bulk/(?P<ct_id>\d+)[/]?$',
+        export.BulkExport.as_view(),
+        name='billing__bulk_export',
+    ),
 
     re_path(r'^payment_information/', include([
         re_path(
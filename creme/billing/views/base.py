@@ -28,6 +28,8 @@ from creme.creme_core.models import RelationType
 from creme.creme_core.utils import bool_from_str_extended
 from creme.creme_core.views import generic
 
+from .. import gui
+
 
 class BaseCreation(generic.EntityCreation):
     model = Base
@@ -89,6 +91,9 @@ class RelatedBaseCreation(generic.AddingInstanceToEntityPopup):
 class BaseList(generic.EntitiesList):
     model = Base
 
+    def get_buttons(self):
+        return super().get_buttons().append(gui.BulkExportButton)
+
     def get_cells(self, hfilter):
         cells = super().get_cells(hfilter=hfilter)
         model = self.model
@@ -18,16 +18,24 @@
 
 import logging
 
+from django.conf import settings
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils.translation import gettext as _
+from django.utils.translation import gettext_lazy
 
 from creme import billing
 from creme.creme_core.core.exceptions import ConflictError
-from creme.creme_core.models import FileRef
-from creme.creme_core.views.generic import CremeModelEditionWizardPopup, base
+from creme.creme_core.models import FileRef, Job
+from creme.creme_core.views.generic import (
+    CremeModelCreation,
+    CremeModelEditionWizardPopup,
+    base,
+)
 
 from ..exporters import BillingExportEngineManager
+from ..exporters.cache import ExportCache
 from ..forms import export as export_forms
 from ..models import ExporterConfigItem
 
@@ -67,6 +75,7 @@ class Export(base.EntityRelatedMixin, base.CheckedView):
         billing.get_sales_order_model(),
         billing.get_template_base_model(),
     ]
+    export_cache_class = ExportCache
 
     def check_related_entity_permissions(self, entity, user):
         has_perm = user.has_perm_to_view_or_die
@@ -100,8 +109,8 @@ class Export(base.EntityRelatedMixin, base.CheckedView):
                 'go to the configuration of the app «Billing».'
             ))
 
-        export_result = exporter.export(
-            entity=entity, user=request.user,
+        export_result = self.export_cache_class().export(
+            entity=entity, exporter=exporter, user=request.user,
         )
 
         if isinstance(export_result, HttpResponse):
@@ -110,3 +119,46 @@ class Export(base.EntityRelatedMixin, base.CheckedView):
         assert isinstance(export_result, FileRef)
 
         return HttpResponseRedirect(export_result.get_download_absolute_url())
+
+
+class BulkExport(base.EntityCTypeRelatedMixin, CremeModelCreation):
+    """Create a job which exports the documents of a filter in a ZIP file."""
+    model = Job
+    form_class = export_forms.BulkExportForm
+    permissions = 'billing'
+    title = gettext_lazy('Bulk export of «{model}»')
+    submit_label = gettext_lazy('Export')
+    entity_classes = Export.entity_classes
+
+    def check_related_ctype(self, ctype):
+        super().check_related_ctype(ctype)
+
+        if ctype.model_class() not in self.entity_classes:
+            raise ConflictError(f'This model is not a billing document: {ctype}')
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.user.is_authenticated
+            and Job.objects.not_finished(request.user).count() >= settings.MAX_JOBS_PER_USER
+        ):
+            return HttpResponseRedirect(reverse('creme_core__my_jobs'))
+
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['model'] = self.get_ctype().model_class()
+
+        return kwargs
+
+    def get_initial(self):
+        initial = super().get_initial()
+        initial['filter'] = self.request.GET.get('efilter')
+
+        return initial
+
+    def get_title_format_data(self):
+        # NB: Job has no attribute "creation_label" (used by CremeModelCreation)
+        return {
+            'model': self.get_ctype().model_class()._meta.verbose_name_plural,
+        }
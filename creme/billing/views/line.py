@@ -43,6 +43,7 @@ from creme.creme_core.views.generic.listview import SelectionMode
 from .. import constants
 from ..core import BILLING_MODELS
 from ..core.line import line_registry
+from ..core.totals import defer_totals_update
 from ..forms import line as line_forms
 
 ProductLine = billing.get_product_line_model()
@@ -181,6 +182,7 @@ LINE_FORMSET_PREFIX = {
 @permission_required('billing')
 @atomic
 @workflow_engine
+@defer_totals_update()
 def multi_save_lines(request, document_id):
     get_for_ct = ContentType.objects.get_for_model
     b_entity = get_object_or_404(
@@ -38,6 +38,7 @@ from creme.creme_core.core import setting_key
 from creme.creme_core.core.entity_filter import EF_REGULAR
 from creme.creme_core.core.field_tags import FieldTag
 from creme.creme_core.core.notification import notification_registry
+from creme.creme_core.core.workflow import workflow_stats
 from creme.creme_core.gui.bricks import (
     Brick,
     BrickManager,
@@ -573,10 +574,16 @@ class WorkflowsBrick(PaginatedBrick):
         ctypes_wrappers = btc['page'].object_list
         user = btc['user']
 
+        workflows = [
+            *core_models.Workflow.objects.filter(
+                content_type__in=[ctw.ctype for ctw in ctypes_wrappers],
+            ).order_by('id'),
+        ]
+        # NB: empty if the statistics are disabled
+        stats = workflow_stats.get(workflows)
+
         workflow_map = defaultdict(list)
-        for workflow in core_models.Workflow.objects.filter(
-            content_type__in=[ctw.ctype for ctw in ctypes_wrappers],
-        ).order_by('id'):
+        for workflow in workflows:
             workflow.rendered_actions = [
                 action.render(user=user) for action in workflow.actions
             ]
@@ -584,6 +591,15 @@ class WorkflowsBrick(PaginatedBrick):
                 *workflow.conditions.descriptions(user=user),
             ]
 
+            wf_stats = stats.get(workflow.uuid)
+            if wf_stats is not None:
+                triggered = wf_stats['triggered']
+                # Average duration in milliseconds
+                wf_stats['average'] = (
+                    round(wf_stats['duration'] / triggered / 1000, 2) if triggered else 0
+                )
+            workflow.stats = wf_stats
+
             workflow_map[workflow.content_type_id].append(workflow)
 
         for ctw in ctypes_wrappers:
@@ -3,13 +3,17 @@ from json import dumps as json_dump
 
 from django import forms
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.test.utils import override_settings
 from django.urls import reverse
+from django.utils.formats import number_format
 from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
 
 from creme.creme_config.bricks import WorkflowsBrick
 from creme.creme_config.forms.workflow import TriggerField
 from creme.creme_core.core.entity_filter import condition_handler, operators
-from creme.creme_core.core.workflow import WorkflowConditions
+from creme.creme_core.core.workflow import WorkflowConditions, workflow_stats
 from creme.creme_core.forms.entity_filter import fields as ef_fields
 from creme.creme_core.forms.workflows import (
     PropertyAddingActionForm,
@@ -167,6 +171,53 @@ class WorkflowTestCase(BrickTestCaseMixin, CremeTestCase):
         #     },
         # )
 
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'creme_workflows_test': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'creme_config-tests-workflows',
+            },
+        },
+        WORKFLOW_STATS_CACHE_ALIAS='creme_workflows_test',
+    )
+    def test_portal__stats(self):
+        self.login_as_root()
+        self.addCleanup(caches['creme_workflows_test'].clear)
+
+        wf = Workflow.objects.create(
+            title='My WF',
+            content_type=FakeContact,
+            trigger=EntityCreationTrigger(model=FakeContact),
+        )
+        workflow_stats.add({wf.uuid: {'triggered': 4, 'executed': 3, 'duration': 10_000}})
+
+        response = self.assertGET200(reverse('creme_config__workflows'))
+        brick_node = self.get_brick_node(
+            self.get_html_tree(response.content), WorkflowsBrick.id,
+        )
+        stats_node = self.get_html_node_or_fail(
+            brick_node,
+            f'.//div[@data-workflow-id="{wf.id}"]//span[@class="workflow-config-stats-content"]',
+        )
+        content = ' '.join(''.join(stats_node.itertext()).split())
+        self.assertIn(
+            ngettext(
+                'Triggered %(counter)s time', 'Triggered %(counter)s times', 4,
+            ) % {'counter': 4},
+            content,
+        )
+        self.assertIn(
+            ngettext(
+                'executed %(counter)s time', 'executed %(counter)s times', 3,
+            ) % {'counter': 3},
+            content,
+        )
+        self.assertIn(
+            _('average duration: %(duration)s ms') % {'duration': number_format(2.5)},
+            content,
+        )
+
     def test_create__no_conditions(self):
         user = self.login_as_standard(admin_4_apps=('creme_core',))
 
@@ -591,6 +642,32 @@ class WorkflowTestCase(BrickTestCaseMixin, CremeTestCase):
         self.assertTrue(self.refresh(wf1).enabled)
         self.assertFalse(self.refresh(wf2).enabled)
 
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'creme_config_test': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'creme_config-tests-config',
+            },
+        },
+        CONFIG_CACHE_ALIAS='creme_config_test',
+    )
+    def test_enable__index(self):
+        "The shared index of the Workflows is invalidated."
+        self.login_as_root()
+        self.addCleanup(caches['creme_config_test'].clear)
+
+        wf = Workflow.objects.create(
+            title='My WF',
+            content_type=FakeContact,
+            enabled=False,
+            trigger=EntityCreationTrigger(model=FakeContact),
+        )
+        self.assertNotIn(wf.id, [w.id for w in Workflow.objects.get_index()])
+
+        self.assertPOST200(reverse('creme_config__enable_workflow', args=(wf.id,)))
+        self.assertIn(wf.id, [w.id for w in Workflow.objects.get_index()])
+
     def test_disable(self):
         self.login_as_standard(admin_4_apps=('creme_core',))
 
@@ -22,6 +22,7 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
+from creme.creme_core.core.config_cache import config_cache
 from creme.creme_core.core.exceptions import ConflictError
 from creme.creme_core.core.workflow import workflow_registry
 from creme.creme_core.models import CustomEntityType, Workflow
@@ -127,6 +128,8 @@ class WorkflowEnabling(generic.CheckedView):
         Workflow.objects.filter(id=kwargs[self.pk_url_kwarg]).update(
             enabled=kwargs.get(self.enabled_arg, self.enabled_default),
         )
+        # NB: update() does not send the signals which invalidate the cache
+        config_cache.invalidate(Workflow.objects.config_cache_namespace)
 
         return HttpResponse()
 
@@ -447,6 +447,11 @@ class CremeCoreConfig(CremeAppConfig):
             from .tests.fake_apps import ready
             ready()
 
+        # NB: connect the signal handlers which update the search index, the
+        #     materialized filters & the cache of counts.
+        from .core import count_cache, search_index  # NOQA
+        from .core.entity_filter import materialization  # NOQA
+
         super().all_apps_ready()
 
     def register_menu_entries(self, menu_registry):
@@ -625,6 +630,8 @@ class CremeCoreConfig(CremeAppConfig):
             content_cls=core_notif.UpgradeAnnouncement,
         ).register_content(
             content_cls=core_notif.MassImportDoneContent,
+        ).register_content(
+            content_cls=core_notif.MassExportDoneContent,
         )
 
     def register_creme_config(self, config_registry):
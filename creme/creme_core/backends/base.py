@@ -16,8 +16,18 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
 from django.http.response import HttpResponseBase
 
+if TYPE_CHECKING:
+    from django.http import StreamingHttpResponse
+
+    from ..models import FileRef
+
 
 class ImportBackend:
     """
@@ -57,6 +67,19 @@ class ExportBackend:
     help_text: str = 'OVERRIDE ME'
 
     response: HttpResponseBase
+    # Backends which store the file on the disk (see save()) should set this
+    # attribute with the created FileRef.
+    fileref: FileRef | None = None
+
+    def stream(self, rows: Iterable[list], filename: str) -> StreamingHttpResponse | None:
+        """Build a response which generates the file on the fly, so the whole
+        file is never stored in memory.
+        @param rows: Iterable of rows (lists of strings) ; it is consumed lazily.
+        @param filename: file name.
+        @return: A response, or <None> if the backend cannot stream (the methods
+                 writerow() & save() are used instead).
+        """
+        return None
 
     def writerow(self, row):
         """Appends a row.
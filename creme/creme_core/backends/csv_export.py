@@ -18,13 +18,19 @@
 
 import csv
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.defaultfilters import slugify
 from django.utils.translation import gettext_lazy as _
 
 from .base import ExportBackend
 
 
+class _Echo:
+    "Pseudo-buffer; the CSV writer gives us back the written lines."
+    def write(self, value):
+        return value
+
+
 class CSVExportBackend(ExportBackend):
     id = 'csv'
     verbose_name = _("CSV File (delimiter: ',')")
@@ -39,11 +45,23 @@ class CSVExportBackend(ExportBackend):
             delimiter=self.delimiter,
         )
 
+    def _content_disposition(self, filename):
+        return f'attachment; filename="{slugify(filename)}.csv"'
+
+    def stream(self, rows, filename):
+        writer = csv.writer(_Echo(), quoting=csv.QUOTE_ALL, delimiter=self.delimiter)
+
+        return StreamingHttpResponse(
+            (writer.writerow(row) for row in rows),
+            content_type='text/csv',
+            headers={'Content-Disposition': self._content_disposition(filename)},
+        )
+
     def writerow(self, row):
         return self.writer.writerow(row)
 
     def save(self, filename, user):
-        self.response['Content-Disposition'] = f'attachment; filename="{slugify(filename)}.csv"'
+        self.response['Content-Disposition'] = self._content_disposition(filename)
 
 
 class SemiCSVExportBackend(CSVExportBackend):
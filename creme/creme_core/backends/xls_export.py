@@ -53,6 +53,7 @@ class XLSExportBackend(ExportBackend):
             ),
             description=gettext('Mass export'),  # TODO: possibility to pass the name?
         )
+        self.fileref = fileref
         self.response = HttpResponseRedirect(fileref.get_download_absolute_url())
         self.writer.save(path)
 
@@ -39,7 +39,10 @@ class XLSXExportBackend(ExportBackend):
     def __init__(self):
         super().__init__()
         self.dir_path = join(settings.MEDIA_ROOT, *self.dir_parts)
-        self._workbook = Workbook()
+        # NB: in write-only mode, the rows are flushed on the disk, so the
+        #     memory usage does not depend on the number of rows.
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
 
     def save(self, filename, user):
         name = f'{slugify(filename)}.{self.id}'
@@ -53,8 +56,9 @@ class XLSXExportBackend(ExportBackend):
             ),
             description=gettext('Mass export'),  # TODO: possibility to pass the name?
         )
+        self.fileref = fileref
         self.response = HttpResponseRedirect(fileref.get_download_absolute_url())
         self._workbook.save(path)
 
     def writerow(self, row):
-        self._workbook.active.append(row)
+        self._sheet.append(row)
@@ -0,0 +1,222 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+"""Cache for the configuration models, shared between the requests.
+
+The configuration models (FieldsConfig, CustomField, SettingValue...) are read
+by almost all the views, but rarely modified. Their managers already cache the
+instances during a request (see 'creme_core.global_info.get_per_request_cache()') ;
+the cache defined here is a second level which avoids the queries between the
+requests.
+
+The data are stored in the Django's cache which alias is given by the setting
+'CONFIG_CACHE_ALIAS' (the cache is disabled if the alias is <None>).
+The data are grouped by namespace; each namespace has a version number which is
+stored in the cache too, & which is incremented when an instance of a related
+model is saved/deleted (so all the data of the namespace are invalidated at once).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Hashable, Iterable
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models import Model, signals
+
+from ..global_info import get_per_request_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigCache:
+    """Cache shared between the requests (& between the processes if the
+    backend is shared, like Redis) for the configuration models.
+
+    Models must be registered with the method 'watch()' to get an automatic
+    invalidation.
+
+    Example (in a manager):
+        cached = config_cache.get_many('my_app-my_config', keys)
+        missing_keys = [key for key in keys if key not in cached]
+        ...
+        config_cache.set_many('my_app-my_config', retrieved_data)
+    """
+    _version_key_fmt = 'creme_core-config_cache-version-{}'.format
+    _dirty_key = 'creme_core-config_cache-dirty'
+
+    def __init__(self):
+        self._watched: dict[str, set[type[Model]]] = {}
+
+    @property
+    def backend(self) -> BaseCache | None:
+        "Get the Django's cache; <None> means that the cache is disabled."
+        alias = settings.CONFIG_CACHE_ALIAS
+
+        return None if alias is None else caches[alias]
+
+    @property
+    def timeout(self) -> int | None:
+        return settings.CONFIG_CACHE_TIMEOUT
+
+    def _data_key(self, namespace: str, version: int, key: Hashable) -> str:
+        return f'creme_core-config_cache-{namespace}-{version}-{key}'
+
+    def _dirty_namespaces(self) -> set[str]:
+        "Namespaces which have been modified in the current transaction."
+        return get_per_request_cache().setdefault(self._dirty_key, set())
+
+    def _get_version(self, backend: BaseCache, namespace: str) -> int:
+        version_key = self._version_key_fmt(namespace)
+        version = backend.get(version_key)
+
+        if version is None:
+            # NB: the version key can have been evicted; we use a version
+            #     number which cannot have been used before, to avoid to
+            #     retrieve old data.
+            backend.add(version_key, time_ns(), timeout=None)
+            version = backend.get(version_key)
+
+        return version
+
+    def get_version(self, namespace: str) -> int | None:
+        """Get the current version number of a namespace ; it changes each time
+        the namespace is invalidated. Useful to store data in another place
+        (like the memory of the process) & to know if they are still valid.
+        @return: An integer, or <None> if the cache is disabled.
+        """
+        backend = self.backend
+
+        return None if backend is None else self._get_version(backend, namespace)
+
+    def is_dirty(self, namespace: str) -> bool:
+        """Have some instances related to the namespace been modified in the
+        current transaction? (the related data should not be cached because
+        they could be rolled back).
+        """
+        return (
+            transaction.get_connection().in_atomic_block
+            and namespace in self._dirty_namespaces()
+        )
+
+    def get_many(self, namespace: str, keys: Iterable[Hashable]) -> dict:
+        """Retrieve some cached data.
+        @param namespace: Name of the group of data.
+        @param keys: Keys of the data in the namespace.
+        @return: A dictionary with the found data ; the keys which are missing
+                 from the dictionary must be retrieved from the DB by the caller.
+        """
+        backend = self.backend
+        keys = [*keys]
+        if backend is None or not keys:
+            return {}
+
+        version = self._get_version(backend, namespace)
+        data_keys = {self._data_key(namespace, version, key): key for key in keys}
+
+        return {
+            data_keys[data_key]: value
+            for data_key, value in backend.get_many(data_keys.keys()).items()
+        }
+
+    def set_many(self, namespace: str, data: dict) -> None:
+        """Store some data.
+        Notice that the data are not stored if some instances related to the
+        namespace have been modified in the current transaction (because these
+        data could be rolled back).
+
+        @param namespace: Name of the group of data.
+        @param data: Dictionary; keys must be hashable, values must be picklable.
+        """
+        backend = self.backend
+        if backend is None or not data:
+            return
+
+        if self.is_dirty(namespace):
+            return
+
+        version = self._get_version(backend, namespace)
+        backend.set_many(
+            {
+                self._data_key(namespace, version, key): value
+                for key, value in data.items()
+            },
+            timeout=self.timeout,
+        )
+
+    def invalidate(self, namespace: str) -> None:
+        "Invalidate all the data of a namespace."
+        backend = self.backend
+        if backend is None:
+            return
+
+        version_key = self._version_key_fmt(namespace)
+        try:
+            backend.incr(version_key)
+        except ValueError:  # The key does not exist (yet, or anymore)
+            backend.add(version_key, time_ns(), timeout=None)
+
+    def watch(self, namespace: str, *models: type[Model]) -> None:
+        """Invalidate a namespace each time an instance of the given models
+        is saved or deleted.
+        """
+        self._watched.setdefault(namespace, set()).update(models)
+
+        def _invalidate(sender, **kwargs):
+            self.invalidate(namespace)
+
+            if transaction.get_connection().in_atomic_block:
+                self._dirty_namespaces().add(namespace)
+
+                def _on_commit():
+                    self._dirty_namespaces().discard(namespace)
+                    # Other processes may have cached the old data before the commit
+                    self.invalidate(namespace)
+
+                transaction.on_commit(_on_commit)
+
+        for model in models:
+            for signal in (signals.post_save, signals.post_delete):
+                signal.connect(
+                    _invalidate,
+                    sender=model, weak=False,
+                    dispatch_uid=(
+                        f'creme_core-config_cache-{namespace}-{model._meta.label}'
+                    ),
+                )
+
+    @property
+    def namespaces(self) -> dict[str, set[type[Model]]]:
+        "Watched namespaces & their related models."
+        return {ns: {*models} for ns, models in self._watched.items()}
+
+    def clear(self) -> None:
+        "Invalidate all the watched namespaces."
+        for namespace in self._watched:
+            self.invalidate(namespace)
+
+
+config_cache = ConfigCache()
@@ -0,0 +1,228 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+"""Cache for the numbers of entities counted by the list-views.
+
+Counting the entities of a list-view (with a filter, a search & the
+credentials of the user) is often more expensive than retrieving the entities
+of the page ; the counts are cached in the Django's cache which alias is
+given by the setting 'LISTVIEW_COUNT_CACHE_ALIAS' (the cache is disabled if the
+alias is <None>), with the lifetime 'LISTVIEW_COUNT_CACHE_TIMEOUT'.
+
+The key of a count is built from the SQL query (so it contains the model, the
+conditions of the filter, the search & the credentials of the user). The keys
+of a model have a version number, which is incremented when an entity of this
+model, or one of its relationships/properties/custom-values, is saved/deleted.
+"""
+
+from __future__ import annotations
+
+from hashlib import sha1
+from time import time_ns
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+from django.db.models import QuerySet, signals
+from django.dispatch import receiver
+
+from ..global_info import get_per_request_cache
+from ..models import CremeEntity, CremeProperty, CustomFieldValue, Relation
+
+
+class EntityCountCache:
+    """Cache shared between the requests (& between the processes if the
+    backend is shared, like Redis) for the numbers of entities in querysets.
+
+    Example:
+        count = entity_count_cache.get(queryset)
+        if count is None:
+            count = queryset.count()
+            entity_count_cache.set(queryset, count)
+    """
+    _version_key_fmt = 'creme_core-count_cache-version-{}'.format
+    _dirty_key = 'creme_core-count_cache-dirty'
+
+    @property
+    def backend(self) -> BaseCache | None:
+        "Get the Django's cache; <None> means that the cache is disabled."
+        alias = settings.LISTVIEW_COUNT_CACHE_ALIAS
+
+        return None if alias is None else caches[alias]
+
+    @property
+    def timeout(self) -> int | None:
+        return settings.LISTVIEW_COUNT_CACHE_TIMEOUT
+
+    def _get_version(self, backend: BaseCache, ctype_id: int) -> int:
+        version_key = self._version_key_fmt(ctype_id)
+        version = backend.get(version_key)
+
+        if version is None:
+            # NB: see ConfigCache._get_version()
+            backend.add(version_key, time_ns(), timeout=None)
+            version = backend.get(version_key)
+
+        return version
+
+    def _data_key(self,
+                  backend: BaseCache,
+                  queryset: QuerySet,
+                  model: type[CremeEntity] | None,
+                  ) -> str | None:
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return None
+
+        ctype_id = ContentType.objects.get_for_model(model or queryset.model).id
+        digest = sha1(f'{sql}{params!r}'.encode(), usedforsecurity=False).hexdigest()
+
+        return (
+            f'creme_core-count_cache-{ctype_id}-'
+            f'{self._get_version(backend, ctype_id)}-{digest}'
+        )
+
+    def get(self, queryset: QuerySet, model: type[CremeEntity] | None = None) -> int | None:
+        """Get the cached number of instances of a queryset.
+        @param queryset: Queryset on a model inheriting CremeEntity.
+        @param model: Model which entities are counted, if the queryset is on
+               CremeEntity (& is filtered by ContentType) ; by default, the
+               model of the queryset is used.
+        @return: An integer, or <None> if there is no cached value.
+        """
+        backend = self.backend
+        if backend is None:
+            return None
+
+        data_key = self._data_key(backend, queryset, model)
+
+        return None if data_key is None else backend.get(data_key)
+
+    def set(self,
+            queryset: QuerySet,
+            count: int,
+            model: type[CremeEntity] | None = None,
+            ) -> None:
+        """Store the number of instances of a queryset.
+        Notice that the count is not stored if some entities of the same model
+        have been modified in the current transaction (because the count could
+        be rolled back).
+        """
+        backend = self.backend
+        if backend is None:
+            return
+
+        if transaction.get_connection().in_atomic_block:
+            ctype_id = ContentType.objects.get_for_model(model or queryset.model).id
+            if ctype_id in self._dirty_ctype_ids():
+                return
+
+        data_key = self._data_key(backend, queryset, model)
+        if data_key is not None:
+            backend.set(data_key, count, timeout=self.timeout)
+
+    def _dirty_ctype_ids(self) -> set[int]:
+        "IDs of the ContentTypes which have been modified in the current transaction."
+        return get_per_request_cache().setdefault(self._dirty_key, set())
+
+    def _incr_version(self, backend: BaseCache, ctype_id: int) -> None:
+        version_key = self._version_key_fmt(ctype_id)
+        try:
+            backend.incr(version_key)
+        except ValueError:  # The key does not exist (yet, or anymore)
+            backend.add(version_key, time_ns(), timeout=None)
+
+    def invalidate(self, ctype_id: int) -> None:
+        "Invalidate the counts related to a type of entity."
+        backend = self.backend
+        if backend is None:
+            return
+
+        self._incr_version(backend, ctype_id)
+
+        if transaction.get_connection().in_atomic_block:
+            dirty_ctype_ids = self._dirty_ctype_ids()
+            dirty_ctype_ids.add(ctype_id)
+
+            def _on_commit():
+                dirty_ctype_ids.discard(ctype_id)
+                # Other processes may have cached the old counts before the commit
+                self._incr_version(backend, ctype_id)
+
+            transaction.on_commit(_on_commit)
+
+    def count(self, queryset: QuerySet, model: type[CremeEntity] | None = None) -> int:
+        "Get the number of instances of a queryset (from the cache if possible)."
+        count = self.get(queryset, model=model)
+
+        if count is None:
+            count = queryset.count()
+            self.set(queryset, count, model=model)
+
+        return count
+
+
+entity_count_cache = EntityCountCache()
+
+
+# Signal handlers --------------------------------------------------------------
+
+def _entity_ctype_id(instance, fk_name: str) -> int | None:
+    field = type(instance)._meta.get_field(fk_name)
+
+    if field.is_cached(instance):
+        return getattr(instance, fk_name).entity_type_id
+
+    # NB: the entity can have been deleted (deletion of the relationships/properties)
+    return CremeEntity.objects.filter(
+        id=getattr(instance, field.attname),
+    ).values_list('entity_type', flat=True).first()
+
+
+def _related_ctype_id(instance) -> int | None:
+    if isinstance(instance, CremeEntity):
+        return instance.entity_type_id
+
+    if isinstance(instance, Relation):
+        return _entity_ctype_id(instance, 'subject_entity')
+
+    if isinstance(instance, CremeProperty):
+        return _entity_ctype_id(instance, 'creme_entity')
+
+    if isinstance(instance, CustomFieldValue):
+        return instance.custom_field.content_type_id
+
+    return None
+
+
+@receiver(signals.post_save, dispatch_uid='creme_core-invalidate_count_cache_save')
+@receiver(signals.post_delete, dispatch_uid='creme_core-invalidate_count_cache_delete')
+def _invalidate_count_cache(sender, instance, **kwargs):
+    if entity_count_cache.backend is not None:
+        ctype_id = _related_ctype_id(instance)
+
+        if ctype_id is not None:
+            entity_count_cache.invalidate(ctype_id)
@@ -20,12 +20,14 @@ from __future__ import annotations
 
 import logging
 import warnings
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from typing import TYPE_CHECKING
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
+from django.db.models import PROTECT, RESTRICT, FileField, Q, signals
+from django.db.transaction import atomic
 from django.utils.translation import gettext as _
 
 from creme.creme_core.core.exceptions import ConflictError
@@ -273,6 +275,175 @@ class EntityDeletor:
         "@return <True> means the instance will not be moved to the trash."
         return hasattr(entity, 'get_related_entity') or entity.is_deleted
 
+    def allows_bulk_deletion(self, model: type[CremeEntity]) -> bool:
+        """Can the instances of a model be definitively deleted in bulk (see
+        <BulkEntityDeletion>), instead of calling 'perform()' on each instance?
+        It's possible when the deletion has no specific logic: the deletor & the
+        model do not override the methods of deletion, the model has no file
+        field & no signal handler is connected specifically to the model.
+        Override this method in your child classes to force/forbid the deletion
+        in bulk.
+        """
+        from creme.creme_core.models import CremeEntity
+
+        cls = type(self)
+        if cls.perform is not EntityDeletor.perform or cls._delete is not EntityDeletor._delete:
+            return False
+
+        if any(
+            getattr(model, method_name) is not getattr(CremeEntity, method_name)
+            for method_name in (
+                'delete', '_delete_without_transaction', '_pre_delete', '_delete_stored_files',
+            )
+        ):
+            return False
+
+        if any(isinstance(field, FileField) for field in model._meta.fields):
+            return False
+
+        # NB: receivers are stored with a key (receiver_id, sender_id)
+        model_id = id(model)
+
+        return not any(
+            receiver[0][1] == model_id
+            for signal in (signals.pre_delete, signals.post_delete)
+            for receiver in signal.receivers
+        )
+
+
+class BulkEntityDeletion:
+    """Definitive deletion of several entities of the same model, with grouped
+    queries (instead of calling 'EntityDeletor.perform()' on each instance).
+    It's used by the trash cleaner for the models which have no specific logic
+    of deletion (see 'EntityDeletor.allows_bulk_deletion()').
+
+    The history does not contain a line per deleted entity, but a line
+    summarising the deletion (see 'write_history()') ; the lines about the
+    deleted relationships are kept (they are useful for the remaining entities).
+
+    Usage:
+        deletion = BulkEntityDeletion(model=MyModel, user=user, deletor=deletor)
+
+        for entities in [batches of entities...]:
+            errors = deletion.check(entities)
+            deletion.perform([e for e in entities if e.id not in errors])
+
+        deletion.write_history()
+    """
+    def __init__(self, *,
+                 model: type[CremeEntity],
+                 user: CremeUser,
+                 deletor: EntityDeletor,
+                 ):
+        self.model = model
+        self.user = user
+        self.deletor = deletor
+        self.deleted_count = 0
+
+    def protected_ids(self, entity_ids: Sequence[int]) -> set[int]:
+        """Get the IDs of the entities which cannot be deleted because they are
+        referenced by relationships with an internal type, or by a protected
+        ForeignKey.
+        """
+        from creme.creme_core.models import Relation
+
+        model = self.model
+        protected = {
+            *Relation.objects.filter(
+                subject_entity__in=entity_ids, type__is_internal=True,
+            ).exclude(
+                type__in=model._DELETABLE_INTERNAL_RTYPE_IDS,
+            ).values_list('subject_entity_id', flat=True),
+        }
+
+        for rel in model._meta.related_objects:
+            if getattr(rel, 'on_delete', None) in (PROTECT, RESTRICT) \
+               and rel.related_model is not Relation:
+                field = rel.field
+                protected.update(
+                    rel.related_model._base_manager.filter(
+                        **{f'{field.name}__in': entity_ids},
+                    ).values_list(field.attname, flat=True)
+                )
+
+        return protected
+
+    def check(self, entities: Sequence[CremeEntity]) -> dict[int, str]:
+        """Check which entities cannot be deleted.
+        @return: A dictionary with the IDs of the entities as keys, & the
+                 reasons (strings) as values.
+        """
+        errors = {}
+        user = self.user
+        deletor = self.deletor
+
+        for entity in entities:
+            try:
+                deletor.check_permissions(user=user, entity=entity)
+            except (PermissionDenied, ConflictError) as e:
+                errors[entity.id] = e.args[0]
+
+        for entity_id in self.protected_ids([e.id for e in entities if e.id not in errors]):
+            errors[entity_id] = _('Can not be deleted because of links with other entities.')
+
+        return errors
+
+    def perform(self, entities: Sequence[CremeEntity]) -> None:
+        """Delete some entities (they should have been checked before).
+        @raise <django.db.models.deletion.ProtectedError> (the entities are
+               still referenced) ; the transaction is rolled back.
+        """
+        from creme.creme_core.models import Relation
+        from creme.creme_core.models.history import _get_deleted_entity_ids
+
+        from .entity_filter.materialization import grouped_updates
+        from .history import toggle_history
+
+        if not entities:
+            return
+
+        model = self.model
+        entity_ids = [e.id for e in entities]
+
+        with atomic(), grouped_updates() as materializer:
+            if materializer is not None:
+                # NB: the remaining entities lose their relationships with the
+                #     deleted entities (the symmetrical relationships).
+                materializer.update_ids(
+                    Relation.objects.filter(
+                        object_entity__in=entity_ids,
+                    ).exclude(
+                        subject_entity__in=entity_ids,
+                    ).values_list('subject_entity_id', flat=True)
+                )
+
+            # NB: the symmetrical relationships are deleted by cascade
+            Relation.objects.filter(
+                Q(type__is_internal=False)
+                | Q(type__in=model._DELETABLE_INTERNAL_RTYPE_IDS),
+                subject_entity__in=entity_ids,
+            ).delete()
+
+            # NB: the lines about the auxiliary instances are useless too
+            _get_deleted_entity_ids().update(entity_ids)
+
+            with toggle_history(enabled=False):
+                model._base_manager.filter(id__in=entity_ids).delete()
+
+        self.deleted_count += len(entity_ids)
+
+    def write_history(self) -> None:
+        "Create a line of history which summarises the deletion (if needed)."
+        from creme.creme_core.models.history import _HLTEntityMassDeletion
+
+        if self.deleted_count:
+            _HLTEntityMassDeletion.create_line(
+                ctype=ContentType.objects.get_for_model(self.model),
+                user=self.user,
+                count=self.deleted_count,
+            )
+            self.deleted_count = 0
+
 
 class EntityDeletorRegistry:
     """Stores the deletion behaviours per CremeEntity model."""
@@ -0,0 +1,236 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+"""Cache for the Q instances built by the EntityFilters ("compiled" filters).
+
+Building the Q of a filter needs to load its conditions, to resolve its
+sub-filters recursively, & to resolve the dynamic operands; it's done each
+time a list-view, a credential, a report... uses the filter.
+
+The compiled Q instances are stored:
+  - in the memory of the process (so they are shared between the requests)
+    when the configuration cache is enabled (see the setting
+    'CONFIG_CACHE_ALIAS'); the version of the namespace of the configuration
+    cache is used to know if the compiled filters are still valid (i.e. it is
+    incremented when an EntityFilter/EntityFilterCondition is modified, even
+    by another process).
+  - in the per-request cache in the other case.
+
+The keys are the ID of the filter & the ID of the user when the filter depends
+on the current user (see <CurrentUserOperand>). The filters which depend on
+other things, like the current date, are not cached (see
+'FilterConditionHandler.is_q_cacheable()').
+
+The function 'explain()' gives the SQL query generated by a filter & the plan
+of execution of the DB; see the command "creme_explain_filter" too.
+"""
+
+from __future__ import annotations
+
+import logging
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from django.db import connections
+from django.db.models import Q
+
+from ...global_info import get_per_request_cache
+from ..config_cache import config_cache
+
+if TYPE_CHECKING:
+    from creme.creme_core.models import CremeUser, EntityFilter
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledQCache:
+    """Cache for the Q instances built by the EntityFilters.
+
+    Example:
+        q = compiled_q_cache.get(efilter.id, user)
+        if q is None:
+            q = [build the Q instance...]
+            compiled_q_cache.set(efilter, user, q)
+    """
+    namespace = 'creme_core-entity_filters'
+    per_request_cache_key = 'creme_core-compiled_filters'
+
+    # Maximum number of compiled filters stored by the process; the cache is
+    # emptied when this size is reached.
+    max_size: int = 1024
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._entries: dict[str, tuple[bool, dict]] = {}
+
+    def _get_entries(self) -> dict[str, tuple[bool, dict]]:
+        "Get the compiled filters which are valid for the current request."
+        cache = get_per_request_cache()
+        entries = cache.get(self.per_request_cache_key)
+
+        if entries is None:
+            # NB: the version is retrieved once per request
+            version = config_cache.get_version(self.namespace)
+
+            if version is None:  # The shared cache is disabled
+                entries = {}
+            else:
+                with self._lock:
+                    if version != self._version:
+                        self._version = version
+                        self._entries = {}
+
+                    entries = self._entries
+
+            cache[self.per_request_cache_key] = entries
+
+        return entries
+
+    @staticmethod
+    def _user_key(user: CremeUser | None) -> int | None:
+        return None if user is None else user.id
+
+    def get(self, efilter_id: str, user: CremeUser | None) -> Q | None:
+        """Retrieve a compiled filter.
+        @return: An instance of Q, or <None> if the filter has not been
+                 compiled yet (or cannot be cached).
+        """
+        entry = self._get_entries().get(efilter_id)
+        if entry is None:
+            return None
+
+        user_dependent, q_per_user = entry
+
+        return q_per_user.get(self._user_key(user) if user_dependent else None)
+
+    def set(self, efilter: EntityFilter, user: CremeUser | None, q: Q) -> None:
+        """Store a compiled filter.
+        Nothing is stored if the filter cannot be cached (see
+        'EntityFilter.is_q_cacheable()') or if a filter has been modified in
+        the current transaction (it could be rolled back).
+        """
+        if not efilter.is_q_cacheable() or config_cache.is_dirty(self.namespace):
+            return
+
+        entries = self._get_entries()
+        user_dependent = efilter.depends_on_user()
+
+        with self._lock:
+            if len(entries) >= self.max_size:
+                entries.clear()
+
+            entry = entries.get(efilter.id)
+            if entry is None:
+                entries[efilter.id] = entry = (user_dependent, {})
+
+            entry[1][self._user_key(user) if user_dependent else None] = q
+
+    def clear(self) -> None:
+        """Remove all the compiled filters of the current process (it's
+        called when an EntityFilter/EntityFilterCondition is modified; the other
+        processes use the version of the configuration cache).
+        """
+        get_per_request_cache().pop(self.per_request_cache_key, None)
+
+        with self._lock:
+            self._version = None
+            self._entries = {}
+
+
+compiled_q_cache = CompiledQCache()
+
+
+class FilterExplanation:
+    """Information about the query generated by an EntityFilter.
+
+    Attributes:
+        - sql: the SQL query (as string) which retrieves the accepted entities.
+        - plan: the plan of execution given by the DB (see 'QuerySet.explain()').
+        - compilation_queries: number of queries performed to build the Q
+          instance (i.e. to load the conditions, the sub-filters...).
+        - compilation_duration: time (in seconds) spent to build the Q instance.
+        - cacheable: can the Q instance be cached (see CompiledQCache)?
+        - user_dependent: does the Q instance depend on the user?
+    """
+    def __init__(self, *,
+                 sql: str,
+                 plan: str,
+                 compilation_queries: int,
+                 compilation_duration: float,
+                 cacheable: bool,
+                 user_dependent: bool,
+                 ):
+        self.sql = sql
+        self.plan = plan
+        self.compilation_queries = compilation_queries
+        self.compilation_duration = compilation_duration
+        self.cacheable = cacheable
+        self.user_dependent = user_dependent
+
+
+class _QueriesCounter:
+    "Wrapper for 'connection.execute_wrapper()' which counts the queries."
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+
+        return execute(sql, params, many, context)
+
+
+def explain(efilter: EntityFilter,
+            user: CremeUser | None = None,
+            **options) -> FilterExplanation:
+    """Get the SQL query generated by a filter & its cost.
+    The compiled Q instance is not retrieved from the cache.
+    @param efilter: Instance of EntityFilter.
+    @param user: User used by the dynamic operands (see <CurrentUserOperand>).
+    @param options: Options for 'QuerySet.explain()' (they depend on the DB,
+           e.g. "analyze=True" with PostgreSQL).
+    @raise ValueError: Some options are not supported by the DB.
+    """
+    model = efilter.entity_type.model_class()
+    queryset = model._default_manager.all()
+
+    counter = _QueriesCounter()
+
+    with connections[queryset.db].execute_wrapper(counter):
+        start = perf_counter()
+        q = efilter.build_q(user=user)
+        duration = perf_counter() - start
+
+    queryset = queryset.filter(q)
+    if not efilter.entities_are_distinct:
+        queryset = queryset.distinct()
+
+    return FilterExplanation(
+        sql=str(queryset.query),
+        plan=queryset.explain(**options),
+        compilation_queries=counter.count,
+        compilation_duration=duration,
+        cacheable=efilter.is_q_cacheable(),
+        user_dependent=efilter.depends_on_user(),
+    )
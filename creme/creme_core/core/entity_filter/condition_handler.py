@@ -19,6 +19,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from datetime import datetime
 from decimal import Decimal
 from functools import partial
@@ -33,6 +34,7 @@ from django.db.models import (
     ManyToManyField,
     Model,
     Q,
+    prefetch_related_objects,
 )
 from django.utils.formats import date_format
 from django.utils.hashable import make_hashable
@@ -145,6 +147,12 @@ class FilterConditionHandler:
         "Get an instance of FilterConditionHandler from serialized data."
         raise NotImplementedError
 
+    def depends_on_user(self) -> bool:
+        """Does the Q instance built by 'get_q()' depend on the given user
+        (i.e. a dynamic operand like <CurrentUserOperand> is used)?
+        """
+        return False
+
     def description(self, user):
         "Human-readable string explaining the handler."
         raise NotImplementedError
@@ -172,6 +180,28 @@ class FilterConditionHandler:
         """
         raise NotImplementedError
 
+    def prefetch(self, entities: Sequence[CremeEntity], user) -> None:
+        """Retrieve (with grouped queries) the data used by 'accept()' for
+        several entities; so checking these entities does not perform a query
+        per entity.
+        Hint: the default implementation does nothing; override it in your
+              child classes if 'accept()' performs queries.
+
+        @param entities: Sequence of instances of the model of the handler.
+        @param user: See 'accept()'.
+        """
+        pass
+
+    def is_q_cacheable(self) -> bool:
+        """Can the Q instance built by 'get_q()' be cached between the requests
+        (see 'creme_core.core.entity_filter.compilation')?
+        It must be <False> if the Q instance depends on something else than the
+        data of the condition & the user, like the current date.
+        Hint: the default implementation returns <False> to be safe ; override
+              it in your child classes.
+        """
+        return False
+
     @property
     def model(self) -> type[CremeEntity]:
         return self._model
@@ -307,9 +337,22 @@ class SubFilterConditionHandler(FilterConditionHandler):
 
         return form_class(**defaults)
 
+    def depends_on_user(self):
+        subfilter = self.subfilter
+
+        return subfilter.depends_on_user() if subfilter else False
+
     def get_q(self, user):
         return self.subfilter.get_q(user)
 
+    def prefetch(self, entities, user):
+        self.subfilter.prefetch(entities, user)
+
+    def is_q_cacheable(self):
+        subfilter = self.subfilter
+
+        return subfilter.is_q_cacheable() if subfilter else False
+
     @classmethod
     def query_for_parent_conditions(cls, ctype):
         return Q(
@@ -324,6 +367,7 @@ class SubFilterConditionHandler(FilterConditionHandler):
 
 class OperatorConditionHandlerMixin:
     efilter_registry: EntityFilterRegistry
+    _values: list
 
     # @classmethod
     # def _check_operator(cls, operator_id):
@@ -333,6 +377,12 @@ class OperatorConditionHandlerMixin:
         if self.get_operator(operator_id) is None:
             return f"Operator ID '{operator_id}' is invalid"
 
+    def depends_on_user(self) -> bool:
+        return any(
+            self.get_operand(value=value, user=None) is not None
+            for value in self._values
+        )
+
     # @classmethod
     # def get_operand(cls, value, user) -> operands.ConditionDynamicOperand | None:
     #     return cls.efilter_registry.get_operand(type_id=value, user=user)
@@ -382,6 +432,21 @@ class BaseRegularFieldConditionHandler(FilterConditionHandler):
     def field_info(self) -> FieldInfo:
         return FieldInfo(self._model, self._field_name)  # TODO: cache ?
 
+    def is_q_cacheable(self):
+        return True
+
+    def prefetch(self, entities, user):
+        field_info = self.field_info
+
+        # NB: the last ForeignKey is not retrieved (its ID is enough)
+        if not isinstance(field_info[-1], ManyToManyField):
+            field_info = field_info[:-1]
+
+        if field_info and entities:
+            prefetch_related_objects(
+                entities, '__'.join(field.name for field in field_info),
+            )
+
 
 class RegularFieldConditionHandler(OperatorConditionHandlerMixin,
                                    BaseRegularFieldConditionHandler):
@@ -713,6 +778,10 @@ class DateFieldHandlerMixin:
 
         return '??'
 
+    def is_q_cacheable(self):
+        # NB: the named ranges (like "current year") depend on the current date
+        return not self._range_name
+
     def _get_date_range(self):
         "Get a <creme_core.utils.date_range.DateRange> instance from the attributes."
         return date_range_registry.get_range(
@@ -921,6 +990,29 @@ class BaseCustomFieldConditionHandler(FilterConditionHandler):
 
         # TODO: check existence of the CustomField ? (normally the condition should be removed)
 
+    def is_q_cacheable(self):
+        return True
+
+    def prefetch(self, entities, user):
+        cfield = self.custom_field
+        if not cfield:
+            return
+
+        cf_id = cfield.id
+        CremeEntity.populate_custom_values(
+            [entity for entity in entities if cf_id not in entity._cvalues_map],
+            [cfield],
+        )
+
+        if cfield.field_type == CustomField.MULTI_ENUM:
+            cvalues = [
+                cvalue
+                for cvalue in (entity.get_custom_value(cfield) for entity in entities)
+                if cvalue is not None
+            ]
+            if cvalues:
+                prefetch_related_objects(cvalues, 'value')
+
     @classmethod
     def query_for_related_conditions(cls, instance):
         return Q(
@@ -1316,6 +1408,9 @@ class BaseRelationConditionHandler(FilterConditionHandler):
     def applicable_on_entity_base(self):
         return True
 
+    def is_q_cacheable(self):
+        return True
+
     @classmethod
     def query_for_related_conditions(cls, instance):
         return Q(
@@ -1378,8 +1473,8 @@ class RelationConditionHandler(BaseRelationConditionHandler):
 
     def accept(self, *, entity, user):
         # NB: we use get_relations() in order to get a cached result, & so avoid
-        #     additional queries when calling several times this method.
-        # TODO: add a system to populate relations when checking several entities
+        #     additional queries when calling several times this method
+        #     (see prefetch() too).
         relations = entity.get_relations(relation_type_id=self._rtype_id)
 
         if self._entity_uuid:
@@ -1389,11 +1484,7 @@ class RelationConditionHandler(BaseRelationConditionHandler):
         elif self._ct_key:
             ct = self.content_type
             ct_id = ct.id if ct else None
-            # TODO: get_relations() with real_obj_entities==False does not select_related()
-            #       => real_obj_entities = True ?
-            #          select_related() even if real_obj_entities==False ?
-            #          CT's ID stored in Relation (RealEntityForeignKey) ??
-            found = any(r.object_entity.entity_type_id == ct_id for r in relations)
+            found = any(r.object_ctype_id == ct_id for r in relations)
         else:
             found = bool(relations)
 
@@ -1561,6 +1652,13 @@ class RelationConditionHandler(BaseRelationConditionHandler):
 
         return query
 
+    def prefetch(self, entities, user):
+        rtype_id = self._rtype_id
+        CremeEntity.populate_relations(
+            [entity for entity in entities if rtype_id not in entity._relations_map],
+            [rtype_id],
+        )
+
 
 class RelationSubFilterConditionHandler(BaseRelationConditionHandler):
     """Filter entities which are have (or have not) certain Relations.
@@ -1598,7 +1696,26 @@ class RelationSubFilterConditionHandler(BaseRelationConditionHandler):
 
         self._exclude = exclude
 
-    # def accept(self, *, entity, user):  TODO ? (not needed currently for credentials filters)
+    def _filtered_relations(self, entity) -> list[Relation]:
+        "Relationships of the entity whose object can be accepted by the sub-filter."
+        subfilter = self.subfilter
+        ct_id = subfilter.entity_type_id
+        any_ctype = subfilter.entity_type.model_class() is CremeEntity
+
+        return [
+            relation
+            for relation in entity.get_relations(self._rtype_id, real_obj_entities=True)
+            if any_ctype or relation.object_ctype_id == ct_id
+        ]
+
+    def accept(self, *, entity, user):
+        subfilter = self.subfilter
+        found = any(
+            subfilter.accept(entity=relation.real_object, user=user)
+            for relation in self._filtered_relations(entity)
+        )
+
+        return not found if self._exclude else found
 
     @classmethod
     # def build(cls, *, model, name, data):
@@ -1665,6 +1782,16 @@ class RelationSubFilterConditionHandler(BaseRelationConditionHandler):
         if self.subfilter is False:
             return f"'{self.subfilter_id}' is not a valid filter ID"
 
+    def depends_on_user(self):
+        subfilter = self.subfilter
+
+        return subfilter.depends_on_user() if subfilter else False
+
+    def is_q_cacheable(self):
+        subfilter = self.subfilter
+
+        return subfilter.is_q_cacheable() if subfilter else False
+
     @classmethod
     def formfield(cls, form_class=ef_fields.RelationSubfiltersConditionsField, **kwargs):
         defaults = {
@@ -1692,6 +1819,28 @@ class RelationSubFilterConditionHandler(BaseRelationConditionHandler):
 
         return query
 
+    def prefetch(self, entities, user):
+        subfilter = self.subfilter
+        if not subfilter:
+            return
+
+        rtype_id = self._rtype_id
+        CremeEntity.populate_relations(
+            [entity for entity in entities if rtype_id not in entity._relations_map],
+            [rtype_id],
+        )
+
+        subfilter.prefetch(
+            [
+                *{
+                    relation.object_entity_id: relation.real_object
+                    for entity in entities
+                    for relation in self._filtered_relations(entity)
+                }.values()
+            ],
+            user,
+        )
+
     @classmethod
     def query_for_parent_conditions(cls, ctype):
         # NB: we do not use "ctype" because an EntityFilter on a model can have
@@ -1746,8 +1895,8 @@ class PropertyConditionHandler(FilterConditionHandler):
     def accept(self, *, entity, user):
         ptype_uuid = self._ptype_uuid
         # NB: we use get_properties() in order to get a cached result, & so avoid
-        #     additional queries when calling several times this method.
-        # TODO: add a system to populate properties when checking several entities
+        #     additional queries when calling several times this method
+        #     (see prefetch() too).
         accepted = any(prop.type.uuid == ptype_uuid for prop in entity.get_properties())
 
         return not accepted if self._exclude else accepted
@@ -1804,6 +1953,14 @@ class PropertyConditionHandler(FilterConditionHandler):
 
         return form_class(**defaults)
 
+    def is_q_cacheable(self):
+        return True
+
+    def prefetch(self, entities, user):
+        CremeEntity.populate_properties(
+            [entity for entity in entities if entity._properties is None]
+        )
+
     # TODO: see remark on RelationConditionHandler._get_q()
     def get_q(self, user):
         query = Q(
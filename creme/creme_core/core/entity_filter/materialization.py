@@ -0,0 +1,530 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Materialization of the EntityFilters used by the credentials.
+
+When a role uses credentials with a filter (see SetCredentials.ESET_FILTER),
+the filtering of the entities (list-views, quick-search, bricks...) uses the
+Q instance built by the filter's conditions ; with complex conditions (on
+relationships, custom-fields...) the queries are slow when there are lots of
+entities.
+
+The entities accepted by these filters can be stored in the table of the model
+MaterializedEntityFilterEntry ; the filtering of the entities is then a simple
+(indexed) sub-query on this table. The filters which depend on the current
+user (see <CurrentUserOperand>) are materialized for each user of the roles
+which use them.
+
+The stored entities are updated when the entities, their relationships,
+their properties & their custom-values are saved/deleted, & when the teams are
+modified (notice that modifying an instance referenced by a ForeignKey, or
+using methods which do not send the signals, like 'QuerySet.update()', does not
+update the materialized filters ; the code which performs this kind of
+operations on entities must call 'EntityFilterMaterializer.update_ids()'). When
+the conditions of a filter are modified, the filter is materialized again at
+the end of the transaction.
+The operations in bulk should use the context manager 'grouped_updates()', in
+order to update the stored entities once, at the end of the operation.
+The filters which use sub-filters or relative date ranges (e.g. "current year")
+cannot be materialized ; they are always used dynamically.
+
+Use the command "creme_materialize_filters" to materialize the filters (the
+filters which are not materialized are used dynamically) & to check the
+consistency of the stored entities.
+
+The materialization is enabled with the setting "MATERIALIZED_CREDENTIALS_FILTERS".
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q, signals
+from django.dispatch import receiver
+
+from ...global_info import get_per_request_cache
+from ...models import (
+    CremeEntity,
+    CremeProperty,
+    CremeUser,
+    CustomFieldValue,
+    EntityFilter,
+    EntityFilterCondition,
+    MaterializedEntityFilter,
+    MaterializedEntityFilterEntry,
+    Relation,
+    SetCredentials,
+)
+from ...models.custom_field import CustomFieldMultiEnum
+from ...models.history import _get_deleted_entity_ids
+from .condition_handler import (
+    DateFieldHandlerMixin,
+    RelationSubFilterConditionHandler,
+    SubFilterConditionHandler,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EntityFilterMaterializer:
+    """Store the entities accepted by the EntityFilters used by the credentials,
+    & keep them up-to-date.
+    """
+    # Number of entities inserted by query when a filter is materialized
+    chunk_size: int = 1024
+
+    per_request_cache_key = 'creme_core-materialized_filters'
+    grouped_ids_cache_key = 'creme_core-materialized_filters-grouped_ids'
+
+    @staticmethod
+    def is_materializable(efilter: EntityFilter) -> bool:
+        """Can the accepted entities be stored?
+        (i.e. they do not depend on the current date or on other filters).
+        """
+        for condition in efilter.get_conditions():
+            handler = condition.handler
+
+            if isinstance(handler, (SubFilterConditionHandler, RelationSubFilterConditionHandler)):
+                return False
+
+            if isinstance(handler, DateFieldHandlerMixin) and handler._range_name:
+                return False
+
+        return True
+
+    @staticmethod
+    def depends_on_user(efilter: EntityFilter) -> bool:
+        "Does a condition use an operand like <CurrentUserOperand>?"
+        return efilter.depends_on_user()
+
+    def _mfilter_ids(self) -> dict[tuple[str, int | None], int]:
+        cache = get_per_request_cache()
+        mfilter_ids = cache.get(self.per_request_cache_key)
+
+        if mfilter_ids is None:
+            values = MaterializedEntityFilter.objects.values_list('id', 'efilter', 'user')
+            cache[self.per_request_cache_key] = mfilter_ids = {
+                (efilter_id, user_id): mfilter_id for mfilter_id, efilter_id, user_id in values
+            }
+
+        return mfilter_ids
+
+    def _clear_cache(self) -> None:
+        get_per_request_cache().pop(self.per_request_cache_key, None)
+
+    def get_q(self, efilter: EntityFilter, user: CremeUser) -> Q:
+        """Get the Q instance to filter the entities accepted by a filter.
+        If the filter has been materialized, the Q uses the stored entities ;
+        in the other case, the conditions of the filter are used.
+        """
+        mfilter_id = self._mfilter_ids().get(
+            (efilter.id, user.id if self.depends_on_user(efilter) else None)
+        )
+
+        return efilter.get_q(user=user) if mfilter_id is None else Q(
+            pk__in=MaterializedEntityFilterEntry.objects
+                                                .filter(mfilter=mfilter_id)
+                                                .values('entity'),
+        )
+
+    def _accepted_ids(self, efilter: EntityFilter, user: CremeUser | None) -> Iterator[int]:
+        model = efilter.entity_type.model_class()
+
+        return efilter.filter(
+            model._default_manager.all(), user=user,
+        ).values_list('id', flat=True).iterator(chunk_size=self.chunk_size)
+
+    def build(self, efilter: EntityFilter, user: CremeUser | None = None) -> int:
+        """Materialize a filter (the previous materialization is replaced).
+        @param efilter: Instance of EntityFilter ; it must be materializable.
+        @param user: The user used by the operands ; it must be given if (and
+               only if) the filter depends on the user.
+        @return: The number of accepted entities.
+        """
+        if not self.is_materializable(efilter):
+            raise ValueError(f'The filter "{efilter.id}" cannot be materialized')
+
+        if self.depends_on_user(efilter) != (user is not None):
+            raise ValueError(
+                f'The filter "{efilter.id}" must be materialized '
+                f'{"with" if user is None else "without"} a user'
+            )
+
+        count = 0
+
+        with transaction.atomic():
+            MaterializedEntityFilter.objects.filter(efilter=efilter, user=user).delete()
+            mfilter = MaterializedEntityFilter.objects.create(efilter=efilter, user=user)
+
+            entries = []
+            for entity_id in self._accepted_ids(efilter, user):
+                entries.append(MaterializedEntityFilterEntry(mfilter=mfilter, entity_id=entity_id))
+
+                if len(entries) >= self.chunk_size:
+                    MaterializedEntityFilterEntry.objects.bulk_create(entries)
+                    count += len(entries)
+                    entries = []
+
+            MaterializedEntityFilterEntry.objects.bulk_create(entries)
+            count += len(entries)
+
+        self._clear_cache()
+
+        return count
+
+    def check(self,
+              efilter: EntityFilter,
+              user: CremeUser | None = None,
+              ) -> tuple[set[int], set[int]]:
+        """Compare the stored entities with the entities accepted by the
+        conditions of a materialized filter.
+        @return: A tuple (IDs of the missing entities, IDs of the entities
+                 which should not be stored).
+        """
+        stored_ids = {
+            *MaterializedEntityFilterEntry.objects.filter(
+                mfilter__efilter=efilter, mfilter__user=user,
+            ).values_list('entity', flat=True)
+        }
+        accepted_ids = {*self._accepted_ids(efilter, user)}
+
+        return accepted_ids - stored_ids, stored_ids - accepted_ids
+
+    def credentials_filters(self) -> Iterator[tuple[EntityFilter, CremeUser | None]]:
+        """Generate the pairs (filter, user) which can be materialized, for the
+        filters used by the credentials of the roles.
+        The user is None for the filters which do not depend on the user.
+        """
+        users_per_role_id = defaultdict(list)
+        for user in CremeUser.objects.filter(is_active=True, is_team=False, role__isnull=False):
+            users_per_role_id[user.role_id].append(user)
+
+        efilters = {}
+        role_ids_per_efilter_id = defaultdict(set)
+        for sc in SetCredentials.objects.filter(
+            set_type=SetCredentials.ESET_FILTER,
+        ).select_related('efilter'):
+            efilters[sc.efilter_id] = sc.efilter
+            role_ids_per_efilter_id[sc.efilter_id].add(sc.role_id)
+
+        for efilter_id, efilter in sorted(efilters.items()):
+            if not self.is_materializable(efilter):
+                continue
+
+            if self.depends_on_user(efilter):
+                for role_id in sorted(role_ids_per_efilter_id[efilter_id]):
+                    for user in users_per_role_id[role_id]:
+                        yield efilter, user
+            else:
+                yield efilter, None
+
+    def materialized_filters(self) -> Iterator[tuple[EntityFilter, CremeUser | None]]:
+        "Generate the pairs (filter, user) which have been materialized."
+        for mfilter in MaterializedEntityFilter.objects.select_related(
+            'efilter', 'user',
+        ).order_by('efilter', 'user'):
+            yield mfilter.efilter, mfilter.user
+
+    def build_all(self) -> Iterator[tuple[EntityFilter, CremeUser | None, int]]:
+        """Materialize all the filters used by the credentials ; the
+        materializations which are not used anymore are removed.
+        @return: Generator of tuples (filter, user, number of entities).
+        """
+        kept = set()
+
+        for efilter, user in [*self.credentials_filters()]:
+            yield efilter, user, self.build(efilter, user)
+            kept.add((efilter.id, user.id if user else None))
+
+        MaterializedEntityFilter.objects.filter(id__in=[
+            mfilter_id
+            for mfilter_id, efilter_id, user_id in MaterializedEntityFilter.objects.values_list(
+                'id', 'efilter', 'user',
+            )
+            if (efilter_id, user_id) not in kept
+        ]).delete()
+        self._clear_cache()
+
+    def _grouped_ids(self) -> set[int] | None:
+        return get_per_request_cache().get(self.grouped_ids_cache_key)
+
+    @contextmanager
+    def grouped_updates(self) -> Iterator[None]:
+        """Context manager which groups the updates of the stored entities (see
+        update() & update_ids()) ; the entities are updated once, at the end of
+        the block (they are retrieved again).
+        It's useful for the operations in bulk (the entities are updated with
+        few queries, instead of several queries per entity).
+        """
+        cache = get_per_request_cache()
+        key = self.grouped_ids_cache_key
+
+        if key in cache:  # Nested blocks
+            yield
+            return
+
+        cache[key] = entity_ids = set()
+
+        try:
+            yield
+        finally:
+            del cache[key]
+
+        self.update_ids(entity_ids)
+
+    def update(self, entities: Iterable[CremeEntity]) -> None:
+        "Update the stored entities (they have been modified/created)."
+        grouped_ids = self._grouped_ids()
+        if grouped_ids is not None:
+            grouped_ids.update(entity.id for entity in entities)
+            return
+
+        deleted_ids = _get_deleted_entity_ids()
+        entities = [entity for entity in entities if entity.id not in deleted_ids]
+        if not entities:
+            return
+
+        base_ct_id = ContentType.objects.get_for_model(CremeEntity).id
+        mfilters = [
+            *MaterializedEntityFilter.objects.filter(
+                efilter__entity_type__in={
+                    base_ct_id, *(entity.entity_type_id for entity in entities),
+                },
+            ).select_related('efilter', 'user'),
+        ]
+        if not mfilters:
+            return
+
+        stored = {
+            *MaterializedEntityFilterEntry.objects.filter(
+                mfilter__in=mfilters, entity__in=entities,
+            ).values_list('mfilter', 'entity'),
+        }
+        new_entries = []
+        removed_entity_ids = defaultdict(list)
+
+        # NB: the entities retrieved by update_ids() are base CremeEntities
+        CremeEntity.populate_real_entities(
+            [entity for entity in entities if type(entity) is CremeEntity],
+        )
+        real_entities = [entity.get_real_entity() for entity in entities]
+
+        for mfilter in mfilters:
+            efilter = mfilter.efilter
+            ct_id = efilter.entity_type_id
+            checked_entities = [
+                entity
+                for entity in real_entities
+                if ct_id in (base_ct_id, entity.entity_type_id)
+            ]
+            if not checked_entities:
+                continue
+
+            for entity, accepted in zip(
+                checked_entities,
+                efilter.accept_many(checked_entities, user=mfilter.user),
+            ):
+                is_stored = (mfilter.id, entity.id) in stored
+
+                if accepted and not is_stored:
+                    new_entries.append(
+                        MaterializedEntityFilterEntry(mfilter=mfilter, entity=entity)
+                    )
+                elif not accepted and is_stored:
+                    removed_entity_ids[mfilter.id].append(entity.id)
+
+        if new_entries:
+            MaterializedEntityFilterEntry.objects.bulk_create(new_entries)
+
+        for mfilter_id, entity_ids in removed_entity_ids.items():
+            MaterializedEntityFilterEntry.objects.filter(
+                mfilter=mfilter_id, entity__in=entity_ids,
+            ).delete()
+
+    def update_ids(self, entity_ids: Iterable[int]) -> None:
+        """Update the stored entities (their relationships, properties or
+        custom-values have been modified).
+        The entities are retrieved again, in order to avoid stale caches.
+        """
+        grouped_ids = self._grouped_ids()
+        if grouped_ids is not None:
+            grouped_ids.update(entity_ids)
+            return
+
+        deleted_ids = _get_deleted_entity_ids()
+        entity_ids = {*entity_ids} - deleted_ids
+
+        if entity_ids:
+            self.update(CremeEntity.objects.filter(id__in=entity_ids))
+
+    def rebuild(self, *, efilter_ids: Iterable[str] = (), user_ids: Iterable[int] = ()) -> None:
+        """Materialize again the filters which are already materialized.
+        @param efilter_ids: IDs of the modified filters.
+        @param user_ids: IDs of the users whose teams have been modified (only
+               the filters depending on the user are concerned).
+        """
+        pairs = {
+            *MaterializedEntityFilter.objects.filter(
+                Q(efilter__in=[*efilter_ids]) | Q(user__in=[*user_ids]),
+            ).values_list('efilter', 'user'),
+        }
+        if not pairs:
+            return
+
+        efilters = EntityFilter.objects.in_bulk({efilter_id for efilter_id, __ in pairs})
+        users = CremeUser.objects.in_bulk({user_id for __, user_id in pairs if user_id})
+
+        for efilter_id, user_id in pairs:
+            efilter = efilters.get(efilter_id)
+            user = users.get(user_id)
+
+            if (
+                efilter is None
+                or not self.is_materializable(efilter)
+                or self.depends_on_user(efilter) != (user is not None)
+            ):
+                logger.info(
+                    'The materialization of the filter "%s" is removed', efilter_id,
+                )
+                MaterializedEntityFilter.objects.filter(efilter=efilter_id).delete()
+                self._clear_cache()
+            else:
+                self.build(efilter, user)
+
+    def invalidate(self, efilter_id: str) -> None:
+        """The conditions of a filter have been modified ; the stored entities
+        are removed (so the filter is used dynamically), & the filter is
+        materialized again at the end of the transaction.
+        """
+        mfilters = MaterializedEntityFilter.objects.filter(efilter=efilter_id)
+
+        if mfilters.exists():
+            mfilters.delete()
+            self._clear_cache()
+
+            # NB: the filter is materialized again with its current users (the
+            #     filters which depend on the user are re-materialized for all
+            #     the users of the roles by the command).
+            transaction.on_commit(partial(self._rematerialize, efilter_id))
+
+    def _rematerialize(self, efilter_id: str) -> None:
+        efilter = EntityFilter.objects.filter(id=efilter_id).first()
+
+        if efilter is not None and self.is_materializable(efilter):
+            for cred_efilter, user in self.credentials_filters():
+                if cred_efilter.id == efilter_id:
+                    self.build(cred_efilter, user)
+
+
+def get_materializer() -> EntityFilterMaterializer | None:
+    "Get the materializer ; <None> means the materialization is disabled."
+    return _materializer if settings.MATERIALIZED_CREDENTIALS_FILTERS else None
+
+
+_materializer = EntityFilterMaterializer()
+
+
+@contextmanager
+def grouped_updates() -> Iterator[EntityFilterMaterializer | None]:
+    """Context manager which groups the updates of the materialized filters
+    (see EntityFilterMaterializer.grouped_updates()) when the materialization
+    is enabled.
+
+    Usage:
+        with grouped_updates() as materializer:
+            [operation in bulk on some entities...]
+
+            if materializer is not None:
+                materializer.update_ids([IDs of the modified entities...])
+    """
+    materializer = get_materializer()
+
+    if materializer is None:
+        yield None
+    else:
+        with materializer.grouped_updates():
+            yield materializer
+
+
+# Signal handlers --------------------------------------------------------------
+
+@receiver(signals.post_save, dispatch_uid='creme_core-update_materialized_filters_save')
+def _update_on_save(sender, instance, **kwargs):
+    materializer = get_materializer()
+
+    if materializer is not None:
+        if isinstance(instance, CremeEntity):
+            materializer.update([instance])
+        elif isinstance(instance, Relation):
+            materializer.update_ids([instance.subject_entity_id])
+        elif isinstance(instance, CremeProperty):
+            materializer.update_ids([instance.creme_entity_id])
+        elif isinstance(instance, CustomFieldValue):
+            materializer.update_ids([instance.entity_id])
+        elif isinstance(instance, (EntityFilter, EntityFilterCondition)):
+            materializer.invalidate(
+                instance.id if isinstance(instance, EntityFilter) else instance.filter_id
+            )
+
+
+@receiver(signals.post_delete, dispatch_uid='creme_core-update_materialized_filters_delete')
+def _update_on_delete(sender, instance, **kwargs):
+    materializer = get_materializer()
+
+    if materializer is not None:
+        if isinstance(instance, Relation):
+            materializer.update_ids([instance.subject_entity_id])
+        elif isinstance(instance, CremeProperty):
+            materializer.update_ids([instance.creme_entity_id])
+        elif isinstance(instance, CustomFieldValue):
+            materializer.update_ids([instance.entity_id])
+        elif isinstance(instance, EntityFilterCondition):
+            materializer.invalidate(instance.filter_id)
+
+
+@receiver(signals.m2m_changed, dispatch_uid='creme_core-update_materialized_filters_m2m')
+def _update_on_m2m(sender, instance, action, pk_set, **kwargs):
+    materializer = get_materializer()
+
+    if materializer is None:
+        return
+
+    if isinstance(instance, CustomFieldMultiEnum):
+        if action.startswith('post_'):
+            materializer.update_ids([instance.entity_id])
+    elif sender is CremeUser.teammates_set.through:
+        # NB: the teammates are retrieved before the clearing
+        if action == 'pre_clear':
+            user_ids = (
+                [*instance.teammates_set.values_list('id', flat=True)]
+                if instance.is_team else
+                [instance.id]
+            )
+        elif action in ('post_add', 'post_remove'):
+            user_ids = [*pk_set] if instance.is_team else [instance.id]
+        else:
+            return
+
+        transaction.on_commit(partial(materializer.rebuild, user_ids=user_ids))
@@ -16,10 +16,20 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ################################################################################
 
+from __future__ import annotations
+
 from contextlib import ContextDecorator
+from functools import partial
+
+from django.db import models, transaction
 
 from ..global_info import get_per_request_cache
-from ..models.history import HISTORY_ENABLED_CACHE_KEY, is_history_enabled
+from ..models import CremeEntity, HistoryLine
+from ..models.history import (
+    HISTORY_BUFFER_CACHE_KEY,
+    HISTORY_ENABLED_CACHE_KEY,
+    is_history_enabled,
+)
 
 
 def do_toggle_history(*, enabled: bool) -> None:
@@ -63,3 +73,153 @@ class toggle_history(ContextDecorator):
         do_toggle_history(enabled=self.initial)
 
         return False  # Exceptions are not captured
+
+
+class HistoryBuffer:
+    """Collect the new instances of HistoryLine & create them with bulk queries.
+    Hint: you should use buffer_history() instead of using this class directly.
+
+    The lines created within a transaction are kept only when the transaction
+    is committed (if a savepoint is rolled back, its lines are dropped), so the
+    lines are created after the commit.
+    """
+    def __init__(self, *, size: int = 1024) -> None:
+        """Constructor.
+        @param size: The lines are created when their number reaches this size
+               (the buffer is flushed automatically).
+        """
+        self.size = size
+        self._lines: list[HistoryLine] = []
+
+    def __len__(self):
+        return len(self._lines)
+
+    def add(self, hline: HistoryLine) -> None:
+        "Add a line which has not been saved yet; it will be created by flush()."
+        if hline._buffered:
+            # NB: the line has been modified in memory (see _HLTInstanceCacheMixin)
+            return
+
+        hline._buffered = True
+
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(partial(self._confirm, hline))
+        else:
+            self._confirm(hline)
+
+    def _confirm(self, hline: HistoryLine) -> None:
+        self._lines.append(hline)
+
+        if len(self._lines) >= self.size:
+            self.flush()
+
+    @staticmethod
+    def _detach_deleted_entities(hlines: list[HistoryLine]) -> None:
+        # NB: emulate the behaviour of 'on_delete=SET_NULL' for the entities
+        #     which have been deleted after the creation of the lines.
+        entity_ids = {hline.entity_id for hline in hlines if hline.entity_id}
+        if not entity_ids:
+            return
+
+        existing_ids = {
+            *CremeEntity.objects.filter(id__in=entity_ids).values_list('id', flat=True),
+        }
+
+        for hline in hlines:
+            if hline.entity_id and hline.entity_id not in existing_ids:
+                hline.entity = None
+
+    def flush(self) -> None:
+        "Create the collected lines."
+        hlines = self._lines
+        if not hlines:
+            return
+
+        self._lines = []
+        self._detach_deleted_entities(hlines)
+
+        linked_lines = [hline for hline in hlines if hline._unsaved_related_line is not None]
+        size = self.size
+        manager = HistoryLine.objects
+
+        with transaction.atomic():
+            if (
+                not linked_lines
+                or transaction.get_connection().features.can_return_rows_from_bulk_insert
+            ):
+                manager.bulk_create(hlines, batch_size=size)
+            else:
+                # The IDs of the related lines must be retrieved (e.g. MySQL)
+                involved = {
+                    id(line)
+                    for hline in linked_lines
+                    for line in (hline, hline._unsaved_related_line)
+                }
+
+                for hline in hlines:
+                    if id(hline) in involved:
+                        # NB: HistoryLine.save() would buffer the line again.
+                        models.Model.save(hline, force_insert=True)
+
+                manager.bulk_create(
+                    [hline for hline in hlines if id(hline) not in involved],
+                    batch_size=size,
+                )
+
+            if linked_lines:
+                for hline in linked_lines:
+                    hline._set_related_line_id(hline._unsaved_related_line.id)
+                    hline._unsaved_related_line = None
+
+                manager.bulk_update(linked_lines, fields=['value'], batch_size=size)
+
+
+class buffer_history(ContextDecorator):
+    """ Decorator and context manager designed to create the lines of history
+    with bulk queries (see HistoryBuffer) ; it's useful for the code creating
+    a lot of lines (mass import, batch process...).
+
+    Usages:
+
+    @buffer_history()
+    def do_something():
+        do()
+
+    or
+
+    with buffer_history():
+        do_something()
+
+    The nested usages use the buffer of the outermost one. The lines are
+    created when the outermost context is left (or when the transaction
+    containing it is committed).
+    """
+    def __init__(self, *, size: int = 1024) -> None:
+        self.size = size
+
+    def _recreate_cm(self):
+        # NB: a new instance is used by each call of the decorated function,
+        #     because the instance stores the buffer.
+        return type(self)(size=self.size)
+
+    def __enter__(self):
+        cache = get_per_request_cache()
+
+        if HISTORY_BUFFER_CACHE_KEY in cache:
+            self.buffer = None
+        else:
+            self.buffer = cache[HISTORY_BUFFER_CACHE_KEY] = HistoryBuffer(size=self.size)
+
+    def __exit__(self, *exc):
+        buffer = self.buffer
+
+        if buffer is not None:
+            del get_per_request_cache()[HISTORY_BUFFER_CACHE_KEY]
+
+            if transaction.get_connection().in_atomic_block:
+                # NB: the lines are confirmed before (see HistoryBuffer.add()).
+                transaction.on_commit(buffer.flush)
+            else:
+                buffer.flush()
+
+        return False  # Exceptions are not captured
@@ -0,0 +1,235 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+"""Advisor for the DB-indexes used to sort the list-views.
+
+The list-views are efficient with big tables when their ordering corresponds
+to a DB-index (the keyset pagination can be used, & the DB does not have to
+sort the whole table). The advisor retrieves the orderings which are really
+used (i.e. the HeaderFilters & the sorted columns stored in the states of the
+list-views, which are saved in the sessions of the users), & finds the ones
+which do not correspond to an index.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Field, Index, Model
+from django.utils.timezone import now
+
+from ..gui.listview import ListViewState
+from ..models import CremeEntity, HeaderFilter
+from ..utils.db import get_indexed_ordering, get_keyed_indexes_columns
+from ..utils.meta import Order
+from . import sorter
+
+logger = logging.getLogger(__name__)
+
+
+class SortIndexAdvice:
+    """A missing DB-index.
+
+    Attributes:
+        - model: class inheriting CremeEntity.
+        - field_names: tuple of strings ; names of the fields of the index.
+        - columns: tuple of strings ; names of the related DB columns.
+        - usages: number of states of list-view using this ordering.
+    """
+    def __init__(self,
+                 model: type[CremeEntity],
+                 fields: Iterable[Field],
+                 usages: int = 0):
+        fields = [*fields]
+        self.model = model
+        self.field_names = tuple(field.name for field in fields)
+        self.columns = tuple(field.column for field in fields)
+        self.usages = usages
+
+    def __repr__(self):
+        return (
+            f'<SortIndexAdvice('
+            f'model={self.model.__name__}, '
+            f'field_names={self.field_names}, '
+            f'usages={self.usages}'
+            f')>'
+        )
+
+    def build_index(self) -> Index:
+        "Build the (not created) DB-index."
+        index = Index(fields=self.field_names)
+        index.set_name_with_model(self.model)
+
+        return index
+
+
+class SortIndexAdvisor:
+    """Find the orderings of list-views which do not correspond to DB-indexes.
+
+    Hint: you can override the method 'iter_states()' to retrieve the states
+          of list-views from your own storage.
+    """
+    advice_class = SortIndexAdvice
+    db_session_engines = {
+        'django.contrib.sessions.backends.db',
+        'django.contrib.sessions.backends.cached_db',
+    }
+
+    def __init__(self, cell_sorter_registry: sorter.CellSorterRegistry | None = None):
+        """Constructor.
+        @param cell_sorter_registry: Registry used by the list-views to sort
+               the columns ; by default the global one is used.
+        """
+        self.query_sorter = sorter.QuerySorter(
+            cell_sorter_registry or sorter.cell_sorter_registry
+        )
+
+    def iter_states(self) -> Iterator[ListViewState]:
+        """Get the states of the list-views stored in the (not expired) sessions.
+        @raise ValueError: The sessions are not stored in DB.
+        """
+        engine = settings.SESSION_ENGINE
+        if engine not in self.db_session_engines:
+            raise ValueError(
+                f'The sessions must be stored in the DB (engine "{engine}" is not managed).'
+            )
+
+        for session in Session.objects.filter(expire_date__gt=now()).iterator():
+            for value in session.get_decoded().values():
+                if isinstance(value, dict) and 'header_filter_id' in value:
+                    state = ListViewState()
+
+                    for k, v in value.items():
+                        setattr(state, k, v)
+
+                    yield state
+
+    def _ordering_fields(self,
+                         model: type[Model],
+                         ordering: tuple[str, ...],
+                         ) -> list[Field] | None:
+        "Get the fields of an ordering, or None if no DB-index can be built."
+        desc_count = sum(1 for field_name in ordering if field_name.startswith('-'))
+        if desc_count and desc_count != len(ordering):
+            # NB: the indexes are ASC (see get_indexed_ordering())
+            return None
+
+        local_fields = {}
+        for field in model._meta.local_concrete_fields:
+            local_fields[field.name] = local_fields[field.attname] = field
+
+        fields = []
+        for field_name in ordering:
+            # NB: related fields & fields of the parent models (they are in
+            #     other tables) cannot be used in an index.
+            field = local_fields.get(field_name.removeprefix('-'))
+            if field is None:
+                return None
+
+            fields.append(field)
+
+        return fields
+
+    def orderings(self) -> Counter[tuple[type[CremeEntity], tuple[str, ...]]]:
+        """Count the orderings used by the states of list-view.
+        @return: A Counter with keys like (model, ordered_field_names).
+        """
+        counter = Counter()
+        hfilters = {}
+        sort_info = self.query_sorter.get
+
+        for state in self.iter_states():
+            hfilter_id = state.header_filter_id
+            if not hfilter_id:
+                continue
+
+            try:
+                hfilter = hfilters[hfilter_id]
+            except KeyError:
+                hfilter = hfilters[hfilter_id] = HeaderFilter.objects.filter(
+                    id=hfilter_id,
+                ).first()
+
+            if hfilter is None:
+                continue
+
+            model = hfilter.entity_type.model_class()
+            counter[(
+                model,
+                sort_info(
+                    model=model,
+                    cells=hfilter.filtered_cells,
+                    cell_key=state.sort_cell_key,
+                    order=Order.from_string(state.sort_order, required=False),
+                ).field_names,
+            )] += 1
+
+        return counter
+
+    def missing_indexes(self) -> list[SortIndexAdvice]:
+        """Get the missing DB-indexes for the orderings used by the list-views.
+        @return: A list of advices ; the most used orderings come first.
+        """
+        advices = {}
+
+        for (model, ordering), count in self.orderings().items():
+            if get_indexed_ordering(model, ordering) is not None:
+                continue
+
+            fields = self._ordering_fields(model, ordering)
+            if fields is None:
+                logger.info(
+                    'SortIndexAdvisor: the ordering %s of <%s> cannot be indexed.',
+                    ordering, model.__name__,
+                )
+                continue
+
+            # NB: the indexes are ASC, the DESC orderings use the same index.
+            key = (model, tuple(field.column for field in fields))
+            advice = advices.get(key)
+            if advice is None:
+                advices[key] = advice = self.advice_class(model=model, fields=fields)
+
+            advice.usages += count
+
+        return sorted(advices.values(), key=lambda a: a.usages, reverse=True)
+
+    def create_index(self, advice: SortIndexAdvice) -> Index:
+        """Create a DB-index in the database.
+        Notice that the index is not declared in the model (i.e. it's not
+        managed by the migrations).
+        """
+        index = advice.build_index()
+
+        with connections[DEFAULT_DB_ALIAS].schema_editor() as editor:
+            editor.add_index(advice.model, index)
+
+        # NB: only the current process knows the new index (restart the server)
+        get_keyed_indexes_columns.cache_clear()
+
+        return index
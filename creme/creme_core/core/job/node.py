@@ -0,0 +1,144 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from os import getpid
+from socket import gethostname
+
+from django.db import IntegrityError
+from django.db.transaction import atomic
+from django.utils.timezone import now
+
+from creme.creme_core.models import JobLease, JobSchedulerNode
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerNode:
+    """Registration of a JobScheduler in the DB, when several schedulers share
+    the jobs (see the setting 'JOBMANAGER_LEASE_DURATION').
+
+    The node regularly updates its heartbeat; the nodes which have not updated
+    their heartbeat for a duration longer than the lease duration are
+    considered as dead, & they are removed (with their leases) by the other
+    nodes.
+    A node must hold the lease of a Job to run it (see acquire()/release()).
+    """
+    def __init__(self, lease_duration: int, name: str = ''):
+        """Constructor.
+        @param lease_duration: Duration in seconds.
+        @param name: Unique name of the node; by default it's built from the
+               host name & the process ID.
+        """
+        if lease_duration < 1:
+            raise ValueError(
+                f'SchedulerNode: the lease duration must be >= 1 (duration={lease_duration})'
+            )
+
+        self.lease_duration = timedelta(seconds=lease_duration)
+        self.heartbeat_period = self.lease_duration / 3
+        self.name = name or f'{gethostname()}-{getpid()}'
+        self.job_ids: set[int] = set()  # IDs of the leased Jobs
+        self._node: JobSchedulerNode | None = None
+        self._last_heartbeat: datetime | None = None
+
+    @property
+    def registered(self) -> bool:
+        return self._node is not None
+
+    def register(self, now_value: datetime | None = None) -> None:
+        now_value = now_value or now()
+
+        # NB: a node with the same name has been run by a previous process
+        #     which has crashed.
+        JobSchedulerNode.objects.filter(name=self.name).delete()
+
+        logger.info('SchedulerNode: register the node "%s"', self.name)
+        self._node = JobSchedulerNode.objects.create(name=self.name, heartbeat=now_value)
+        self._last_heartbeat = now_value
+        self.job_ids.clear()
+
+    def unregister(self) -> None:
+        node = self._node
+
+        if node is not None:
+            logger.info('SchedulerNode: unregister the node "%s"', self.name)
+            node.delete()  # NB: the leases are deleted too
+            self._node = None
+
+        self.job_ids.clear()
+
+    def heartbeat(self, now_value: datetime | None = None) -> bool:
+        """Update the heartbeat of the node (if its period is elapsed), & remove
+        the dead nodes.
+        @return: <False> if the current node has been considered as dead by
+                 another node (so its leases have been lost, & the node has been
+                 registered again).
+        """
+        now_value = now_value or now()
+
+        if now_value - self._last_heartbeat < self.heartbeat_period:
+            return True
+
+        self._last_heartbeat = now_value
+        alive = JobSchedulerNode.objects.filter(
+            id=self._node.id,
+        ).update(heartbeat=now_value) > 0
+
+        if not alive:
+            logger.warning(
+                'SchedulerNode: the node "%s" has been considered as dead; '
+                'its leases are lost.',
+                self.name,
+            )
+            self.register(now_value)
+
+        JobSchedulerNode.objects.filter(
+            heartbeat__lt=now_value - self.lease_duration,
+        ).delete()
+
+        return alive
+
+    def acquire(self, job_id: int) -> bool:
+        "Try to get the lease of a Job; returns <True> if the node holds it."
+        if job_id in self.job_ids:
+            return True
+
+        try:
+            with atomic():
+                JobLease.objects.create(job_id=job_id, node=self._node)
+        except IntegrityError:
+            return False
+
+        self.job_ids.add(job_id)
+
+        return True
+
+    def release(self, job_id: int) -> None:
+        if job_id in self.job_ids:
+            self.job_ids.discard(job_id)
+            JobLease.objects.filter(job_id=job_id, node=self._node).delete()
@@ -0,0 +1,207 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from dataclasses import dataclass
+from multiprocessing.pool import AsyncResult, Pool
+from time import perf_counter
+
+import django
+from django.db import close_old_connections
+from django.utils.translation import deactivate
+
+from creme.creme_core.global_info import clear_global_info
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobRunStats:
+    """Statistics about the execution of a Job in a worker of the pool.
+
+    Notice that 'rss_delta' is the difference between the resident memory of
+    the worker after & before the execution of the job (so it can be negative);
+    it's in KiB, & it's <None> if the platform does not provide it.
+    """
+    job_id: int
+    wall_time: float  # In seconds
+    rss_delta: int | None
+
+
+def _current_rss() -> int | None:
+    "Resident memory of the current process in KiB (<None> if unavailable)."
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):  # Not Linux
+        return None
+
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def run_job(job_id: int) -> JobRunStats:
+    """Execute a Job in the current process (which must be a worker of the pool ;
+    Django is already set up).
+    """
+    from . import job_type_registry
+
+    close_old_connections()
+    rss_before = _current_rss()
+    start = perf_counter()
+
+    try:
+        job_type_registry(job_id)
+    finally:
+        wall_time = perf_counter() - start
+
+        # The worker is reused by the next jobs; we clean the global state.
+        clear_global_info()
+        deactivate()
+        close_old_connections()
+
+    rss_after = _current_rss()
+
+    return JobRunStats(
+        job_id=job_id,
+        wall_time=wall_time,
+        rss_delta=None if rss_before is None or rss_after is None else rss_after - rss_before,
+    )
+
+
+class PooledJob:
+    """Handle on a Job which is run by a worker of a JobWorkerPool.
+    It's the counterpart of the <subprocess.Popen> instances used for the jobs
+    which are run in their own process; the methods poll() & wait() follow the
+    API of Popen (the return code is 0 when the execution succeeded, 1 when it
+    failed).
+
+    Attributes:
+        - returncode: <None> while the job is running.
+        - stats: instance of JobRunStats, available when the execution has
+          succeeded (<None> in the other cases).
+    """
+    def __init__(self, job_id: int, result: AsyncResult):
+        self.job_id = job_id
+        self.returncode: int | None = None
+        self.stats: JobRunStats | None = None
+        self._result = result
+
+    def _collect(self, timeout: float | None = None) -> None:
+        try:
+            self.stats = self._result.get(timeout)
+        except multiprocessing.TimeoutError:
+            raise
+        except Exception:
+            logger.exception('JobWorkerPool: the job id=%s failed', self.job_id)
+            self.returncode = 1
+        else:
+            self.returncode = 0
+
+    def poll(self) -> int | None:
+        """Check if the execution is finished.
+        @return: <None> while the job is running, the return code in the
+                 other case.
+        """
+        if self.returncode is None and self._result.ready():
+            self._collect()
+
+        return self.returncode
+
+    def wait(self, timeout: float | None = None) -> int:
+        """Wait the end of the execution.
+        @return: The return code.
+        @raise multiprocessing.TimeoutError.
+        """
+        if self.returncode is None:
+            self._collect(timeout)
+
+        return self.returncode
+
+
+class JobWorkerPool:
+    """Pool of worker processes which execute Jobs.
+
+    The workers set up Django once, & are reused to run several jobs, so the
+    short jobs (system jobs like the reminders or the cleaners) do not pay the
+    cost of a Django's initialisation each time they are run.
+    A worker is replaced by a fresh one after a given number of jobs (to avoid
+    memory leaks to accumulate).
+
+    Notice that:
+      - the processes are spawned (not forked) so the workers do not share the
+        DB connections of the job scheduler.
+      - the IDs of the jobs are sent to the workers with the queue of
+        <multiprocessing.Pool>, not with the queue of the scheduler
+        (see BaseJobSchedulerQueue) which is used by the web processes to send
+        commands to the scheduler(s) ; the workers are local processes, & the
+        scheduler needs a handle on each execution (see PooledJob).
+    """
+    def __init__(self, size: int, max_jobs_per_worker: int | None = None):
+        """Constructor.
+        @param size: Number of worker processes.
+        @param max_jobs_per_worker: Number of jobs run by a worker before it's
+               replaced; <None> means no limit.
+        """
+        if size < 1:
+            raise ValueError(f'JobWorkerPool: the size must be >= 1 (size={size})')
+
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker or None
+        self._pool: Pool | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        if self._pool is None:
+            logger.info(
+                'JobWorkerPool: start %s worker(s) (max jobs per worker: %s)',
+                self.size, self.max_jobs_per_worker,
+            )
+            self._pool = multiprocessing.get_context('spawn').Pool(
+                processes=self.size,
+                initializer=django.setup,
+                maxtasksperchild=self.max_jobs_per_worker,
+            )
+
+    def stop(self) -> None:
+        pool = self._pool
+
+        if pool is not None:
+            logger.info('JobWorkerPool: stop the workers')
+            pool.terminate()
+            pool.join()
+            self._pool = None
+
+    def run_job(self, job_id: int) -> PooledJob:
+        "Send the ID of a Job to the workers; the first available one runs it."
+        pool = self._pool
+        if pool is None:
+            raise RuntimeError('JobWorkerPool.run_job(): the pool is not started')
+
+        return PooledJob(job_id=job_id, result=pool.apply_async(run_job, (job_id,)))
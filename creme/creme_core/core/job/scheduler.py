@@ -23,6 +23,7 @@ from heapq import heapify, heappop, heappush
 from subprocess import Popen
 from typing import Deque
 
+from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.db.models import Q
 from django.utils.formats import date_format
@@ -35,11 +36,38 @@ from creme.creme_core.utils.system import (
     python_subprocess,
 )
 
+from .node import SchedulerNode
+from .pool import JobWorkerPool, PooledJob
 from .queue import Command, get_queue
 
 logger = logging.getLogger(__name__)
 
 
+def _first_multiple_after(start: datetime,
+                          period: relativedelta,
+                          limit: datetime,
+                          ) -> datetime:
+    """Get the smallest date on the form "start + N * period" (N >= 0) which
+    is >= limit.
+    The number of steps does not depend on N; the periods with a variable
+    length (months, years) are approximated, & the result is then adjusted.
+    """
+    if start >= limit:
+        return start
+
+    # NB: 12 periods to smooth the length of months
+    step = ((start + period * 12) - start) / 12
+    count = -((start - limit) // step)  # Division rounded up
+
+    while start + period * count < limit:
+        count += 1
+
+    while count > 1 and start + period * (count - 1) >= limit:
+        count -= 1
+
+    return start + period * count
+
+
 # TODO: should we rely on a watch dog?
 class JobScheduler:
     """It should run within its own process (see 'creme_job_manager' command),
@@ -53,10 +81,26 @@ class JobScheduler:
         - User jobs are executed with a pool of processes, and its size is given
           by settings.MAX_USER_JOBS.
 
+    If settings.JOBMANAGER_POOL_SIZE is not 0, the System Jobs are executed by
+    a pool of worker processes (see JobWorkerPool) instead of a new process for
+    each execution.
+
     If the execution of a (pseudo-)periodic Job takes too long time (more than
     its period), the Job is scheduled to the next valid time, and not executed
     immediately (see _next_wakeup()).
 
+    If settings.JOBMANAGER_LEASE_DURATION is not 0, several schedulers (i.e.
+    "nodes", which can run on several machines) share the Jobs (see
+    SchedulerNode):
+        - a node must get the lease of a Job to run it.
+        - each node schedules all the System Jobs; the first one which wakes
+          up runs the Job, the other ones skip this execution.
+        - a User Job is run by the node which receives its START command.
+        - a REFRESH command is received by only one node ; the other nodes
+          detect the modification of the schedule when they get the lease.
+        - as the END commands can be received by any node, the nodes check
+          regularly the processes of their own jobs.
+
     The "period" of pseudo-periodic is computed each time they are run. But
     the manager runs them regularly (see settings.PSEUDO_PERIOD) in order to
     reduce the aftermath of a redis/... connection problem.
@@ -89,10 +133,24 @@ class JobScheduler:
         def reaches_trials_limit(self) -> bool:
             return self.trials >= 100
 
-    def __init__(self) -> None:
+    def __init__(self, node_name: str = '') -> None:
+        """Constructor.
+        @param node_name: Name of the node in multi-nodes mode (see SchedulerNode).
+        """
         self._max_user_jobs = settings.MAX_USER_JOBS
         self._queue = get_queue()
-        self._procs: dict[int, Popen] = {}  # keys are Job IDs
+        self._procs: dict[int, Popen | PooledJob] = {}  # keys are Job IDs
+
+        pool_size = settings.JOBMANAGER_POOL_SIZE
+        self._pool = JobWorkerPool(
+            size=pool_size,
+            max_jobs_per_worker=settings.JOBMANAGER_POOL_MAX_JOBS_PER_WORKER,
+        ) if pool_size else None
+
+        lease_duration = settings.JOBMANAGER_LEASE_DURATION
+        self._node = SchedulerNode(
+            lease_duration=lease_duration, name=node_name,
+        ) if lease_duration else None
 
         # Heap, which elements are (wakeup_date, job_instance)
         #   => closer wakeup in the first element.
@@ -101,11 +159,11 @@ class JobScheduler:
 
         self._system_jobs_starts: dict[int, datetime] = {}  # "int" is Job ID
         self._users_jobs: Deque[Job] = deque()
+        self._users_job_ids: set[int] = set()  # IDs of the jobs in _users_jobs
         self._running_userjob_ids: set[int] = set()
 
     def _retrieve_jobs(self) -> None:
         # now_value = now()
-        users_jobs = self._users_jobs
         system_jobs = self._system_jobs
 
         # NB: order_by() => execute users' jobs in the right order
@@ -130,7 +188,7 @@ class JobScheduler:
                         job,
                     )
 
-                users_jobs.appendleft(job)
+                self._push_user_job(job)
             else:  # System jobs
                 if jtype.periodic != JobType.NOT_PERIODIC:
                     # heappush(system_jobs, (self._next_wakeup(job, now_value), job.id, job))
@@ -154,12 +212,11 @@ class JobScheduler:
         if job.enabled:
             next_wakeup = reference_run or job.reference_run
             now_value = now()
-            period = job.real_periodicity.as_timedelta()
-
-            # TODO: optimise this computing to avoid O(N) complexity;
-            #       we could probably remove the argument "reference_run".
-            while next_wakeup < now_value:
-                next_wakeup += period
+            next_wakeup = _first_multiple_after(
+                start=next_wakeup,
+                period=job.real_periodicity.as_timedelta(),
+                limit=now_value,
+            )
 
             # TODO: how to cleanly manage jobs with an invalid type?
             if job.type.periodic == JobType.PSEUDO_PERIODIC:
@@ -174,12 +231,13 @@ class JobScheduler:
         return next_wakeup
 
     def _push_user_job(self, user_job: Job):
-        users_jobs = self._users_jobs
-
         if user_job.user:
+            users_job_ids = self._users_job_ids
+
             # Avoids a possible race condition: the job could be already in the list
-            if user_job.id not in (j.id for j in users_jobs):
-                users_jobs.appendleft(user_job)
+            if user_job.id not in users_job_ids:
+                users_job_ids.add(user_job.id)
+                self._users_jobs.appendleft(user_job)
         else:
             logger.warning(
                 'JobScheduler: try to start the job %r, which is a'
@@ -189,13 +247,19 @@ class JobScheduler:
 
     def _start_job(self, job: Job):
         logger.info('JobScheduler: start %r', job)
+        pool = self._pool
 
-        self._procs[job.id] = python_subprocess(
-            f'import django; '
-            f'django.setup(); '
-            f'from creme.creme_core.core.job import job_type_registry; '
-            f'job_type_registry({job.id})'
-        )
+        if pool is not None and not job.user_id:
+            self._procs[job.id] = pool.run_job(job.id)
+        else:
+            # NB: user jobs can be long (mass import...), so we do not want
+            #     them to hold the workers of the pool.
+            self._procs[job.id] = python_subprocess(
+                f'import django; '
+                f'django.setup(); '
+                f'from creme.creme_core.core.job import job_type_registry; '
+                f'job_type_registry({job.id})'
+            )
 
     def _end_job(self, job: Job):
         logger.info('JobScheduler: end %r', job)
@@ -203,14 +267,114 @@ class JobScheduler:
         if proc is not None:
             proc.wait()  # TODO: use return code ??
 
+            if isinstance(proc, PooledJob) and proc.stats is not None:
+                logger.info(
+                    'JobScheduler: job %r executed in %.3f seconds '
+                    '(RSS delta of the worker: %s KiB)',
+                    job, proc.stats.wall_time, proc.stats.rss_delta,
+                )
+
+        if self._node is not None:
+            self._node.release(job.id)
+
+    def _check_ended_jobs(self) -> None:
+        """Multi-nodes mode: the END command of a Job can be received by
+        another node, so the processes of the jobs run by the current node are
+        checked.
+        """
+        for job_id, proc in [*self._procs.items()]:
+            if proc.poll() is not None:
+                self._handle_command_end(Command(Command.END, data_id=job_id))
+
+    def _lease_system_job(self,
+                          job: Job,
+                          wakeup: datetime,
+                          now_value: datetime,
+                          ) -> Job | None:
+        """Multi-nodes mode: try to get the lease of a system Job which has to
+        be run.
+        @return: A fresh instance of the Job if the current node must run it;
+                 <None> if the Job is run (or has already been run) by another
+                 node, if it has been disabled, or if its schedule has been
+                 modified (the Job is re-scheduled).
+        """
+        node = self._node
+
+        if node.acquire(job.id):
+            fresh_job = Job.objects.filter(id=job.id).first()
+
+            if fresh_job is None:
+                node.release(job.id)
+                logger.warning('JobScheduler: the system job id=%s has been deleted', job.id)
+
+                return None
+
+            # NB: a REFRESH command is consumed by only one node, so the other
+            #     nodes can use an obsolete periodicity/reference run.
+            if (
+                fresh_job.periodicity != job.periodicity
+                or fresh_job.reference_run != job.reference_run
+            ):
+                node.release(job.id)
+                logger.info(
+                    'JobScheduler: the schedule of the job %r has been modified '
+                    '-> it is re-scheduled',
+                    fresh_job,
+                )
+                heappush(
+                    self._system_jobs,
+                    (self._next_wakeup(fresh_job), fresh_job.id, fresh_job),
+                )
+
+                return None
+
+            last_run = fresh_job.last_run
+            if fresh_job.enabled and not (last_run and last_run >= wakeup):
+                return fresh_job
+
+            node.release(job.id)
+            job = fresh_job
+        else:
+            logger.info('JobScheduler: the job %r is run by another node', job)
+
+        # NB: we wait a bit to avoid busy loops (the other node could run the
+        #     job with a pseudo-periodic wake-up date).
+        heappush(
+            self._system_jobs,
+            (
+                max(self._next_wakeup(job, wakeup), now_value + node.heartbeat_period),
+                job.id,
+                job,
+            ),
+        )
+
+        return None
+
     def _handle_kill(self, *args):
         logger.info('Job manager stops: %d running job(s)', len(self._procs))
         self._queue.destroy()
+
+        if self._node is not None:
+            self._node.unregister()
+
+        if self._pool is not None:
+            self._pool.stop()
+
         exit()
 
     def _handle_command_end(self, cmd: Command):
         job_id = cmd.data_id
 
+        if self._node is not None and job_id not in self._procs:
+            # NB: the job has been run by another node, which will detect
+            #     the end by itself (or the end has already been detected).
+            logger.info(
+                'JobScheduler.handle_command_end() -> the job id=%s is not run '
+                'by this node -> command is ignored.',
+                job_id,
+            )
+            return
+
         try:
             job = Job.objects.get(id=job_id)
         except Job.DoesNotExist:
@@ -349,12 +513,22 @@ class JobScheduler:
         #       which prevents network crashes ?
         # TODO: regularly use Popen.poll() to check if a child has crashed
         #       (with a problem which is not a catchable) ?
-        self._queue.clear()
+        node = self._node
+        if node is None:
+            self._queue.clear()
+        else:
+            # NB: the queue is shared with the other nodes
+            node.register()
+
         self._retrieve_jobs()
 
+        if self._pool is not None:
+            self._pool.start()
+
         enable_exit_handler(self._handle_kill)
 
         users_jobs = self._users_jobs
+        users_job_ids = self._users_job_ids
         system_jobs = self._system_jobs
         system_jobs_starts = self._system_jobs_starts
         running_userjob_ids = self._running_userjob_ids
@@ -385,6 +559,15 @@ class JobScheduler:
             else:
                 print('No user job at the moment.')
 
+            if self._pool is not None:
+                print(f'System jobs are run by a pool of {self._pool.size} worker(s).')
+
+            if node is not None:
+                print(
+                    f'Multi-nodes mode: this node is "{node.name}" '
+                    f'(lease duration: {int(node.lease_duration.total_seconds())} seconds).'
+                )
+
             print('\nQuit the server with CTRL-BREAK.')
 
         MAX_USER_JOBS = self._max_user_jobs
@@ -398,6 +581,10 @@ class JobScheduler:
         while True:
             now_value = now()
 
+            if node is not None:
+                node.heartbeat(now_value)
+                self._check_ended_jobs()
+
             if system_jobs:
                 wakeup = system_jobs[0][0]
                 timeout = int((wakeup - now_value).total_seconds())
@@ -431,6 +618,12 @@ class JobScheduler:
                                 real_job.id,
                             )
                     else:
+                        if node is not None:
+                            job = self._lease_system_job(job, wakeup, now_value)
+
+                            if job is None:
+                                continue
+
                         system_jobs_starts[job.id] = wakeup
                         self._start_job(job)
 
@@ -440,10 +633,20 @@ class JobScheduler:
                 # -- user-jobs are not periodic)
                 timeout = 0
 
+            if node is not None:
+                # NB: we must regularly update the heartbeat & check the ended jobs
+                heartbeat_timeout = max(1, int(node.heartbeat_period.total_seconds()))
+                timeout = min(timeout, heartbeat_timeout) if timeout else heartbeat_timeout
+
             while len(running_userjob_ids) <= MAX_USER_JOBS and users_jobs:
                 job = users_jobs.pop()
-                self._start_job(job)
-                running_userjob_ids.add(job.id)
+                users_job_ids.discard(job.id)
+
+                if node is None or node.acquire(job.id):
+                    self._start_job(job)
+                    running_userjob_ids.add(job.id)
+                else:
+                    logger.info('JobScheduler: the job %r is run by another node', job)
 
             cmd = self._queue.get_command(timeout)
             if cmd is None:  # Time out -> time to run a system job
@@ -22,11 +22,20 @@ import logging
 from collections.abc import Iterator
 from datetime import datetime
 
+from django.db.models import QuerySet
 from django.db.models.query_utils import Q
 from django.db.transaction import atomic
 
 from ..constants import UUID_CHANNEL_REMINDERS
-from ..models import CremeModel, CremeUser, Notification, NotificationChannel
+from ..models import (
+    CremeEntity,
+    CremeModel,
+    CremeUser,
+    Notification,
+    NotificationChannel,
+)
+from ..utils.chunktools import iter_as_chunk
+from .entity_filter.materialization import grouped_updates
 from .notification import NotificationContent
 
 logger = logging.getLogger(__name__)
@@ -47,10 +56,20 @@ class Reminder:
     def get_notification_content(self, instance: CremeModel) -> NotificationContent:
         raise NotImplementedError
 
-    # TODO: get_queryset/get_instance_to_remind instead
+    # Number of instances which are notified (& flagged as reminded) at once,
+    # in the same transaction.
+    chunk_size: int = 256
+
     def get_Q_filter(self) -> Q:
         pass
 
+    def get_queryset(self) -> QuerySet:
+        """Get the instances which have to be reminded.
+        Hint: override it to retrieve the data used by get_users() &
+        get_notification_content() (see QuerySet.select_related()).
+        """
+        return self.model.objects.filter(self.get_Q_filter()).exclude(reminded=True)
+
     def ok_for_continue(self) -> bool:
         return True
 
@@ -58,21 +77,33 @@ class Reminder:
         if not self.ok_for_continue():
             return
 
-        instances = self.model.objects.filter(self.get_Q_filter()).exclude(reminded=True)
+        instances = [*self.get_queryset()]
 
         if instances:
             channel = NotificationChannel.objects.get_for_uuid(UUID_CHANNEL_REMINDERS)
-
-            for instance in instances:
-                with atomic():
-                    Notification.objects.send(
+            get_users = self.get_users
+            get_content = self.get_notification_content
+
+            # NB: the configurations of the users are retrieved, & the
+            #     notifications are created, once per chunk ; the instances
+            #     are flagged with one query (no save()).
+            for instances_chunk in iter_as_chunk(instances, self.chunk_size):
+                with atomic(), grouped_updates() as materializer:
+                    Notification.objects.bulk_send(
                         channel=channel,
-                        users=self.get_users(instance),
-                        content=self.get_notification_content(instance),
+                        contents=[
+                            (get_users(instance), get_content(instance))
+                            for instance in instances_chunk
+                        ],
                     )
 
-                    instance.reminded = True
-                    instance.save()
+                    instance_ids = [instance.pk for instance in instances_chunk]
+                    self.model.objects.filter(pk__in=instance_ids).update(reminded=True)
+
+                    # NB: QuerySet.update() sends no signal ; the materialized
+                    #     filters only depend on the entities.
+                    if materializer is not None and issubclass(self.model, CremeEntity):
+                        materializer.update_ids(instance_ids)
 
     def next_wakeup(self, now_value: datetime) -> datetime | None:
         """Returns the next time when the job manager should wake up in order
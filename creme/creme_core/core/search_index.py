@@ -0,0 +1,499 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+"""Index for the global search (see 'creme_core.core.search.Searcher').
+
+Without index, the search builds a query with a condition "icontains" for each
+searched word & each searchable field (& a sub-query for each CustomField);
+the DB cannot use its indices with this kind of query, so the search is slow
+when there are lots of entities.
+
+The index stores, for each entity, the normalized value (lower case, without
+accent) of each searchable cell (see SearchConfigItem) in the table of the
+model SearchIndexEntry ; the search is then made on a single table, which can
+be efficiently indexed by the DB (see the different backends).
+
+The index is updated when entities & custom-values are saved ; the entities
+which reference an instance in their indexed cells (e.g. the cell "sector__title"
+of a Contact references a Sector) are updated when this instance is saved.
+Notice that the methods which do not send the signals, like 'QuerySet.update()',
+do not update the index.
+The cells which have not been indexed yet (e.g. a cell which has been added
+to a search configuration) are searched without the index ; use the command
+"creme_search_index" to (re)build the index.
+
+The backend is chosen with the setting "SEARCH_INDEX_BACKEND".
+"""
+
+from __future__ import annotations
+
+import logging
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Field, Model, prefetch_related_objects, signals
+from django.db.models.expressions import RawSQL
+from django.db.models.query import Q, QuerySet
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from ..global_info import get_per_request_cache
+from ..models import (
+    CremeEntity,
+    CustomField,
+    IndexedSearchCell,
+    SearchConfigItem,
+    SearchIndexEntry,
+)
+from ..models.custom_field import CustomFieldMultiEnum, CustomFieldValue
+from . import entity_cell
+from .config_cache import config_cache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    "Normalize a string for the search index (lower case, no accent)."
+    return ''.join(
+        c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c)
+    ).casefold()
+
+
+def _iter_strings(value) -> Iterator[str]:
+    if isinstance(value, list):
+        for elt in value:
+            yield from _iter_strings(elt)
+    elif value is not None:
+        value = str(value)
+        if value:
+            yield value
+
+
+class SearchIndexBackend:
+    """Base search index: the values are stored in the table of the model
+    SearchIndexEntry, & the search uses conditions "contains"
+    (i.e. LIKE '%word%') on this table.
+
+    It works with all the DB engines. On PostgreSQL, a trigram index is created
+    by the migrations (if the extension "pg_trgm" can be installed), which
+    makes this kind of condition fast.
+    """
+    # Number of entities retrieved by query when the index is built
+    chunk_size: int = 256
+
+    config_cache_namespace = 'creme_core-search_index'
+
+    INDEXED_CELL_TYPES = (
+        entity_cell.EntityCellRegularField.type_id,
+        entity_cell.EntityCellCustomField.type_id,
+    )
+
+    @staticmethod
+    def _custom_value_string(cvalue: CustomFieldValue) -> str:
+        return str(
+            cvalue
+            if cvalue.custom_field.field_type in (CustomField.ENUM, CustomField.MULTI_ENUM) else
+            cvalue.value
+        )
+
+    def _cell_value(self, entity: CremeEntity, cell: entity_cell.EntityCell) -> str:
+        if cell.type_id == entity_cell.EntityCellCustomField.type_id:
+            cvalue = entity.get_custom_value(cell.custom_field)
+
+            return '' if cvalue is None else self._custom_value_string(cvalue)
+
+        return ' '.join(_iter_strings(cell.field_info.value_from(entity)))
+
+    def _entries_for_word(self, word: str) -> QuerySet:
+        """Get the entries which contain a word.
+        Hint: override this method in child classes to use a specific kind of
+        index.
+        @param word: Normalized word.
+        """
+        return SearchIndexEntry.objects.filter(content__contains=word)
+
+    def _indexed_cells(self, model: type[CremeEntity]) -> list[entity_cell.EntityCell]:
+        return entity_cell.CELLS_MAP.build_cells_from_keys(
+            model=model,
+            keys=self.indexed_cell_keys(ContentType.objects.get_for_model(model)),
+        )[0]
+
+    def _invalidate_cell_keys(self, ctype: ContentType) -> None:
+        namespace = self.config_cache_namespace
+        config_cache.invalidate(namespace)
+
+        request_cache = get_per_request_cache()
+        request_cache.pop(f'{namespace}-{ctype.id}', None)
+        request_cache.pop(f'{namespace}-dependencies', None)
+
+    def _iter_chunks(self, queryset: QuerySet) -> Iterator[list[CremeEntity]]:
+        "Retrieve the entities of a queryset by chunks (of size 'chunk_size')."
+        queryset = queryset.order_by('pk')
+        last_pk = None
+
+        while True:
+            entities = [
+                *(queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[
+                    :self.chunk_size
+                ]
+            ]
+            if not entities:
+                break
+
+            yield entities
+            last_pk = entities[-1].pk
+
+    @staticmethod
+    def _relation_fields(cell: entity_cell.EntityCell) -> list[Field]:
+        """Get the fields of a regular-field cell which reference other instances
+        (e.g. "sector" for the cell "sector__title").
+        """
+        fields = []
+
+        for field in cell.field_info:
+            if not field.is_relation:
+                break
+
+            fields.append(field)
+
+        return fields
+
+    def _prepare_entities(self,
+                          entities: Sequence[CremeEntity],
+                          cells: Iterable[entity_cell.EntityCell],
+                          ) -> None:
+        "Retrieve the values of the cells with grouped queries."
+        cfields = []
+        related_paths = set()
+
+        for cell in cells:
+            if cell.type_id == entity_cell.EntityCellCustomField.type_id:
+                cfields.append(cell.custom_field)
+            else:
+                rel_fields = self._relation_fields(cell)
+                if rel_fields:
+                    related_paths.add('__'.join(field.name for field in rel_fields))
+
+        if cfields:
+            CremeEntity.populate_custom_values(entities, cfields)
+
+        if related_paths:
+            prefetch_related_objects(entities, *related_paths)
+
+    def build_entries(self,
+                      entities: Sequence[CremeEntity],
+                      cells: Sequence[entity_cell.EntityCell],
+                      ) -> list[SearchIndexEntry]:
+        """Build (but do not save) the entries of the index.
+        @param entities: Instances of the same model.
+        @param cells: Cells related to this model.
+        """
+        self._prepare_entities(entities, cells)
+        entries = []
+
+        for entity in entities:
+            for cell in cells:
+                content = normalize(self._cell_value(entity, cell))
+
+                if content:
+                    entries.append(SearchIndexEntry(
+                        entity=entity, cell_key=cell.key, content=content,
+                    ))
+
+        return entries
+
+    def configured_cells(self, model: type[CremeEntity]) -> list[entity_cell.EntityCell]:
+        """Get the cells which can be searched for a model, i.e. the cells used
+        by all the (enabled) search configurations of this model.
+        """
+        cells = {}
+
+        for sci in SearchConfigItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(model), disabled=False,
+        ):
+            for cell in sci.refined_cells:
+                if cell.type_id in self.INDEXED_CELL_TYPES:
+                    cells.setdefault(cell.key, cell)
+
+        return [*cells.values()]
+
+    def dependencies(self) -> dict[str, dict[int, list[str]]]:
+        """Get the models referenced by the indexed cells.
+        @return: A dictionary ; keys are labels of models (e.g. "persons.Sector"),
+                 values are dictionaries with the IDs of the referencing
+                 ContentTypes as keys & lists of lookups as values
+                 (e.g. {ct_id_of_Contact: ["sector"]}).
+        """
+        namespace = self.config_cache_namespace
+        request_cache = get_per_request_cache()
+        request_key = f'{namespace}-dependencies'
+
+        deps = request_cache.get(request_key)
+        if deps is None:
+            deps = config_cache.get_many(namespace, ['dependencies']).get('dependencies')
+
+            if deps is None:
+                deps = {}
+                keys_per_ctype = defaultdict(list)
+
+                for ctype_id, cell_key in IndexedSearchCell.objects.values_list(
+                    'content_type_id', 'cell_key',
+                ):
+                    keys_per_ctype[ctype_id].append(cell_key)
+
+                for ctype_id, keys in keys_per_ctype.items():
+                    model = ContentType.objects.get_for_id(ctype_id).model_class()
+                    if model is None:
+                        continue
+
+                    for cell in entity_cell.CELLS_MAP.build_cells_from_keys(
+                        model=model, keys=keys,
+                    )[0]:
+                        if cell.type_id != entity_cell.EntityCellRegularField.type_id:
+                            continue
+
+                        path = []
+                        for field in self._relation_fields(cell):
+                            path.append(field.name)
+                            lookups = deps.setdefault(
+                                field.related_model._meta.concrete_model._meta.label, {},
+                            ).setdefault(ctype_id, [])
+                            lookup = '__'.join(path)
+
+                            if lookup not in lookups:
+                                lookups.append(lookup)
+
+                config_cache.set_many(namespace, {'dependencies': deps})
+
+            request_cache[request_key] = deps
+
+        return deps
+
+    def indexed_cell_keys(self, ctype: ContentType) -> set[str]:
+        "Get the keys of the cells which are indexed for a type of entity."
+        namespace = self.config_cache_namespace
+        request_cache = get_per_request_cache()
+        request_key = f'{namespace}-{ctype.id}'
+
+        keys = request_cache.get(request_key)
+        if keys is None:
+            keys = config_cache.get_many(namespace, [ctype.id]).get(ctype.id)
+
+            if keys is None:
+                keys = {
+                    *IndexedSearchCell.objects
+                                      .filter(content_type=ctype)
+                                      .values_list('cell_key', flat=True)
+                }
+                config_cache.set_many(namespace, {ctype.id: keys})
+
+            request_cache[request_key] = keys
+
+        return keys
+
+    def is_ready(self,
+                 model: type[CremeEntity],
+                 cells: Iterable[entity_cell.EntityCell],
+                 ) -> bool:
+        "Can the index be used to search in these cells?"
+        indexed_keys = self.indexed_cell_keys(ContentType.objects.get_for_model(model))
+
+        return all(cell.key in indexed_keys for cell in cells)
+
+    def search_q(self, cells: Iterable[entity_cell.EntityCell], words: Iterable[str]) -> Q:
+        """Build a Q to search some words in some cells.
+        Each word must be contained in (at least) one cell.
+        """
+        cell_keys = [cell.key for cell in cells]
+        result_q = Q()
+
+        for word in words:
+            result_q &= Q(
+                pk__in=self._entries_for_word(normalize(word))
+                           .filter(cell_key__in=cell_keys)
+                           .values('entity_id')
+            )
+
+        return result_q
+
+    def update(self, entities: Sequence[CremeEntity]) -> None:
+        """Update the entries of some entities.
+        @param entities: Instances of the same model.
+        """
+        if not entities:
+            return
+
+        cells = self._indexed_cells(type(entities[0]))
+        if not cells:
+            return
+
+        with transaction.atomic():
+            SearchIndexEntry.objects.filter(
+                entity__in=entities, cell_key__in=[cell.key for cell in cells],
+            ).delete()
+            SearchIndexEntry.objects.bulk_create(self.build_entries(entities, cells))
+
+    def update_custom_value(self, cvalue: CustomFieldValue, deleted: bool = False) -> None:
+        """Update the entry related to a custom-value (the other entries of the
+        entity are not modified).
+        @param cvalue: Instance of a class inheriting CustomFieldValue.
+        @param deleted: <True> means the custom-value has been deleted.
+        """
+        cfield = cvalue.custom_field
+        cell_key = f'{entity_cell.EntityCellCustomField.type_id}-{cfield.id}'
+
+        if cell_key not in self.indexed_cell_keys(cfield.content_type):
+            return
+
+        content = '' if deleted else normalize(self._custom_value_string(cvalue))
+
+        if content:
+            SearchIndexEntry.objects.update_or_create(
+                entity_id=cvalue.entity_id, cell_key=cell_key,
+                defaults={'content': content},
+            )
+        else:
+            SearchIndexEntry.objects.filter(
+                entity_id=cvalue.entity_id, cell_key=cell_key,
+            ).delete()
+
+    def update_related(self, instance: Model) -> None:
+        """Update the entries of the entities which reference an instance in
+        their indexed cells (e.g. the Contacts related to a Sector with the
+        cell "sector__title").
+        @param instance: Instance of any model.
+        """
+        get_ct = ContentType.objects.get_for_id
+
+        for ctype_id, lookups in self.dependencies().get(
+            instance._meta.concrete_model._meta.label, {},
+        ).items():
+            related_q = Q()
+            for lookup in lookups:
+                related_q |= Q(**{lookup: instance.pk})
+
+            for entities in self._iter_chunks(
+                get_ct(ctype_id).model_class()._default_manager.filter(related_q).distinct()
+            ):
+                self.update(entities)
+
+    def rebuild(self, model: type[CremeEntity]) -> int:
+        """(Re)Build the index of a model, for the cells of the current search
+        configuration. The index is not used for this model during the
+        rebuilding.
+        @return: The number of indexed entities.
+        """
+        ctype = ContentType.objects.get_for_model(model)
+        cells = self.configured_cells(model)
+
+        IndexedSearchCell.objects.filter(content_type=ctype).delete()
+        self._invalidate_cell_keys(ctype)
+
+        count = 0
+
+        for entities in self._iter_chunks(model._default_manager.all()):
+            with transaction.atomic():
+                # NB: we remove the entries of the cells which are not used anymore too
+                SearchIndexEntry.objects.filter(entity__in=entities).delete()
+                SearchIndexEntry.objects.bulk_create(self.build_entries(entities, cells))
+
+            count += len(entities)
+
+        IndexedSearchCell.objects.bulk_create([
+            IndexedSearchCell(content_type=ctype, cell_key=cell.key) for cell in cells
+        ])
+        self._invalidate_cell_keys(ctype)
+
+        return count
+
+
+class SQLiteSearchIndexBackend(SearchIndexBackend):
+    """Search index for SQLite ; it uses a FTS5 table (with the tokenizer
+    "trigram") which mirrors the table of SearchIndexEntry.
+    This table is created by the migrations, it needs SQLite >= 3.34.
+    """
+    fts_table = 'creme_core_searchindexentry_fts'
+
+    def _entries_for_word(self, word):
+        # NB: the LIKE condition uses the trigram index when the word has at
+        #     least 3 characters.
+        pattern = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+        return SearchIndexEntry.objects.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {self.fts_table} WHERE content LIKE %s ESCAPE '\\'",
+                [f'%{pattern}%'],
+            ),
+        )
+
+
+@lru_cache
+def _build_backend(path: str) -> SearchIndexBackend:
+    return import_string(path)()
+
+
+def get_search_index() -> SearchIndexBackend | None:
+    "Get the search index ; <None> means the index is disabled."
+    path = settings.SEARCH_INDEX_BACKEND
+
+    return _build_backend(path) if path else None
+
+
+# Signal handlers --------------------------------------------------------------
+
+@receiver(signals.post_save, dispatch_uid='creme_core-update_search_index_save')
+def _update_index_on_save(sender, instance, created, **kwargs):
+    index = get_search_index()
+
+    if index is not None:
+        if isinstance(instance, CremeEntity):
+            index.update([instance])
+        elif isinstance(instance, CustomFieldValue):
+            index.update_custom_value(instance)
+
+        # NB: a new instance cannot be referenced yet ; the historical models
+        #     used by the migrations are ignored.
+        if not created and sender._meta.apps is apps:
+            index.update_related(instance)
+
+
+@receiver(signals.post_delete, dispatch_uid='creme_core-update_search_index_delete')
+def _update_index_on_delete(sender, instance, **kwargs):
+    if isinstance(instance, CustomFieldValue):
+        index = get_search_index()
+
+        if index is not None:
+            index.update_custom_value(instance, deleted=True)
+
+
+@receiver(signals.m2m_changed, dispatch_uid='creme_core-update_search_index_m2m')
+def _update_index_on_m2m(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        index = get_search_index()
+
+        if index is not None:
+            if isinstance(instance, CremeEntity):
+                index.update([instance])
+            elif isinstance(instance, CustomFieldMultiEnum):
+                index.update_custom_value(instance)
@@ -25,11 +25,16 @@ from __future__ import annotations
 import enum
 import logging
 import re
-from collections.abc import Iterable, Iterator
+from collections import defaultdict
+from collections.abc import Hashable, Iterable, Iterator
+from time import perf_counter_ns
 from typing import TYPE_CHECKING
+from uuid import UUID
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Model, QuerySet, signals
+from django.core.cache import BaseCache, caches
+from django.db.models import Model, signals
 from django.dispatch import receiver
 from django.utils.html import format_html, format_html_join
 from django.utils.translation import gettext as _
@@ -54,7 +59,7 @@ if TYPE_CHECKING:
     from django.forms import Field as FormField
 
     from creme.creme_core.forms.workflows import BaseWorkflowActionForm
-    from creme.creme_core.models import CremeUser
+    from creme.creme_core.models import CremeUser, Workflow
 
 
 logger = logging.getLogger(__name__)
@@ -102,6 +107,14 @@ class WorkflowEvent:
         """Is this event preventing another event to be inserted in the same queue."""
         return False
 
+    @property
+    def index_key(self) -> Hashable | None:
+        """Key used to retrieve the Workflows which can be triggered by this
+        event (see WorkflowIndex & WorkflowTrigger.index_key).
+        <None> means that all the Workflows must be inspected.
+        """
+        return None
+
 
 class _EntityEvent(WorkflowEvent):
     """Event representing the creation of a CremeEntity instance."""
@@ -118,6 +131,10 @@ class _EntityEvent(WorkflowEvent):
     def entity(self) -> CremeEntity:
         return self._entity
 
+    @property
+    def index_key(self):
+        return self._entity.entity_type_id
+
 
 class EntityCreated(_EntityEvent):
     """Event representing the creation of a CremeEntity instance."""
@@ -147,6 +164,10 @@ class PropertyAdded(WorkflowEvent):
     def creme_property(self) -> CremeProperty:
         return self._property
 
+    @property
+    def index_key(self):
+        return self._property.type.uuid
+
 
 class RelationAdded(WorkflowEvent):
     """Event representing the creation of a Relation instance."""
@@ -163,6 +184,10 @@ class RelationAdded(WorkflowEvent):
     def relation(self) -> Relation:
         return self._relation
 
+    @property
+    def index_key(self):
+        return self._relation.type_id
+
 
 class WorkflowEventQueue:
     """Queue containing instances of WorkflowEvent.
@@ -233,6 +258,16 @@ class WorkflowTrigger:
         """
         return self._activate(event) if isinstance(event, self.event_class) else None
 
+    @property
+    def index_key(self) -> Hashable | None:
+        """Key used to index the Workflow in a WorkflowIndex; it must be equal
+        to the key of the events which can activate the trigger (see
+        WorkflowEvent.index_key).
+        <None> means that the trigger is inspected for all the events of its
+        class (it's the default behaviour).
+        """
+        return None
+
     @classmethod
     def config_formfield(cls, model: type[CremeEntity]) -> FormField:
         """Returns a form field which builds an instance of this trigger class.
@@ -959,6 +994,178 @@ workflow_registry = WorkflowRegistry()
 
 
 # Engine -----------------------------------------------------------------------
+class WorkflowIndex:
+    """Index of Workflows by the events which can trigger them.
+
+    The triggers give a key (see WorkflowTrigger.index_key), like the ID of a
+    ContentType or of a RelationType, & so the Workflows which can be triggered
+    by an event are retrieved without inspecting all the Workflows (the event
+    gives its own key, see WorkflowEvent.index_key).
+    The triggers without key are inspected for all the events of their class.
+
+    The instances are picklable; so an index can be shared between the requests
+    (see 'creme_core.models.workflow.WorkflowManager.get_index()').
+    """
+    _UNKNOWN = object()
+
+    def __init__(self, workflows: Iterable[Workflow]):
+        """Constructor.
+        @param workflows: Instances of 'creme_core.models.Workflow' (generally
+               the enabled ones). The order is kept by the method 'candidates()'.
+        """
+        self._workflows = workflows = [*workflows]
+
+        # NB: values are lists of tuples (position, workflow)
+        by_event_class = defaultdict(list)
+        indexed = defaultdict(list)
+        not_indexed = defaultdict(list)
+
+        for position, workflow in enumerate(workflows):
+            trigger = workflow.trigger
+            event_class = trigger.event_class
+            key = trigger.index_key
+            entry = (position, workflow)
+
+            by_event_class[event_class].append(entry)
+
+            if key is None:
+                not_indexed[event_class].append(entry)
+            else:
+                indexed[(event_class, key)].append(entry)
+
+        self._by_event_class = dict(by_event_class)
+        self._indexed = dict(indexed)
+        self._not_indexed = dict(not_indexed)
+        self._indexed_classes = {event_class for event_class, __ in indexed}
+
+    def __iter__(self) -> Iterator[Workflow]:
+        return iter(self._workflows)
+
+    def __len__(self):
+        return len(self._workflows)
+
+    def candidates(self, event: WorkflowEvent) -> list[Workflow]:
+        """Get the Workflows which can be triggered by an event.
+        Notice that the triggers of these Workflows must still be activated
+        (see WorkflowTrigger.activate()), because the index does not perform
+        all the checking (like the model of the related entities).
+        @return: A list of Workflows, in the order given to the constructor.
+        """
+        found = []
+        key = self._UNKNOWN
+
+        for event_class in type(event).__mro__:
+            entries = self._by_event_class.get(event_class)
+            if not entries:
+                continue
+
+            if event_class in self._indexed_classes:
+                # NB: the key is computed lazily, because it can perform a query
+                if key is self._UNKNOWN:
+                    key = event.index_key
+
+                if key is not None:
+                    found.extend(self._not_indexed.get(event_class, ()))
+                    found.extend(self._indexed.get((event_class, key), ()))
+                    continue
+
+            found.extend(entries)
+
+        found.sort(key=lambda entry: entry[0])
+
+        return [workflow for __, workflow in found]
+
+
+class WorkflowStats:
+    """Counters about the executions of the Workflows, which can be displayed
+    to the administrators:
+        - "triggered": number of activations of the trigger.
+        - "executed": number of executions of the actions (i.e. the conditions
+          were filled).
+        - "duration": total time (in microseconds) spent in the conditions &
+          the actions.
+
+    The counters are stored in the Django's cache which alias is given by the
+    setting 'WORKFLOW_STATS_CACHE_ALIAS' (the counters are disabled if the
+    alias is <None>). They are shared by the processes if the backend is shared
+    (like Redis).
+    """
+    counters = ('triggered', 'executed', 'duration')
+
+    _key_fmt = 'creme_core-workflow_stats-{uuid}-{counter}'.format
+
+    @property
+    def backend(self) -> BaseCache | None:
+        "Get the Django's cache; <None> means that the counters are disabled."
+        alias = settings.WORKFLOW_STATS_CACHE_ALIAS
+
+        return None if alias is None else caches[alias]
+
+    def add(self, data: dict[UUID, dict[str, int]]) -> None:
+        """Increment some counters.
+        @param data: Dictionary with Workflows' UUIDs as keys, & dictionaries
+               {counter_name: increment} as values.
+        """
+        backend = self.backend
+        if backend is None:
+            return
+
+        key_fmt = self._key_fmt
+
+        for wf_uuid, counters in data.items():
+            for counter, value in counters.items():
+                if not value:
+                    continue
+
+                key = key_fmt(uuid=wf_uuid, counter=counter)
+
+                try:
+                    backend.incr(key, value)
+                except ValueError:  # The key does not exist (yet, or anymore)
+                    if not backend.add(key, value, timeout=None):
+                        # Another process has created the key in the meantime
+                        backend.incr(key, value)
+
+    def get(self, workflows: Iterable[Workflow]) -> dict[UUID, dict[str, int]]:
+        """Retrieve the counters of some Workflows.
+        @return: A dictionary with Workflows' UUIDs as keys, & dictionaries
+                 {counter_name: value} as values; the dictionary is empty if
+                 the counters are disabled.
+        """
+        backend = self.backend
+        if backend is None:
+            return {}
+
+        key_fmt = self._key_fmt
+        counters = self.counters
+        keys = {
+            key_fmt(uuid=wf.uuid, counter=counter): (wf.uuid, counter)
+            for wf in workflows
+            for counter in counters
+        }
+        stats = {wf_uuid: dict.fromkeys(counters, 0) for wf_uuid, __ in keys.values()}
+
+        for key, value in backend.get_many(keys.keys()).items():
+            wf_uuid, counter = keys[key]
+            stats[wf_uuid][counter] = value
+
+        return stats
+
+    def reset(self, workflows: Iterable[Workflow]) -> None:
+        "Reset the counters of some Workflows."
+        backend = self.backend
+        if backend is not None:
+            key_fmt = self._key_fmt
+            backend.delete_many([
+                key_fmt(uuid=wf.uuid, counter=counter)
+                for wf in workflows
+                for counter in self.counters
+            ])
+
+
+workflow_stats = WorkflowStats()
+
+
 class WorkflowEngine:
     """Class which runs the configured Workflows.
 
@@ -1021,10 +1228,11 @@ class WorkflowEngine:
                 logger.debug('WorkflowEngine: inspecting %s events', len(events))
 
                 engine._is_executing_actions = True
-                workflows = engine._workflows
+                index = engine.index
+                stats = defaultdict(lambda: dict.fromkeys(workflow_stats.counters, 0))
 
                 for event in events:
-                    for workflow in workflows:
+                    for workflow in index.candidates(event):
                         trigger = workflow.trigger
                         ctxt = trigger.activate(event)
 
@@ -1034,6 +1242,9 @@ class WorkflowEngine:
                                 'inspecting its conditions...',
                                 trigger, workflow.id,
                             )
+                            start = perf_counter_ns()
+                            wf_stats = stats[workflow.uuid]
+                            wf_stats['triggered'] += 1
 
                             if workflow.conditions.accept(
                                 user=self._user, context=ctxt,
@@ -1045,6 +1256,7 @@ class WorkflowEngine:
                                     'WorkflowEngine: conditions are filled, executing %s actions',
                                     len(actions),
                                 )
+                                wf_stats['executed'] += 1
 
                                 for action in actions:
                                     logger.debug('WorkflowEngine: execute %s', action)
@@ -1054,6 +1266,10 @@ class WorkflowEngine:
                                     except Exception:
                                         logger.exception('Error in the Workflow engine')
 
+                            wf_stats['duration'] += (perf_counter_ns() - start) // 1000
+
+                workflow_stats.add(stats)
+
                 # NB: we ensure all the events emitted by the actions are dropped
                 #     So they won't trigger the engine during a potential other call
                 #     And so the engine ca be safely run several times
@@ -1067,7 +1283,7 @@ class WorkflowEngine:
     _is_executing_actions = False
 
     _queue: WorkflowEventQueue
-    _workflows: QuerySet  # QuerySet[Workflow]
+    _index: WorkflowIndex | None = None
 
     @classmethod
     def get_current(cls) -> WorkflowEngine:
@@ -1079,11 +1295,8 @@ class WorkflowEngine:
         cache_key = cls.cache_key
         wf = cache.get(cache_key)
         if wf is None:
-            from ..models import Workflow
-
             wf = cache[cache_key] = cls()
             wf._queue = WorkflowEventQueue()
-            wf._workflows = Workflow.objects.filter(enabled=True)
 
         return wf
 
@@ -1095,6 +1308,20 @@ class WorkflowEngine:
         self._queue.append(event)
         return self
 
+    @property
+    def index(self) -> WorkflowIndex:
+        """Index of the enabled Workflows.
+        It's retrieved the first time some events are managed, & then kept
+        for the lifetime of the engine (i.e. the request).
+        """
+        index = self._index
+        if index is None:
+            from ..models import Workflow
+
+            self._index = index = Workflow.objects.get_index()
+
+        return index
+
     @property
     def is_executing_actions(self):
         return self._is_executing_actions
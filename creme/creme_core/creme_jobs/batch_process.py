@@ -17,30 +17,61 @@
 ################################################################################
 
 import logging
-from functools import partial
+import multiprocessing
+from itertools import islice
 
+import django
+from django.conf import settings
 # TODO: move in function to do lazy loading ?
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import close_old_connections
+from django.db.models import signals
 from django.db.transaction import atomic
+from django.utils.timezone import now
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext
 
 from ..core.batch_process import BatchAction
+from ..core.entity_filter.materialization import grouped_updates
+from ..core.history import buffer_history
 from ..core.paginator import FlowPaginator
 from ..core.workflow import WorkflowEngine
-from ..models import EntityCredentials, EntityFilter, EntityJobResult
+from ..models import (
+    CremeEntity,
+    EntityCredentials,
+    EntityFilter,
+    EntityJobResult,
+    Job,
+)
 from ..models.utils import model_verbose_name
 from .base import JobProgress, JobType
 
 logger = logging.getLogger(__name__)
 
 
+def _process_range(job_id: int, first_id: int, last_id: int) -> None:
+    """Process the entities of a batch process which IDs are in a range.
+    It's executed by the worker processes (Django is already set up).
+    """
+    close_old_connections()
+
+    try:
+        batch_process_type._process_entities(
+            Job.objects.get(id=job_id), id_range=(first_id, last_id),
+        )
+    finally:
+        close_old_connections()
+
+
 class _BatchProcessType(JobType):
     id = JobType.generate_id('creme_core', 'batch_process')
     verbose_name = _('Batch process')
 
+    # Number of entities which are locked, modified & saved in the same transaction.
+    chunk_size = 1024
+
     def _get_actions(self, model, job_data):
         for kwargs in job_data['actions']:
             yield BatchAction(model, **kwargs)
@@ -78,15 +109,140 @@ class _BatchProcessType(JobType):
 
         return humanized
 
-    def _execute(self, job):
+    def _get_entities(self, job):
+        "Get the queryset of the entities to process."
         job_data = job.data
-        model = self._get_model(job_data)
-        entities = model.objects.filter(is_deleted=False)
+        entities = self._get_model(job_data).objects.filter(is_deleted=False)
 
         efilter = self._get_efilter(job_data)
         if efilter is not None:
             entities = efilter.filter(entities)
 
+        return EntityCredentials.filter(
+            job.user, entities, EntityCredentials.CHANGE,
+        ).order_by('id')
+
+    def _get_id_ranges(self, job, workers: int) -> list[tuple[int, int]]:
+        """Split the IDs of the entities to process in contiguous & disjoint
+        ranges (one per worker process).
+        @return: List of tuples (first_id, last_id).
+        """
+        already_processed = {
+            *EntityJobResult.objects.filter(job=job).values_list('entity_id', flat=True)
+        }
+        ids = [
+            entity_id
+            for entity_id in self._get_entities(job).values_list('id', flat=True)
+            if entity_id not in already_processed
+        ]
+        if not ids:
+            return []
+
+        # NB: a worker processes at least a full chunk.
+        range_size = max(-(-len(ids) // workers), self.chunk_size)
+        it = iter(ids)
+        ranges = []
+
+        while id_range := [*islice(it, range_size)]:
+            ranges.append((id_range[0], id_range[-1]))
+
+        return ranges
+
+    def _use_bulk_update(self, model) -> bool:
+        """Can the entities be saved with a bulk UPDATE query?
+        It's possible only if the model (& its parents) do not override the
+        method 'save()' (i.e. there is no custom saving logic which would be
+        ignored).
+        """
+        for cls in model.__mro__:
+            if cls is CremeEntity:
+                return True
+
+            if 'save' in cls.__dict__:
+                return False
+
+        return False
+
+    def _bulk_save(self, model, entities, field_names) -> None:
+        """Save some modified entities with a bulk UPDATE query.
+        The signals 'pre_save' & 'post_save' are sent like with a regular
+        save() (so the history & the workflows work as expected) ; the
+        materialized filters are updated once for all the entities.
+        """
+        modified = now()
+        search_max_length = CremeEntity._meta.get_field('header_filter_search_field').max_length
+        update_fields = {*field_names, 'modified', 'header_filter_search_field'}
+
+        for entity in entities:
+            signals.pre_save.send(sender=model, instance=entity, raw=False, update_fields=None)
+            entity.modified = modified
+            entity.header_filter_search_field = (
+                entity._search_field_value()[:search_max_length]
+            )
+
+        with grouped_updates() as materializer:
+            model.objects.bulk_update(entities, fields=update_fields)
+
+            if materializer is not None:
+                materializer.update(entities)
+
+            for entity in entities:
+                signals.post_save.send(
+                    sender=model, instance=entity, created=False, raw=False, update_fields=None,
+                )
+
+    def _process_chunk(self, job, model, actions, entity_ids) -> None:
+        """Lock, modify & save the entities of a chunk, in a single transaction."""
+        wf_engine = WorkflowEngine.get_current()
+        use_bulk = self._use_bulk_update(model)
+        to_update = []
+        results = []
+
+        with atomic(), wf_engine.run(user=None):
+            for entity in model.objects.select_for_update().filter(id__in=entity_ids):
+                # NB: all the actions are applied (no short-circuit)
+                if not any([action(entity) for action in actions]):
+                    continue
+
+                try:
+                    entity.full_clean()
+                except ValidationError as e:
+                    results.append(EntityJobResult(
+                        job=job,
+                        real_entity=entity,
+                        messages=self._humanize_validation_error(entity, e),
+                    ))
+                    continue
+
+                if use_bulk:
+                    to_update.append(entity)
+                else:
+                    entity.save()
+
+                results.append(EntityJobResult(job=job, real_entity=entity))
+
+            if to_update:
+                self._bulk_save(
+                    model=model,
+                    entities=to_update,
+                    field_names=[action.field_name for action in actions],
+                )
+
+            EntityJobResult.objects.bulk_create(results)
+
+    @buffer_history()
+    def _process_entities(self, job, id_range: tuple[int, int] | None = None) -> None:
+        """Process the entities (not already processed) of the job.
+        @param id_range: Tuple (first_id, last_id) to process only the entities
+               which IDs are in this range; <None> means all the entities.
+        """
+        job_data = job.data
+        model = self._get_model(job_data)
+        entities = self._get_entities(job)
+
+        if id_range is not None:
+            entities = entities.filter(id__gte=id_range[0], id__lte=id_range[1])
+
         already_processed = frozenset(
             EntityJobResult.objects
                            .filter(job=job)
@@ -95,42 +251,49 @@ class _BatchProcessType(JobType):
         if already_processed:
             logger.info('BatchProcess: resuming job %s', job.id)
 
-        entities = EntityCredentials.filter(job.user, entities, EntityCredentials.CHANGE)
         paginator = FlowPaginator(
-            queryset=entities.order_by('id'), key='id', per_page=1024,
+            queryset=entities.only('id'), key='id', per_page=self.chunk_size,
         )
         actions = [*self._get_actions(model, job_data)]
-        create_result = partial(EntityJobResult.objects.create, job=job)
-        wf_engine = WorkflowEngine.get_current()
 
         for entities_page in paginator.pages():
-            for entity in entities_page.object_list:
-                if entity.id in already_processed:
-                    continue
+            entity_ids = [
+                entity.id
+                for entity in entities_page.object_list
+                if entity.id not in already_processed
+            ]
+
+            if entity_ids:
+                self._process_chunk(
+                    job=job, model=model, actions=actions, entity_ids=entity_ids,
+                )
 
-                changed = False
-
-                with atomic(), wf_engine.run(user=None):
-                    try:
-                        final_entity = model.objects.select_for_update().get(id=entity.id)
-                    except model.DoesNotExist:
-                        continue
-
-                    for action in actions:
-                        if action(final_entity):
-                            changed = True
-
-                    if changed:
-                        try:
-                            final_entity.full_clean()
-                        except ValidationError as e:
-                            create_result(
-                                real_entity=final_entity,
-                                messages=self._humanize_validation_error(final_entity, e)
-                            )
-                        else:
-                            final_entity.save()
-                            create_result(real_entity=final_entity)
+    def _execute(self, job):
+        workers = settings.BATCH_PROCESS_WORKERS
+
+        if workers > 1:
+            id_ranges = self._get_id_ranges(job, workers=workers)
+
+            if len(id_ranges) > 1:
+                logger.info(
+                    'BatchProcess: job %s is processed by %s workers',
+                    job.id, len(id_ranges),
+                )
+
+                # NB: the processes are spawned (not forked) so the workers do
+                #     not share the DB connection of the current process
+                #     (see creme_core.core.job.pool.JobWorkerPool).
+                with multiprocessing.get_context('spawn').Pool(
+                    processes=len(id_ranges), initializer=django.setup,
+                ) as pool:
+                    pool.starmap(
+                        _process_range,
+                        [(job.id, first_id, last_id) for first_id, last_id in id_ranges],
+                    )
+
+                return
+
+        self._process_entities(job)
 
     def progress(self, job):
         count = EntityJobResult.objects.filter(job=job).count()
@@ -0,0 +1,85 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+import logging
+
+from django.contrib.contenttypes.models import ContentType
+from django.http import HttpRequest, QueryDict
+from django.utils.translation import gettext
+from django.utils.translation import gettext_lazy as _
+
+from ..constants import UUID_CHANNEL_JOBS
+from ..models import Notification
+from ..models.utils import model_verbose_name
+from ..notification import MassExportDoneContent
+from .base import JobType
+
+logger = logging.getLogger(__name__)
+
+
+class _MassExportType(JobType):
+    """Export the entities of a list-view in a file (see the view
+    'creme_core.views.mass_export.MassExport' which creates the job when there
+    are lots of entities).
+    """
+    id           = JobType.generate_id('creme_core', 'mass_export')
+    verbose_name = _('Mass export')
+
+    def _build_GET(self, job_data):
+        return QueryDict(job_data['GET'].encode('utf8'))
+
+    def _get_ctype(self, job_data):
+        return ContentType.objects.get_for_id(job_data['ctype'])
+
+    def _build_view(self, job):
+        from ..views.mass_export import MassExport
+
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = self._build_GET(job.data)
+        request.user = job.user
+
+        view = MassExport()
+        view.setup(request)
+
+        return view
+
+    def _execute(self, job):
+        fileref = self._build_view(job).export_to_fileref()
+
+        Notification.objects.send(
+            channel=UUID_CHANNEL_JOBS,
+            users=[job.user],
+            content=MassExportDoneContent(instance=fileref),
+        )
+
+    def get_description(self, job):
+        try:
+            desc = [
+                gettext('Export «{model}»').format(
+                    model=model_verbose_name(self._get_ctype(job.data).model_class()),
+                ),
+            ]
+        except Exception:
+            logger.exception('Error in _MassExportType.get_description')
+            desc = ['?']
+
+        return desc
+
+
+mass_export_type = _MassExportType()
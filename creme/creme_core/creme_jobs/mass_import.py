@@ -20,6 +20,8 @@ import logging
 
 from django.contrib.contenttypes.models import ContentType
 from django.http import QueryDict
+from django.utils.formats import number_format
+from django.utils.timezone import now
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext
@@ -27,6 +29,7 @@ from django.utils.translation import ngettext
 from creme.documents import get_document_model
 
 from ..constants import UUID_CHANNEL_JOBS
+from ..core.history import buffer_history
 from ..forms.mass_import import form_factory, get_header
 from ..models import MassImportJobResult, Notification
 from ..models.utils import model_verbose_name
@@ -64,7 +67,8 @@ class _MassImportType(JobType):
                 gettext('Invalid data [{}]').format(form.errors.as_text())
             )
 
-        form.process(job)
+        with buffer_history():
+            form.process(job)
 
         Notification.objects.send(
             channel=UUID_CHANNEL_JOBS,
@@ -74,6 +78,25 @@ class _MassImportType(JobType):
 
     def progress(self, job):
         count = MassImportJobResult.objects.filter(job=job).count()
+
+        # NB: the throughput is computed since the beginning of the current run
+        #     (so it's overestimated when the job has been resumed).
+        if count and job.last_run and not job.is_finished:
+            elapsed = (now() - job.last_run).total_seconds()
+
+            if elapsed > 0:
+                return JobProgress(
+                    percentage=None,
+                    label=ngettext(
+                        '{count} line has been processed ({throughput} lines/s).',
+                        '{count} lines have been processed ({throughput} lines/s).',
+                        count
+                    ).format(
+                        count=count,
+                        throughput=number_format(count / elapsed, decimal_pos=1),
+                    ),
+                )
+
         return JobProgress(
             percentage=None,
             label=ngettext(
@@ -17,10 +17,11 @@
 ################################################################################
 
 import logging
+from collections.abc import Callable
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
-from django.db.models import F, ProtectedError
+from django.db.models import F, ProtectedError, RestrictedError
 from django.db.transaction import atomic
 from django.db.utils import NotSupportedError
 from django.utils.translation import gettext as _
@@ -28,8 +29,9 @@ from django.utils.translation import gettext_lazy, ngettext
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 
-from ..core.deletion import entity_deletor_registry
+from ..core.deletion import BulkEntityDeletion, entity_deletor_registry
 from ..core.exceptions import ConflictError
+from ..core.history import buffer_history
 from ..core.paginator import FlowPaginator
 from ..models import CremeEntity, EntityJobResult, TrashCleaningCommand
 from .base import JobProgress, JobType
@@ -43,6 +45,7 @@ class _TrashCleanerType(JobType):
 
     deletor_registry = entity_deletor_registry
 
+    @buffer_history()
     def _execute(self, job):
         # NB 1: we try to delete the remaining entities (which could not be deleted
         #       because of relationships) when there are errors, while the previous
@@ -113,13 +116,32 @@ class _TrashCleanerType(JobType):
                     per_page=256,
                 )
 
+                deletor = self.deletor = self.deletor_registry.get(model=entity_class)
+                bulk_deletion = BulkEntityDeletion(
+                    model=entity_class, user=user, deletor=deletor,
+                ) if deletor is not None and deletor.allows_bulk_deletion(entity_class) else None
+
                 for entities_page in paginator.pages():
                     with atomic():
                         # NB (#60): Move 'SELECT FOR UPDATE' here for now (see above).
-                        for entity in entity_class.objects.filter(
-                            pk__in=entities_page.object_list
-                        ).select_for_update():
-                            deletor = self.deletor = self.deletor_registry.get(model=type(entity))
+                        entities = [
+                            *entity_class.objects.filter(
+                                pk__in=entities_page.object_list
+                            ).select_for_update(),
+                        ]
+
+                        if bulk_deletion is not None:
+                            deleted_count, entities = self._delete_in_bulk(
+                                bulk_deletion=bulk_deletion,
+                                entities=entities,
+                                create_error=create_error,
+                            )
+
+                            if deleted_count:
+                                progress = True
+                                cmd_qs.update(deleted_count=F('deleted_count') + deleted_count)
+
+                        for entity in entities:
                             if deletor is None:
                                 create_error(
                                     entity,
@@ -155,9 +177,42 @@ class _TrashCleanerType(JobType):
                                 progress = True
                                 cmd_qs.update(deleted_count=F('deleted_count') + 1)
 
+                if bulk_deletion is not None:
+                    bulk_deletion.write_history()
+
             if not errors or not progress:
                 break
 
+    @staticmethod
+    def _delete_in_bulk(*,
+                        bulk_deletion: BulkEntityDeletion,
+                        entities: list[CremeEntity],
+                        create_error: Callable[[CremeEntity, str], None],
+                        ) -> tuple[int, list[CremeEntity]]:
+        """Delete a page of entities with grouped queries.
+        @return: A tuple (number of deleted entities, entities which must be
+                 deleted one by one). The second element is not empty when
+                 the DB refused the deletion in bulk.
+        """
+        errors = bulk_deletion.check(entities)
+        for entity in entities:
+            error = errors.get(entity.id)
+            if error is not None:
+                create_error(entity, error)
+
+        deletable = [entity for entity in entities if entity.id not in errors]
+
+        try:
+            bulk_deletion.perform(deletable)
+        except (ProtectedError, RestrictedError):
+            logger.info(
+                'The bulk deletion of %s failed; the entities are deleted one by one.',
+                bulk_deletion.model,
+            )
+            return 0, deletable
+
+        return len(deletable), []
+
     def progress(self, job):
         count = TrashCleaningCommand.objects.get(job=job).deleted_count
 
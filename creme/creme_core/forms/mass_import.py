@@ -19,8 +19,10 @@
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
+from copy import copy
 from functools import partial
-from itertools import zip_longest
+from itertools import islice, zip_longest
 from os.path import splitext
 from typing import TYPE_CHECKING
 
@@ -29,7 +31,13 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.validators import EMPTY_VALUES
 from django.db.models import BooleanField as ModelBooleanField
-from django.db.models import ManyToManyField, Model, prefetch_related_objects
+from django.db.models import (
+    F,
+    ManyToManyField,
+    Model,
+    QuerySet,
+    prefetch_related_objects,
+)
 from django.db.transaction import atomic
 from django.forms.models import modelform_factory
 from django.forms.widgets import HiddenInput, Widget
@@ -74,7 +82,15 @@ from .widgets import (
 )
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Optional, Sequence, Tuple
+    from typing import (
+        Any,
+        Callable,
+        Iterable,
+        Iterator,
+        Optional,
+        Sequence,
+        Tuple,
+    )
 
     Line = Sequence[str]
     ExtractedTuple = Tuple[Any, Optional[str]]
@@ -167,10 +183,85 @@ class UploadForm(CremeForm):
 
 # Base Extractors (+ widget) ---------------------------------------------------
 
+class LookupCache:
+    """Cache for the instances referenced by a chunk of lines (see
+    BaseExtractor.prefetch()), which are retrieved with only one query.
+
+    The values which could match several instances are not cached, so the
+    extractors must fall back to their regular query when a value is not found
+    in the cache (the result is the same as without cache).
+    """
+    key_alias = 'creme_import_key'
+
+    def __init__(self):
+        self._instances: dict[str, Model] = {}
+
+    def clear(self) -> None:
+        self._instances.clear()
+
+    @staticmethod
+    def column_values(lines: Iterable[Line], column_index: int) -> Iterator[str]:
+        """Get the values of a column (index starting at 1) for some lines.
+        The lines which are too short are ignored ; the extractors get the
+        regular error for them in extract_value().
+        """
+        return (line[column_index - 1] for line in lines if column_index <= len(line))
+
+    def fill(self, queryset: QuerySet, field_name: str, values: Iterable[str]) -> None:
+        """Retrieve the instances which field is equal to one of the values.
+        @param queryset: Instances to search.
+        @param field_name: Name of the field to search (can be a path like "foo__bar").
+        @param values: Strings (the values of a column).
+        """
+        self.clear()
+
+        values = {value for value in values if value}
+        if not values:
+            return
+
+        key_alias = self.key_alias
+        # NB: some DB collations are case-insensitive; the values which differ
+        #     only by their case are ignored to avoid an ambiguity.
+        groups = defaultdict(list)
+
+        try:
+            queryset = queryset.filter(
+                **{f'{field_name}__in': values}
+            ).annotate(**{key_alias: F(field_name)})
+
+            for instance in (queryset if queryset.ordered else queryset.order_by('pk')):
+                groups[str(getattr(instance, key_alias)).casefold()].append(instance)
+        except Exception as e:
+            # E.g. a value which is not a valid integer for an IntegerField
+            logger.debug('LookupCache.fill(): the instances are not cached (%s)', e)
+            return
+
+        self._instances = {
+            str(getattr(group[0], key_alias)): group[0]
+            for group in groups.values()
+            if len(group) == 1
+        }
+
+    def get(self, value: str) -> Model | None:
+        """Get the instance corresponding to a value.
+        @return: A copy of the cached instance (the lines are independent),
+                 or None if the value is not cached.
+        """
+        instance = self._instances.get(value)
+
+        return None if instance is None else copy(instance)
+
+
 class BaseExtractor:
     def extract_value(self, line: Line, user) -> ExtractedTuple:
         raise NotImplementedError
 
+    def prefetch(self, lines: Sequence[Line], user) -> None:
+        """Retrieve the instances referenced by a chunk of lines, in order to
+        avoid a query per line in extract_value(). Overload me.
+        """
+        pass
+
 
 class SingleColumnExtractor(BaseExtractor):
     def __init__(self, column_index: int):
@@ -206,6 +297,7 @@ class RegularFieldExtractor(SingleColumnExtractor):
         self._fk_model: type[Model] | None = None
         self._m2m: bool | None = None
         self._fk_form: type[CremeModelForm] | None = None
+        self._lookup_cache = LookupCache()
 
     def set_subfield_search(self,
                             subfield_search: str,
@@ -218,6 +310,16 @@ class RegularFieldExtractor(SingleColumnExtractor):
         self._m2m = multiple
         self._fk_form = creation_form_class
 
+    def prefetch(self, lines, user):
+        index = self._column_index
+
+        if index and self._subfield_search and not self._m2m:
+            self._lookup_cache.fill(
+                queryset=self._fk_model.objects.all(),
+                field_name=self._subfield_search,
+                values=LookupCache.column_values(lines, index),
+            )
+
     def extract_value(self, line, user) -> ExtractedTuple:
         value = self._default_value
         err_msg = None
@@ -235,7 +337,9 @@ class RegularFieldExtractor(SingleColumnExtractor):
                     )
 
                     try:
-                        value = retriever(**data)
+                        value = (
+                            None if self._m2m else self._lookup_cache.get(line_value)
+                        ) or retriever(**data)
                     except Exception as e:
                         fk_form = self._fk_form
 
@@ -552,6 +656,18 @@ class EntityExtractor(BaseExtractor):
     def __init__(self, extraction_cmds: list[EntityExtractionCommand]):
         "@params extraction_cmds: List of EntityExtractionCommands."
         self._commands = extraction_cmds
+        self._lookup_caches = defaultdict(LookupCache)
+
+    def prefetch(self, lines, user):
+        for command in self._commands:
+            index = command.column_index
+
+            if index:
+                self._lookup_caches[command.field_name, command.model].fill(
+                    queryset=command.model.objects.all(),
+                    field_name=command.field_name,
+                    values=LookupCache.column_values(lines, index),
+                )
 
     def _extract_entity(self, line: Line, user, command: EntityExtractionCommand):
         index = command.column_index
@@ -570,7 +686,10 @@ class EntityExtractor(BaseExtractor):
         kwargs = {command.field_name: value}
 
         try:
-            extracted = model.objects.get(**kwargs)
+            extracted = (
+                self._lookup_caches[command.field_name, model].get(value)
+                or model.objects.get(**kwargs)
+            )
         except Exception as e:
             if command.create:
                 created = model(user=user, **kwargs)
@@ -779,12 +898,25 @@ class RelationExtractor(SingleColumnExtractor):
         self._related_form = modelform_factory(
             related_model, fields='__all__',
         ) if create_if_unfound else None
+        self._lookup_cache = LookupCache()
+        self._lookup_user_id = None
 
     related_model = property(lambda self: self._related_model)
 
     def create_if_unfound(self):
         return self._related_form is not None
 
+    def prefetch(self, lines, user):
+        index = self._column_index
+
+        # NB: the credentials depend on the user
+        self._lookup_user_id = user.id
+        self._lookup_cache.fill(
+            queryset=EntityCredentials.filter(user, self._related_model.objects.all()),
+            field_name=self._subfield_search,
+            values=LookupCache.column_values(lines, index),
+        )
+
     # TODO: link credentials
     # TODO: constraint on properties for relationtypes (wait for cache in RelationType)
     def extract_value(self, line, user):
@@ -797,7 +929,11 @@ class RelationExtractor(SingleColumnExtractor):
             model = self._related_model
 
             try:
-                object_entity = EntityCredentials.filter(
+                object_entity = (
+                    self._lookup_cache.get(value)
+                    if user.id == self._lookup_user_id else
+                    None
+                ) or EntityCredentials.filter(
                     user, model.objects.filter(**data),
                 ).first()
             except Exception as e:
@@ -857,6 +993,10 @@ class MultiRelationsExtractor:
         for extractor in self._extractors:
             yield extractor.extract_value(line, user)
 
+    def prefetch(self, lines, user):
+        for extractor in self._extractors:
+            extractor.prefetch(lines, user)
+
     def __iter__(self):
         return iter(self._extractors)
 
@@ -1055,6 +1195,8 @@ class CustomFieldExtractor(SingleColumnExtractor):
 
         self._custom_field = custom_field
         self._create_if_unfound = create_if_unfound
+        # Cache for the enum choices {casefolded value: CustomFieldEnumValue.id}
+        self._enum_ids: dict[str, int] = {}
 
         match self._custom_field.field_type:
             case CustomField.ENUM:
@@ -1064,6 +1206,17 @@ class CustomFieldExtractor(SingleColumnExtractor):
             case _:
                 self._manage_enum = None
 
+    def prefetch(self, lines, user):
+        enum_ids = self._enum_ids
+        enum_ids.clear()
+
+        if self._manage_enum and self._column_index:
+            for enum_id, enum_value in CustomFieldEnumValue.objects.filter(
+                custom_field=self._custom_field,
+            ).order_by('id').values_list('id', 'value'):
+                # NB: like the query in extract_value() (i.e. "first()")
+                enum_ids.setdefault(enum_value.lower(), enum_id)
+
     def extract_value(self, line, user):
         value = self._default_value
         err_msg = None
@@ -1073,14 +1226,18 @@ class CustomFieldExtractor(SingleColumnExtractor):
 
             if line_value:
                 if self._manage_enum:
-                    enum_value = CustomFieldEnumValue.objects.filter(
-                        custom_field=self._custom_field,
-                        value__iexact=line_value,
-                    ).first()
-
-                    if enum_value is not None:
+                    enum_id = self._enum_ids.get(line_value.lower())
+                    if enum_id is None:
+                        enum_value = CustomFieldEnumValue.objects.filter(
+                            custom_field=self._custom_field,
+                            value__iexact=line_value,
+                        ).first()
+                        if enum_value is not None:
+                            enum_id = enum_value.id
+
+                    if enum_id is not None:
                         return (
-                            self._manage_enum(enum_value.id),
+                            self._manage_enum(enum_id),
                             err_msg
                         )
                     elif self._create_if_unfound:
@@ -1257,6 +1414,10 @@ class ImportForm(CremeModelForm):
     ]  # Overridden by factory
     header_dict: dict[str, int] = {}  # Idem
 
+    # The lines are read by chunks of this size ; the instances referenced by
+    # the lines of a chunk are retrieved with few queries (see _prefetch()).
+    lines_chunk_size = 256
+
     blocks = FieldBlockManager(
         {
             'id': 'general',
@@ -1332,6 +1493,20 @@ class ImportForm(CremeModelForm):
     def _pre_instance_save(self, instance, line):  # Overload me
         pass
 
+    def _prefetch(self, lines: Sequence[Line], user) -> None:
+        "Fill the caches of the extractors (see BaseExtractor.prefetch()) for a chunk of lines."
+        for value in self.cleaned_data.values():
+            if isinstance(value, (BaseExtractor, MultiRelationsExtractor)):
+                value.prefetch(lines=lines, user=user)
+
+    def _iter_chunks(self, lines: Iterator[Line]) -> Iterator[Line]:
+        "Read the lines by chunks & prefetch the instances referenced by each chunk."
+        user = self.user
+
+        while chunk := [*islice(lines, self.lines_chunk_size)]:
+            self._prefetch(chunk, user=user)
+            yield from chunk
+
     def process(self, job: Job):
         model_class = self._meta.model
         get_cleaned = self.cleaned_data.get
@@ -1385,7 +1560,7 @@ class ImportForm(CremeModelForm):
             def is_empty_value(s):
                 return s is None or isinstance(s, str) and not s.strip()
 
-            for i, line in enumerate(filter(None, lines), start=1):
+            for i, line in enumerate(self._iter_chunks(filter(None, lines)), start=1):
                 job_result = MassImportJobResult(job=job, line=line)
 
                 try:
@@ -1572,6 +1747,10 @@ class ImportForm4CremeEntity(ImportForm):
             perm=EntityCredentials.VIEW | EntityCredentials.CHANGE,
         )
 
+    def _prefetch(self, lines, user):
+        # NB: the values are extracted with the owner (see _post_instance_creation()).
+        super()._prefetch(lines=lines, user=self.cleaned_data['user'])
+
     def _post_instance_creation(self, instance, line, updated):
         cdata = self.cleaned_data
         user = instance.user
@@ -20,7 +20,7 @@ from __future__ import annotations
 
 import warnings
 # import warnings
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from functools import partial
 from os.path import splitext
 from typing import TYPE_CHECKING
@@ -51,6 +51,7 @@ from ..templatetags.creme_widgets import (
 )
 from ..utils import bool_as_html
 from ..utils.collections import ClassKeyedMap
+from ..utils.db import populate_related
 from ..utils.html import render_limited_list
 from ..utils.meta import FieldInfo
 from .view_tag import ViewTag
@@ -546,7 +547,6 @@ class FieldPrinterRegistry:
         def build_field_printer(self, field_info: FieldInfo) -> ReducedPrinter:
             base_field = field_info[0]
             base_name = base_field.name
-            HIDDEN_VALUE = settings.HIDDEN_VALUE
 
             if len(field_info) > 1:
                 base_model = base_field.remote_field.model
@@ -561,7 +561,7 @@ class FieldPrinterRegistry:
                                 return ''
 
                             if not user.has_perm_to_view(base_value):
-                                return HIDDEN_VALUE
+                                return settings.HIDDEN_VALUE
 
                             return sub_printer(base_value, user)
                     else:
@@ -575,20 +575,25 @@ class FieldPrinterRegistry:
                 else:
                     assert isinstance(base_field, models.ManyToManyField)
 
+                    # NB: get_m2m_values() uses the prefetched instances
+                    #     (see FieldPrinterRegistry.print_values()).
                     if issubclass(base_model, CremeEntity):
                         def sub_values(obj, user):
                             has_perm = user.has_perm_to_view
 
-                            for e in getattr(obj, base_name).filter(is_deleted=False):
+                            for e in obj.get_m2m_values(base_name):
+                                if e.is_deleted:
+                                    continue
+
                                 if not has_perm(e):
-                                    yield HIDDEN_VALUE
+                                    yield settings.HIDDEN_VALUE
                                 else:
                                     sub_value = sub_printer(e, user)
                                     if sub_value:  # NB: avoid empty string
                                         yield sub_value
                     else:
                         def sub_values(obj, user):
-                            for a in getattr(obj, base_name).all():
+                            for a in obj.get_m2m_values(base_name):
                                 sub_value = sub_printer(a, user)
                                 if sub_value:  # NB: avoid empty string
                                     yield sub_value
@@ -611,6 +616,10 @@ class FieldPrinterRegistry:
             return printer
 
     def __init__(self):
+        # Cache for the printers built by build_field_printer()
+        #  key: (model, field_name, tag) ; value: ReducedPrinter.
+        self._built_printers: dict[tuple[type[Model], str, ViewTag], ReducedPrinter] = {}
+
         html_printers = [
             (models.IntegerField,       print_integer_html),
 
@@ -800,6 +809,8 @@ class FieldPrinterRegistry:
         for tag in ViewTag.smart_generator(tags):
             self._printers[tag].register_model_field_type(type=type, printer=printer)
 
+        self._built_printers.clear()
+
         return self
 
     def register_model_field(self, *,
@@ -821,6 +832,8 @@ class FieldPrinterRegistry:
                 printer=printer,
             )
 
+        self._built_printers.clear()
+
         return self
 
     def register_choice_printer(self,
@@ -838,6 +851,8 @@ class FieldPrinterRegistry:
         for tag in ViewTag.smart_generator(tags):
             self._printers[tag].register_choice(printer)
 
+        self._built_printers.clear()
+
         return self
 
     def register_listview_css_class(self,
@@ -868,9 +883,19 @@ class FieldPrinterRegistry:
                             field_name: str,
                             tag: ViewTag = ViewTag.HTML_DETAIL,
                             ) -> ReducedPrinter:
-        return self._printers[tag].build_field_printer(
-            field_info=FieldInfo(model, field_name),
-        )
+        """Get a printer for a field (which can be a deep field like "user__username").
+        The printers are built once, & kept in a cache (which is cleared when
+        a printer is registered).
+        """
+        key = (model, field_name, tag)
+        printer = self._built_printers.get(key)
+
+        if printer is None:
+            self._built_printers[key] = printer = self._printers[tag].build_field_printer(
+                field_info=FieldInfo(model, field_name),
+            )
+
+        return printer
 
     def get_field_value(self, *,
                         instance: models.Model,
@@ -882,6 +907,45 @@ class FieldPrinterRegistry:
             model=instance.__class__, field_name=field_name, tag=tag,
         )(instance, user)
 
+    def print_values(self, *,
+                     instances: Sequence[models.Model],
+                     field_names: Sequence[str],
+                     user: CremeUser,
+                     tag: ViewTag = ViewTag.TEXT_PLAIN,
+                     ) -> list[list[str]]:
+        """Get the printed values of several fields for several instances.
+        The printers are built once, & the instances related by the
+        ForeignKeys/ManyToManyFields are retrieved with grouped queries
+        (see 'creme_core.utils.db.populate_related()').
+        @param instances: Instances of the same model.
+        @param field_names: Names of fields (deep fields are accepted,
+               like "user__username").
+        @return: A list (one item per instance) of lists of strings (one string
+                 per field, in the order of "field_names").
+        """
+        if not instances:
+            return []
+
+        model = type(instances[0])
+        printers = [
+            self.build_field_printer(model=model, field_name=field_name, tag=tag)
+            for field_name in field_names
+        ]
+
+        # NB: populate_related() only prefetches the first level of ManyToManyFields
+        related_names = {*field_names}
+        for field_name in field_names:
+            field_info = FieldInfo(model, field_name)
+            if len(field_info) > 1 and field_info[0].many_to_many:
+                related_names.add(field_info[0].name)
+
+        populate_related(instances, related_names)
+
+        return [
+            [printer(instance, user) for printer in printers]
+            for instance in instances
+        ]
+
     def printers_for_field_type(self,
                                 type: type[Field],
                                 tags: ViewTag | Iterable[ViewTag] | str,
@@ -730,6 +730,11 @@ class HTMLMassExportExplainer(HistoryLineExplainer):
     template_name = 'creme_core/history/html/mass-export.html'
 
 
+class HTMLMassDeletionExplainer(HistoryLineExplainer):
+    type_id = 'mass_deletion'
+    template_name = 'creme_core/history/html/mass-deletion.html'
+
+
 # ------------------------------------------------------------------------------
 class HistoryRegistry:
     """Registry for HistoryLineExplainers & FieldChangeExplainers.
@@ -851,4 +856,7 @@ html_history_registry = HistoryRegistry(
 ).register_line_explainer(
     htype=history.TYPE_EXPORT,
     explainer_class=HTMLMassExportExplainer,
+).register_line_explainer(
+    htype=history.TYPE_MASS_DELETION,
+    explainer_class=HTMLMassDeletionExplainer,
 )
@@ -0,0 +1,77 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from creme.creme_core.core.entity_filter.compilation import explain
+from creme.creme_core.models import EntityFilter
+
+
+class Command(BaseCommand):
+    help = (
+        'Display the SQL query generated by an EntityFilter, the plan of '
+        'execution given by the DB, & the cost of the building of the query.'
+    )
+
+    def add_arguments(self, parser):
+        add_argument = parser.add_argument
+        add_argument('filter_id', help='ID of the filter')
+        add_argument(
+            '-u', '--user', dest='username',
+            help='Username of the user used by the dynamic operands '
+                 '(like "current user").',
+        )
+        add_argument(
+            '--analyze', action='store_true', dest='analyze', default=False,
+            help='Execute the query to get the real costs (the option must be '
+                 'supported by the DB, like PostgreSQL). [default: %(default)s]',
+        )
+
+    def handle(self, *args, **options):
+        filter_id = options['filter_id']
+        efilter = EntityFilter.objects.filter(id=filter_id).first()
+        if efilter is None:
+            raise CommandError(f'The filter "{filter_id}" does not exist.')
+
+        username = options['username']
+        if username:
+            user = get_user_model().objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'The user "{username}" does not exist.')
+        else:
+            user = None
+
+        explain_options = {'analyze': True} if options['analyze'] else {}
+
+        try:
+            explanation = explain(efilter, user=user, **explain_options)
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        write = self.stdout.write
+        write(f'SQL query:\n{explanation.sql}\n')
+        write(f'Plan:\n{explanation.plan}\n')
+        write(
+            f'Building of the query: {explanation.compilation_queries} query(ies), '
+            f'{explanation.compilation_duration * 1000:.2f} ms\n'
+        )
+        write(
+            f'Cacheable: {"yes" if explanation.cacheable else "no"}; '
+            f'depends on the user: {"yes" if explanation.user_dependent else "no"}'
+        )
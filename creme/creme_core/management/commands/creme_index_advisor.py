@@ -0,0 +1,76 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.core.management.base import BaseCommand, CommandError
+
+from creme.creme_core.core.index_advisor import SortIndexAdvisor
+
+
+class Command(BaseCommand):
+    help = (
+        'Find the orderings used by the list-views (HeaderFilters & sorted '
+        'columns stored in the sessions of the users) which do not correspond '
+        'to a DB-index, & report (or create) the missing indexes.'
+    )
+    advisor_class = SortIndexAdvisor
+
+    def add_arguments(self, parser):
+        add_argument = parser.add_argument
+        add_argument(
+            '--create', action='store_true', dest='create', default=False,
+            help='Create the missing indexes (notice that they are not managed '
+                 'by the migrations). [default: %(default)s]',
+        )
+        add_argument(
+            '--min-usages', type=int, dest='min_usages', default=1,
+            help='Ignore the orderings used by fewer states of list-view. '
+                 '[default: %(default)s]',
+        )
+
+    def handle(self, *args, **options):
+        advisor = self.advisor_class()
+        verbosity = options['verbosity']
+
+        try:
+            advices = [
+                advice
+                for advice in advisor.missing_indexes()
+                if advice.usages >= options['min_usages']
+            ]
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        if not advices:
+            if verbosity:
+                self.stdout.write('No missing index.')
+
+            return
+
+        for advice in advices:
+            label = (
+                f'{advice.model._meta.db_table} ({", ".join(advice.columns)}): '
+                f'used by {advice.usages} list-view(s)'
+            )
+
+            if options['create']:
+                index = advisor.create_index(advice)
+
+                if verbosity:
+                    self.stdout.write(f'Index "{index.name}" created on {label}.')
+            else:
+                self.stdout.write(f'Missing index on {label}.')
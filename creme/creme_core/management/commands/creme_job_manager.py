@@ -23,8 +23,16 @@ class Command(BaseCommand):
     help = 'Run a pool of task workers (batch processing, CSV importing etc...).'
     args = ''
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-n', '--node', dest='node_name', default='',
+            help='Name of the node when several schedulers share the jobs '
+                 '(see the setting JOBMANAGER_LEASE_DURATION). '
+                 '[default: the host name & the process ID]',
+        )
+
     def handle(self, *args, **options):
         verbosity = options.get('verbosity')
 
         from creme.creme_core.core.job import JobScheduler
-        JobScheduler().start(verbose=bool(verbosity))
+        JobScheduler(node_name=options['node_name']).start(verbose=bool(verbosity))
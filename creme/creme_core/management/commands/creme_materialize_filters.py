@@ -0,0 +1,86 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.core.management.base import BaseCommand, CommandError
+
+from creme.creme_core.core.entity_filter.materialization import (
+    get_materializer,
+)
+
+
+def _pair_label(efilter, user):
+    return f'"{efilter.id}"' if user is None else f'"{efilter.id}" (user: {user.username})'
+
+
+class Command(BaseCommand):
+    help = (
+        'Materialize the filters used by the credentials of the roles (see the '
+        'setting "MATERIALIZED_CREDENTIALS_FILTERS"), or check the consistency '
+        'of the materialized filters.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true', dest='check', default=False,
+            help='Compare the stored entities with the conditions of the filters '
+                 '(nothing is modified). [default: %(default)s]',
+        )
+
+    def _build(self, materializer, verbosity):
+        for efilter, user, count in materializer.build_all():
+            if verbosity:
+                self.stdout.write(
+                    f'{_pair_label(efilter, user)}: {count} entities materialized.'
+                )
+
+    def _check(self, materializer, verbosity):
+        errors = 0
+
+        for efilter, user in materializer.materialized_filters():
+            missing_ids, unexpected_ids = materializer.check(efilter, user)
+
+            if missing_ids or unexpected_ids:
+                errors += 1
+                self.stderr.write(
+                    f'{_pair_label(efilter, user)}: '
+                    f'missing entities: {sorted(missing_ids)} ; '
+                    f'unexpected entities: {sorted(unexpected_ids)}'
+                )
+            elif verbosity:
+                self.stdout.write(f'{_pair_label(efilter, user)}: OK')
+
+        if errors:
+            raise CommandError(
+                f'{errors} materialized filter(s) are not consistent; '
+                f'run the command without "--check" to materialize them again.'
+            )
+
+    def handle(self, *args, **options):
+        materializer = get_materializer()
+        if materializer is None:
+            raise CommandError(
+                'The materialization of the filters is disabled '
+                '(see the setting "MATERIALIZED_CREDENTIALS_FILTERS").'
+            )
+
+        verbosity = options['verbosity']
+
+        if options['check']:
+            self._check(materializer, verbosity)
+        else:
+            self._build(materializer, verbosity)
@@ -0,0 +1,81 @@
+################################################################################
+#    Creme is a free/open-source Customer Relationship Management software
+#    Copyright (C) 2025  Hybird
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+################################################################################
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+
+from creme.creme_core.core.search_index import get_search_index
+from creme.creme_core.models import CremeEntity, SearchConfigItem
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the index used by the global search (see the setting '
+        '"SEARCH_INDEX_BACKEND"), for the fields of the current search configuration.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.ModelName',
+            help='Models to index (e.g. "persons.Contact"). '
+                 'By default, all the models which have a search configuration are indexed.',
+        )
+
+    def _get_models(self, labels):
+        if not labels:
+            get_ct = ContentType.objects.get_for_id
+            models = {
+                get_ct(ct_id).model_class()
+                for ct_id in SearchConfigItem.objects
+                                             .filter(disabled=False)
+                                             .values_list('content_type', flat=True)
+            }
+            models.discard(None)  # Uninstalled app
+
+            return sorted(models, key=lambda model: model._meta.label)
+
+        models = []
+
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as e:
+                raise CommandError(f'Invalid model "{label}": {e}') from e
+
+            if not issubclass(model, CremeEntity):
+                raise CommandError(f'The model "{label}" is not an entity model.')
+
+            models.append(model)
+
+        return models
+
+    def handle(self, *args, **options):
+        index = get_search_index()
+        if index is None:
+            raise CommandError(
+                'The search index is disabled (see the setting "SEARCH_INDEX_BACKEND").'
+            )
+
+        verbosity = options['verbosity']
+
+        for model in self._get_models(options['models']):
+            count = index.rebuild(model)
+
+            if verbosity:
+                self.stdout.write(f'{model._meta.label}: {count} entities indexed.')
@@ -0,0 +1,105 @@
+import logging
+
+from django.db import DatabaseError, migrations, models, transaction
+
+from creme.creme_core.models.fields import EntityCTypeForeignKey
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'creme_core_searchindexentry_fts'
+SQLITE_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"content, content='creme_core_searchindexentry', content_rowid='id', tokenize='trigram'"
+    f")",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON creme_core_searchindexentry BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); "
+    f"END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON creme_core_searchindexentry BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) "
+    f"VALUES ('delete', old.id, old.content); "
+    f"END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON creme_core_searchindexentry BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) "
+    f"VALUES ('delete', old.id, old.content); "
+    f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); "
+    f"END",
+]
+POSTGRESQL_STATEMENTS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX creme_core_searchindexentry_trgm '
+    'ON creme_core_searchindexentry USING gin (content gin_trgm_ops)',
+]
+
+
+def create_text_index(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {
+        'sqlite': SQLITE_STATEMENTS,
+        'postgresql': POSTGRESQL_STATEMENTS,
+    }.get(connection.vendor)
+
+    if statements:
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    for statement in statements:
+                        cursor.execute(statement)
+        except DatabaseError as e:
+            logger.warning(
+                'The text index for the search cannot be created (%s); '
+                'the search index will work without it.', e,
+            )
+
+
+def drop_text_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('creme_core', '0168_v2_7__currency_is_default02'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'entity',
+                    models.ForeignKey(
+                        to='creme_core.cremeentity', editable=False,
+                        on_delete=models.CASCADE, related_name='+',
+                    )
+                ),
+                ('cell_key', models.CharField(max_length=300, editable=False)),
+                ('content', models.TextField(editable=False)),
+            ],
+            options={
+                'unique_together': {('entity', 'cell_key')},
+            },
+        ),
+        migrations.CreateModel(
+            name='IndexedSearchCell',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'content_type',
+                    EntityCTypeForeignKey(
+                        to='contenttypes.contenttype', editable=False,
+                        on_delete=models.CASCADE,
+                    )
+                ),
+                ('cell_key', models.CharField(max_length=300, editable=False)),
+            ],
+            options={
+                'unique_together': {('content_type', 'cell_key')},
+            },
+        ),
+        migrations.RunPython(create_text_index, drop_text_index),
+    ]
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('creme_core', '0169_v2_7__search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterializedEntityFilter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'efilter',
+                    models.ForeignKey(
+                        to='creme_core.entityfilter', editable=False, on_delete=models.CASCADE,
+                    )
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        to=settings.AUTH_USER_MODEL, editable=False, null=True,
+                        on_delete=models.CASCADE,
+                    )
+                ),
+            ],
+            options={
+                'unique_together': {('efilter', 'user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MaterializedEntityFilterEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'mfilter',
+                    models.ForeignKey(
+                        to='creme_core.materializedentityfilter', editable=False,
+                        on_delete=models.CASCADE, related_name='entries',
+                    )
+                ),
+                (
+                    'entity',
+                    models.ForeignKey(
+                        to='creme_core.cremeentity', editable=False,
+                        on_delete=models.CASCADE, related_name='+',
+                    )
+                ),
+            ],
+            options={
+                'unique_together': {('mfilter', 'entity')},
+            },
+        ),
+    ]
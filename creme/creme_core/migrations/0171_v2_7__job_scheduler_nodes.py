@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('creme_core', '0170_v2_7__materialized_filters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSchedulerNode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, editable=False)),
+                ('heartbeat', models.DateTimeField(editable=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobLease',
+            fields=[
+                (
+                    'job',
+                    models.OneToOneField(
+                        to='creme_core.job', primary_key=True, serialize=False,
+                        editable=False, on_delete=models.CASCADE, related_name='+',
+                    )
+                ),
+                (
+                    'node',
+                    models.ForeignKey(
+                        to='creme_core.jobschedulernode', editable=False,
+                        on_delete=models.CASCADE, related_name='leases',
+                    )
+                ),
+            ],
+        ),
+    ]
@@ -23,14 +23,26 @@ from .deletion import (  # NOQA
     TrashCleaningCommand,
 )
 from .entity import CremeEntity  # NOQA
-from .entity_filter import EntityFilter, EntityFilterCondition  # NOQA
+from .entity_filter import (  # NOQA
+    EntityFilter,
+    EntityFilterCondition,
+    MaterializedEntityFilter,
+    MaterializedEntityFilterEntry,
+)
 from .fields_config import FieldsConfig  # NOQA
 from .file_ref import FileRef  # NOQA
 from .header_filter import HeaderFilter  # NOQA
 from .history import HistoryConfigItem, HistoryLine  # NOQA
 from .i18n import Language  # NOQA
 from .imprint import Imprint  # NOQA
-from .job import EntityJobResult, Job, JobResult, MassImportJobResult  # NOQA
+from .job import (  # NOQA
+    EntityJobResult,
+    Job,
+    JobLease,
+    JobResult,
+    JobSchedulerNode,
+    MassImportJobResult,
+)
 from .lock import Mutex, MutexAutoLock  # NOQA
 from .menu import MenuConfigItem  # NOQA
 from .notification import (  # NOQA
@@ -39,7 +51,11 @@ from .notification import (  # NOQA
     NotificationChannelConfigItem,
 )
 from .relation import Relation, RelationType, SemiFixedRelationType  # NOQA
-from .search import SearchConfigItem  # NOQA
+from .search import (  # NOQA
+    IndexedSearchCell,
+    SearchConfigItem,
+    SearchIndexEntry,
+)
 from .setting_value import SettingValue  # NOQA
 from .vat import Vat  # NOQA
 from .version import Version  # NOQA
@@ -57,6 +57,7 @@ if TYPE_CHECKING:
 
     from ..core.sandbox import SandboxType
     from .base import CremeModel
+    from .entity_filter import EntityFilter
 
     EntityInstanceOrClass = Union[Type[CremeEntity], CremeEntity]
     EntityInstanceOrClassOrCType = Union[Type[CremeEntity], CremeEntity, ContentType]
@@ -551,6 +552,16 @@ class SetCredentials(models.Model):
 
         return allowed_found
 
+    @staticmethod
+    def _efilter_q(efilter: EntityFilter, user) -> Q:
+        from ..core.entity_filter.materialization import get_materializer
+
+        materializer = get_materializer()
+
+        return efilter.get_q(user=user) if materializer is None else materializer.get_q(
+            efilter=efilter, user=user,
+        )
+
     @classmethod
     def _aux_filter(cls,
                     model: type[CremeEntity],
@@ -562,6 +573,7 @@ class SetCredentials(models.Model):
         allowed_ctype_ids = {None, ContentType.objects.get_for_model(model).id}
         ESET_ALL = cls.ESET_ALL
         ESET_OWN = cls.ESET_OWN
+        efilter_q = cls._efilter_q
 
         filtered_qs = queryset
 
@@ -605,7 +617,7 @@ class SetCredentials(models.Model):
                     q |= Q(**user_filtering_kwargs())
                 else:  # SetCredentials.ESET_FILTER
                     # TODO: distinct ? (see EntityFilter.filter())
-                    q |= cred.efilter.get_q(user=user)
+                    q |= efilter_q(cred.efilter, user)
             else:
                 filtered_qs = filtered_qs.filter(q)
 
@@ -613,7 +625,7 @@ class SetCredentials(models.Model):
                 if cred.set_type == ESET_OWN:
                     filtered_qs = filtered_qs.exclude(**user_filtering_kwargs())
                 else:  # SetCredentials.ESET_FILTER
-                    filtered_qs = filtered_qs.exclude(cred.efilter.get_q(user=user))
+                    filtered_qs = filtered_qs.exclude(efilter_q(cred.efilter, user))
 
         return filtered_qs
 
@@ -795,7 +807,7 @@ class SetCredentials(models.Model):
                             filter_q = _user_filtering_q()
                         else:
                             # TODO: distinct ??
-                            filter_q = efilters_per_id[filter_id].get_q(user=user)
+                            filter_q = cls._efilter_q(efilters_per_id[filter_id], user)
 
                         filters_q |= filter_q
 
@@ -31,6 +31,7 @@ from django.utils.timezone import localtime
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
+from ..core.config_cache import config_cache
 from ..global_info import get_per_request_cache
 from ..utils.content_type import as_ctype
 from .base import CremeModel
@@ -47,6 +48,8 @@ __all__ = (
 
 
 class CustomFieldManager(models.Manager):
+    config_cache_namespace = 'creme_core-custom_fields'
+
     # TODO: exclude deleted fields?
     def compatible(self, ct_or_model, /):
         return self.filter(content_type=as_ctype(ct_or_model))
@@ -60,7 +63,14 @@ class CustomFieldManager(models.Manager):
 
         cached_cfields = cache.get(key)
         if cached_cfields is None:
-            cached_cfields = cache[key] = [*self.filter(content_type=ct)]
+            namespace = self.config_cache_namespace
+            cached_cfields = config_cache.get_many(namespace, [ct.id]).get(ct.id)
+
+            if cached_cfields is None:
+                cached_cfields = [*self.filter(content_type=ct)]
+                config_cache.set_many(namespace, {ct.id: cached_cfields})
+
+            cache[key] = cached_cfields
 
         return OrderedDict((cfield.id, cfield) for cfield in cached_cfields)
 
@@ -511,3 +521,6 @@ _TABLES: dict[int, type[CustomFieldValue]] = OrderedDict([
     (CustomField.ENUM,       CustomFieldEnum),
     (CustomField.MULTI_ENUM, CustomFieldMultiEnum),
 ])
+
+
+config_cache.watch(CustomFieldManager.config_cache_namespace, CustomField)
@@ -20,7 +20,7 @@ from __future__ import annotations
 
 import logging
 # import warnings
-from collections.abc import Iterable, Iterator
+from collections.abc import Iterable, Iterator, Sequence
 from copy import deepcopy
 from itertools import zip_longest
 from re import compile as compile_re
@@ -30,18 +30,25 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models import Q, QuerySet
-from django.db.models.signals import pre_delete
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.dispatch import receiver
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext, pgettext_lazy
 
+from ..core.config_cache import config_cache
 from ..core.entity_filter import (
     EF_REGULAR,
     TYPE_ID_MAX_LENGTH,
     EntityFilterRegistry,
     entity_filter_registries,
 )
+from ..core.entity_filter.compilation import CompiledQCache, compiled_q_cache
 from ..global_info import get_global_info
 from ..setting_keys import global_filters_edition_key
 from ..utils import update_model_instance
@@ -415,6 +422,30 @@ class EntityFilter(models.Model):  # TODO: CremeModel? MinionModel?
 
         return any(accepted) if self.use_or else all(accepted)
 
+    def accept_many(self, entities: Sequence[CremeEntity], user: CremeUser) -> list[bool]:
+        """Check if several CremeEntity instances are accepted or refused by the
+        filter. The data needed by the conditions (relationships, properties,
+        custom-values...) are retrieved with grouped queries (see 'prefetch()'),
+        so the number of queries does not depend on the number of entities.
+
+        @param entities: Sequence of instances of the model of the filter
+               (i.e. not base CremeEntities if the filter is related to a
+               child class).
+        @param user: see 'accept()'.
+        @return: A list of booleans (one per entity, in the same order).
+        """
+        entities = [*entities]
+        self.prefetch(entities, user)
+
+        return [self.accept(entity=entity, user=user) for entity in entities]
+
+    def prefetch(self, entities: Sequence[CremeEntity], user: CremeUser) -> None:
+        """Retrieve (with grouped queries) the data used by the conditions to
+        check several entities ; see 'accept_many()'.
+        """
+        for condition in self.get_conditions():
+            condition.prefetch(entities, user)
+
     @property
     def applicable_on_entity_base(self) -> bool:
         """Can this filter be applied on CremeEntity (QuerySet or simple instance)?
@@ -763,7 +794,10 @@ class EntityFilter(models.Model):  # TODO: CremeModel? MinionModel?
     def get_delete_absolute_url(self) -> str:
         return self.registry.deletion_url(self)
 
-    def get_q(self, user: CremeUser | None = None) -> Q:
+    def build_q(self, user: CremeUser | None = None) -> Q:
+        """Build the Q instance corresponding to the conditions.
+        Hint: use 'get_q()' instead, which uses a cache.
+        """
         query = Q()
 
         if user is None:
@@ -778,6 +812,38 @@ class EntityFilter(models.Model):  # TODO: CremeModel? MinionModel?
 
         return query
 
+    def get_q(self, user: CremeUser | None = None) -> Q:
+        """Get the Q instance corresponding to the conditions.
+        The compiled Q instances are cached (see
+        'creme_core.core.entity_filter.compilation').
+        """
+        if user is None:
+            user = get_global_info('user')
+
+        if self._state.adding:
+            return self.build_q(user=user)
+
+        query = compiled_q_cache.get(self.id, user)
+        if query is None:
+            query = self.build_q(user=user)
+            compiled_q_cache.set(self, user, query)
+
+        # NB: shallow copy, so the caller can modify the returned instance
+        #     (e.g. with "negate()") without modifying the cached one.
+        return Q.create(
+            children=query.children, connector=query.connector, negated=query.negated,
+        )
+
+    def depends_on_user(self) -> bool:
+        """Does the Q instance depend on the user
+        (i.e. a dynamic operand like <CurrentUserOperand> is used)?
+        """
+        return any(cond.handler.depends_on_user() for cond in self.get_conditions())
+
+    def is_q_cacheable(self) -> bool:
+        "Can the Q instance be cached? (see 'FilterConditionHandler.is_q_cacheable()')."
+        return all(cond.handler.is_q_cacheable() for cond in self.get_conditions())
+
     def _build_conditions_cache(self, conditions) -> None:
         checked_conds: list[EntityFilterCondition] = []
         append = checked_conds.append
@@ -920,6 +986,10 @@ class EntityFilterCondition(models.Model):
         """
         return self.handler.accept(entity=entity, user=user)
 
+    def prefetch(self, entities: Sequence[CremeEntity], user: CremeUser) -> None:
+        "See 'EntityFilter.prefetch()'."
+        self.handler.prefetch(entities, user)
+
     @staticmethod
     def conditions_equal(conditions1: Iterable[EntityFilterCondition],
                          conditions2: Iterable[EntityFilterCondition],
@@ -1018,6 +1088,41 @@ class EntityFilterCondition(models.Model):
         return changed
 
 
+class MaterializedEntityFilter(models.Model):
+    """The entities accepted by an EntityFilter (used by the credentials)
+    have been computed & stored as instances of MaterializedEntityFilterEntry ;
+    see 'creme_core.core.entity_filter.materialization'.
+    The field "user" is filled only for filters which depend on the current
+    user (see <CurrentUserOperand>) ; there is one instance per user in this case.
+    """
+    efilter = models.ForeignKey(EntityFilter, on_delete=models.CASCADE, editable=False)
+    user = models.ForeignKey(CremeUser, null=True, on_delete=models.CASCADE, editable=False)
+
+    class Meta:
+        app_label = 'creme_core'
+        unique_together = ('efilter', 'user')
+
+    def __str__(self):
+        return (
+            f'MaterializedEntityFilter(efilter_id="{self.efilter_id}", user_id={self.user_id})'
+        )
+
+
+class MaterializedEntityFilterEntry(models.Model):
+    "An entity accepted by a materialized EntityFilter."
+    mfilter = models.ForeignKey(
+        MaterializedEntityFilter, on_delete=models.CASCADE,
+        related_name='entries', editable=False,
+    )
+    entity = models.ForeignKey(
+        CremeEntity, on_delete=models.CASCADE, related_name='+', editable=False,
+    )
+
+    class Meta:
+        app_label = 'creme_core'
+        unique_together = ('mfilter', 'entity')
+
+
 # TODO: rework now that the deletion views for RelationType/CremePropertyType/CustomFields
 #       abort if a Condition is referencing them.
 #        => just display error in filter configuration
@@ -1035,3 +1140,23 @@ def _delete_related_efc(sender, instance, **kwargs):
 
     if q:
         EntityFilterCondition.objects.filter(q).delete()
+
+
+@receiver((post_save, post_delete), sender=EntityFilter,
+          dispatch_uid='creme_core-clear_compiled_filters01')
+@receiver((post_save, post_delete), sender=EntityFilterCondition,
+          dispatch_uid='creme_core-clear_compiled_filters02')
+def _clear_compiled_filters(sender, **kwargs):
+    compiled_q_cache.clear()
+
+
+# NB: the teams of the user are used by <CurrentUserOperand>
+@receiver(m2m_changed, sender=CremeUser.teammates_set.through,
+          dispatch_uid='creme_core-clear_compiled_filters03')
+def _clear_compiled_filters_on_teams(sender, action, **kwargs):
+    if action.startswith('post_'):
+        config_cache.invalidate(CompiledQCache.namespace)
+        compiled_q_cache.clear()
+
+
+config_cache.watch(CompiledQCache.namespace, EntityFilter, EntityFilterCondition)
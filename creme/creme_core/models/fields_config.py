@@ -32,6 +32,7 @@ from django.utils.functional import cached_property
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
+from ..core.config_cache import config_cache
 from ..core.field_tags import FieldTag
 from ..global_info import get_per_request_cache
 from ..utils.meta import FieldInfo
@@ -68,6 +69,8 @@ logger = logging.getLogger(__name__)
 
 
 class FieldsConfigManager(models.Manager):
+    config_cache_namespace = 'creme_core-fields_config'
+
     def configurable_fields(self, model: type[Model]) -> Iterator[tuple[Field, list[str]]]:
         conf_model = self.model
         REQUIRED = conf_model.REQUIRED
@@ -125,12 +128,32 @@ class FieldsConfigManager(models.Manager):
             else:
                 result[model] = fc
 
-        # Step 2: fill 'result' with configs in DB
+        # Step 2: fill 'result' with configs in the shared cache
+        if not_cached_ctypes:
+            shared_fconfigs = config_cache.get_many(
+                self.config_cache_namespace, (ct.id for ct in not_cached_ctypes),
+            )
+
+            if shared_fconfigs:
+                missing_ctypes = []
+
+                for ct in not_cached_ctypes:
+                    fc = shared_fconfigs.get(ct.id)
+
+                    if fc is None:
+                        missing_ctypes.append(ct)
+                    else:
+                        result[ct.model_class()] = cache[cache_key_fmt(ct.id)] = fc
+
+                not_cached_ctypes = missing_ctypes
+
+        # Step 3: fill 'result' with configs in DB
+        to_share = {}
         for fc in self.filter(content_type__in=not_cached_ctypes):
             ct = fc.content_type
-            result[ct.model_class()] = cache[cache_key_fmt(ct.id)] = fc
+            result[ct.model_class()] = cache[cache_key_fmt(ct.id)] = to_share[ct.id] = fc
 
-        # Step 3: fill 'result' with empty configs for remaining models
+        # Step 4: fill 'result' with empty configs for remaining models
         for model in models:
             if model not in result:
                 ct = get_ct(model)
@@ -139,6 +162,11 @@ class FieldsConfigManager(models.Manager):
                     descriptions=(),
                 )
 
+                if ct in not_cached_ctypes:
+                    to_share[ct.id] = result[model]
+
+        config_cache.set_many(self.config_cache_namespace, to_share)
+
         return result
 
     def has_configurable_fields(self, model: type[Model]) -> bool:
@@ -456,3 +484,6 @@ class FieldsConfig(CremeModel):
 
     def natural_key(self):
         return self.content_type.natural_key()
+
+
+config_cache.watch(FieldsConfigManager.config_cache_namespace, FieldsConfig)
@@ -159,6 +159,7 @@ TYPE_PROP_DEL        = 13
 TYPE_TRASH           = 14
 TYPE_CUSTOM_EDITION  = 15
 TYPE_EXPORT          = 20
+TYPE_MASS_DELETION   = 21
 
 
 class _HistoryLineType:
@@ -571,7 +572,7 @@ class _HLTRelatedEntity(_HistoryLineType):
             object_entities = [r.object_entity for r in relations]
             create_line = partial(
                 HistoryLine._create_line_4_instance,
-                ltype=cls.type_id, date=entity.modified, related_line_id=related_line.id,
+                ltype=cls.type_id, date=entity.modified, related_line=related_line,
             )
 
             CremeEntity.populate_real_entities(object_entities)  # Optimisation
@@ -623,12 +624,15 @@ class _HLTRelation(_HistoryLineType):
         hline_sym = create_line(
             relation.object_entity, sym_cls.type_id,
             modifs=[relation.type.symmetric_type_id],
-            related_line_id=hline.id,
+            related_line=hline,
         )
         hline.value = HistoryLine._encode_attrs(
             hline.entity,
             modifs=[relation.type_id], related_line_id=hline_sym.id,
         )
+        if hline_sym.id is None:  # The lines are buffered (see HistoryBuffer)
+            hline._unsaved_related_line = hline_sym
+
         hline.save()
 
     @classmethod
@@ -806,7 +810,31 @@ class _HLTEntityExport(_HistoryLineType):
         )
 
 
+@TYPES_MAP(TYPE_MASS_DELETION)
+class _HLTEntityMassDeletion(_HistoryLineType):
+    verbose_name = _('Mass deletion')
+
+    @classmethod
+    def create_line(cls, ctype: ContentType, user, count: int) -> HistoryLine:
+        """Builder of HistoryLine representing the deletion of several entities
+        with the same type (e.g. when the trash is emptied), instead of one line
+        per deleted entity.
+
+        @param ctype: ContentType instance ; type of deleted entities.
+        @param user: User who performs the deletion.
+        @param count: Number of deleted entities.
+        @return: Created instance of line.
+        """
+        return HistoryLine.objects.create(
+            entity_ctype=ctype,
+            entity_owner=user,
+            type=cls.type_id,
+            value=HistoryLine._encode_attrs(instance='', modifs=[count]),
+        )
+
+
 HISTORY_ENABLED_CACHE_KEY = 'creme_core-history-enabled'
+HISTORY_BUFFER_CACHE_KEY = 'creme_core-history-buffer'
 
 
 def is_history_enabled() -> bool:
@@ -858,6 +886,10 @@ class HistoryLine(Model):
     _modifications: list | None = None
     _related_line_id: int | None = None
     _related_line: HistoryLine | bool | None = False
+    # Related line which has not been saved yet when this line has been
+    # created (see 'creme_core.core.history.HistoryBuffer').
+    _unsaved_related_line: HistoryLine | None = None
+    _buffered: bool = False
 
     class Meta:
         app_label = 'creme_core'
@@ -1014,6 +1046,13 @@ class HistoryLine(Model):
 
         return self._related_line_id
 
+    def _set_related_line_id(self, line_id: int | None) -> None:
+        "Insert the ID of the related line in a value which has been encoded without it."
+        value = json_load(self.value)
+        value.insert(1, line_id)
+        self.value = _JSONEncoder().encode(value)
+        self._entity_repr = self._modifications = self._related_line_id = None
+
     @staticmethod
     def populate_users(hlines: Sequence[HistoryLine], user):
         """Set the internal cache for 'user' in some HistoryLines, to optimize queries.
@@ -1077,13 +1116,19 @@ class HistoryLine(Model):
                                 date=None,
                                 modifs=(),
                                 related_line_id=None,
+                                related_line=None,
                                 ):
         """Builder.
         @param ltype: See TYPE_*
         @param date: If not given, will be 'now'.
         @param modifs: List of tuples containing JSONifiable values.
         @param related_line_id: HistoryLine.id.
+        @param related_line: HistoryLine instance (alternative to 'related_line_id');
+               it can be not saved yet (see 'creme_core.core.history.HistoryBuffer').
         """
+        if related_line is not None:
+            related_line_id = related_line.id
+
         kwargs = {
             'entity': instance,
             'entity_ctype': instance.entity_type,
@@ -1099,7 +1144,13 @@ class HistoryLine(Model):
         if date:
             kwargs['date'] = date
 
-        return cls.objects.create(**kwargs)
+        hline = cls(**kwargs)
+        if related_line is not None and related_line_id is None:
+            hline._unsaved_related_line = related_line
+
+        hline.save(force_insert=True)
+
+        return hline
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         if update_fields is not None:
@@ -1114,6 +1165,13 @@ class HistoryLine(Model):
 
             self.by_wf_engine = WorkflowEngine.get_current().is_executing_actions
 
+            if self.pk is None:
+                buffer = get_per_request_cache().get(HISTORY_BUFFER_CACHE_KEY)
+
+                if buffer is not None:
+                    buffer.add(self)
+                    return
+
             super().save(
                 force_insert=force_insert,
                 force_update=force_update,
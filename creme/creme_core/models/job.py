@@ -322,6 +322,42 @@ class Job(models.Model):
         self.type_id = value.id
 
 
+class JobSchedulerNode(models.Model):
+    """A process running the job scheduler (see the command "creme_job_manager")
+    when several schedulers share the jobs (see the setting
+    'JOBMANAGER_LEASE_DURATION').
+    The heartbeat is regularly updated by the scheduler; a node which does not
+    update it anymore is considered as dead, & it is removed (with its leases)
+    by the other nodes.
+    """
+    name = models.CharField(max_length=100, unique=True, editable=False)
+    heartbeat = models.DateTimeField(editable=False)
+
+    class Meta:
+        app_label = 'creme_core'
+
+    def __str__(self):
+        return self.name
+
+
+class JobLease(models.Model):
+    """Right of a JobSchedulerNode to run a Job; a Job has one lease at most,
+    so it cannot be run by several nodes at the same time.
+    """
+    job = models.OneToOneField(
+        Job, primary_key=True, on_delete=models.CASCADE, editable=False, related_name='+',
+    )
+    node = models.ForeignKey(
+        JobSchedulerNode, on_delete=models.CASCADE, editable=False, related_name='leases',
+    )
+
+    class Meta:
+        app_label = 'creme_core'
+
+    def __repr__(self):
+        return f'JobLease(job={self.job_id}, node={self.node_id})'
+
+
 class BaseJobResult(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     messages = models.JSONField(null=True)
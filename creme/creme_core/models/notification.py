@@ -249,20 +249,45 @@ class NotificationManager(models.Manager):
         """Create as much as needed Notification instances for some Users,
         by respecting their own configuration for the given channel.
         """
+        self.bulk_send(channel=channel, contents=[(users, content)], level=level)
+
+    send.alters_data = True
+
+    def bulk_send(self, *,
+                  channel: str | uuid.UUID | NotificationChannel,
+                  contents: Iterable[tuple[Iterable[CremeUser], notification.NotificationContent]],
+                  level: Notification.Level | None = None,
+                  ) -> None:
+        """Send several contents on the same channel, like send() but the
+        configurations of all the Users are retrieved at once, & all the
+        Notification instances are created with one query.
+        @param contents: Pairs (users, content).
+        """
         if isinstance(channel, str | uuid.UUID):
             channel = NotificationChannel.objects.get_for_uuid(channel)
 
-        unique_users = {}
-        for user in users:
-            if user.is_team:
-                unique_users.update(user.teammates)
-            else:
-                unique_users[user.id] = user
+        # NB: the teammates are cached by the first instance of each team.
+        teams = {}
+        all_users = {}
+        users_per_content = []
+        for users, content in contents:
+            unique_users = {}
+            for user in users:
+                if user.is_team:
+                    unique_users.update(teams.setdefault(user.id, user).teammates)
+                else:
+                    unique_users[user.id] = user
+
+            all_users.update(unique_users)
+            users_per_content.append((unique_users.values(), content))
+
+        if not users_per_content:
+            return
 
         config_items = {
             config_item.user_id: config_item
             for config_item in NotificationChannelConfigItem.objects.bulk_get(
-                channels=[channel], users=unique_users.values(),
+                channels=[channel], users=all_users.values(),
             )
         }
 
@@ -271,7 +296,8 @@ class NotificationManager(models.Manager):
             self.model(
                 channel=channel, user=user, output=output, content=content, level=level,
             )
-            for user in unique_users.values()
+            for users, content in users_per_content
+            for user in users
             for output in config_items[user.id].outputs
         ])
 
@@ -288,7 +314,7 @@ class NotificationManager(models.Manager):
             from .. import creme_jobs
             creme_jobs.notification_emails_sender_type.refresh_job()
 
-    send.alters_data = True
+    bulk_send.alters_data = True
 
 
 class Notification(models.Model):
@@ -21,10 +21,12 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 from collections.abc import Iterable
+from functools import partial
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, models
+from django.db import IntegrityError, connections, models
+from django.db.models import signals
 from django.db.models.query_utils import Q
 from django.db.transaction import atomic
 from django.dispatch import receiver
@@ -36,7 +38,7 @@ from ..signals import pre_merge_related
 from ..utils.content_type import as_ctype
 from . import fields as creme_fields
 from .base import CremeModel
-from .creme_property import CremePropertyType
+from .creme_property import CremeProperty, CremePropertyType
 from .entity import CremeEntity
 
 logger = logging.getLogger(__name__)
@@ -233,6 +235,9 @@ class RelationManager(models.Manager):
     def safe_multi_save(self,
                         relations: Iterable[Relation],
                         check_existing: bool = True,
+                        *,
+                        clean: bool = False,
+                        batch_size: int | None = None,
                         ) -> int:
         """Save several instances of Relation by taking care of the UNIQUE
         constraint on ('type', 'subject_entity', 'object_entity').
@@ -242,13 +247,24 @@ class RelationManager(models.Manager):
         a duplicate (& so their ID remains 'None').
 
         Compared to use N x 'safe_get_or_create()', this method will only
-        perform 1 query to retrieve the existing Relations.
+        perform 1 query to retrieve the existing Relations. Several Relations
+        are created with bulk queries (the symmetrical instances included), if
+        the DB backend can return the IDs of the inserted rows ; the signals
+        "post_save" are sent like with 'Relation.save()' (so the history & the
+        workflows work as usual), but the lines of history are created with
+        bulk queries too.
 
         @param relations: An iterable of Relations (not save yet).
         @param check_existing: Perform a query to check existing Relations.
                You can pass False for newly created instances in order to avoid a query.
+        @param clean: If True, the constraints of the types (ContentTypes &
+               properties of the subjects/objects) are validated with
+               'clean_multi()' before any creation.
+        @param batch_size: Size of the batches of the bulk queries
+               (see 'QuerySet.bulk_create()').
         @return: Number of Relations inserted in base.
                  NB: the symmetrical instances are not counted.
+        @raise ValidationError: if <clean=True> & a constraint is not respected.
         """
         count = 0
 
@@ -280,7 +296,18 @@ class RelationManager(models.Manager):
                     unique_relations.pop(rel_sig, None)
 
             # Creation (we take the first of each group to guaranty uniqueness)
-            for relation in unique_relations.values():
+            relations = [*unique_relations.values()]
+
+            if clean:
+                self.clean_multi(relations)
+
+            if (
+                len(relations) > 1
+                and connections[self.db].features.can_return_rows_from_bulk_insert
+            ):
+                return self._bulk_create_pairs(relations, batch_size=batch_size)
+
+            for relation in relations:
                 try:
                     # NB: Relation.save is already @atomic'd
                     relation.save()
@@ -293,6 +320,172 @@ class RelationManager(models.Manager):
 
     safe_multi_save.alters_data = True
 
+    def _fill_caches(self,
+                     relations: list[Relation],
+                     rtypes: dict[str, RelationType] | None = None,
+                     ) -> None:
+        "Retrieve the missing types & entities of the Relations in a fixed number of queries."
+        rtypes = {} if rtypes is None else rtypes
+        get_field = self.model._meta.get_field
+        type_f = get_field('type')
+        subject_f = get_field('subject_entity')
+        object_f = get_field('object_entity')
+
+        missing_rtype_ids = {
+            relation.type_id
+            for relation in relations
+            if relation.type_id not in rtypes and not type_f.is_cached(relation)
+        }
+        if missing_rtype_ids:
+            rtypes.update(RelationType.objects.in_bulk(missing_rtype_ids))
+
+        missing_entity_ids = {
+            *(r.subject_entity_id for r in relations if not subject_f.is_cached(r)),
+            *(r.object_entity_id for r in relations if not object_f.is_cached(r)),
+        }
+        entities = CremeEntity.objects.in_bulk(missing_entity_ids) if missing_entity_ids else {}
+
+        for relation in relations:
+            rtype = rtypes.get(relation.type_id)
+            if rtype is not None:
+                relation.type = rtype
+
+            if not subject_f.is_cached(relation):
+                relation.subject_entity = entities[relation.subject_entity_id]
+
+            if not object_f.is_cached(relation):
+                relation.object_entity = entities[relation.object_entity_id]
+
+    def clean_multi(self, relations: Iterable[Relation]) -> None:
+        """Validate the constraints of the types of several Relations (not
+        saved yet), for the subjects & for the objects (i.e. the subjects of
+        the symmetrical Relations), like 'Relation.clean()' does for one
+        Relation ; but the number of queries does not depend on the number
+        of Relations.
+        @raise ValidationError.
+        """
+        relations = [*relations]
+        if not relations:
+            return
+
+        # NB: we retrieve the types again, in order to prefetch the constraints
+        #     of all the types (& symmetrical types) in the same queries.
+        rtype_ids = {relation.type_id for relation in relations}
+        rtypes = RelationType.objects.filter(
+            Q(id__in=rtype_ids) | Q(symmetric_type__in=rtype_ids)
+        ).prefetch_related(
+            'subject_ctypes', 'subject_properties', 'subject_forbidden_properties',
+        ).in_bulk()
+
+        for rtype in rtypes.values():
+            sym_type = rtypes.get(rtype.symmetric_type_id)
+            if sym_type is not None:
+                rtype.symmetric_type = sym_type
+
+        for relation in relations:
+            relation.type = rtypes[relation.type_id]
+
+        self._fill_caches(relations, rtypes=rtypes)
+
+        ptypes_per_entity = defaultdict(list)
+        for prop in CremeProperty.objects.filter(
+            creme_entity__in={
+                entity_id
+                for relation in relations
+                for entity_id in (relation.subject_entity_id, relation.object_entity_id)
+            },
+        ).select_related('type'):
+            ptypes_per_entity[prop.creme_entity_id].append(prop.type)
+
+        for relation in relations:
+            relation.clean_subject_entity(
+                property_types=ptypes_per_entity[relation.subject_entity_id],
+            )
+            relation._build_symmetric_relation().clean_subject_entity(
+                property_types=ptypes_per_entity[relation.object_entity_id],
+            )
+
+    def _bulk_create_pairs(self,
+                           relations: list[Relation],
+                           batch_size: int | None = None,
+                           ) -> int:
+        from ..core.history import buffer_history
+
+        model = self.model
+        using = self.db
+
+        for relation in relations:
+            if relation.pk is not None:
+                raise ValueError(
+                    f'RelationManager.safe_multi_save(): the instance pk={relation.pk} '
+                    f'is already saved.'
+                )
+
+        self._fill_caches(relations)
+
+        with buffer_history():
+            try:
+                # NB: the pairing needs the IDs of the inserted subject-relations
+                #     (i.e. "RETURNING" support) ; the FKs "symmetric_relation"
+                #     of these relations are set by a final bulk update.
+                with atomic(using=using):
+                    for relation in relations:
+                        if not relation.object_ctype_id:
+                            relation.object_ctype = relation.object_entity.entity_type
+
+                    self.bulk_create(relations, batch_size=batch_size)
+
+                    sym_relations = []
+                    for relation in relations:
+                        sym_relation = relation._build_symmetric_relation()
+                        sym_relation.created = relation.created
+                        sym_relations.append(sym_relation)
+
+                    self.bulk_create(sym_relations, batch_size=batch_size)
+
+                    for relation, sym_relation in zip(relations, sym_relations):
+                        relation.symmetric_relation = sym_relation
+
+                    self.bulk_update(
+                        relations, fields=['symmetric_relation'], batch_size=batch_size,
+                    )
+            except IntegrityError:
+                # A Relation has been created in a concurrent transaction; we
+                # use the slow way to ignore the duplicates.
+                logger.warning(
+                    'RelationManager.safe_multi_save(): bulk creation failed, '
+                    'the Relations are created one by one.'
+                )
+
+                count = 0
+                for relation in relations:
+                    relation.pk = None
+                    relation.symmetric_relation = None
+                    relation._state.adding = True
+
+                    try:
+                        relation.save()
+                    except IntegrityError:
+                        logger.exception('Avoid a Relation duplicate: %s ?!', relation)
+                    else:
+                        count += 1
+
+                return count
+
+            # We send the same signals as <Relation.save()>
+            send = partial(signals.post_save.send, sender=model, raw=False, using=using)
+            update_fields = frozenset(['symmetric_relation'])
+
+            for relation, sym_relation in zip(relations, sym_relations):
+                relation.symmetric_relation = None
+                send(instance=relation, created=True, update_fields=None)
+
+                relation.symmetric_relation = sym_relation
+                send(instance=sym_relation, created=True, update_fields=None)
+                send(instance=relation, created=False, update_fields=update_fields)
+
+        return len(relations)
+
 
 class RelationType(CremeModel):
     """Type of Relations.
@@ -581,16 +774,17 @@ class Relation(CremeModel):
 
     def clean(self):
         self.clean_subject_entity()
+        self._build_symmetric_relation().clean_subject_entity()
 
-        # TODO: factorise with save()
-        sym_relation = type(self)(
-            user=self.user,
+    def _build_symmetric_relation(self) -> Relation:
+        "Build the symmetrical instance (not saved)."
+        return type(self)(
+            user_id=self.user_id,
             type=self.type.symmetric_type,
             symmetric_relation=self,
             subject_entity=self.object_entity,
             real_object=self.subject_entity,
         )
-        sym_relation.clean_subject_entity()
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         """See django.db.models.Model.save().
@@ -612,15 +806,8 @@ class Relation(CremeModel):
         with atomic():
             super().save(using=using, force_insert=force_insert)
 
-            cls = type(self)
-            sym_relation = cls(
-                user=self.user,
-                type=self.type.symmetric_type,
-                symmetric_relation=self,
-                subject_entity=self.object_entity,
-                real_object=self.subject_entity,
-            )
-            super(cls, sym_relation).save(using=using, force_insert=force_insert)
+            sym_relation = self._build_symmetric_relation()
+            super(type(self), sym_relation).save(using=using, force_insert=force_insert)
 
             self.symmetric_relation = sym_relation
             super().save(
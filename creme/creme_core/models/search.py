@@ -30,6 +30,7 @@ from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext_lazy
 
+from ..core.config_cache import config_cache
 from ..utils.meta import ModelFieldEnumerator
 from .auth import UserRole
 from .base import CremeModel
@@ -43,6 +44,8 @@ logger = logging.getLogger(__name__)
 
 
 class SearchConfigItemManager(models.Manager):
+    config_cache_namespace = 'creme_core-search_config'
+
     def create_if_needed(self,
                          model: type[CremeEntity],
                          fields: Iterable[str],
@@ -92,16 +95,23 @@ class SearchConfigItemManager(models.Manager):
         role_query = Q(role__isnull=True)
         if user.is_superuser:
             role_query |= Q(superuser=True)
+            role_key = 'superuser'
 
             def filter_func(sci):
                 return sci.superuser
         else:
             role = user.role
             role_query |= Q(role=role)
+            role_key = f'role{user.role_id}'
 
             def filter_func(sci):
                 return sci.role == role
 
+        # NB: the cached values are lists with 0 or 1 item
+        namespace = self.config_cache_namespace
+        cache_keys = {ctype.id: f'{ctype.id}-{role_key}' for ctype in ctypes}
+        cached_items = config_cache.get_many(namespace, cache_keys.values())
+
 # TODO: use a similar way if superuser is a role
 #       (PG does not return a cool result if we do a ".order_by('role', 'superuser')")
 #        sc_items = {
@@ -116,15 +126,26 @@ class SearchConfigItemManager(models.Manager):
 #
 #        for ctype in ctypes:
 #            yield sc_items.get(ctype) or SearchConfigItem(content_type=ctype)
-        sc_items_per_ctid: DefaultDict[int, list] = defaultdict(list)
-        for sci in self.filter(content_type__in=ctypes).filter(role_query):
-            sc_items_per_ctid[sci.content_type_id].append(sci)
+        missing_ctypes = [
+            ctype for ctype in ctypes if cache_keys[ctype.id] not in cached_items
+        ]
+        if missing_ctypes:
+            sc_items_per_ctid: DefaultDict[int, list] = defaultdict(list)
+            for sci in self.filter(content_type__in=missing_ctypes).filter(role_query):
+                sc_items_per_ctid[sci.content_type_id].append(sci)
+
+            retrieved_items = {}
+            for ctype in missing_ctypes:
+                sc_items = sc_items_per_ctid.get(ctype.id)
+                retrieved_items[cache_keys[ctype.id]] = [
+                    next((item for item in sc_items if filter_func(item)), sc_items[0])
+                ] if sc_items else []
+
+            config_cache.set_many(namespace, retrieved_items)
+            cached_items.update(retrieved_items)
 
         for ctype in ctypes:
-            sc_items = sc_items_per_ctid.get(ctype.id)
-
-            if sc_items:
-                yield next((item for item in sc_items if filter_func(item)), sc_items[0])
+            yield from cached_items[cache_keys[ctype.id]]
 
 
 class SearchConfigItem(CremeModel):
@@ -261,3 +282,38 @@ class SearchConfigItem(CremeModel):
             raise ValueError('"role" must be NULL if "superuser" is True')
 
         super().save(*args, **kwargs)
+
+
+class SearchIndexEntry(models.Model):
+    """Normalized value of a searchable cell (see SearchConfigItem) for an
+    entity; these values are used by the search index
+    (see 'creme_core.core.search_index').
+    """
+    entity = models.ForeignKey(
+        CremeEntity, on_delete=models.CASCADE, related_name='+', editable=False,
+    )
+    cell_key = models.CharField(max_length=300, editable=False)
+    content = models.TextField(editable=False)
+
+    class Meta:
+        app_label = 'creme_core'
+        unique_together = ('entity', 'cell_key')
+
+    def __str__(self):
+        return f'SearchIndexEntry(entity_id={self.entity_id}, cell_key="{self.cell_key}")'
+
+
+class IndexedSearchCell(models.Model):
+    """Cell which values have been indexed for all the entities of a model;
+    the search index is used only if all the searched cells are indexed.
+    """
+    content_type = EntityCTypeForeignKey(editable=False)
+    cell_key = models.CharField(max_length=300, editable=False)
+
+    class Meta:
+        app_label = 'creme_core'
+        unique_together = ('content_type', 'cell_key')
+
+
+config_cache.watch(SearchConfigItemManager.config_cache_namespace, SearchConfigItem)
+config_cache.watch('creme_core-search_index', IndexedSearchCell)
@@ -23,6 +23,7 @@ import logging
 from django.core.validators import EMPTY_VALUES
 from django.db import models, transaction
 
+from ..core.config_cache import config_cache
 from ..core.setting_key import (
     SettingKey,
     SettingKeyRegistry,
@@ -40,6 +41,7 @@ class SettingValueManager(models.Manager):
             self.value = value
 
     cache_key_fmt = 'creme_core-setting_value-{}'
+    config_cache_namespace = 'creme_core-setting_values'
 
     key_registry: SettingKeyRegistry
 
@@ -149,10 +151,21 @@ class SettingValueManager(models.Manager):
                 svalues[key_id] = sv
 
         if uncached_info:
-            retrieved_svalues = {
-                svalue.key_id: svalue
-                for svalue in self.filter(key_id__in=[i[0] for i in uncached_info])
-            }
+            namespace = self.config_cache_namespace
+            retrieved_svalues = config_cache.get_many(
+                namespace, [i[0] for i in uncached_info],
+            )
+            missing_key_ids = [
+                key_id for key_id, *__ in uncached_info if key_id not in retrieved_svalues
+            ]
+
+            if missing_key_ids:
+                svalues_from_db = {
+                    svalue.key_id: svalue
+                    for svalue in self.filter(key_id__in=missing_key_ids)
+                }
+                config_cache.set_many(namespace, svalues_from_db)
+                retrieved_svalues.update(svalues_from_db)
 
             for key_id, cache_key, value_info in uncached_info:
                 try:
@@ -217,3 +230,6 @@ class SettingValue(models.Model):
         value = self.value
 
         return self.key.value_as_html(value) if value is not None else ''
+
+
+config_cache.watch(SettingValueManager.config_cache_namespace, SettingValue)
@@ -22,9 +22,11 @@ from uuid import uuid4
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from ..core.config_cache import config_cache
 from ..core.workflow import (
     WorkflowAction,
     WorkflowConditions,
+    WorkflowIndex,
     WorkflowTrigger,
     workflow_registry,
 )
@@ -32,6 +34,24 @@ from .base import CremeModel
 from .fields import EntityCTypeForeignKey
 
 
+class WorkflowManager(models.Manager):
+    config_cache_namespace = 'creme_core-workflows'
+
+    def get_index(self) -> WorkflowIndex:
+        """Get the index of the enabled Workflows (used by the WorkflowEngine).
+        The index is shared between the requests (see
+        'creme_core.core.config_cache'), & rebuilt when a Workflow is modified.
+        """
+        namespace = self.config_cache_namespace
+        index = config_cache.get_many(namespace, ['index']).get('index')
+
+        if index is None:
+            index = WorkflowIndex(self.filter(enabled=True).order_by('id'))
+            config_cache.set_many(namespace, {'index': index})
+
+        return index
+
+
 class Workflow(CremeModel):
     """A Workflow stores actions (like sending emails or creating Relation)
     which are automatically performed:
@@ -56,6 +76,8 @@ class Workflow(CremeModel):
     # False => not editable/deletable
     is_custom = models.BooleanField(default=True, editable=False)
 
+    objects = WorkflowManager()
+
     creation_label = _('Create a Workflow')
     save_label = _('Save the Workflow')
 
@@ -129,3 +151,6 @@ class Workflow(CremeModel):
     def trigger(self, value: WorkflowTrigger) -> None:
         self._trigger = None
         self.json_trigger = value.to_dict()
+
+
+config_cache.watch(WorkflowManager.config_cache_namespace, Workflow)
@@ -0,0 +1,299 @@
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Q
+from django.test.utils import override_settings
+
+from creme.creme_core.core.config_cache import config_cache
+from creme.creme_core.core.entity_filter import (
+    condition_handler,
+    operands,
+    operators,
+)
+from creme.creme_core.core.entity_filter.compilation import (
+    CompiledQCache,
+    FilterExplanation,
+    compiled_q_cache,
+    explain,
+)
+from creme.creme_core.models import (
+    CremePropertyType,
+    EntityFilter,
+    FakeContact,
+    FakeOrganisation,
+    RelationType,
+)
+
+from ...base import CremeTestCase
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'creme_config_test': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'creme_config_test',
+    },
+}
+
+
+class CompiledQCacheTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(compiled_q_cache.clear)
+
+    def _create_filter(self, *conditions, pk='creme_core-test_compilation', model=FakeContact):
+        efilter = EntityFilter.objects.create(
+            id=pk, name='Test', entity_type=model,
+        ).set_conditions(conditions, check_cycles=False, check_privacy=False)
+
+        # NB: the filter has been modified in the current transaction
+        #     => the compiled Q would not be stored.
+        self.clear_global_info()
+
+        return efilter
+
+    @staticmethod
+    def _build_name_condition(name):
+        return condition_handler.RegularFieldConditionHandler.build_condition(
+            model=FakeContact, operator=operators.IEQUALS,
+            field_name='last_name', values=[name],
+        )
+
+    def test_is_q_cacheable(self):
+        build_date_cond = condition_handler.DateRegularFieldConditionHandler.build_condition
+        self.assertTrue(self._build_name_condition('Ikari').handler.is_q_cacheable())
+        self.assertTrue(
+            build_date_cond(
+                model=FakeContact, field_name='birthday', start=self.create_datetime(2000, 1, 1),
+            ).handler.is_q_cacheable()
+        )
+        self.assertFalse(
+            build_date_cond(
+                model=FakeContact, field_name='birthday', date_range='current_year',
+            ).handler.is_q_cacheable()
+        )
+
+        ptype = CremePropertyType.objects.create(text='Is cool')
+        self.assertTrue(
+            condition_handler.PropertyConditionHandler.build_condition(
+                model=FakeContact, ptype=ptype,
+            ).handler.is_q_cacheable()
+        )
+
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_loves', 'Is loving'),
+            ('test-object_loves',  'Is loved by'),
+        )[0]
+        self.assertTrue(
+            condition_handler.RelationConditionHandler.build_condition(
+                model=FakeContact, rtype=rtype,
+            ).handler.is_q_cacheable()
+        )
+
+    def test_get_q(self):
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        self.assertTrue(efilter.is_q_cacheable())
+        self.assertFalse(efilter.depends_on_user())
+
+        user = self.get_root_user()
+        self.assertIsNone(compiled_q_cache.get(efilter.id, user))
+
+        expected_q = efilter.build_q(user=user)
+        self.assertEqual(expected_q, self.refresh(efilter).get_q(user=user))
+        self.assertEqual(expected_q, compiled_q_cache.get(efilter.id, user))
+
+        efilter = self.refresh(efilter)
+        with self.assertNumQueries(0):
+            q = efilter.get_q(user=user)
+        self.assertEqual(expected_q, q)
+
+        # The cached instance is not modified
+        q.negate()
+        self.assertEqual(expected_q, self.refresh(efilter).get_q(user=user))
+
+    def test_get_q__modified_condition(self):
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        user = self.get_root_user()
+        q1 = efilter.get_q(user=user)
+
+        efilter.set_conditions(
+            [self._build_name_condition('Katsuragi')],
+            check_cycles=False, check_privacy=False,
+        )
+        self.assertIsNone(compiled_q_cache.get(efilter.id, user))
+
+        q2 = self.refresh(efilter).get_q(user=user)
+        self.assertNotEqual(q1, q2)
+        self.assertEqual(efilter.build_q(user=user), q2)
+
+    def test_get_q__modified_filter(self):
+        efilter = self._create_filter(
+            self._build_name_condition('Ikari'),
+            self._build_name_condition('Katsuragi'),
+        )
+        user = self.get_root_user()
+        self.assertEqual(Q.AND, efilter.get_q(user=user).connector)
+
+        efilter.use_or = True
+        efilter.save()
+        self.assertEqual(Q.OR, self.refresh(efilter).get_q(user=user).connector)
+
+    def test_get_q__not_saved(self):
+        efilter = EntityFilter(id='creme_core-test_compilation', entity_type=FakeContact)
+        efilter._conditions_cache = []
+        self.assertEqual(Q(), efilter.get_q(user=self.get_root_user()))
+        self.assertIsNone(
+            compiled_q_cache.get('creme_core-test_compilation', self.get_root_user())
+        )
+
+    def test_get_q__date_range(self):
+        "Named date ranges depend on the current date => not cached."
+        efilter = self._create_filter(
+            condition_handler.DateRegularFieldConditionHandler.build_condition(
+                model=FakeContact, field_name='birthday', date_range='current_year',
+            ),
+        )
+        self.assertFalse(efilter.is_q_cacheable())
+
+        user = self.get_root_user()
+        efilter.get_q(user=user)
+        self.assertIsNone(compiled_q_cache.get(efilter.id, user))
+
+    def test_get_q__current_user(self):
+        efilter = self._create_filter(
+            condition_handler.RegularFieldConditionHandler.build_condition(
+                model=FakeContact, operator=operators.EQUALS,
+                field_name='user', values=[operands.CurrentUserOperand.type_id],
+            ),
+        )
+        self.assertTrue(efilter.is_q_cacheable())
+        self.assertTrue(efilter.depends_on_user())
+
+        user1 = self.get_root_user()
+        user2 = self.create_user()
+        q1 = efilter.get_q(user=user1)
+        q2 = efilter.get_q(user=user2)
+        self.assertNotEqual(q1, q2)
+        self.assertEqual(q1, compiled_q_cache.get(efilter.id, user1))
+        self.assertEqual(q2, compiled_q_cache.get(efilter.id, user2))
+
+        # The teams are used by the operand
+        team = self.create_team('Team #1', user2)
+        self.assertIsNone(compiled_q_cache.get(efilter.id, user2))
+
+        self.clear_global_info()
+        self.assertEqual(
+            Q(user__in=[user2.id, team.id]),
+            self.refresh(efilter).get_q(user=self.refresh(user2)),
+        )
+
+    def test_get_q__subfilter(self):
+        build_date_cond = condition_handler.DateRegularFieldConditionHandler.build_condition
+        sub_filter = self._create_filter(
+            build_date_cond(model=FakeContact, field_name='birthday', date_range='current_year'),
+            pk='creme_core-test_compilation_sub',
+        )
+        efilter = self._create_filter(
+            self._build_name_condition('Ikari'),
+            condition_handler.SubFilterConditionHandler.build_condition(sub_filter),
+        )
+        self.assertFalse(efilter.is_q_cacheable())
+        self.assertFalse(efilter.depends_on_user())
+
+        efilter.get_q(user=self.get_root_user())
+        self.assertIsNone(compiled_q_cache.get(efilter.id, self.get_root_user()))
+
+    @override_settings(CACHES=TEST_CACHES, CONFIG_CACHE_ALIAS='creme_config_test')
+    def test_shared_cache(self):
+        self.addCleanup(caches['creme_config_test'].clear)
+
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        user = self.get_root_user()
+        q = efilter.get_q(user=user)
+
+        # Another request
+        self.clear_global_info()
+        efilter = self.refresh(efilter)
+        with self.assertNumQueries(0):
+            self.assertEqual(q, efilter.get_q(user=user))
+
+        # Modified by another process
+        config_cache.invalidate(CompiledQCache.namespace)
+        self.assertEqual(q, compiled_q_cache.get(efilter.id, user))  # Same request
+
+        self.clear_global_info()
+        self.assertIsNone(compiled_q_cache.get(efilter.id, user))
+
+    def test_max_size(self):
+        cache = CompiledQCache()
+        cache.max_size = 2
+
+        efilter1 = self._create_filter(self._build_name_condition('Ikari'))
+        efilter2 = self._create_filter(
+            self._build_name_condition('Katsuragi'), pk='creme_core-test_compilation2',
+        )
+        efilter3 = self._create_filter(
+            self._build_name_condition('Langley'), pk='creme_core-test_compilation3',
+        )
+
+        user = self.get_root_user()
+        cache.set(efilter1, user, Q(last_name='Ikari'))
+        cache.set(efilter2, user, Q(last_name='Katsuragi'))
+        self.assertEqual(Q(last_name='Ikari'), cache.get(efilter1.id, user))
+
+        cache.set(efilter3, user, Q(last_name='Langley'))
+        self.assertIsNone(cache.get(efilter1.id, user))
+        self.assertEqual(Q(last_name='Langley'), cache.get(efilter3.id, user))
+
+
+class ExplainTestCase(CremeTestCase):
+    def _create_filter(self):
+        return EntityFilter.objects.create(
+            id='creme_core-test_explain', name='Test', entity_type=FakeOrganisation,
+        ).set_conditions(
+            [
+                condition_handler.RegularFieldConditionHandler.build_condition(
+                    model=FakeOrganisation, operator=operators.ICONTAINS,
+                    field_name='name', values=['NERV'],
+                ),
+            ],
+            check_cycles=False, check_privacy=False,
+        )
+
+    def test_explain(self):
+        efilter = self.refresh(self._create_filter())
+
+        explanation = explain(efilter, user=self.get_root_user())
+        self.assertIsInstance(explanation, FilterExplanation)
+        self.assertIn('NERV', explanation.sql)
+        self.assertIsInstance(explanation.plan, str)
+        self.assertTrue(explanation.plan)
+        self.assertEqual(1, explanation.compilation_queries)  # Conditions
+        self.assertGreaterEqual(explanation.compilation_duration, 0)
+        self.assertIs(explanation.cacheable, True)
+        self.assertIs(explanation.user_dependent, False)
+
+    def test_command(self):
+        efilter = self._create_filter()
+
+        stdout = StringIO()
+        call_command('creme_explain_filter', efilter.id, verbosity=0, stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn('SQL query:', output)
+        self.assertIn('NERV', output)
+        self.assertIn('Plan:', output)
+        self.assertIn('Cacheable: yes', output)
+
+    def test_command__errors(self):
+        with self.assertRaises(CommandError):
+            call_command('creme_explain_filter', 'creme_core-unknown', verbosity=0)
+
+        efilter = self._create_filter()
+        with self.assertRaises(CommandError):
+            call_command(
+                'creme_explain_filter', efilter.id, username='unknown', verbosity=0,
+            )
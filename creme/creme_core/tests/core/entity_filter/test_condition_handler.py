@@ -526,6 +526,38 @@ class RegularFieldConditionHandlerTestCase(_ConditionHandlerTestCase):
         self.assertIs(handler.accept(entity=doc2, user=user), False)
         self.assertIs(handler.accept(entity=doc3, user=user), False)
 
+    def test_prefetch__nested_fk(self):
+        user = self.get_root_user()
+
+        create_cat = FakeFolderCategory.objects.create
+        cat1 = create_cat(name='Pix')
+        cat2 = create_cat(name='Video')
+
+        create_folder = partial(FakeFolder.objects.create, user=user)
+        folder1 = create_folder(title='Pictures', category=cat1)
+        folder2 = create_folder(title='Videos',   category=cat2)
+
+        create_doc = partial(FakeDocument.objects.create, user=user)
+        doc1 = create_doc(title='Pix#1',   linked_folder=folder1)
+        doc2 = create_doc(title='Video#1', linked_folder=folder2)
+
+        handler = RegularFieldConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeDocument,
+            field_name='linked_folder__category',
+            operator_id=operators.EQUALS,
+            values=[cat1.id],
+        )
+        docs = [*FakeDocument.objects.filter(id__in=[doc1.id, doc2.id]).order_by('id')]
+
+        with self.assertNumQueries(1):
+            handler.prefetch(docs, user)
+
+        with self.assertNumQueries(0):
+            accepted = [handler.accept(entity=doc, user=user) for doc in docs]
+
+        self.assertListEqual([True, False], accepted)
+
     def test_accept__nested_fk__nullable(self):
         "Nullable nested ForeignKey (sub-field)."
         user = self.get_root_user()
@@ -692,6 +724,45 @@ class RegularFieldConditionHandlerTestCase(_ConditionHandlerTestCase):
         self.assertIs(handler4.accept(entity=doc2, user=user), True)
         self.assertIs(handler4.accept(entity=doc3, user=user), False)
 
+    def test_prefetch__m2m(self):
+        user = self.get_root_user()
+
+        create_cat = FakeDocumentCategory.objects.create
+        cat1 = create_cat(name='Picture')
+        cat2 = create_cat(name='Music')
+
+        create_doc = partial(
+            FakeDocument.objects.create,
+            user=user,
+            linked_folder=FakeFolder.objects.create(user=user, title='My docs'),
+        )
+        doc1 = create_doc(title='Picture#1')
+        doc1.categories.set([cat1])
+
+        doc2 = create_doc(title='Music#1')
+        doc2.categories.set([cat2])
+
+        doc3 = create_doc(title='Video#1')
+
+        handler = RegularFieldConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeDocument,
+            field_name='categories',
+            operator_id=operators.EQUALS,
+            values=[cat1.id],
+        )
+        docs = [
+            *FakeDocument.objects.filter(id__in=[doc1.id, doc2.id, doc3.id]).order_by('id'),
+        ]
+
+        with self.assertNumQueries(1):
+            handler.prefetch(docs, user)
+
+        with self.assertNumQueries(0):
+            accepted = [handler.accept(entity=doc, user=user) for doc in docs]
+
+        self.assertListEqual([True, False, False], accepted)
+
     def test_accept__m2m_n_snapshot(self):
         user = self.get_root_user()
         doc = FakeDocument.objects.create(
@@ -2247,6 +2318,56 @@ class CustomFieldConditionHandlerTestCase(_ConditionHandlerTestCase):
         self.assertIs(handler4.accept(entity=bebop,     user=user), True)
         self.assertIs(handler4.accept(entity=redtail,   user=user), False)
 
+    def test_prefetch__multienum(self):
+        user = self.get_root_user()
+
+        custom_field = CustomField.objects.create(
+            name='Type of ship', field_type=CustomField.MULTI_ENUM,
+            content_type=FakeOrganisation,
+        )
+
+        create_evalue = partial(
+            CustomFieldEnumValue.objects.create, custom_field=custom_field,
+        )
+        enum_attack = create_evalue(value='Attack')
+        enum_fret   = create_evalue(value='Fret')
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        bebop     = create_orga(name='Bebop')
+        swordfish = create_orga(name='Swordfish')
+        redtail   = create_orga(name='RedTail')
+
+        cf_memum = partial(CustomFieldMultiEnum, custom_field=custom_field)
+        cf_memum(entity=swordfish).set_value_n_save([enum_attack])
+        cf_memum(entity=bebop).set_value_n_save([enum_fret])
+
+        handler = CustomFieldConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeOrganisation,
+            custom_field=custom_field,
+            operator_id=operators.EQUALS,
+            values=[enum_attack.id],
+            related_name='customfieldmultienum',
+        )
+        handler.custom_field  # NB: fill the cache of the handler
+        orgas = [
+            *FakeOrganisation.objects.filter(
+                id__in=[bebop.id, swordfish.id, redtail.id],
+            ).order_by('id'),
+        ]
+
+        with self.assertNumQueries(2):
+            handler.prefetch(orgas, user)
+
+        with self.assertNumQueries(0):
+            accepted = [handler.accept(entity=orga, user=user) for orga in orgas]
+
+        self.assertListEqual([False, True, False], accepted)
+
+        # Already retrieved
+        with self.assertNumQueries(0):
+            handler.prefetch(orgas, user)
+
     def test_accept__snapshot__int(self):
         user = self.get_root_user()
 
@@ -3642,6 +3763,44 @@ class RelationConditionHandlerTestCase(_ConditionHandlerTestCase):
         self.assertIs(handler4.accept(entity=shinji, user=user), True)
         self.assertIs(handler4.accept(entity=asuka,  user=user), False)
 
+    def test_prefetch(self):
+        user = self.get_root_user()
+        loves = RelationType.objects.smart_update_or_create(
+            ('test-subject_love', 'Is loving'),
+            ('test-object_love',  'Is loved by'),
+        )[0]
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        shinji = create_contact(last_name='Ikari',     first_name='Shinji')
+        rei    = create_contact(last_name='Ayanami',   first_name='Rei')
+        misato = create_contact(last_name='Katsuragi', first_name='Misato')
+
+        nerv = FakeOrganisation.objects.create(user=user, name='Nerv')
+
+        create_rel = partial(Relation.objects.create, user=user, type=loves)
+        create_rel(subject_entity=shinji, object_entity=rei)
+        create_rel(subject_entity=misato, object_entity=nerv)
+
+        handler = RelationConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeContact,
+            rtype=loves.id,
+            ctype=ContentType.objects.get_for_model(FakeContact),
+        )
+        contacts = [
+            *FakeContact.objects.filter(id__in=[shinji.id, rei.id, misato.id]).order_by('id'),
+        ]
+        handler.prefetch(contacts, user)
+
+        with self.assertNumQueries(0):
+            accepted = [handler.accept(entity=contact, user=user) for contact in contacts]
+
+        self.assertListEqual([True, False, False], accepted)
+
+        # Already retrieved
+        with self.assertNumQueries(0):
+            handler.prefetch(contacts, user)
+
     def test_description(self):
         user = self.get_root_user()
 
@@ -4406,6 +4565,97 @@ class RelationSubFilterConditionHandlerTestCase(_ConditionHandlerTestCase):
             handler2.description(user),
         )
 
+    def test_accept(self):
+        user = self.get_root_user()
+        loves = RelationType.objects.smart_update_or_create(
+            ('test-subject_love', 'Is loving'),
+            ('test-object_love',  'Is loved by'),
+        )[0]
+
+        sub_filter = EntityFilter.objects.smart_update_or_create(
+            pk='test-filter01', name='Filter Ikari', model=FakeContact, is_custom=True,
+            conditions=[
+                RegularFieldConditionHandler.build_condition(
+                    model=FakeContact, field_name='last_name',
+                    operator=operators.EQUALS, values=['Ikari'],
+                ),
+            ],
+        )
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        shinji = create_contact(last_name='Ikari',     first_name='Shinji')
+        rei    = create_contact(last_name='Ayanami',   first_name='Rei')
+        asuka  = create_contact(last_name='Langley',   first_name='Asuka')
+        misato = create_contact(last_name='Katsuragi', first_name='Misato')
+
+        nerv = FakeOrganisation.objects.create(user=user, name='Ikari')
+
+        create_rel = partial(Relation.objects.create, user=user, type=loves)
+        create_rel(subject_entity=rei,    object_entity=shinji)
+        create_rel(subject_entity=asuka,  object_entity=misato)
+        create_rel(subject_entity=misato, object_entity=nerv)
+
+        handler1 = RelationSubFilterConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeContact, rtype=loves, subfilter=sub_filter,
+        )
+        self.assertIs(handler1.accept(entity=rei,    user=user), True)
+        self.assertIs(handler1.accept(entity=asuka,  user=user), False)
+        self.assertIs(handler1.accept(entity=misato, user=user), False)
+        self.assertIs(handler1.accept(entity=shinji, user=user), False)
+
+        # Exclude ---
+        handler2 = RelationSubFilterConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeContact, rtype=loves, subfilter=sub_filter, exclude=True,
+        )
+        self.assertIs(handler2.accept(entity=rei,    user=user), False)
+        self.assertIs(handler2.accept(entity=asuka,  user=user), True)
+        self.assertIs(handler2.accept(entity=misato, user=user), True)
+
+    def test_prefetch(self):
+        user = self.get_root_user()
+        loves = RelationType.objects.smart_update_or_create(
+            ('test-subject_love', 'Is loving'),
+            ('test-object_love',  'Is loved by'),
+        )[0]
+        ptype = CremePropertyType.objects.create(text='Pilot')
+
+        sub_filter = EntityFilter.objects.smart_update_or_create(
+            pk='test-filter01', name='Pilots', model=FakeContact, is_custom=True,
+            conditions=[
+                PropertyConditionHandler.build_condition(model=FakeContact, ptype=ptype),
+            ],
+        )
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        shinji = create_contact(last_name='Ikari',     first_name='Shinji')
+        rei    = create_contact(last_name='Ayanami',   first_name='Rei')
+        asuka  = create_contact(last_name='Langley',   first_name='Asuka')
+        misato = create_contact(last_name='Katsuragi', first_name='Misato')
+
+        CremeProperty.objects.create(creme_entity=shinji, type=ptype)
+
+        create_rel = partial(Relation.objects.create, user=user, type=loves)
+        create_rel(subject_entity=rei,   object_entity=shinji)
+        create_rel(subject_entity=asuka, object_entity=misato)
+
+        handler = RelationSubFilterConditionHandler(
+            efilter_type=EF_REGULAR,
+            model=FakeContact, rtype=loves, subfilter=self.refresh(sub_filter),
+        )
+        handler.subfilter.get_conditions()  # NB: fill the cache
+        ContentType.objects.get_for_model(CremeEntity)  # pre-fill the cache
+        contacts = [*FakeContact.objects.filter(id__in=[rei.id, asuka.id]).order_by('id')]
+
+        with self.assertNumQueries(3):  # Relations, objects & their properties
+            handler.prefetch(contacts, user)
+
+        with self.assertNumQueries(0):
+            accepted = [handler.accept(entity=contact, user=user) for contact in contacts]
+
+        self.assertListEqual([True, False], accepted)
+
     def test_description__errors(self):
         user = self.get_root_user()
 
@@ -4673,6 +4923,40 @@ class PropertyConditionHandlerTestCase(_ConditionHandlerTestCase):
         self.assertIs(handler2.accept(entity=shinji, user=user), True)
         self.assertIs(handler2.accept(entity=misato, user=user), True)
 
+    def test_prefetch(self):
+        user = self.get_root_user()
+        create_ptype = CremePropertyType.objects.create
+        cute  = create_ptype(text='Cute')
+        pilot = create_ptype(text='Pilot')
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        shinji = create_contact(last_name='Ikari',     first_name='Shinji')
+        rei    = create_contact(last_name='Ayanami',   first_name='Rei')
+        misato = create_contact(last_name='Katsuragi', first_name='Misato')
+
+        create_prop = CremeProperty.objects.create
+        create_prop(creme_entity=rei,    type=cute)
+        create_prop(creme_entity=shinji, type=pilot)
+
+        handler = PropertyConditionHandler(
+            efilter_type=EF_REGULAR, model=FakeContact, ptype=cute,
+        )
+        contacts = [
+            *FakeContact.objects.filter(id__in=[shinji.id, rei.id, misato.id]).order_by('id'),
+        ]
+
+        with self.assertNumQueries(1):
+            handler.prefetch(contacts, user)
+
+        with self.assertNumQueries(0):
+            accepted = [handler.accept(entity=contact, user=user) for contact in contacts]
+
+        self.assertListEqual([False, True, False], accepted)
+
+        # Already retrieved
+        with self.assertNumQueries(0):
+            handler.prefetch(contacts, user)
+
     def test_description(self):
         user = self.get_root_user()
         cute = CremePropertyType.objects.create(text='Cute')
@@ -0,0 +1,419 @@
+from functools import partial
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from creme.creme_core.auth import EntityCredentials
+from creme.creme_core.core.deletion import BulkEntityDeletion, EntityDeletor
+from creme.creme_core.core.entity_filter import (
+    EF_CREDENTIALS,
+    condition_handler,
+    operands,
+    operators,
+)
+from creme.creme_core.core.entity_filter.materialization import (
+    EntityFilterMaterializer,
+    get_materializer,
+    grouped_updates,
+)
+from creme.creme_core.models import (
+    CremeEntity,
+    CremeProperty,
+    CremePropertyType,
+    EntityFilter,
+    FakeContact,
+    FakeOrganisation,
+    MaterializedEntityFilter,
+    MaterializedEntityFilterEntry,
+    Relation,
+    RelationType,
+    SetCredentials,
+    UserRole,
+)
+
+from ...base import CremeTestCase
+
+
+@override_settings(MATERIALIZED_CREDENTIALS_FILTERS=True)
+class EntityFilterMaterializationTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.materializer = get_materializer()
+
+    def _create_filter(self, *conditions, model=FakeContact):
+        return EntityFilter.objects.create(
+            id='creme_core-test_materialization',
+            entity_type=model,
+            filter_type=EF_CREDENTIALS,
+        ).set_conditions(conditions, check_cycles=False, check_privacy=False)
+
+    def _create_role(self, efilter, *users):
+        role = UserRole.objects.create(name='Coder', allowed_apps=['creme_core'])
+        SetCredentials.objects.create(
+            role=role,
+            value=EntityCredentials.VIEW,
+            set_type=SetCredentials.ESET_FILTER,
+            ctype=None if efilter.entity_type.model_class() is CremeEntity else FakeContact,
+            efilter=efilter,
+        )
+
+        for user in users:
+            user.is_superuser = False
+            user.role = role
+            user.save()
+
+        return role
+
+    @staticmethod
+    def _stored_ids(efilter, user=None):
+        return {
+            *MaterializedEntityFilterEntry.objects.filter(
+                mfilter__efilter=efilter, mfilter__user=user,
+            ).values_list('entity', flat=True)
+        }
+
+    @staticmethod
+    def _build_name_condition(name, model=FakeContact):
+        return condition_handler.RegularFieldConditionHandler.build_condition(
+            model=model, operator=operators.IEQUALS,
+            field_name='last_name', values=[name],
+            filter_type=EF_CREDENTIALS,
+        )
+
+    @staticmethod
+    def _build_owner_condition(model=CremeEntity):
+        return condition_handler.RegularFieldConditionHandler.build_condition(
+            model=model, operator=operators.EQUALS,
+            field_name='user', values=[operands.CurrentUserOperand.type_id],
+            filter_type=EF_CREDENTIALS,
+        )
+
+    def test_get_materializer(self):
+        self.assertIsInstance(self.materializer, EntityFilterMaterializer)
+
+        with override_settings(MATERIALIZED_CREDENTIALS_FILTERS=False):
+            self.assertIsNone(get_materializer())
+
+    def test_is_materializable(self):
+        materializer = self.materializer
+        efilter1 = self._create_filter(self._build_name_condition('Ikari'))
+        self.assertTrue(materializer.is_materializable(efilter1))
+        self.assertFalse(materializer.depends_on_user(efilter1))
+
+        # NB: the conditions on dates cannot be used by the credentials
+        #     (by default), but the materializer should manage them
+        efilter2 = EntityFilter.objects.create(
+            id='creme_core-test_materialization2',
+            entity_type=FakeContact,
+        ).set_conditions(
+            [
+                condition_handler.DateRegularFieldConditionHandler.build_condition(
+                    model=FakeContact, field_name='birthday', date_range='current_year',
+                ),
+            ],
+            check_cycles=False, check_privacy=False,
+        )
+        self.assertFalse(materializer.is_materializable(efilter2))
+
+        with self.assertRaises(ValueError):
+            materializer.build(efilter2)
+
+        efilter3 = EntityFilter.objects.create(
+            id='creme_core-test_materialization3',
+            entity_type=CremeEntity,
+            filter_type=EF_CREDENTIALS,
+        ).set_conditions(
+            [self._build_owner_condition()], check_cycles=False, check_privacy=False,
+        )
+        self.assertTrue(materializer.is_materializable(efilter3))
+        self.assertTrue(materializer.depends_on_user(efilter3))
+
+        with self.assertRaises(ValueError):
+            materializer.build(efilter3)
+
+    def test_build(self):
+        user = self.create_user(index=1)
+        other_user = self.get_root_user()
+
+        create_contact = partial(FakeContact.objects.create, user=other_user)
+        contact1 = create_contact(first_name='Shinji', last_name='Ikari')
+        contact2 = create_contact(first_name='Rei',    last_name='Ayanami')
+        contact3 = create_contact(first_name='Gendo',  last_name='Ikari')
+
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        self._create_role(efilter, user)
+
+        materializer = self.materializer
+        self.assertEqual(2, materializer.build(efilter))
+        self.assertSetEqual({contact1.id, contact3.id}, self._stored_ids(efilter))
+
+        # Build again => replaced
+        self.assertEqual(2, materializer.build(efilter))
+        self.assertEqual(1, MaterializedEntityFilter.objects.filter(efilter=efilter).count())
+
+        # The stored entities are used by the credentials
+        MaterializedEntityFilterEntry.objects.filter(entity=contact3.id).delete()
+
+        qs = FakeContact.objects.filter(id__in=[contact1.id, contact2.id, contact3.id])
+        user = self.refresh(user)
+        self.assertListEqual(
+            [contact1], [*EntityCredentials.filter(user, qs, perm=EntityCredentials.VIEW)],
+        )
+
+        self.assertTupleEqual(({contact3.id}, set()), materializer.check(efilter))
+
+        # Not used when the materialization is disabled
+        with override_settings(MATERIALIZED_CREDENTIALS_FILTERS=False):
+            self.assertCountEqual(
+                [contact1, contact3],
+                EntityCredentials.filter(user, qs, perm=EntityCredentials.VIEW),
+            )
+
+    def test_update_on_save(self):
+        user = self.get_root_user()
+        create_contact = partial(FakeContact.objects.create, user=user)
+        contact1 = create_contact(first_name='Shinji', last_name='Ikari')
+        contact2 = create_contact(first_name='Rei',    last_name='Ayanami')
+
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        self.materializer.build(efilter)
+        self.assertSetEqual({contact1.id}, self._stored_ids(efilter))
+
+        contact2.last_name = 'Ikari'
+        contact2.save()
+        self.assertSetEqual({contact1.id, contact2.id}, self._stored_ids(efilter))
+
+        contact1.last_name = 'Katsuragi'
+        contact1.save()
+        self.assertSetEqual({contact2.id}, self._stored_ids(efilter))
+
+        contact3 = create_contact(first_name='Gendo', last_name='Ikari')
+        self.assertSetEqual({contact2.id, contact3.id}, self._stored_ids(efilter))
+
+        # Other model
+        FakeOrganisation.objects.create(user=user, name='Ikari')
+        self.assertSetEqual({contact2.id, contact3.id}, self._stored_ids(efilter))
+
+        contact3.delete()
+        self.assertSetEqual({contact2.id}, self._stored_ids(efilter))
+
+    def test_update_relations_n_properties(self):
+        user = self.get_root_user()
+        create_contact = partial(FakeContact.objects.create, user=user)
+        contact1 = create_contact(first_name='Shinji', last_name='Ikari')
+        contact2 = create_contact(first_name='Rei',    last_name='Ayanami')
+        orga = FakeOrganisation.objects.create(user=user, name='Nerv')
+
+        ptype = CremePropertyType.objects.create(text='Is a pilot')
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed', 'is employed by'),
+            ('test-object_employed',  'employs'),
+        )[0]
+
+        efilter = EntityFilter.objects.create(
+            id='creme_core-test_materialization',
+            entity_type=FakeContact,
+            filter_type=EF_CREDENTIALS,
+            use_or=True,
+        ).set_conditions(
+            [
+                condition_handler.PropertyConditionHandler.build_condition(
+                    model=FakeContact, ptype=ptype, has=True, filter_type=EF_CREDENTIALS,
+                ),
+                condition_handler.RelationConditionHandler.build_condition(
+                    model=FakeContact, rtype=rtype, has=True, filter_type=EF_CREDENTIALS,
+                ),
+            ],
+            check_cycles=False, check_privacy=False,
+        )
+        self.materializer.build(efilter)
+        self.assertSetEqual(set(), self._stored_ids(efilter))
+
+        prop = CremeProperty.objects.create(type=ptype, creme_entity=contact1)
+        self.assertSetEqual({contact1.id}, self._stored_ids(efilter))
+
+        relation = Relation.objects.create(
+            user=user, subject_entity=contact2, type=rtype, object_entity=orga,
+        )
+        self.assertSetEqual({contact1.id, contact2.id}, self._stored_ids(efilter))
+
+        prop.delete()
+        self.assertSetEqual({contact2.id}, self._stored_ids(efilter))
+
+        relation.delete()
+        self.assertSetEqual(set(), self._stored_ids(efilter))
+
+    def test_grouped_updates(self):
+        user = self.get_root_user()
+        create_contact = partial(FakeContact.objects.create, user=user)
+        contact1 = create_contact(first_name='Shinji', last_name='Ikari')
+        contact2 = create_contact(first_name='Rei',    last_name='Ayanami')
+        contact3 = create_contact(first_name='Asuka',  last_name='Langley')
+
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        materializer = self.materializer
+        materializer.build(efilter)
+        self.assertSetEqual({contact1.id}, self._stored_ids(efilter))
+
+        with grouped_updates() as grouped_materializer:
+            self.assertIs(materializer, grouped_materializer)
+
+            # NB: no signal
+            FakeContact.objects.filter(
+                id__in=[contact2.id, contact3.id],
+            ).update(last_name='Ikari')
+            materializer.update_ids([contact2.id, contact3.id])
+
+            contact1.last_name = 'Katsuragi'
+            contact1.save()
+
+            # Nested block
+            with materializer.grouped_updates():
+                contact3.last_name = 'Soryu'
+                contact3.save()
+
+            self.assertSetEqual({contact1.id}, self._stored_ids(efilter))
+
+        self.assertSetEqual({contact2.id}, self._stored_ids(efilter))
+
+        with override_settings(MATERIALIZED_CREDENTIALS_FILTERS=False):
+            with grouped_updates() as grouped_materializer:
+                self.assertIsNone(grouped_materializer)
+
+    def test_bulk_deletion(self):
+        "The remaining entities lose their relationships with the deleted ones."
+        user = self.get_root_user()
+        contact = FakeContact.objects.create(user=user, first_name='Shinji', last_name='Ikari')
+        orga = FakeOrganisation.objects.create(user=user, name='Nerv')
+
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed', 'is employed by'),
+            ('test-object_employed',  'employs'),
+        )[0]
+        Relation.objects.create(
+            user=user, subject_entity=contact, type=rtype, object_entity=orga,
+        )
+
+        efilter = self._create_filter(
+            condition_handler.RelationConditionHandler.build_condition(
+                model=FakeContact, rtype=rtype, has=True, filter_type=EF_CREDENTIALS,
+            ),
+        )
+        self.materializer.build(efilter)
+        self.assertSetEqual({contact.id}, self._stored_ids(efilter))
+
+        BulkEntityDeletion(
+            model=FakeOrganisation, user=user, deletor=EntityDeletor(),
+        ).perform([orga])
+        self.assertDoesNotExist(orga)
+        self.assertSetEqual(set(), self._stored_ids(efilter))
+
+    def test_user_dependent(self):
+        user = self.create_user(index=1)
+        other_user = self.create_user(index=2)
+
+        create_orga = FakeOrganisation.objects.create
+        orga1 = create_orga(user=user,       name='Nerv')
+        orga2 = create_orga(user=other_user, name='Seele')
+
+        efilter = self._create_filter(self._build_owner_condition(), model=CremeEntity)
+        self._create_role(efilter, user)
+
+        materializer = self.materializer
+        self.assertListEqual(
+            [(efilter, user)], [*materializer.credentials_filters()],
+        )
+        materializer.build(efilter, user)
+
+        # NB: the user owns its own Contact too
+        def stored_orga_ids():
+            return {
+                *FakeOrganisation.objects.filter(
+                    id__in=self._stored_ids(efilter, user),
+                ).values_list('id', flat=True),
+            }
+
+        self.assertSetEqual({orga1.id}, stored_orga_ids())
+
+        user = self.refresh(user)
+        qs = FakeOrganisation.objects.filter(id__in=[orga1.id, orga2.id])
+        self.assertListEqual(
+            [orga1], [*EntityCredentials.filter(user, qs, perm=EntityCredentials.VIEW)],
+        )
+        self.assertListEqual(
+            [orga1.id],
+            [
+                *EntityCredentials.filter_entities(
+                    user,
+                    CremeEntity.objects.filter(id__in=[orga1.id, orga2.id]),
+                    perm=EntityCredentials.VIEW,
+                ).values_list('id', flat=True),
+            ],
+        )
+
+        # Team membership
+        with self.captureOnCommitCallbacks(execute=True):
+            team = self.create_team('Team', user, other_user)
+        orga3 = create_orga(user=team, name='Wille')
+        self.assertSetEqual({orga1.id, orga3.id}, stored_orga_ids())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            team.teammates = [other_user]
+        self.assertSetEqual({orga1.id}, stored_orga_ids())
+
+    def test_conditions_modification(self):
+        user = self.create_user(index=1)
+        create_contact = partial(FakeContact.objects.create, user=user)
+        contact1 = create_contact(first_name='Shinji', last_name='Ikari')
+        contact2 = create_contact(first_name='Rei',    last_name='Ayanami')
+
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        self._create_role(efilter, user)
+        self.materializer.build(efilter)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            efilter.set_conditions(
+                [self._build_name_condition('Ayanami')],
+                check_cycles=False, check_privacy=False,
+            )
+            self.assertFalse(MaterializedEntityFilter.objects.filter(efilter=efilter))
+
+        self.assertSetEqual({contact2.id}, self._stored_ids(efilter))
+        self.assertNotIn(contact1.id, self._stored_ids(efilter))
+
+    def test_command(self):
+        user = self.create_user(index=1)
+        create_contact = partial(FakeContact.objects.create, user=user)
+        contact1 = create_contact(first_name='Shinji', last_name='Ikari')
+        contact2 = create_contact(first_name='Rei',    last_name='Ayanami')
+
+        efilter = self._create_filter(self._build_name_condition('Ikari'))
+        self._create_role(efilter, user)
+
+        # Not used anymore => removed
+        other_efilter = EntityFilter.objects.create(
+            id='creme_core-test_materialization2',
+            entity_type=FakeContact,
+            filter_type=EF_CREDENTIALS,
+        )
+        MaterializedEntityFilter.objects.create(efilter=other_efilter)
+
+        call_command('creme_materialize_filters', verbosity=0)
+        self.assertSetEqual({contact1.id}, self._stored_ids(efilter))
+        self.assertFalse(MaterializedEntityFilter.objects.filter(efilter=other_efilter))
+
+        call_command('creme_materialize_filters', check=True, verbosity=0)
+
+        # No signal => not consistent
+        FakeContact.objects.filter(id=contact2.id).update(last_name='Ikari')
+
+        stderr = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('creme_materialize_filters', check=True, verbosity=0, stderr=stderr)
+        self.assertIn(f'missing entities: [{contact2.id}]', stderr.getvalue())
+
+        with override_settings(MATERIALIZED_CREDENTIALS_FILTERS=False):
+            with self.assertRaises(CommandError):
+                call_command('creme_materialize_filters', verbosity=0)
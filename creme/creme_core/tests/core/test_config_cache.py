@@ -0,0 +1,269 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db.models import signals
+from django.test.utils import override_settings
+
+from creme.creme_core.core.config_cache import ConfigCache, config_cache
+from creme.creme_core.core.entity_cell import EntityCellRegularField
+from creme.creme_core.core.setting_key import SettingKey, setting_key_registry
+from creme.creme_core.models import (
+    CustomField,
+    EntityFilter,
+    EntityFilterCondition,
+    FakeContact,
+    FakeOrganisation,
+    FieldsConfig,
+    SearchConfigItem,
+    SettingValue,
+)
+
+from ..base import CremeTestCase
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'creme_config_test': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'creme_config_test',
+    },
+}
+
+
+@override_settings(CACHES=TEST_CACHES, CONFIG_CACHE_ALIAS='creme_config_test')
+class ConfigCacheTestCase(CremeTestCase):
+    def tearDown(self):
+        super().tearDown()
+        caches['creme_config_test'].clear()
+
+    def _watch(self, cache, namespace, model):
+        cache.watch(namespace, model)
+
+        for signal in (signals.post_save, signals.post_delete):
+            self.addCleanup(
+                signal.disconnect,
+                sender=model,
+                dispatch_uid=f'creme_core-config_cache-{namespace}-{model._meta.label}',
+            )
+
+    def test_disabled(self):
+        cache = ConfigCache()
+
+        with override_settings(CONFIG_CACHE_ALIAS=None):
+            self.assertIsNone(cache.backend)
+
+            cache.set_many('creme_core-test', {'key1': 1})
+            self.assertDictEqual({}, cache.get_many('creme_core-test', ['key1']))
+
+            cache.invalidate('creme_core-test')  # No error
+
+    def test_get_n_set(self):
+        cache = ConfigCache()
+        self.assertIs(caches['creme_config_test'], cache.backend)
+
+        ns = 'creme_core-test'
+        self.assertDictEqual({}, cache.get_many(ns, ['key1', 'key2']))
+
+        cache.set_many(ns, {'key1': [1, 2], 'key2': 'value'})
+        self.assertDictEqual(
+            {'key1': [1, 2], 'key2': 'value'},
+            cache.get_many(ns, ['key1', 'key2', 'key3']),
+        )
+        self.assertDictEqual({}, cache.get_many('creme_core-other', ['key1']))
+
+    def test_invalidate(self):
+        cache = ConfigCache()
+        ns1 = 'creme_core-test1'
+        ns2 = 'creme_core-test2'
+        cache.set_many(ns1, {'key1': 1})
+        cache.set_many(ns2, {'key1': 2})
+
+        cache.invalidate(ns1)
+        self.assertDictEqual({}, cache.get_many(ns1, ['key1']))
+        self.assertDictEqual({'key1': 2}, cache.get_many(ns2, ['key1']))
+
+        # Version evicted
+        caches['creme_config_test'].clear()
+        cache.invalidate(ns2)
+        self.assertDictEqual({}, cache.get_many(ns2, ['key1']))
+
+    def test_get_version(self):
+        cache = ConfigCache()
+        ns = 'creme_core-test_version'
+
+        version1 = cache.get_version(ns)
+        self.assertIsInstance(version1, int)
+        self.assertEqual(version1, cache.get_version(ns))
+
+        cache.invalidate(ns)
+        version2 = cache.get_version(ns)
+        self.assertIsInstance(version2, int)
+        self.assertNotEqual(version1, version2)
+
+        with override_settings(CONFIG_CACHE_ALIAS=None):
+            self.assertIsNone(cache.get_version(ns))
+
+    def test_is_dirty(self):
+        cache = ConfigCache()
+        ns = 'creme_core-test_dirty'
+        self._watch(cache, ns, SettingValue)
+        self.assertFalse(cache.is_dirty(ns))
+
+        SettingValue.objects.create(key_id='creme_core-test_dirty', json_value=12)
+        self.assertTrue(cache.is_dirty(ns))
+        self.assertFalse(cache.is_dirty('creme_core-other'))
+
+        self.clear_global_info()
+        self.assertFalse(cache.is_dirty(ns))
+
+    def test_watch(self):
+        cache = ConfigCache()
+        ns = 'creme_core-test_watch'
+        self._watch(cache, ns, SettingValue)
+        self.assertDictEqual({ns: {SettingValue}}, cache.namespaces)
+
+        cache.set_many(ns, {'key1': 1})
+        self.assertDictEqual({'key1': 1}, cache.get_many(ns, ['key1']))
+
+        sv = SettingValue.objects.create(key_id='creme_core-test_watch', json_value=12)
+        self.assertDictEqual({}, cache.get_many(ns, ['key1']))
+
+        # Modified in the current transaction => not stored
+        cache.set_many(ns, {'key1': 1})
+        self.assertDictEqual({}, cache.get_many(ns, ['key1']))
+
+        self.clear_global_info()
+        cache.set_many(ns, {'key1': 1})
+        self.assertDictEqual({'key1': 1}, cache.get_many(ns, ['key1']))
+
+        sv.delete()
+        self.assertDictEqual({}, cache.get_many(ns, ['key1']))
+
+    def test_clear(self):
+        cache = ConfigCache()
+        ns = 'creme_core-test_clear'
+        self._watch(cache, ns, SettingValue)
+        cache.set_many(ns, {'key1': 1})
+
+        cache.clear()
+        self.assertDictEqual({}, cache.get_many(ns, ['key1']))
+
+    def test_fields_config(self):
+        FieldsConfig.objects.create(
+            content_type=FakeContact,
+            descriptions=[('phone', {FieldsConfig.HIDDEN: True})],
+        )
+        ContentType.objects.get_for_model(FakeOrganisation)  # Fill the cache of ContentType
+        self.clear_global_info()
+
+        with self.assertNumQueries(1):
+            fconfigs = FieldsConfig.objects.get_for_models([FakeContact, FakeOrganisation])
+        self.assertTrue(fconfigs[FakeContact].is_fieldname_hidden('phone'))
+        self.assertFalse(fconfigs[FakeOrganisation].is_fieldname_hidden('phone'))
+
+        self.clear_global_info()
+        with self.assertNumQueries(0):
+            fconfigs = FieldsConfig.objects.get_for_models([FakeContact, FakeOrganisation])
+        self.assertTrue(fconfigs[FakeContact].is_fieldname_hidden('phone'))
+        self.assertFalse(fconfigs[FakeOrganisation].is_fieldname_hidden('phone'))
+
+        # Invalidation
+        fconf = FieldsConfig.objects.get(
+            content_type=ContentType.objects.get_for_model(FakeContact),
+        )
+        fconf.descriptions = [('mobile', {FieldsConfig.HIDDEN: True})]
+        fconf.save()
+
+        self.clear_global_info()
+        fconfig = FieldsConfig.objects.get_for_model(FakeContact)
+        self.assertFalse(fconfig.is_fieldname_hidden('phone'))
+        self.assertTrue(fconfig.is_fieldname_hidden('mobile'))
+
+    def test_custom_fields(self):
+        cfield = CustomField.objects.create(
+            content_type=FakeContact, name='Size', field_type=CustomField.INT,
+        )
+        self.clear_global_info()
+
+        with self.assertNumQueries(1):
+            cfields = CustomField.objects.get_for_model(FakeContact)
+        self.assertListEqual([cfield.id], [*cfields.keys()])
+
+        self.clear_global_info()
+        with self.assertNumQueries(0):
+            cfields = CustomField.objects.get_for_model(FakeContact)
+        self.assertEqual('Size', cfields[cfield.id].name)
+
+        cfield.name = 'Height'
+        cfield.save()
+
+        self.clear_global_info()
+        with self.assertNumQueries(1):
+            cfields = CustomField.objects.get_for_model(FakeContact)
+        self.assertEqual('Height', cfields[cfield.id].name)
+
+    def test_setting_values(self):
+        skey = SettingKey(
+            id='creme_core-test_config_cache',
+            description='Page size',
+            app_label='creme_core', type=SettingKey.INT,
+        )
+        setting_key_registry.register(skey)
+        self.addCleanup(setting_key_registry.unregister, skey)
+
+        SettingValue.objects.set_4_key(skey, 12)
+        self.clear_global_info()
+
+        with self.assertNumQueries(1):
+            value = SettingValue.objects.value_4_key(skey)
+        self.assertEqual(12, value)
+
+        self.clear_global_info()
+        with self.assertNumQueries(0):
+            value = SettingValue.objects.value_4_key(skey)
+        self.assertEqual(12, value)
+
+        SettingValue.objects.set_4_key(skey, 25)
+        self.clear_global_info()
+        self.assertEqual(25, SettingValue.objects.value_4_key(skey))
+
+    def test_search_config(self):
+        user = self.get_root_user()
+        sci = SearchConfigItem.objects.create(
+            content_type=FakeContact,
+            cells=[EntityCellRegularField.build(FakeContact, 'first_name')],
+        )
+        self.clear_global_info()
+
+        models = [FakeContact, FakeOrganisation]
+        with self.assertNumQueries(1):
+            items = [*SearchConfigItem.objects.iter_for_models(models, user)]
+        self.assertListEqual([sci.id], [item.id for item in items])
+
+        self.clear_global_info()
+        with self.assertNumQueries(0):
+            items = [*SearchConfigItem.objects.iter_for_models(models, user)]
+        self.assertListEqual([sci.id], [item.id for item in items])
+        self.assertListEqual(
+            ['regular_field-first_name'], [cell.key for cell in items[0].cells],
+        )
+
+        sci.cells = [EntityCellRegularField.build(FakeContact, 'last_name')]
+        sci.save()
+
+        self.clear_global_info()
+        item = self.get_alone_element(
+            SearchConfigItem.objects.iter_for_models([FakeContact], user)
+        )
+        self.assertListEqual(['regular_field-last_name'], [cell.key for cell in item.cells])
+
+    def test_global_instance(self):
+        namespaces = config_cache.namespaces
+        self.assertEqual({FieldsConfig}, namespaces.get('creme_core-fields_config'))
+        self.assertEqual({CustomField}, namespaces.get('creme_core-custom_fields'))
+        self.assertEqual({SettingValue}, namespaces.get('creme_core-setting_values'))
+        self.assertEqual({SearchConfigItem}, namespaces.get('creme_core-search_config'))
+        self.assertEqual(
+            {EntityFilter, EntityFilterCondition},
+            namespaces.get('creme_core-entity_filters'),
+        )
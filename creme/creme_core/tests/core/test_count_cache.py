@@ -0,0 +1,159 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+from creme.creme_core.core.count_cache import (
+    EntityCountCache,
+    entity_count_cache,
+)
+from creme.creme_core.models import (
+    CremeEntity,
+    CremeProperty,
+    CremePropertyType,
+    FakeContact,
+    FakeOrganisation,
+    Relation,
+    RelationType,
+)
+
+from ..base import CremeTestCase
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'creme_count_test': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'creme_count_test',
+    },
+}
+
+
+@override_settings(CACHES=TEST_CACHES, LISTVIEW_COUNT_CACHE_ALIAS='creme_count_test')
+class EntityCountCacheTestCase(CremeTestCase):
+    def tearDown(self):
+        super().tearDown()
+        caches['creme_count_test'].clear()
+
+    def test_disabled(self):
+        cache = EntityCountCache()
+
+        with override_settings(LISTVIEW_COUNT_CACHE_ALIAS=None):
+            self.assertIsNone(cache.backend)
+
+            qs = FakeContact.objects.all()
+            cache.set(qs, 12)
+            self.assertIsNone(cache.get(qs))
+            self.assertEqual(qs.count(), cache.count(qs))
+
+            cache.invalidate(12)  # No error
+
+    def test_get_n_set(self):
+        cache = EntityCountCache()
+        self.assertIs(caches['creme_count_test'], cache.backend)
+
+        qs1 = FakeContact.objects.filter(last_name='Spiegel')
+        qs2 = FakeContact.objects.filter(last_name='Valentine')
+        self.assertIsNone(cache.get(qs1))
+
+        cache.set(qs1, 12)
+        self.assertEqual(12, cache.get(qs1))
+        self.assertIsNone(cache.get(qs2))
+        self.assertEqual(12, cache.count(qs1))
+
+        with self.assertNumQueries(1):
+            count2 = cache.count(qs2)
+        self.assertEqual(0, count2)
+
+        with self.assertNumQueries(0):
+            cache.count(qs2)
+
+        # Empty queryset (no SQL)
+        qs3 = FakeContact.objects.none()
+        cache.set(qs3, 0)
+        self.assertIsNone(cache.get(qs3))
+
+    def test_model(self):
+        cache = EntityCountCache()
+        qs = CremeEntity.objects.filter(
+            entity_type=ContentType.objects.get_for_model(FakeContact),
+        )
+
+        cache.set(qs, 12, model=FakeContact)
+        self.assertEqual(12, cache.get(qs, model=FakeContact))
+
+        FakeOrganisation.objects.create(user=self.get_root_user(), name='Bebop')
+        self.assertEqual(12, cache.get(qs, model=FakeContact))
+
+        FakeContact.objects.create(user=self.get_root_user(), last_name='Spiegel')
+        self.assertIsNone(cache.get(qs, model=FakeContact))
+
+    def test_invalidation(self):
+        user = self.get_root_user()
+        spike = FakeContact.objects.create(user=user, first_name='Spike', last_name='Spiegel')
+        bebop = FakeOrganisation.objects.create(user=user, name='Bebop')
+
+        cache = entity_count_cache
+        contacts_qs = FakeContact.objects.filter(last_name='Spiegel')
+        orgas_qs = FakeOrganisation.objects.all()
+
+        def set_counts():
+            cache.set(contacts_qs, 12)
+            cache.set(orgas_qs, 24)
+
+        # NB: the counts are not stored if entities of the model have been
+        #     modified in the transaction (& the test is in a transaction)
+        set_counts()
+        self.assertIsNone(cache.get(contacts_qs))
+        self.assertIsNone(cache.get(orgas_qs))
+
+        cache._dirty_ctype_ids().clear()
+        set_counts()
+        self.assertEqual(12, cache.get(contacts_qs))
+        self.assertEqual(24, cache.get(orgas_qs))
+
+        # Entity ---
+        spike.first_name = 'Spiky'
+        spike.save()
+        self.assertIsNone(cache.get(contacts_qs))
+        self.assertEqual(24, cache.get(orgas_qs))
+
+        # Property ---
+        cache._dirty_ctype_ids().clear()
+        set_counts()
+        ptype = CremePropertyType.objects.create(text='Is a bounty hunter')
+        prop = CremeProperty.objects.create(type=ptype, creme_entity=spike)
+        self.assertIsNone(cache.get(contacts_qs))
+        self.assertEqual(24, cache.get(orgas_qs))
+
+        cache._dirty_ctype_ids().clear()
+        set_counts()
+        prop.delete()
+        self.assertIsNone(cache.get(contacts_qs))
+
+        # Relation (symmetrical => both types) ---
+        cache._dirty_ctype_ids().clear()
+        set_counts()
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_pilot', 'pilots'),
+            ('test-object_pilot',  'is piloted by'),
+        )[0]
+        Relation.objects.create(
+            user=user, subject_entity=spike, type=rtype, object_entity=bebop,
+        )
+        self.assertIsNone(cache.get(contacts_qs))
+        self.assertIsNone(cache.get(orgas_qs))
+
+    def test_invalidation_on_commit(self):
+        cache = entity_count_cache
+        qs = FakeContact.objects.all()
+        ct_id = ContentType.objects.get_for_model(FakeContact).id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FakeContact.objects.create(user=self.get_root_user(), last_name='Spiegel')
+            self.assertIn(ct_id, cache._dirty_ctype_ids())
+
+        self.assertNotIn(ct_id, cache._dirty_ctype_ids())
+
+        cache.set(qs, 12)
+        self.assertEqual(12, cache.get(qs))
@@ -2,13 +2,14 @@ from functools import partial
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
-from django.db.models import ProtectedError
+from django.db.models import ProtectedError, signals
 from django.test.utils import override_settings
 from django.utils.translation import gettext as _
 from parameterized import parameterized
 
 from creme.creme_core.core.deletion import (
     REPLACERS_MAP,
+    BulkEntityDeletion,
     EntityDeletor,
     EntityDeletorRegistry,
     FixedValueReplacer,
@@ -23,14 +24,17 @@ from creme.creme_core.models import (
     FakeContact,
     FakeDocument,
     FakeDocumentCategory,
+    FakeFolder,
     FakeInvoice,
     FakeInvoiceLine,
     FakeOrganisation,
     FakeSector,
     FakeTicket,
     FakeTicketPriority,
+    HistoryLine,
     Relation,
     RelationType,
+    history,
 )
 
 from ..base import CremeTestCase
@@ -435,6 +439,121 @@ class EntityDeletionTestCase(CremeTestCase):
         self.assertDoesNotExist(line)
         self.assertStillExists(invoice)
 
+    def test_allows_bulk_deletion(self):
+        deletor = EntityDeletor()
+        self.assertIs(deletor.allows_bulk_deletion(FakeOrganisation), True)
+        self.assertIs(deletor.allows_bulk_deletion(FakeFolder), True)
+
+        # FileField
+        self.assertIs(deletor.allows_bulk_deletion(FakeDocument), False)
+
+        # Specific deletor
+        class SpecificDeletor(EntityDeletor):
+            def _delete(self, user, entity):
+                super()._delete(user=user, entity=entity)
+
+        self.assertIs(SpecificDeletor().allows_bulk_deletion(FakeOrganisation), False)
+
+        # Specific signal handler
+        def _handler(sender, instance, **kwargs):
+            pass
+
+        signals.pre_delete.connect(_handler, sender=FakeOrganisation)
+        self.addCleanup(signals.pre_delete.disconnect, _handler, sender=FakeOrganisation)
+        self.assertIs(deletor.allows_bulk_deletion(FakeOrganisation), False)
+        self.assertIs(deletor.allows_bulk_deletion(FakeFolder), True)
+
+    def test_bulk_deletion(self):
+        user = self.get_root_user()
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user, is_deleted=True)
+        entity1 = create_orga(name='Nerv')
+        entity2 = create_orga(name='Seele')
+        entity3 = create_orga(name='Gehirn')
+        entity4 = create_orga(name='Neo tokyo', is_deleted=False)
+
+        create_rtype = RelationType.objects.smart_update_or_create
+        rtype1 = create_rtype(
+            ('test-subject_linked', 'is linked to'),
+            ('test-object_linked',  'is linked to'),
+        )[0]
+        rtype2 = create_rtype(
+            ('test-subject_daughter', 'is a daughter of'),
+            ('test-object_daughter',  'has a daughter'),
+            is_internal=True,
+        )[0]
+        create_rel = partial(Relation.objects.create, user=user, object_entity=entity4)
+        rel1 = create_rel(type=rtype1, subject_entity=entity1)
+        create_rel(type=rtype2, subject_entity=entity3)
+
+        ptype = CremePropertyType.objects.create(text='has eva')
+        prop = CremeProperty.objects.create(type=ptype, creme_entity=entity2)
+
+        deletion = BulkEntityDeletion(
+            model=FakeOrganisation, user=user, deletor=EntityDeletor(),
+        )
+        self.assertEqual(0, deletion.deleted_count)
+
+        entities = [entity1, entity2, entity3]
+        errors = deletion.check(entities)
+        self.assertDictEqual(
+            {entity3.id: _('Can not be deleted because of links with other entities.')},
+            errors,
+        )
+
+        hline_id = HistoryLine.objects.order_by('-id').first().id
+
+        with self.assertNoException():
+            deletion.perform([e for e in entities if e.id not in errors])
+
+        self.assertEqual(2, deletion.deleted_count)
+        self.assertDoesNotExist(entity1)
+        self.assertDoesNotExist(entity2)
+        self.assertStillExists(entity3)
+        self.assertStillExists(entity4)
+        self.assertDoesNotExist(rel1)
+        self.assertDoesNotExist(prop)
+
+        self.assertFalse(
+            HistoryLine.objects.filter(id__gt=hline_id, type=history.TYPE_DELETION)
+        )
+
+        # ---
+        deletion.write_history()
+        self.assertEqual(0, deletion.deleted_count)
+
+        hline = HistoryLine.objects.order_by('-id').first()
+        self.assertEqual(history.TYPE_MASS_DELETION, hline.type)
+        self.assertEqual(FakeOrganisation, hline.entity_ctype.model_class())
+        self.assertEqual(user, hline.entity_owner)
+        self.assertListEqual([2], hline.modifications)
+
+        # Nothing deleted => no line
+        deletion.write_history()
+        self.assertEqual(hline, HistoryLine.objects.order_by('-id').first())
+
+    def test_bulk_deletion__protected_fk(self):
+        user = self.get_root_user()
+
+        create_folder = partial(FakeFolder.objects.create, user=user, is_deleted=True)
+        folder1 = create_folder(title='Empty')
+        folder2 = create_folder(title='Not empty')
+        FakeDocument.objects.create(user=user, title='Doc', linked_folder=folder2)
+
+        deletion = BulkEntityDeletion(
+            model=FakeFolder, user=user, deletor=EntityDeletor(),
+        )
+        self.assertSetEqual({folder2.id}, deletion.protected_ids([folder1.id, folder2.id]))
+        self.assertListEqual([folder2.id], [*deletion.check([folder1, folder2])])
+
+        with self.assertRaises(ProtectedError):
+            deletion.perform([folder2])
+        self.assertStillExists(folder2)
+        self.assertEqual(0, deletion.deleted_count)
+
+        deletion.perform([folder1])
+        self.assertDoesNotExist(folder1)
+
     def test_global_registry(self):
         self.assertIsInstance(entity_deletor_registry, EntityDeletorRegistry)
         self.assertIsNotNone(entity_deletor_registry.get(FakeContact))
@@ -1,8 +1,29 @@
 from functools import partial
 
-from creme.creme_core.core.history import do_toggle_history, toggle_history
-from creme.creme_core.models import FakeContact, HistoryLine, Language
-from creme.creme_core.models.history import TYPE_CREATION, is_history_enabled
+from django.db.transaction import atomic
+
+from creme.creme_core.core.history import (
+    HistoryBuffer,
+    buffer_history,
+    do_toggle_history,
+    toggle_history,
+)
+from creme.creme_core.models import (
+    FakeContact,
+    FakeOrganisation,
+    HistoryLine,
+    Language,
+    Relation,
+    RelationType,
+)
+from creme.creme_core.models.history import (
+    TYPE_CREATION,
+    TYPE_DELETION,
+    TYPE_EDITION,
+    TYPE_RELATION,
+    TYPE_SYM_RELATION,
+    is_history_enabled,
+)
 
 from ..base import CremeTestCase
 
@@ -109,3 +130,161 @@ class HistoryTestCase(CremeTestCase):
         hline = HistoryLine.objects.order_by('-id').first()
         self.assertEqual(TYPE_CREATION, hline.type)
         self.assertEqual(fry.id, hline.entity.id)
+
+    def test_buffer_history(self):
+        user = self.get_root_user()
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_works', 'works for'),
+            ('test-object_works',  'employs'),
+        )[0]
+        old_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffer_history():
+                fry = FakeContact.objects.create(
+                    user=user, first_name='Phillip', last_name='Fry',
+                )
+                fry = self.refresh(fry)
+                fry.phone = '123'
+                fry.save()
+                fry.email = 'fry@planetexpress.com'
+                fry.save()
+
+                orga = FakeOrganisation.objects.create(user=user, name='Planet Express')
+                Relation.objects.create(
+                    user=user, subject_entity=fry, type=rtype, object_entity=orga,
+                )
+
+                self.assertFalse(HistoryLine.objects.exclude(id__in=old_ids).exists())
+
+        hlines = [*HistoryLine.objects.exclude(id__in=old_ids).order_by('id')]
+        self.assertListEqual(
+            [TYPE_CREATION, TYPE_EDITION, TYPE_CREATION, TYPE_RELATION, TYPE_SYM_RELATION],
+            [hline.type for hline in hlines],
+        )
+
+        # Edition (one line, like without buffer) ---
+        edition_line = hlines[1]
+        self.assertEqual(fry.id, edition_line.entity_id)
+        self.assertListEqual(
+            [['phone', '123'], ['email', 'fry@planetexpress.com']],
+            edition_line.modifications,
+        )
+
+        # Relationship (lines linked together) ---
+        rel_line = hlines[3]
+        sym_line = hlines[4]
+        self.assertEqual(fry.id,  rel_line.entity_id)
+        self.assertEqual(orga.id, sym_line.entity_id)
+        self.assertListEqual([rtype.id], rel_line.modifications)
+        self.assertListEqual([rtype.symmetric_type_id], sym_line.modifications)
+        self.assertEqual(sym_line, rel_line.related_line)
+        self.assertEqual(rel_line, sym_line.related_line)
+
+    def test_buffer_history__rollback(self):
+        user = self.get_root_user()
+        old_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffer_history():
+                fry = FakeContact.objects.create(
+                    user=user, first_name='Phillip', last_name='Fry',
+                )
+
+                try:
+                    with atomic():
+                        FakeContact.objects.create(
+                            user=user, first_name='Amy', last_name='Wong',
+                        )
+                        raise ValueError('Rollback')
+                except ValueError:
+                    pass
+
+        hline = self.get_alone_element(HistoryLine.objects.exclude(id__in=old_ids))
+        self.assertEqual(TYPE_CREATION, hline.type)
+        self.assertEqual(fry.id,        hline.entity_id)
+
+    def test_buffer_history__decorator(self):
+        user = self.get_root_user()
+        old_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        def count_lines():
+            return HistoryLine.objects.exclude(id__in=old_ids).count()
+
+        @buffer_history()
+        def perform(expected_count):
+            FakeContact.objects.create(user=user, first_name='Amy', last_name='Wong')
+            self.assertEqual(expected_count, count_lines())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            perform(expected_count=0)
+
+        self.assertEqual(1, count_lines())
+
+        # Nested usage ---
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffer_history():
+                perform(expected_count=1)
+                FakeContact.objects.create(user=user, first_name='Hermes', last_name='Conrad')
+                self.assertEqual(1, count_lines())
+
+        self.assertEqual(3, count_lines())
+
+    def test_buffer_history__disabled_history(self):
+        old_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with buffer_history(), toggle_history(enabled=False):
+                FakeContact.objects.create(
+                    user=self.get_root_user(), first_name='Amy', last_name='Wong',
+                )
+
+        self.assertFalse(HistoryLine.objects.exclude(id__in=old_ids).exists())
+
+    def test_history_buffer__deleted_entity(self):
+        user = self.get_root_user()
+        leela = FakeContact.objects.create(user=user, first_name='Leela', last_name='Turanga')
+        old_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        buffer = HistoryBuffer(size=100)
+        hline = HistoryLine(
+            entity=leela, entity_ctype=leela.entity_type, entity_owner=user,
+            type=TYPE_EDITION,
+            value=HistoryLine._encode_attrs(leela, modifs=[['phone', '1']]),
+        )
+        buffer.add(hline)
+        buffer.add(hline)  # Not added twice
+        self.assertEqual(0, len(buffer))  # Not confirmed (transaction)
+
+        buffer._confirm(hline)
+        self.assertEqual(1, len(buffer))
+
+        leela.delete()
+        buffer.flush()
+        self.assertEqual(0, len(buffer))
+        self.assertIsNotNone(hline.id)
+
+        hline = self.refresh(hline)
+        self.assertIsNone(hline.entity)
+        self.assertEqual(leela.entity_type, hline.entity_ctype)
+        self.assertIn(
+            TYPE_DELETION,
+            HistoryLine.objects.exclude(id__in=old_ids).values_list('type', flat=True),
+        )
+
+    def test_history_buffer__size(self):
+        user = self.get_root_user()
+        fry = FakeContact.objects.create(user=user, first_name='Phillip', last_name='Fry')
+        old_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        buffer = HistoryBuffer(size=2)
+        create_line = partial(
+            HistoryLine, entity=fry, entity_ctype=fry.entity_type, entity_owner=user,
+            type=TYPE_EDITION, value=HistoryLine._encode_attrs(fry, modifs=[['phone', '1']]),
+        )
+        buffer._confirm(create_line())
+        self.assertFalse(HistoryLine.objects.exclude(id__in=old_ids).exists())
+
+        buffer._confirm(create_line())
+        self.assertEqual(2, HistoryLine.objects.exclude(id__in=old_ids).count())
+        self.assertEqual(0, len(buffer))
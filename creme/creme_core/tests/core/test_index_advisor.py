@@ -0,0 +1,216 @@
+from unittest.mock import patch
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from creme.creme_core.core.entity_cell import EntityCellRegularField
+from creme.creme_core.core.index_advisor import (
+    SortIndexAdvice,
+    SortIndexAdvisor,
+)
+from creme.creme_core.gui.listview import ListViewState
+from creme.creme_core.management.commands.creme_index_advisor import (
+    Command as AdvisorCommand,
+)
+from creme.creme_core.models import FakeContact, FakeOrganisation, HeaderFilter
+
+from ..base import CremeTestCase
+
+
+class _FakeAdvisor(SortIndexAdvisor):
+    states = []
+
+    def iter_states(self):
+        yield from self.states
+
+
+class SortIndexAdvisorTestCase(CremeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        build_cell = EntityCellRegularField.build
+        cls.contact_hf = HeaderFilter.objects.create_if_needed(
+            pk='creme_core-tests_index_advisor_contact', name='Contact view',
+            model=FakeContact,
+            cells_desc=[
+                build_cell(FakeContact, 'last_name'),
+                build_cell(FakeContact, 'first_name'),
+                build_cell(FakeContact, 'email'),
+                build_cell(FakeContact, 'created'),
+            ],
+        )
+        cls.orga_hf = HeaderFilter.objects.create_if_needed(
+            pk='creme_core-tests_index_advisor_orga', name='Orga view',
+            model=FakeOrganisation,
+            cells_desc=[
+                build_cell(FakeOrganisation, 'name'),
+                build_cell(FakeOrganisation, 'phone'),
+            ],
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        _FakeAdvisor.states = []
+
+    def _build_state(self, hfilter, cell_key=None, order=None):
+        state = ListViewState(hfilter=hfilter.id)
+        state.sort_cell_key = cell_key
+        state.sort_order = order
+
+        return state
+
+    def test_orderings(self):
+        contact_hf = self.contact_hf
+        build_state = self._build_state
+        _FakeAdvisor.states = [
+            build_state(contact_hf),
+            build_state(contact_hf, cell_key='regular_field-last_name', order='DESC'),
+            build_state(contact_hf, cell_key='regular_field-email'),
+            build_state(contact_hf, cell_key='regular_field-email'),
+            build_state(self.orga_hf, cell_key='regular_field-phone'),
+            ListViewState(),  # No HeaderFilter
+            ListViewState(hfilter='creme_core-unknown'),
+        ]
+
+        self.assertDictEqual(
+            {
+                (FakeContact, ('last_name', 'first_name', 'cremeentity_ptr_id')): 1,
+                (FakeContact, ('-last_name', '-first_name', '-cremeentity_ptr_id')): 1,
+                (FakeContact, ('email', 'last_name', 'first_name', 'cremeentity_ptr_id')): 2,
+                (FakeOrganisation, ('phone', 'name', 'cremeentity_ptr_id')): 1,
+            },
+            dict(_FakeAdvisor().orderings()),
+        )
+
+    def test_missing_indexes(self):
+        contact_hf = self.contact_hf
+        build_state = self._build_state
+        _FakeAdvisor.states = [
+            # Indexed
+            build_state(contact_hf),
+            build_state(contact_hf, cell_key='regular_field-last_name', order='DESC'),
+            # Missing
+            build_state(self.orga_hf, cell_key='regular_field-phone'),
+            build_state(contact_hf, cell_key='regular_field-email'),
+            build_state(contact_hf, cell_key='regular_field-email'),
+            # Not indexable (field of CremeEntity)
+            build_state(contact_hf, cell_key='regular_field-created'),
+            # Not indexable (ASC & DESC are mixed)
+            build_state(contact_hf, cell_key='regular_field-email', order='DESC'),
+        ]
+
+        advices = _FakeAdvisor().missing_indexes()
+        self.assertEqual(2, len(advices), advices)
+
+        advice1 = advices[0]
+        self.assertIsInstance(advice1, SortIndexAdvice)
+        self.assertEqual(FakeContact, advice1.model)
+        self.assertTupleEqual(
+            ('email', 'last_name', 'first_name', 'cremeentity_ptr'),
+            advice1.field_names,
+        )
+        self.assertTupleEqual(
+            ('email', 'last_name', 'first_name', 'cremeentity_ptr_id'),
+            advice1.columns,
+        )
+        self.assertEqual(2, advice1.usages)
+
+        advice2 = advices[1]
+        self.assertEqual(FakeOrganisation, advice2.model)
+        self.assertTupleEqual(('phone', 'name', 'cremeentity_ptr'), advice2.field_names)
+        self.assertEqual(1, advice2.usages)
+
+        index = advice2.build_index()
+        self.assertListEqual(['phone', 'name', 'cremeentity_ptr'], index.fields)
+        self.assertTrue(index.name)
+        self.assertLessEqual(len(index.name), index.max_name_length)
+
+    def test_create_index(self):
+        advice = SortIndexAdvice(
+            model=FakeOrganisation,
+            fields=[
+                FakeOrganisation._meta.get_field('phone'),
+                FakeOrganisation._meta.get_field('cremeentity_ptr'),
+            ],
+        )
+
+        # NB: the DDL is not executed (not compatible with the transaction of the test)
+        with patch('creme.creme_core.core.index_advisor.connections') as connections_mock:
+            index = SortIndexAdvisor().create_index(advice)
+
+        editor = connections_mock.__getitem__.return_value.schema_editor.return_value
+        editor.__enter__.return_value.add_index.assert_called_once_with(
+            FakeOrganisation, index,
+        )
+        self.assertListEqual(['phone', 'cremeentity_ptr'], index.fields)
+
+    def test_iter_states(self):
+        contact_hf = self.contact_hf
+
+        session = SessionStore()
+        session['/tests/contacts'] = self._build_state(
+            contact_hf, cell_key='regular_field-email', order='DESC',
+        ).__dict__
+        session['other'] = {'foo': 'bar'}
+        session.create()
+
+        states = [*SortIndexAdvisor().iter_states()]
+        self.assertEqual(1, len(states))
+
+        state = states[0]
+        self.assertIsInstance(state, ListViewState)
+        self.assertEqual(contact_hf.id,          state.header_filter_id)
+        self.assertEqual('regular_field-email', state.sort_cell_key)
+        self.assertEqual('DESC',                state.sort_order)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_iter_states__error(self):
+        with self.assertRaises(ValueError):
+            [*SortIndexAdvisor().iter_states()]  # NOQA
+
+    def test_command(self):
+        _FakeAdvisor.states = [
+            self._build_state(self.contact_hf),
+            self._build_state(self.orga_hf, cell_key='regular_field-phone'),
+        ]
+
+        command = AdvisorCommand()
+        command.advisor_class = _FakeAdvisor
+
+        with patch.object(command.stdout, 'write') as write_mock:
+            call_command(command, verbosity=1)
+
+        write_mock.assert_called_once()
+        message = write_mock.call_args.args[0]
+        self.assertStartsWith(message, 'Missing index on ')
+        self.assertIn('phone, name, cremeentity_ptr_id', message)
+        self.assertIn('used by 1 list-view(s)', message)
+
+        # ---
+        with patch.object(command.stdout, 'write') as write_mock:
+            call_command(command, verbosity=1, min_usages=2)
+
+        write_mock.assert_called_once_with('No missing index.')
+
+    def test_command__create(self):
+        _FakeAdvisor.states = [
+            self._build_state(self.orga_hf, cell_key='regular_field-phone'),
+        ]
+
+        command = AdvisorCommand()
+        command.advisor_class = _FakeAdvisor
+
+        with patch.object(_FakeAdvisor, 'create_index') as create_mock:
+            call_command(command, verbosity=0, create=True)
+
+        create_mock.assert_called_once()
+        advice = create_mock.call_args.args[0]
+        self.assertEqual(FakeOrganisation, advice.model)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+    def test_command__error(self):
+        with self.assertRaises(CommandError):
+            call_command(AdvisorCommand(), verbosity=0)
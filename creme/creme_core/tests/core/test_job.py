@@ -1,20 +1,34 @@
 import os
+import sys
 from datetime import timedelta
 from shutil import rmtree
 from tempfile import mkdtemp
 from unittest import skipIf
+from unittest.mock import patch
 
 from django.core.exceptions import ImproperlyConfigured
 from django.test.utils import override_settings
 from django.utils.timezone import now
 
 from creme.creme_core.core.job import JobScheduler, _JobTypeRegistry
+from creme.creme_core.core.job.node import SchedulerNode
+from creme.creme_core.core.job.pool import (
+    JobRunStats,
+    JobWorkerPool,
+    PooledJob,
+    run_job,
+)
+from creme.creme_core.core.job.queue.base import Command
 from creme.creme_core.core.job.queue.unix_socket import UnixSocketQueue
 from creme.creme_core.core.reminder import Reminder, reminder_registry
-from creme.creme_core.creme_jobs import reminder_type
+from creme.creme_core.creme_jobs import reminder_type, temp_files_cleaner_type
 from creme.creme_core.creme_jobs.base import JobType
-from creme.creme_core.models import Job
-from creme.creme_core.utils.date_period import HoursPeriod
+from creme.creme_core.models import Job, JobLease, JobSchedulerNode
+from creme.creme_core.utils.date_period import (
+    HoursPeriod,
+    MinutesPeriod,
+    MonthsPeriod,
+)
 from creme.creme_core.utils.dates import round_hour
 
 from ..base import CremeTestCase
@@ -226,3 +240,402 @@ class JobSchedulerTestCase(CremeTestCase):
             rounded_hour + timedelta(hours=1),
             JobScheduler()._next_wakeup(job),
         )
+
+    def test_next_wake_up__old_reference(self):
+        "The computing does not depend on the number of elapsed periods."
+        now_value = now()
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        job.periodicity = MinutesPeriod(value=1)
+        job.reference_run = now_value.replace(second=0, microsecond=0) - timedelta(days=3650)
+
+        with patch.object(
+            type(job), 'real_periodicity',
+            new_callable=lambda: property(lambda j: j.periodicity),
+        ):
+            next_wakeup = JobScheduler()._next_wakeup(job)
+
+        self.assertGreaterEqual(next_wakeup, now_value)
+        self.assertLess(next_wakeup, now_value + timedelta(minutes=1))
+        self.assertEqual(0, next_wakeup.second)
+        self.assertEqual(0, next_wakeup.microsecond)
+
+    def test_next_wake_up__months(self):
+        now_value = now()
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        job.periodicity = MonthsPeriod(value=1)
+        job.reference_run = reference_run = self.create_datetime(
+            year=now_value.year - 5, month=1, day=31, hour=10, utc=True,
+        )
+
+        next_wakeup = JobScheduler()._next_wakeup(job)
+        self.assertGreaterEqual(next_wakeup, now_value)
+
+        # NB: "reference_run + N * period"
+        months = (next_wakeup.year - reference_run.year) * 12 + next_wakeup.month - 1
+        self.assertEqual(reference_run + MonthsPeriod(value=months).as_timedelta(), next_wakeup)
+        self.assertLess(
+            reference_run + MonthsPeriod(value=months - 1).as_timedelta(), now_value,
+        )
+
+    def test_next_wake_up__future_reference(self):
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        job.reference_run = reference_run = now() + timedelta(hours=3)
+        self.assertEqual(reference_run, JobScheduler()._next_wakeup(job))
+
+    def test_push_user_job(self):
+        user = self.get_root_user()
+        job1 = Job.objects.create(type_id=reminder_type.id, user=user)
+        job2 = Job.objects.create(type_id=reminder_type.id, user=user)
+
+        scheduler = JobScheduler()
+        scheduler._push_user_job(job1)
+        scheduler._push_user_job(job2)
+        scheduler._push_user_job(Job.objects.get(id=job1.id))  # Already queued
+        self.assertListEqual([job2, job1], [*scheduler._users_jobs])
+        self.assertSetEqual({job1.id, job2.id}, scheduler._users_job_ids)
+
+        system_job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        with self.assertLogs(level='WARNING'):
+            scheduler._push_user_job(system_job)
+        self.assertEqual(2, len(scheduler._users_jobs))
+
+    def test_pool__disabled(self):
+        self.assertIsNone(JobScheduler()._pool)
+
+    def test_node__disabled(self):
+        self.assertIsNone(JobScheduler()._node)
+
+    @override_settings(JOBMANAGER_POOL_SIZE=3, JOBMANAGER_POOL_MAX_JOBS_PER_WORKER=50)
+    def test_pool(self):
+        scheduler = JobScheduler()
+        pool = scheduler._pool
+        self.assertIsInstance(pool, JobWorkerPool)
+        self.assertEqual(3, pool.size)
+        self.assertEqual(50, pool.max_jobs_per_worker)
+        self.assertFalse(pool.started)
+
+        job_ids = []
+
+        class FakeResult:
+            def __init__(self, value):
+                self.value = value
+
+            def get(self, timeout=None):
+                return self.value
+
+        class FakePool:
+            def apply_async(self, func, args):
+                job_ids.extend(args)
+                return FakeResult(JobRunStats(job_id=args[0], wall_time=0.5, rss_delta=1024))
+
+        pool._pool = FakePool()
+
+        # System job => pool
+        system_job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        scheduler._start_job(system_job)
+        self.assertListEqual([system_job.id], job_ids)
+        self.assertIsInstance(scheduler._procs.get(system_job.id), PooledJob)
+
+        with self.assertLogs(level='INFO') as logs_manager:
+            scheduler._end_job(system_job)
+
+        self.assertNotIn(system_job.id, scheduler._procs)
+        self.assertIn(
+            f'INFO:creme.creme_core.core.job.scheduler:JobScheduler: job {system_job!r} '
+            f'executed in 0.500 seconds (RSS delta of the worker: 1024 KiB)',
+            logs_manager.output,
+        )
+
+
+class _FakeProc:
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        return self.returncode
+
+
+class SchedulerNodeTestCase(CremeTestCase):
+    def test_init(self):
+        node = SchedulerNode(lease_duration=30, name='node1')
+        self.assertEqual('node1', node.name)
+        self.assertEqual(timedelta(seconds=30), node.lease_duration)
+        self.assertEqual(timedelta(seconds=10), node.heartbeat_period)
+        self.assertFalse(node.registered)
+
+        self.assertTrue(SchedulerNode(lease_duration=30).name)
+
+        with self.assertRaises(ValueError):
+            SchedulerNode(lease_duration=0)
+
+    def test_register(self):
+        JobSchedulerNode.objects.create(name='node1', heartbeat=now() - timedelta(days=1))
+
+        node = SchedulerNode(lease_duration=30, name='node1')
+        node.register()
+        self.assertTrue(node.registered)
+
+        db_node = self.get_object_or_fail(JobSchedulerNode, name='node1')
+        self.assertDatetimesAlmostEqual(now(), db_node.heartbeat)
+
+        node.unregister()
+        self.assertFalse(node.registered)
+        self.assertFalse(JobSchedulerNode.objects.filter(name='node1'))
+
+    def test_acquire(self):
+        job1 = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        job2 = Job.objects.get(type_id=reminder_type.id)
+
+        node1 = SchedulerNode(lease_duration=30, name='node1')
+        node1.register()
+        node2 = SchedulerNode(lease_duration=30, name='node2')
+        node2.register()
+
+        self.assertIs(node1.acquire(job1.id), True)
+        self.assertIs(node1.acquire(job1.id), True)
+        self.assertIs(node2.acquire(job1.id), False)
+        self.assertIs(node2.acquire(job2.id), True)
+        self.assertSetEqual({job1.id}, node1.job_ids)
+        self.assertSetEqual({job2.id}, node2.job_ids)
+
+        node1.release(job1.id)
+        self.assertFalse(node1.job_ids)
+        self.assertFalse(JobLease.objects.filter(job=job1.id))
+        self.assertIs(node2.acquire(job1.id), True)
+
+        # Leases are removed with the node
+        node2.unregister()
+        self.assertFalse(JobLease.objects.all())
+
+    def test_heartbeat(self):
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+
+        node1 = SchedulerNode(lease_duration=30, name='node1')
+        node1.register()
+        node2 = SchedulerNode(lease_duration=30, name='node2')
+        node2.register()
+        self.assertTrue(node2.acquire(job.id))
+
+        later = now() + timedelta(seconds=20)
+        with self.assertNumQueries(0):
+            self.assertIs(node1.heartbeat(now() + timedelta(seconds=5)), True)
+
+        self.assertIs(node1.heartbeat(later), True)
+        self.assertEqual(later, self.refresh(node1._node).heartbeat)
+        self.assertTrue(JobSchedulerNode.objects.filter(name='node2'))
+
+        # "node2" has not updated its heartbeat => dead
+        much_later = now() + timedelta(seconds=45)
+        self.assertIs(node1.heartbeat(much_later), True)
+        self.assertFalse(JobSchedulerNode.objects.filter(name='node2'))
+        self.assertFalse(JobLease.objects.all())
+        self.assertTrue(node1.acquire(job.id))
+
+        # "node2" is back: it has lost its leases
+        with self.assertLogs(level='WARNING'):
+            self.assertIs(node2.heartbeat(much_later), False)
+
+        self.assertTrue(node2.registered)
+        self.assertFalse(node2.job_ids)
+        self.assertTrue(JobSchedulerNode.objects.filter(name='node2'))
+
+
+@override_settings(JOBMANAGER_LEASE_DURATION=30)
+class MultiNodesJobSchedulerTestCase(CremeTestCase):
+    def _build_scheduler(self, name):
+        scheduler = JobScheduler(node_name=name)
+        scheduler._node.register()
+
+        return scheduler
+
+    def test_init(self):
+        with override_settings(JOBMANAGER_LEASE_DURATION=60):
+            node = JobScheduler(node_name='node1')._node
+
+        self.assertIsInstance(node, SchedulerNode)
+        self.assertEqual('node1', node.name)
+        self.assertEqual(timedelta(seconds=60), node.lease_duration)
+
+    def test_lease_system_job(self):
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        now_value = now()
+        wakeup = now_value - timedelta(seconds=1)
+
+        scheduler1 = self._build_scheduler('node1')
+        scheduler2 = self._build_scheduler('node2')
+
+        fresh_job = scheduler1._lease_system_job(job, wakeup, now_value)
+        self.assertEqual(job, fresh_job)
+        self.assertIsNot(job, fresh_job)
+        self.assertSetEqual({job.id}, scheduler1._node.job_ids)
+        self.assertFalse(scheduler1._system_jobs)
+
+        # The job is run by another node => re-scheduled
+        with self.assertLogs(level='INFO'):
+            self.assertIsNone(scheduler2._lease_system_job(job, wakeup, now_value))
+
+        self.assertEqual(1, len(scheduler2._system_jobs))
+        next_wakeup, job_id, __ = scheduler2._system_jobs[0]
+        self.assertEqual(job.id, job_id)
+        self.assertGreaterEqual(next_wakeup, now_value + timedelta(seconds=10))
+
+        # The job has been run (& so the lease has been released)
+        scheduler1._procs[job.id] = _FakeProc(returncode=0)
+        scheduler1._system_jobs_starts[job.id] = wakeup
+        Job.objects.filter(id=job.id).update(last_run=now_value)
+        scheduler1._check_ended_jobs()
+        self.assertFalse(scheduler1._procs)
+        self.assertFalse(scheduler1._node.job_ids)
+        self.assertEqual(1, len(scheduler1._system_jobs))
+
+        scheduler2._system_jobs.clear()
+        self.assertIsNone(scheduler2._lease_system_job(job, wakeup, now_value))
+        self.assertFalse(scheduler2._node.job_ids)
+        self.assertFalse(JobLease.objects.all())
+        self.assertEqual(1, len(scheduler2._system_jobs))
+
+    def test_lease_system_job__disabled(self):
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        Job.objects.filter(id=job.id).update(enabled=False)
+
+        scheduler = self._build_scheduler('node1')
+        now_value = now()
+        self.assertIsNone(scheduler._lease_system_job(job, now_value, now_value))
+        self.assertFalse(JobLease.objects.all())
+
+        next_wakeup = scheduler._system_jobs[0][0]
+        self.assertGreater(next_wakeup, now_value + timedelta(days=365))
+
+    def test_lease_system_job__refreshed(self):
+        "The periodicity has been modified (REFRESH command received by another node)."
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        self.assertNotEqual(HoursPeriod(value=12), job.periodicity)
+        Job.objects.filter(id=job.id).update(periodicity=HoursPeriod(value=12))
+
+        scheduler = self._build_scheduler('node1')
+        now_value = now()
+
+        with self.assertLogs(level='INFO'):
+            self.assertIsNone(scheduler._lease_system_job(job, now_value, now_value))
+
+        self.assertFalse(JobLease.objects.all())
+        self.assertEqual(1, len(scheduler._system_jobs))
+
+        next_wakeup, job_id, scheduled_job = scheduler._system_jobs[0]
+        self.assertEqual(job.id, job_id)
+        self.assertEqual(HoursPeriod(value=12), scheduled_job.periodicity)
+        self.assertEqual(scheduler._next_wakeup(scheduled_job), next_wakeup)
+
+        # Up-to-date instance => run
+        scheduler._system_jobs.clear()
+        self.assertEqual(
+            job, scheduler._lease_system_job(scheduled_job, now_value, now_value),
+        )
+        self.assertSetEqual({job.id}, scheduler._node.job_ids)
+
+    def test_command_end(self):
+        "END commands of the jobs run by other nodes are ignored."
+        job = Job.objects.get(type_id=temp_files_cleaner_type.id)
+        scheduler = self._build_scheduler('node1')
+
+        with self.assertLogs(level='INFO') as logs_manager:
+            scheduler._handle_command_end(Command(Command.END, data_id=job.id))
+
+        self.assertIn(
+            f'INFO:creme.creme_core.core.job.scheduler:JobScheduler.handle_command_end() '
+            f'-> the job id={job.id} is not run by this node -> command is ignored.',
+            logs_manager.output,
+        )
+        self.assertFalse(scheduler._system_jobs)
+
+    def test_check_ended_jobs(self):
+        user = self.get_root_user()
+        job1 = Job.objects.create(type_id=reminder_type.id, user=user)
+        job2 = Job.objects.create(type_id=reminder_type.id, user=user)
+
+        scheduler = self._build_scheduler('node1')
+        node = scheduler._node
+        self.assertTrue(node.acquire(job1.id))
+        self.assertTrue(node.acquire(job2.id))
+
+        scheduler._procs[job1.id] = _FakeProc(returncode=0)
+        scheduler._procs[job2.id] = _FakeProc(returncode=None)  # Still running
+        scheduler._running_userjob_ids.update([job1.id, job2.id])
+
+        scheduler._check_ended_jobs()
+        self.assertListEqual([job2.id], [*scheduler._procs])
+        self.assertSetEqual({job2.id}, scheduler._running_userjob_ids)
+        self.assertSetEqual({job2.id}, node.job_ids)
+        self.assertListEqual([job2.id], [*JobLease.objects.values_list('job', flat=True)])
+
+
+class JobWorkerPoolTestCase(CremeTestCase):
+    def test_init(self):
+        pool = JobWorkerPool(size=2)
+        self.assertEqual(2, pool.size)
+        self.assertIsNone(pool.max_jobs_per_worker)
+        self.assertFalse(pool.started)
+
+        self.assertIsNone(JobWorkerPool(size=1, max_jobs_per_worker=0).max_jobs_per_worker)
+
+        with self.assertRaises(ValueError):
+            JobWorkerPool(size=0)
+
+    def test_run_job__not_started(self):
+        with self.assertRaises(RuntimeError):
+            JobWorkerPool(size=1).run_job(12)
+
+    @patch('creme.creme_core.core.job.pool.close_old_connections')
+    @patch('creme.creme_core.core.job.job_type_registry')
+    def test_run_job(self, registry_mock, close_mock):
+        stats = run_job(12)
+        registry_mock.assert_called_once_with(12)
+        self.assertEqual(2, close_mock.call_count)
+
+        self.assertIsInstance(stats, JobRunStats)
+        self.assertEqual(12, stats.job_id)
+        self.assertGreaterEqual(stats.wall_time, 0)
+
+        if sys.platform.startswith('linux'):
+            self.assertIsInstance(stats.rss_delta, int)
+
+    def test_pooled_job(self):
+        class FakeResult:
+            def __init__(self, value, ready=True):
+                self.value = value
+                self._ready = ready
+
+            def ready(self):
+                return self._ready
+
+            def get(self, timeout=None):
+                if isinstance(self.value, Exception):
+                    raise self.value
+
+                return self.value
+
+        stats = JobRunStats(job_id=12, wall_time=1.2, rss_delta=None)
+
+        # Running
+        result1 = FakeResult(stats, ready=False)
+        pooled_job1 = PooledJob(job_id=12, result=result1)
+        self.assertIsNone(pooled_job1.poll())
+        self.assertIsNone(pooled_job1.returncode)
+        self.assertIsNone(pooled_job1.stats)
+
+        # Finished
+        result1._ready = True
+        self.assertEqual(0, pooled_job1.poll())
+        self.assertEqual(0, pooled_job1.returncode)
+        self.assertEqual(stats, pooled_job1.stats)
+        self.assertEqual(0, pooled_job1.wait())
+
+        # Failed
+        pooled_job2 = PooledJob(job_id=13, result=FakeResult(ValueError('Invalid job')))
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(1, pooled_job2.wait())
+        self.assertIsNone(pooled_job2.stats)
+        self.assertEqual(1, pooled_job2.poll())
@@ -0,0 +1,418 @@
+from functools import partial
+from unittest import skipIf
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from creme.creme_core.core.entity_cell import (
+    EntityCellCustomField,
+    EntityCellRegularField,
+)
+from creme.creme_core.core.search import Searcher
+from creme.creme_core.core.search_index import (
+    SearchIndexBackend,
+    SQLiteSearchIndexBackend,
+    get_search_index,
+    normalize,
+)
+from creme.creme_core.models import (
+    CustomField,
+    CustomFieldEnum,
+    CustomFieldEnumValue,
+    CustomFieldString,
+    FakeContact,
+    FakeOrganisation,
+    FakePosition,
+    FakeSector,
+    IndexedSearchCell,
+    Language,
+    SearchConfigItem,
+    SearchIndexEntry,
+)
+
+from ..base import CremeTestCase
+
+BACKEND_PATH = 'creme.creme_core.core.search_index.SearchIndexBackend'
+SQLITE_BACKEND_PATH = 'creme.creme_core.core.search_index.SQLiteSearchIndexBackend'
+
+
+@override_settings(SEARCH_INDEX_BACKEND=BACKEND_PATH)
+class SearchIndexTestCase(CremeTestCase):
+    def setUp(self):
+        super().setUp()
+        SearchConfigItem.objects.all().delete()
+
+    def _create_config(self, model, cells):
+        return SearchConfigItem.objects.create(content_type=model, cells=cells)
+
+    def _build_contacts(self, user):
+        sector = FakeSector.objects.create(title='Linux dev')
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        self.linus = create_contact(first_name='Linus', last_name='Torvalds', sector=sector)
+        self.alan = create_contact(first_name='Alan', last_name='Cox')
+        self.jose = create_contact(first_name='José', last_name='Valim')
+
+    def _search(self, user, model, searched):
+        return {*Searcher([model], user).search(model, searched)}
+
+    def test_normalize(self):
+        self.assertEqual('jose', normalize('José'))
+        self.assertEqual('ecole strasse', normalize('ÉCOLE Straße'))
+        self.assertEqual('', normalize(''))
+
+    def test_get_search_index(self):
+        self.assertIsInstance(get_search_index(), SearchIndexBackend)
+        self.assertIs(get_search_index(), get_search_index())
+
+        with override_settings(SEARCH_INDEX_BACKEND=SQLITE_BACKEND_PATH):
+            self.assertIsInstance(get_search_index(), SQLiteSearchIndexBackend)
+
+        with override_settings(SEARCH_INDEX_BACKEND=None):
+            self.assertIsNone(get_search_index())
+            self.assertIsNone(Searcher([FakeContact], self.get_root_user()).index)
+
+    def test_rebuild(self):
+        user = self.get_root_user()
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        self._create_config(
+            FakeContact,
+            [build_cell(name='first_name'), build_cell(name='sector__title')],
+        )
+        self._build_contacts(user)
+
+        index = get_search_index()
+        ctype = ContentType.objects.get_for_model(FakeContact)
+        self.assertFalse(index.indexed_cell_keys(ctype))
+
+        index.chunk_size = 2
+        self.assertEqual(3, index.rebuild(FakeContact))
+        self.assertSetEqual(
+            {'regular_field-first_name', 'regular_field-sector__title'},
+            index.indexed_cell_keys(ctype),
+        )
+        self.assertCountEqual(
+            ['regular_field-first_name', 'regular_field-sector__title'],
+            IndexedSearchCell.objects.filter(
+                content_type=ctype,
+            ).values_list('cell_key', flat=True),
+        )
+
+        entries = {
+            (entry.entity_id, entry.cell_key): entry.content
+            for entry in SearchIndexEntry.objects.all()
+        }
+        self.assertDictEqual(
+            {
+                (self.linus.id, 'regular_field-first_name'): 'linus',
+                (self.linus.id, 'regular_field-sector__title'): 'linux dev',
+                (self.alan.id, 'regular_field-first_name'): 'alan',
+                (self.jose.id, 'regular_field-first_name'): 'jose',
+            },
+            entries,
+        )
+
+    def test_build_entries__queries(self):
+        "The related instances are retrieved with grouped queries."
+        user = self.get_root_user()
+        create_sector = FakeSector.objects.create
+        sector1 = create_sector(title='Kernel')
+        sector2 = create_sector(title='Compilers')
+
+        create_language = Language.objects.create
+        language1 = create_language(name='Finnish')
+        language2 = create_language(name='Welsh')
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        contact1 = create_contact(first_name='Linus', last_name='Torvalds', sector=sector1)
+        contact2 = create_contact(first_name='Richard', last_name='Stallman', sector=sector2)
+        contact3 = create_contact(first_name='Alan', last_name='Cox')
+        contact1.languages.set([language1])
+        contact3.languages.set([language2])
+
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        cells = [
+            build_cell(name='last_name'),
+            build_cell(name='sector__title'),
+            build_cell(name='languages__name'),
+        ]
+        entities = [
+            *FakeContact.objects.filter(
+                id__in=[contact1.id, contact2.id, contact3.id],
+            ).order_by('id'),
+        ]
+
+        with self.assertNumQueries(2):
+            entries = get_search_index().build_entries(entities, cells)
+
+        self.assertCountEqual(
+            [
+                (contact1.id, 'regular_field-last_name', 'torvalds'),
+                (contact1.id, 'regular_field-sector__title', 'kernel'),
+                (contact1.id, 'regular_field-languages__name', 'finnish'),
+                (contact2.id, 'regular_field-last_name', 'stallman'),
+                (contact2.id, 'regular_field-sector__title', 'compilers'),
+                (contact3.id, 'regular_field-last_name', 'cox'),
+                (contact3.id, 'regular_field-languages__name', 'welsh'),
+            ],
+            [(entry.entity_id, entry.cell_key, entry.content) for entry in entries],
+        )
+
+    def test_search(self):
+        user = self.get_root_user()
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        self._create_config(
+            FakeContact,
+            [
+                build_cell(name='first_name'),
+                build_cell(name='last_name'),
+                build_cell(name='sector__title'),
+            ],
+        )
+        self._build_contacts(user)
+        get_search_index().rebuild(FakeContact)
+
+        searcher = Searcher([FakeContact], user)
+        cells = searcher.get_cells(FakeContact)
+        self.assertTrue(searcher.index.is_ready(FakeContact, cells))
+
+        with self.assertNumQueries(1):
+            found = [*searcher.search(FakeContact, 'linux')]
+        self.assertListEqual([self.linus], found)
+
+        self.assertSetEqual({self.linus, self.jose}, self._search(user, FakeContact, 'li'))
+        self.assertSetEqual({self.linus}, self._search(user, FakeContact, 'LINUS torv'))
+        self.assertSetEqual({self.jose}, self._search(user, FakeContact, 'jose'))
+        self.assertSetEqual({self.jose}, self._search(user, FakeContact, 'JOSÉ'))
+        self.assertFalse(self._search(user, FakeContact, 'linus cox'))
+        self.assertFalse(self._search(user, FakeContact, '100%'))
+
+    def test_search__role(self):
+        "Only the cells of the user's configuration are searched."
+        user = self.create_user(role=self.create_role(allowed_apps=['creme_core']))
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        self._create_config(FakeContact, [build_cell(name='last_name')])
+        SearchConfigItem.objects.create(
+            content_type=FakeContact, role=user.role,
+            cells=[build_cell(name='first_name')],
+        )
+        self._build_contacts(self.get_root_user())
+        get_search_index().rebuild(FakeContact)
+
+        self.assertSetEqual({self.alan}, self._search(user, FakeContact, 'alan'))
+        self.assertFalse(self._search(user, FakeContact, 'cox'))
+
+    def test_search__not_indexed(self):
+        "Cells which are not indexed yet => search without index."
+        user = self.get_root_user()
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        sci = self._create_config(FakeContact, [build_cell(name='first_name')])
+        self._build_contacts(user)
+        get_search_index().rebuild(FakeContact)
+
+        sci.cells = [build_cell(name='first_name'), build_cell(name='last_name')]
+        sci.save()
+        self.clear_global_info()
+
+        searcher = Searcher([FakeContact], user)
+        self.assertFalse(searcher.index.is_ready(FakeContact, searcher.get_cells(FakeContact)))
+        self.assertSetEqual({self.alan}, self._search(user, FakeContact, 'cox'))
+
+        # Other models are not indexed
+        SearchConfigItem.objects.create_if_needed(FakeOrganisation, ['name'])
+        orga = FakeOrganisation.objects.create(user=user, name='Linux Foundation')
+        self.assertSetEqual({orga}, self._search(user, FakeOrganisation, 'linux'))
+
+    def test_update(self):
+        user = self.get_root_user()
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        self._create_config(
+            FakeContact, [build_cell(name='last_name'), build_cell(name='languages__name')],
+        )
+        self._build_contacts(user)
+        get_search_index().rebuild(FakeContact)
+
+        # Creation
+        contact = FakeContact.objects.create(user=user, first_name='Andrew', last_name='Morton')
+        self.assertSetEqual({contact}, self._search(user, FakeContact, 'morton'))
+
+        # Edition
+        contact.last_name = 'Tanenbaum'
+        contact.save()
+        self.assertFalse(self._search(user, FakeContact, 'morton'))
+        self.assertSetEqual({contact}, self._search(user, FakeContact, 'tanen'))
+
+        # M2M
+        language = Language.objects.create(name='Dutch')
+        contact.languages.set([language])
+        self.assertSetEqual({contact}, self._search(user, FakeContact, 'dutch'))
+
+        contact.languages.clear()
+        self.assertFalse(self._search(user, FakeContact, 'dutch'))
+
+        # Deletion
+        contact.delete()
+        self.assertFalse(SearchIndexEntry.objects.filter(entity_id=contact.id))
+
+    def test_update__related(self):
+        "The entities are updated when a referenced instance is modified."
+        user = self.get_root_user()
+        build_cell = partial(EntityCellRegularField.build, model=FakeContact)
+        self._create_config(
+            FakeContact,
+            [
+                build_cell(name='last_name'),
+                build_cell(name='sector__title'),
+                build_cell(name='languages__name'),
+            ],
+        )
+        self._build_contacts(user)
+        language = Language.objects.create(name='Dutch')
+        self.jose.languages.set([language])
+
+        index = get_search_index()
+        index.rebuild(FakeContact)
+
+        ctype_id = ContentType.objects.get_for_model(FakeContact).id
+        self.assertDictEqual(
+            {
+                'creme_core.FakeSector': {ctype_id: ['sector']},
+                'creme_core.Language': {ctype_id: ['languages']},
+            },
+            index.dependencies(),
+        )
+
+        # ForeignKey
+        sector = self.linus.sector
+        sector.title = 'Kernel dev'
+        sector.save()
+        self.assertFalse(self._search(user, FakeContact, 'linux'))
+        self.assertSetEqual({self.linus}, self._search(user, FakeContact, 'kernel'))
+
+        # ManyToManyField
+        language.name = 'Portuguese'
+        language.save()
+        self.assertFalse(self._search(user, FakeContact, 'dutch'))
+        self.assertSetEqual({self.jose}, self._search(user, FakeContact, 'portu'))
+
+        # Not referenced
+        position = FakePosition.objects.create(title='Maintainer')
+        position.title = 'Benevolent dictator'
+
+        with self.assertNumQueries(1):
+            position.save()
+
+    def test_update__not_indexed(self):
+        "No indexed cell => no entry."
+        user = self.get_root_user()
+        SearchConfigItem.objects.create_if_needed(FakeContact, ['last_name'])
+        FakeContact.objects.create(user=user, first_name='Andrew', last_name='Morton')
+        self.assertFalse(SearchIndexEntry.objects.all())
+
+    def test_custom_fields(self):
+        user = self.get_root_user()
+        create_cfield = partial(CustomField.objects.create, content_type=FakeContact)
+        cfield_str = create_cfield(name='Nickname', field_type=CustomField.STR)
+        cfield_enum = create_cfield(name='Hair', field_type=CustomField.ENUM)
+        brown = CustomFieldEnumValue.objects.create(custom_field=cfield_enum, value='Brown')
+
+        self._create_config(
+            FakeContact,
+            [
+                EntityCellRegularField.build(FakeContact, 'last_name'),
+                EntityCellCustomField(cfield_str),
+                EntityCellCustomField(cfield_enum),
+            ],
+        )
+        self._build_contacts(user)
+        CustomFieldString.objects.create(
+            custom_field=cfield_str, entity=self.linus, value='Penguin',
+        )
+        get_search_index().rebuild(FakeContact)
+        self.assertSetEqual({self.linus}, self._search(user, FakeContact, 'pengu'))
+
+        # Update
+        cvalue = CustomFieldString.objects.create(
+            custom_field=cfield_str, entity=self.alan, value='Beard',
+        )
+        self.assertSetEqual({self.alan}, self._search(user, FakeContact, 'beard'))
+
+        cvalue.value = 'Moustache'
+        cvalue.save()
+        self.assertFalse(self._search(user, FakeContact, 'beard'))
+        self.assertSetEqual({self.alan}, self._search(user, FakeContact, 'moustache'))
+
+        CustomFieldEnum.objects.create(custom_field=cfield_enum, entity=self.jose, value=brown)
+        self.assertSetEqual({self.jose}, self._search(user, FakeContact, 'brown'))
+
+        cvalue.delete()
+        self.assertFalse(self._search(user, FakeContact, 'moustache'))
+
+    def test_command(self):
+        user = self.get_root_user()
+        SearchConfigItem.objects.create_if_needed(FakeContact, ['last_name'])
+        SearchConfigItem.objects.create_if_needed(FakeOrganisation, ['name'])
+        self._build_contacts(user)
+        FakeOrganisation.objects.create(user=user, name='Linux Foundation')
+
+        with self.assertNoException():
+            call_command('creme_search_index', 'creme_core.FakeContact', verbosity=0)
+
+        index = get_search_index()
+        get_ct = ContentType.objects.get_for_model
+        self.assertSetEqual(
+            {'regular_field-last_name'}, index.indexed_cell_keys(get_ct(FakeContact)),
+        )
+        self.assertFalse(index.indexed_cell_keys(get_ct(FakeOrganisation)))
+
+        # All models
+        call_command('creme_search_index', verbosity=0)
+        self.assertSetEqual(
+            {'regular_field-name'}, index.indexed_cell_keys(get_ct(FakeOrganisation)),
+        )
+
+    def test_command__errors(self):
+        with self.assertRaises(CommandError):
+            call_command('creme_search_index', 'creme_core.Unknown', verbosity=0)
+
+        with self.assertRaises(CommandError):
+            call_command('creme_search_index', 'creme_core.FakeSector', verbosity=0)
+
+        with override_settings(SEARCH_INDEX_BACKEND=None):
+            with self.assertRaises(CommandError):
+                call_command('creme_search_index', verbosity=0)
+
+
+@skipIf(connection.vendor != 'sqlite', 'The FTS5 index is only available with SQLite')
+@override_settings(SEARCH_INDEX_BACKEND=SQLITE_BACKEND_PATH)
+class SQLiteSearchIndexTestCase(CremeTestCase):
+    def test_search(self):
+        user = self.get_root_user()
+        SearchConfigItem.objects.all().delete()
+        SearchConfigItem.objects.create_if_needed(FakeContact, ['first_name', 'last_name'])
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        linus = create_contact(first_name='Linus', last_name='Torvalds')
+        alan = create_contact(first_name='Alan', last_name='Cox')
+        get_search_index().rebuild(FakeContact)
+
+        def search(searched):
+            return {*Searcher([FakeContact], user).search(FakeContact, searched)}
+
+        self.assertSetEqual({linus}, search('torv'))
+        self.assertSetEqual({alan}, search('ox'))  # Shorter than a trigram
+        self.assertSetEqual({alan}, search('ALAN cox'))
+        self.assertFalse(search('linus cox'))
+        self.assertFalse(search('_'))
+
+        # Triggers
+        alan.last_name = 'Kay'
+        alan.save()
+        self.assertFalse(search('cox'))
+        self.assertSetEqual({alan}, search('kay'))
+
+        linus.delete()
+        self.assertFalse(search('torv'))
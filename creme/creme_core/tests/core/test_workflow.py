@@ -1,7 +1,10 @@
+import pickle
 from functools import partial
 
+from django.core.cache import caches
 from django.db.transaction import atomic
 from django.db.utils import IntegrityError
+from django.test.utils import override_settings
 from django.utils.translation import gettext as _
 
 from creme.creme_core.constants import REL_SUB_HAS
@@ -21,12 +24,15 @@ from creme.creme_core.core.workflow import (
     WorkflowEngine,
     WorkflowEvent,
     WorkflowEventQueue,
+    WorkflowIndex,
     WorkflowRegistry,
     WorkflowSource,
+    WorkflowStats,
     WorkflowTrigger,
     model_as_key,
     model_from_key,
     workflow_registry,
+    workflow_stats,
 )
 from creme.creme_core.forms.workflows import (
     CreatedEntitySourceField,
@@ -66,6 +72,20 @@ from creme.creme_core.workflows import (
 
 from ..base import CremeTestCase, CremeTransactionTestCase
 
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'creme_config_test': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'creme_config_test',
+    },
+    'creme_workflows_test': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'creme_workflows_test',
+    },
+}
+
 
 class UtilsTestCase(CremeTestCase):
     def test_model_to_key(self):
@@ -98,6 +118,7 @@ class WorkflowEventsTestCase(CremeTestCase):
         evt = EntityCreated(entity=entity1)
         self.assertIsInstance(evt, WorkflowEvent)
         self.assertEqual(entity1, evt.entity)
+        self.assertEqual(entity1.entity_type_id, evt.index_key)
 
         # eq ---
         entity2 = create_orga(name='Acme2')
@@ -141,6 +162,7 @@ class WorkflowEventsTestCase(CremeTestCase):
         evt = PropertyAdded(creme_property=prop11)
         self.assertIsInstance(evt, WorkflowEvent)
         self.assertEqual(prop11, evt.creme_property)
+        self.assertEqual(ptype1.uuid, evt.index_key)
 
         # eq ---
         self.assertEqual(PropertyAdded(creme_property=prop11), evt)
@@ -169,6 +191,7 @@ class WorkflowEventsTestCase(CremeTestCase):
         evt = RelationAdded(relation=rel)
         self.assertIsInstance(evt, WorkflowEvent)
         self.assertEqual(rel, evt.relation)
+        self.assertEqual(REL_SUB_HAS, evt.index_key)
 
         # eq ---
         self.assertEqual(RelationAdded(relation=rel), evt)
@@ -821,6 +844,181 @@ class WorkflowRegistryTestCase(CremeTestCase):
         self.assertIn(RelationAddingAction, actions)
 
 
+class WorkflowIndexTestCase(CremeTestCase):
+    def test_candidates(self):
+        user = self.get_root_user()
+
+        create_ptype = CremePropertyType.objects.create
+        ptype1 = create_ptype(text='Is cool')
+        ptype2 = create_ptype(text='Is very cool')
+        rtype = RelationType.objects.get(id=REL_SUB_HAS)
+
+        create_wf = partial(Workflow, content_type=FakeOrganisation)
+        wf1 = create_wf(id=1, trigger=EntityCreationTrigger(model=FakeOrganisation))
+        wf2 = create_wf(id=2, trigger=EntityEditionTrigger(model=FakeOrganisation))
+        wf3 = create_wf(id=3, trigger=EntityCreationTrigger(model=FakeContact))
+        wf4 = create_wf(
+            id=4, trigger=PropertyAddingTrigger(entity_model=FakeOrganisation, ptype=ptype1),
+        )
+        wf5 = create_wf(
+            id=5,
+            trigger=RelationAddingTrigger(
+                subject_model=FakeOrganisation, rtype=rtype, object_model=FakeContact,
+            ),
+        )
+        wf6 = create_wf(id=6, trigger=EntityCreationTrigger(model=FakeOrganisation))
+        wf6.json_trigger = {'type': 'creme_core-invalid'}  # => BrokenTrigger
+
+        index = WorkflowIndex([wf1, wf2, wf3, wf4, wf5, wf6])
+        self.assertEqual(6, len(index))
+        self.assertListEqual([wf1, wf2, wf3, wf4, wf5, wf6], [*index])
+
+        orga = FakeOrganisation.objects.create(user=user, name='Acme')
+        contact = FakeContact.objects.create(user=user, first_name='Bugs', last_name='Bunny')
+
+        # NB: the broken trigger is never indexed
+        self.assertListEqual([wf1, wf6], index.candidates(EntityCreated(entity=orga)))
+        self.assertListEqual([wf2, wf6], index.candidates(EntityEdited(entity=orga)))
+        self.assertListEqual([wf3, wf6], index.candidates(EntityCreated(entity=contact)))
+        self.assertListEqual([wf6],      index.candidates(EntityEdited(entity=contact)))
+
+        create_prop = partial(CremeProperty.objects.create, creme_entity=orga)
+        self.assertListEqual(
+            [wf4, wf6],
+            index.candidates(PropertyAdded(creme_property=create_prop(type=ptype1))),
+        )
+        self.assertListEqual(
+            [wf6],
+            index.candidates(PropertyAdded(creme_property=create_prop(type=ptype2))),
+        )
+
+        self.assertListEqual(
+            [wf5, wf6],
+            index.candidates(RelationAdded(relation=Relation.objects.create(
+                user=user, subject_entity=orga, type=rtype, object_entity=contact,
+            ))),
+        )
+
+    def test_candidates__no_key(self):
+        "Triggers & events without key are not filtered."
+        class TestEvent(WorkflowEvent):
+            pass
+
+        class NoKeyTrigger(EntityCreationTrigger):
+            event_class = TestEvent
+
+            @property
+            def index_key(self):
+                return None
+
+        user = self.get_root_user()
+        orga = FakeOrganisation.objects.create(user=user, name='Acme')
+
+        create_wf = partial(Workflow, content_type=FakeOrganisation)
+        wf1 = create_wf(id=1, trigger=EntityCreationTrigger(model=FakeContact))
+        wf2 = create_wf(id=2)
+        wf2._trigger = NoKeyTrigger(model=FakeOrganisation)
+        wf3 = create_wf(id=3, trigger=EntityCreationTrigger(model=FakeOrganisation))
+
+        index = WorkflowIndex([wf1, wf2, wf3])
+        self.assertListEqual([wf3], index.candidates(EntityCreated(entity=orga)))
+        self.assertListEqual([wf2], index.candidates(TestEvent()))
+
+        class NoKeyEvent(EntityCreated):
+            @property
+            def index_key(self):
+                return None
+
+        self.assertListEqual([wf1, wf3], index.candidates(NoKeyEvent(entity=orga)))
+
+    def test_candidates__lazy_key(self):
+        "The key of the event is not computed if no trigger is indexed for its class."
+        user = self.get_root_user()
+        ptype = CremePropertyType.objects.create(text='Is cool')
+        orga = FakeOrganisation.objects.create(user=user, name='Acme')
+        prop = self.refresh(CremeProperty.objects.create(creme_entity=orga, type=ptype))
+
+        index = WorkflowIndex([
+            Workflow(
+                id=1, content_type=FakeOrganisation,
+                trigger=EntityCreationTrigger(model=FakeOrganisation),
+            ),
+        ])
+
+        with self.assertNumQueries(0):
+            candidates = index.candidates(PropertyAdded(creme_property=prop))
+        self.assertListEqual([], candidates)
+
+    def test_pickle(self):
+        wf = Workflow.objects.create(
+            title='Created Organisations are cool',
+            content_type=FakeOrganisation,
+            trigger=EntityCreationTrigger(model=FakeOrganisation),
+        )
+
+        index = pickle.loads(pickle.dumps(WorkflowIndex([wf])))
+        self.assertListEqual([wf.id], [w.id for w in index])
+
+        orga = FakeOrganisation.objects.create(user=self.get_root_user(), name='Acme')
+        self.assertListEqual(
+            [wf.id], [w.id for w in index.candidates(EntityCreated(entity=orga))],
+        )
+
+
+@override_settings(CACHES=TEST_CACHES, WORKFLOW_STATS_CACHE_ALIAS='creme_workflows_test')
+class WorkflowStatsTestCase(CremeTestCase):
+    def tearDown(self):
+        super().tearDown()
+        caches['creme_workflows_test'].clear()
+
+    def test_disabled(self):
+        stats = WorkflowStats()
+        wf = Workflow(title='Flow')
+
+        with override_settings(WORKFLOW_STATS_CACHE_ALIAS=None):
+            self.assertIsNone(stats.backend)
+
+            stats.add({wf.uuid: {'triggered': 1}})  # No error
+            self.assertDictEqual({}, stats.get([wf]))
+            stats.reset([wf])  # No error
+
+    def test_add_n_get(self):
+        stats = WorkflowStats()
+        self.assertIs(caches['creme_workflows_test'], stats.backend)
+
+        wf1 = Workflow(title='Flow #1')
+        wf2 = Workflow(title='Flow #2')
+        self.assertDictEqual(
+            {
+                wf1.uuid: {'triggered': 0, 'executed': 0, 'duration': 0},
+                wf2.uuid: {'triggered': 0, 'executed': 0, 'duration': 0},
+            },
+            stats.get([wf1, wf2]),
+        )
+
+        stats.add({wf1.uuid: {'triggered': 2, 'executed': 1, 'duration': 150}})
+        stats.add({
+            wf1.uuid: {'triggered': 1, 'executed': 0, 'duration': 50},
+            wf2.uuid: {'triggered': 1, 'executed': 1, 'duration': 20},
+        })
+        self.assertDictEqual(
+            {
+                wf1.uuid: {'triggered': 3, 'executed': 1, 'duration': 200},
+                wf2.uuid: {'triggered': 1, 'executed': 1, 'duration': 20},
+            },
+            stats.get([wf1, wf2]),
+        )
+
+        stats.reset([wf1])
+        self.assertDictEqual(
+            {
+                wf1.uuid: {'triggered': 0, 'executed': 0, 'duration': 0},
+                wf2.uuid: {'triggered': 1, 'executed': 1, 'duration': 20},
+            },
+            stats.get([wf1, wf2]),
+        )
+
+
 class WorkflowEngineTestCase(CremeTestCase):
     def test_simple(self):
         user1 = self.get_root_user()
@@ -1021,6 +1219,92 @@ class WorkflowEngineTestCase(CremeTestCase):
         self.assertHasProperty(entity=orga1, ptype=ptype)
         self.assertEqual(0, len(engine._queue))  # Meh
 
+    @override_settings(CACHES=TEST_CACHES, CONFIG_CACHE_ALIAS='creme_config_test')
+    def test_index(self):
+        "The index is shared between the requests."
+        self.addCleanup(caches['creme_config_test'].clear)
+        user = self.get_root_user()
+
+        ptype = CremePropertyType.objects.create(text='Is cool')
+        wf = Workflow.objects.create(
+            title='Created Organisations are cool',
+            content_type=FakeOrganisation,
+            trigger=EntityCreationTrigger(model=FakeOrganisation),
+            actions=[
+                PropertyAddingAction(
+                    entity_source=CreatedEntitySource(model=FakeOrganisation),
+                    ptype=ptype,
+                ),
+            ],
+        )
+        self.clear_global_info()
+
+        with self.assertNumQueries(1):
+            index = WorkflowEngine.get_current().index
+        self.assertIn(wf.id, [w.id for w in index])
+
+        # Other request
+        self.clear_global_info()
+        with self.assertNumQueries(0):
+            index = WorkflowEngine.get_current().index
+        self.assertIn(wf.id, [w.id for w in index])
+
+        with WorkflowEngine.get_current().run(user=user):
+            orga1 = FakeOrganisation.objects.create(user=user, name='NERV')
+        self.assertHasProperty(entity=orga1, ptype=ptype)
+
+        # The index is rebuilt when a Workflow is modified
+        wf.enabled = False
+        wf.save()
+
+        self.clear_global_info()
+        with self.assertNumQueries(1):
+            index = WorkflowEngine.get_current().index
+        self.assertNotIn(wf.id, [w.id for w in index])
+
+        with WorkflowEngine.get_current().run(user=user):
+            orga2 = FakeOrganisation.objects.create(user=user, name='Seele')
+        self.assertHasNoProperty(entity=orga2, ptype=ptype)
+
+    @override_settings(CACHES=TEST_CACHES, WORKFLOW_STATS_CACHE_ALIAS='creme_workflows_test')
+    def test_stats(self):
+        self.addCleanup(caches['creme_workflows_test'].clear)
+        user = self.get_root_user()
+
+        ptype = CremePropertyType.objects.create(text='Is cool')
+        source = CreatedEntitySource(model=FakeOrganisation)
+        wf1 = Workflow.objects.create(
+            title='Created Corporations are cool',
+            content_type=FakeOrganisation,
+            trigger=EntityCreationTrigger(model=FakeOrganisation),
+            conditions=WorkflowConditions().add(
+                source=source,
+                conditions=[condition_handler.RegularFieldConditionHandler.build_condition(
+                    model=FakeOrganisation,
+                    operator=EndsWithOperator, field_name='name', values=[' Corp'],
+                )],
+            ),
+            actions=[PropertyAddingAction(entity_source=source, ptype=ptype)],
+        )
+        wf2 = Workflow.objects.create(
+            title='Created Contacts are cool',
+            content_type=FakeContact,
+            trigger=EntityCreationTrigger(model=FakeContact),
+        )
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+
+        with WorkflowEngine.get_current().run(user=None):
+            create_orga(name='NERV')
+            create_orga(name='Seele Corp')
+
+        stats = workflow_stats.get([wf1, wf2])
+        stats1 = stats[wf1.uuid]
+        self.assertEqual(2, stats1['triggered'])
+        self.assertEqual(1, stats1['executed'])
+        self.assertGreater(stats1['duration'], 0)
+        self.assertDictEqual({'triggered': 0, 'executed': 0, 'duration': 0}, stats[wf2.uuid])
+
 
 class WorkflowEngineRollbackTestCase(CremeTransactionTestCase):
     def test_creation(self):
@@ -9,6 +9,7 @@ from creme.creme_core.forms.mass_import import (
     CustomFieldExtractor,
     CustomfieldExtractorField,
     CustomFieldExtractorWidget,
+    LookupCache,
     RegularFieldExtractor,
     RegularFieldExtractorField,
     RegularFieldExtractorWidget,
@@ -18,6 +19,7 @@ from creme.creme_core.models import (
     CustomFieldEnumValue,
     FakeContact,
     FakeSector,
+    Language,
 )
 
 from ..base import CremeTestCase
@@ -150,6 +152,71 @@ class ExtractorTestCase(CremeTestCase):
         sector = self.get_object_or_fail(FakeSector, title=title)
         self.assertEqual(sector, value)
 
+    def test_extract__prefetch(self):
+        "Sub-field search + prefetch."
+        user = self.user
+        extractor = RegularFieldExtractor(
+            column_index=3,
+            default_value=None,
+            value_castor=int,
+        )
+        extractor.set_subfield_search(
+            subfield_search='title',
+            subfield_model=FakeSector,
+            multiple=False,
+            creation_form_class=None,
+        )
+
+        sector1, sector2 = FakeSector.objects.all()[:2]
+        line1 = ['Claus', 'Valca', sector1.title]
+        line2 = ['Lavie', 'Head', sector2.title]
+        line3 = ['Alex', 'Row', 'Unknown sector']
+
+        with self.assertNumQueries(1):
+            extractor.prefetch(lines=[line1, line2, line3], user=user)
+
+        with self.assertNumQueries(0):
+            value1, err_msg1 = extractor.extract_value(line1, user)
+            value2, err_msg2 = extractor.extract_value(line2, user)
+
+        self.assertIsNone(err_msg1)
+        self.assertEqual(sector1, value1)
+        self.assertEqual(sector2, value2)
+
+        # Not cached => regular query
+        value3, err_msg3 = extractor.extract_value(line3, user)
+        self.assertIsNone(value3)
+        self.assertTrue(err_msg3)
+
+    def test_extract__prefetch__short_line(self):
+        "The lines which are too short are ignored by prefetch()."
+        user = self.user
+        extractor = RegularFieldExtractor(
+            column_index=3,
+            default_value=None,
+            value_castor=int,
+        )
+        extractor.set_subfield_search(
+            subfield_search='title',
+            subfield_model=FakeSector,
+            multiple=False,
+            creation_form_class=None,
+        )
+
+        sector = FakeSector.objects.first()
+        line1 = ['Claus', 'Valca', sector.title]
+        line2 = ['Lavie', 'Head']
+
+        with self.assertNumQueries(1):
+            extractor.prefetch(lines=[line1, line2], user=user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual((sector, None), extractor.extract_value(line1, user))
+
+        # Regular behaviour (error for this line only)
+        with self.assertRaises(IndexError):
+            extractor.extract_value(line2, user)
+
     # TODO: creation error
     # TODO: multiple=True
     # TODO: value_castor + ValidationError
@@ -263,6 +330,43 @@ class CustomFieldExtractorTestCase(CremeTestCase):
         self.assertEqual(cfield, eval3.custom_field)
         self.assertEqual(line3[2], eval3.value)
 
+    def test_extract_enum__prefetch(self):
+        user = self.user
+        cfield = CustomField.objects.create(
+            name='Hobby',
+            field_type=CustomField.ENUM,
+            content_type=FakeContact,
+        )
+
+        create_evalue = CustomFieldEnumValue.objects.create
+        eval1 = create_evalue(custom_field=cfield, value='Piloting')
+        eval2 = create_evalue(custom_field=cfield, value='Mechanic')
+
+        extractor = CustomFieldExtractor(
+            column_index=3,
+            default_value=None,
+            value_castor=cfield.get_formfield(None).clean,
+            custom_field=cfield,
+            create_if_unfound=True,
+        )
+
+        line1 = ['Claus', 'Valca', 'piloting']
+        line2 = ['Lavie', 'Head', eval2.value]
+        line3 = ['Alvis', 'Hamilton', 'Cooking']
+
+        with self.assertNumQueries(1):
+            extractor.prefetch(lines=[line1, line2, line3], user=user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual((eval1.id, None), extractor.extract_value(line1, user))
+            self.assertEqual((eval2.id, None), extractor.extract_value(line2, user))
+
+        eval3_id, err_msg = extractor.extract_value(line3, user)
+        self.assertIsNone(err_msg)
+        self.assertEqual(
+            line3[2], self.get_object_or_fail(CustomFieldEnumValue, id=eval3_id).value,
+        )
+
     def test_extract_enum02(self):
         "create_if_unfound == False + empty default value."
         user = self.user
@@ -407,6 +511,70 @@ class CustomFieldExtractorTestCase(CremeTestCase):
         self.assertEqual(line3[2], eval3.value)
 
 
+class LookupCacheTestCase(CremeTestCase):
+    def test_fill(self):
+        sector1, sector2 = FakeSector.objects.all()[:2]
+
+        cache = LookupCache()
+        self.assertIsNone(cache.get(sector1.title))
+
+        with self.assertNumQueries(1):
+            cache.fill(
+                queryset=FakeSector.objects.all(),
+                field_name='title',
+                values=[sector1.title, sector2.title, '', 'Unknown'],
+            )
+
+        with self.assertNumQueries(0):
+            cached1 = cache.get(sector1.title)
+            cached2 = cache.get(sector2.title)
+
+        self.assertEqual(sector1, cached1)
+        self.assertEqual(sector2, cached2)
+        self.assertIsNot(cached1, cache.get(sector1.title))  # Copy
+        self.assertIsNone(cache.get('Unknown'))
+        self.assertIsNone(cache.get(sector1.title.upper()))
+
+        cache.clear()
+        self.assertIsNone(cache.get(sector1.title))
+
+        with self.assertNumQueries(0):
+            cache.fill(queryset=FakeSector.objects.all(), field_name='title', values=['', ''])
+
+    def test_column_values(self):
+        self.assertListEqual(
+            ['b', 'e'],
+            [*LookupCache.column_values([['a', 'b'], ['c'], ['d', 'e', 'f'], []], 2)],
+        )
+
+    def test_fill__ambiguous(self):
+        create_language = Language.objects.create
+        lang1 = create_language(name='Klingon')
+        create_language(name='klingon')
+        lang3 = create_language(name='Vulcan')
+
+        cache = LookupCache()
+        cache.fill(
+            queryset=Language.objects.all(),
+            field_name='name',
+            values=[lang1.name, lang3.name, 'klingon'],
+        )
+        self.assertIsNone(cache.get(lang1.name))
+        self.assertIsNone(cache.get('klingon'))
+        self.assertEqual(lang3, cache.get(lang3.name))
+
+    def test_fill__invalid_value(self):
+        sector = FakeSector.objects.first()
+
+        cache = LookupCache()
+        cache.fill(
+            queryset=FakeSector.objects.all(),
+            field_name='id',
+            values=[str(sector.id), 'notanint'],
+        )
+        self.assertIsNone(cache.get(str(sector.id)))
+
+
 class ExtractorFieldTestCase(CremeTestCase):
     def test_attributes(self):
         user = self.get_root_user()
@@ -1697,6 +1697,119 @@ class FieldsPrintersTestCase(CremeTestCase):
             ),
         )
 
+    def test_registry_cache(self):
+        user = self.get_root_user()
+        registry = FieldPrinterRegistry()
+
+        build_printer = registry.build_field_printer
+        printer1 = build_printer(model=FakeOrganisation, field_name='name')
+        self.assertIs(printer1, build_printer(model=FakeOrganisation, field_name='name'))
+        self.assertIsNot(
+            printer1,
+            build_printer(model=FakeOrganisation, field_name='name', tag=ViewTag.TEXT_PLAIN),
+        )
+        self.assertIsNot(printer1, build_printer(model=FakeContact, field_name='email'))
+
+        # Registration => cache is cleared
+        registry.register_model_field_type(
+            type=models.CharField,
+            printer=lambda *, value, **kwargs: f'«{value}»',
+            tags=ViewTag.HTML_DETAIL,
+        )
+        printer2 = build_printer(model=FakeOrganisation, field_name='name')
+        self.assertIsNot(printer1, printer2)
+
+        orga = FakeOrganisation.objects.create(user=user, name='NERV')
+        self.assertEqual('«NERV»', printer2(orga, user))
+
+        registry.register_model_field(
+            model=FakeOrganisation, field_name='name',
+            printer=lambda *, value, **kwargs: f'[{value}]',
+            tags=ViewTag.HTML_DETAIL,
+        )
+        self.assertEqual(
+            '[NERV]',
+            registry.get_field_value(
+                instance=orga, field_name='name', user=user, tag=ViewTag.HTML_DETAIL,
+            ),
+        )
+
+        registry.register_choice_printer(
+            printer=lambda *, value, **kwargs: 'choice', tags=ViewTag.HTML_DETAIL,
+        )
+        self.assertIsNot(printer2, build_printer(model=FakeOrganisation, field_name='name'))
+
+    def test_print_values(self):
+        user = self.get_root_user()
+        registry = FieldPrinterRegistry()
+
+        create_sector = FakeSector.objects.create
+        sector1 = create_sector(title='Robotics')
+        sector2 = create_sector(title='Inquisition')
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        create_orga(name='NERV', sector=sector1, capital=1000)
+        create_orga(name='Seele', sector=sector2)
+        create_orga(name='Wille')
+
+        orgas = [*FakeOrganisation.objects.filter(name__in=['NERV', 'Seele', 'Wille'])]
+
+        with self.assertNumQueries(2):  # Sectors & users
+            values = registry.print_values(
+                instances=orgas,
+                field_names=['name', 'sector__title', 'capital', 'user__username'],
+                user=user,
+            )
+
+        self.assertListEqual(
+            [
+                ['NERV',  'Robotics',    '1000', user.username],
+                ['Seele', 'Inquisition', '',     user.username],
+                ['Wille', '',            '',     user.username],
+            ],
+            values,
+        )
+
+        self.assertListEqual(
+            [],
+            registry.print_values(instances=[], field_names=['name'], user=user),
+        )
+
+    def test_print_values__m2m(self):
+        user = self.get_root_user()
+        registry = FieldPrinterRegistry()
+
+        create_ml = partial(FakeMailingList.objects.create, user=user)
+        ml1 = create_ml(name='Swimsuits')
+        ml2 = create_ml(name='Hats')
+        ml3 = create_ml(name='Deleted', is_deleted=True)
+
+        create_camp = partial(FakeEmailCampaign.objects.create, user=user)
+        camp1 = create_camp(name='Summer 2020')
+        camp2 = create_camp(name='Winter 2020')
+        camp3 = create_camp(name='Spring 2021')
+        camp1.mailing_lists.set([ml1, ml2, ml3])
+        camp2.mailing_lists.set([ml2])
+
+        camps = [
+            *FakeEmailCampaign.objects.filter(id__in=[camp1.id, camp2.id, camp3.id])
+                                      .order_by('id'),
+        ]
+
+        with self.assertNumQueries(1):
+            values = registry.print_values(
+                instances=camps, field_names=['name', 'mailing_lists__name'], user=user,
+            )
+
+        self.assertListEqual(
+            [
+                [camp1.name, f'{ml2.name}/{ml1.name}'],
+                [camp2.name, ml2.name],
+                [camp3.name, ''],
+            ],
+            values,
+        )
+
     def test_registry_credentials(self):
         user = self.login_as_standard(allowed_apps=['creme_core'])
         self.add_credentials(user.role, own='*')
@@ -1646,3 +1646,24 @@ class HistoryRenderTestCase(CremeTestCase):
             ),
             self.render_line(hline2, user),
         )
+
+    def test_render_mass_deletion(self):
+        user = self.get_root_user()
+        hline = history._HLTEntityMassDeletion.create_line(
+            ctype=ContentType.objects.get_for_model(FakeOrganisation),
+            user=user,
+            count=3,
+        )
+
+        self.assertEqual(history.TYPE_MASS_DELETION, hline.type)
+        self.assertHTMLEqual(
+            format_html(
+                '<div class="history-line history-line-mass_deletion">{}<div>',
+                _('Deletion of «%(counted_instances)s» (emptying of the trash)') % {
+                    'counted_instances': _('{count} {model}').format(
+                        count=3, model='Test Organisations',
+                    ),
+                },
+            ),
+            self.render_line(hline, user),
+        )
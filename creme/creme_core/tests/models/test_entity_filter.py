@@ -1567,6 +1567,77 @@ class EntityFiltersTestCase(CremeTestCase):
         self.assertIs(accept(contacts['rei']),    True)
         self.assertIs(accept(contacts['spike']),  False)
 
+    def test_accept_many(self):
+        user = self.get_root_user()
+        loves = RelationType.objects.smart_update_or_create(
+            ('test-subject_love', 'Is loving'),
+            ('test-object_love',  'Is loved by'),
+        )[0]
+        ptype = CremePropertyType.objects.create(text='Pilot')
+        cfield = CustomField.objects.create(
+            name='Size', field_type=CustomField.INT, content_type=FakeContact,
+        )
+
+        contacts = self.contacts
+        create_rel = partial(Relation.objects.create, user=user, type=loves)
+        create_rel(subject_entity=contacts['shinji'], object_entity=contacts['rei'])
+        create_rel(subject_entity=contacts['asuka'],  object_entity=contacts['shinji'])
+        create_rel(subject_entity=contacts['yui'],    object_entity=contacts['gendou'])
+
+        create_prop = partial(CremeProperty.objects.create, type=ptype)
+        create_prop(creme_entity=contacts['shinji'])
+        create_prop(creme_entity=contacts['asuka'])
+        create_prop(creme_entity=contacts['rei'])
+
+        create_cfval = partial(CustomFieldInteger.objects.create, custom_field=cfield)
+        create_cfval(entity=contacts['shinji'], value=150)
+        create_cfval(entity=contacts['asuka'],  value=160)
+        create_cfval(entity=contacts['misato'], value=170)
+
+        efilter = EntityFilter.objects.smart_update_or_create(
+            'test-filter01', 'Pilots', FakeContact,
+            conditions=[
+                RelationConditionHandler.build_condition(model=FakeContact, rtype=loves),
+                PropertyConditionHandler.build_condition(model=FakeContact, ptype=ptype),
+                CustomFieldConditionHandler.build_condition(
+                    custom_field=cfield, operator=operators.LTE, values=[155],
+                ),
+                RegularFieldConditionHandler.build_condition(
+                    model=FakeContact, operator=operators.EQUALS,
+                    field_name='civility__title', values=['Mister'],
+                ),
+            ],
+            use_or=True,
+        )
+        ids = [c.id for c in contacts.values()]
+
+        def get_contacts():
+            return [*FakeContact.objects.filter(id__in=ids).order_by('id')]
+
+        efilter = self.refresh(efilter)
+        efilter.accept_many(get_contacts()[:1], user=user)  # Fill the caches of the handlers
+
+        contacts_to_check = get_contacts()
+        # Relationships, their objects, properties, custom-values & civilities
+        with self.assertNumQueries(5):
+            accepted = efilter.accept_many(contacts_to_check, user=user)
+
+        accepted_contacts = {
+            contact.id for contact, ok in zip(get_contacts(), accepted) if ok
+        }
+        self.assertSetEqual(
+            {
+                contacts[name].id
+                for name in ('shinji', 'asuka', 'yui', 'rei', 'spike', 'jet')
+            },
+            accepted_contacts,
+        )
+        self.assertListEqual(
+            [efilter.accept(entity=contact, user=user) for contact in get_contacts()],
+            accepted,
+        )
+        self.assertListEqual([], efilter.accept_many([], user=user))
+
     def test_condition_update(self):
         build = partial(RegularFieldConditionHandler.build_condition, model=FakeContact)
         EQUALS = operators.EQUALS
@@ -505,6 +505,65 @@ class NotificationTestCase(CremeTestCase):
             Notification, user=user, channel=channel, output=OUTPUT_EMAIL,
         )
 
+    def test_manager_bulk_send(self):
+        "Several contents, teams, no content for a user."
+        queue = get_queue()
+        queue.clear()
+
+        user1 = self.get_root_user()
+        user2 = self.create_user(0)
+        user3 = self.create_user(1)
+
+        team = self.create_team('Guild', user1, user3)
+
+        channel = NotificationChannel.objects.create(
+            name='My Channel', default_outputs=[OUTPUT_WEB],
+        )
+        create_item = partial(NotificationChannelConfigItem.objects.create, channel=channel)
+        create_item(user=user1, outputs=[OUTPUT_WEB])
+        create_item(user=user2, outputs=[OUTPUT_WEB, OUTPUT_EMAIL])
+
+        content1 = SimpleNotifContent(subject='Subject #1', body='Body #1')
+        content2 = SimpleNotifContent(subject='Subject #2', body='Body #2')
+        content3 = SimpleNotifContent(subject='Subject #3', body='Body #3')
+        Notification.objects.bulk_send(
+            channel=channel,
+            contents=[
+                ([user1, team], content1),
+                ([user2], content2),
+                ([team], content3),
+            ],
+            level=Notification.Level.HIGH,
+        )
+        self.assertCountEqual(
+            [
+                (user1.id, OUTPUT_WEB, content1.as_dict()),
+                (user3.id, OUTPUT_WEB, content1.as_dict()),
+                (user2.id, OUTPUT_WEB, content2.as_dict()),
+                (user2.id, OUTPUT_EMAIL, content2.as_dict()),
+                (user1.id, OUTPUT_WEB, content3.as_dict()),
+                (user3.id, OUTPUT_WEB, content3.as_dict()),
+            ],
+            [
+                (notif.user_id, notif.output, notif.content_data)
+                for notif in Notification.objects.filter(channel=channel)
+            ],
+        )
+        self.assertFalse(Notification.objects.filter(
+            channel=channel,
+        ).exclude(level=Notification.Level.HIGH))
+
+        job, _data = self.get_alone_element(queue.refreshed_jobs)
+        self.assertEqual(self.get_emails_sender_job(), job)
+
+    def test_manager_bulk_send__empty(self):
+        channel = NotificationChannel.objects.create(
+            name='My Channel', default_outputs=[OUTPUT_WEB],
+        )
+
+        with self.assertNumQueries(0):
+            Notification.objects.bulk_send(channel=channel, contents=[])
+
     def test_populate(self):
         sys_chan = self.get_object_or_fail(
             NotificationChannel, uuid=constants.UUID_CHANNEL_SYSTEM,
@@ -3,6 +3,7 @@ from functools import partial
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db.models import prefetch_related_objects
+from django.db.models.signals import post_save
 from django.utils.translation import gettext as _
 
 from creme.creme_core.core.exceptions import ConflictError
@@ -13,9 +14,11 @@ from creme.creme_core.models import (
     FakeContact,
     FakeDocument,
     FakeOrganisation,
+    HistoryLine,
     Relation,
     RelationType,
 )
+from creme.creme_core.models.history import TYPE_RELATION, TYPE_SYM_RELATION
 from creme.creme_core.utils.profiling import CaptureQueriesContext
 
 from ..base import CremeTestCase
@@ -746,6 +749,237 @@ class RelationsTestCase(CremeTestCase):
 
         self.assertEqual(len(ctxt1), len(ctxt2) + 1)
 
+    def test_manager_safe_multi_save06(self):
+        "Bulk creation (the number of queries does not depend on the number of relations)."
+        rtype, sym_rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_challenge', 'challenges'),
+            ('test-object_challenge',  'is challenged by'),
+        )
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        contacts = [
+            create_contact(first_name=f'Student #{i}', last_name='Honnouji')
+            for i in range(6)
+        ]
+
+        def save_relations(subjects):
+            return Relation.objects.safe_multi_save(
+                [
+                    Relation(user=user, subject_entity=s, type=rtype, object_entity=satsuki)
+                    for s in subjects
+                ],
+                check_existing=False,
+            )
+
+        with CaptureQueriesContext() as ctxt1:
+            count1 = save_relations(contacts[:2])
+
+        with CaptureQueriesContext() as ctxt2:
+            count2 = save_relations(contacts[2:])
+
+        self.assertEqual(2, count1)
+        self.assertEqual(4, count2)
+        self.assertEqual(len(ctxt1), len(ctxt2))
+
+        for contact in contacts:
+            rel = self.get_object_or_fail(
+                Relation, subject_entity=contact.id, type=rtype, object_entity=satsuki.id,
+            )
+            self.assertEqual(satsuki.entity_type, rel.object_ctype)
+            self.assertEqual(user.id,             rel.user_id)
+
+            sym_rel = rel.symmetric_relation
+            self.assertIsNotNone(sym_rel)
+            self.assertEqual(sym_rtype.id,  sym_rel.type_id)
+            self.assertEqual(satsuki.id,    sym_rel.subject_entity_id)
+            self.assertEqual(contact.id,    sym_rel.object_entity_id)
+            self.assertEqual(rel.id,        sym_rel.symmetric_relation_id)
+            self.assertEqual(rel.created,   sym_rel.created)
+
+    def test_manager_safe_multi_save07(self):
+        "Bulk creation: signals are sent like with save()."
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_challenge', 'challenges'),
+            ('test-object_challenge',  'is challenged by'),
+        )[0]
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko   = create_contact(first_name='Ryuko',   last_name='Matoi')
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        mako    = create_contact(first_name='Mako',    last_name='Mankanshoku')
+
+        calls = []
+
+        def receiver(sender, instance, created, update_fields, **kwargs):
+            calls.append((
+                instance.type_id, instance.subject_entity_id,
+                instance.symmetric_relation_id is not None,
+                created, update_fields,
+            ))
+
+        post_save.connect(receiver, sender=Relation, dispatch_uid='test-relation_bulk')
+        try:
+            # NB: the lines of history are created at commit
+            with self.captureOnCommitCallbacks(execute=True):
+                count = Relation.objects.safe_multi_save([
+                    Relation(user=user, subject_entity=ryuko, type=rtype, object_entity=satsuki),
+                    Relation(user=user, subject_entity=mako,  type=rtype, object_entity=satsuki),
+                ])
+        finally:
+            post_save.disconnect(dispatch_uid='test-relation_bulk')
+
+        self.assertEqual(2, count)
+
+        sym_id = rtype.symmetric_type_id
+        update_fields = frozenset(['symmetric_relation'])
+        self.assertListEqual(
+            [
+                (rtype.id, ryuko.id,   False, True,  None),
+                (sym_id,   satsuki.id, True,  True,  None),
+                (rtype.id, ryuko.id,   True,  False, update_fields),
+                (rtype.id, mako.id,    False, True,  None),
+                (sym_id,   satsuki.id, True,  True,  None),
+                (rtype.id, mako.id,    True,  False, update_fields),
+            ],
+            calls,
+        )
+
+        # History
+        hlines = HistoryLine.objects.filter(entity=ryuko.id, type=TYPE_RELATION)
+        self.assertEqual(1, len(hlines))
+
+        sym_hlines = HistoryLine.objects.filter(entity=satsuki.id, type=TYPE_SYM_RELATION)
+        self.assertEqual(2, len(sym_hlines))
+        self.assertIn(hlines[0].related_line.id, [hline.id for hline in sym_hlines])
+
+    def test_manager_safe_multi_save08(self):
+        "Bulk creation: a duplicate is not detected => fallback to the slow path."
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_challenge', 'challenges'),
+            ('test-object_challenge',  'is challenged by'),
+        )[0]
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko   = create_contact(first_name='Ryuko',   last_name='Matoi')
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        mako    = create_contact(first_name='Mako',    last_name='Mankanshoku')
+
+        build_rel = partial(Relation, user=user, type=rtype, object_entity=satsuki)
+        rel1 = build_rel(subject_entity=ryuko)
+        rel1.save()
+
+        with self.assertLogs(level='WARNING'):
+            count = Relation.objects.safe_multi_save(
+                [build_rel(subject_entity=ryuko), build_rel(subject_entity=mako)],
+                check_existing=False,
+            )
+
+        self.assertEqual(1, count)
+        self.assertStillExists(rel1)
+
+        rel2 = self.get_object_or_fail(
+            Relation, subject_entity=mako.id, type=rtype, object_entity=satsuki.id,
+        )
+        self.assertIsNotNone(rel2.symmetric_relation)
+        self.assertEqual(
+            2, Relation.objects.filter(type=rtype.symmetric_type_id).count(),
+        )
+
+    def test_manager_safe_multi_save09(self):
+        "Argument <clean>."
+        ptype = CremePropertyType.objects.create(text='Is a student')
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_challenge', 'challenges', [FakeContact]),
+            ('test-object_challenge',  'is challenged by', [FakeContact], [ptype]),
+        )[0]
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko   = create_contact(first_name='Ryuko',   last_name='Matoi')
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        mako    = create_contact(first_name='Mako',    last_name='Mankanshoku')
+        CremeProperty.objects.create(creme_entity=satsuki, type=ptype)
+
+        build_rel = partial(Relation, user=user, type=rtype, subject_entity=ryuko)
+
+        with self.assertRaises(ValidationError) as cm:
+            Relation.objects.safe_multi_save(
+                [build_rel(object_entity=satsuki), build_rel(object_entity=mako)],
+                clean=True,
+            )
+
+        self.assertEqual('missing_subject_property', cm.exception.code)
+        self.assertFalse(Relation.objects.filter(type=rtype))
+
+        # ---
+        count = Relation.objects.safe_multi_save(
+            [build_rel(object_entity=satsuki)], clean=True,
+        )
+        self.assertEqual(1, count)
+
+    def test_manager_clean_multi(self):
+        ptype = CremePropertyType.objects.create(text='Is a student')
+        rtype1 = RelationType.objects.smart_update_or_create(
+            ('test-subject_challenge', 'challenges', [FakeContact], [ptype]),
+            ('test-object_challenge',  'is challenged by', [FakeContact]),
+        )[0]
+        rtype2 = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed', 'is employed by', [FakeContact]),
+            ('test-object_employed',  'employs', [FakeOrganisation]),
+        )[0]
+
+        user = self.user
+        create_contact = partial(FakeContact.objects.create, user=user)
+        ryuko   = create_contact(first_name='Ryuko',   last_name='Matoi')
+        satsuki = create_contact(first_name='Satsuki', last_name='Kiryuin')
+        mako    = create_contact(first_name='Mako',    last_name='Mankanshoku')
+        honnouji = FakeOrganisation.objects.create(user=user, name='Honnouji')
+
+        create_ptype = partial(CremeProperty.objects.create, type=ptype)
+        create_ptype(creme_entity=ryuko)
+        create_ptype(creme_entity=mako)
+
+        def build_relations(*subjects):
+            return [
+                *(
+                    Relation(
+                        user=user, subject_entity=s, type=rtype1, object_entity=satsuki,
+                    ) for s in subjects
+                ),
+                *(
+                    Relation(
+                        user=user, subject_entity=s, type=rtype2, object_entity=honnouji,
+                    ) for s in subjects
+                ),
+            ]
+
+        with CaptureQueriesContext() as ctxt1:
+            Relation.objects.clean_multi(build_relations(ryuko))
+
+        with CaptureQueriesContext() as ctxt2:
+            Relation.objects.clean_multi(build_relations(ryuko, mako))
+
+        self.assertEqual(len(ctxt1), len(ctxt2))
+
+        # Missing property ---
+        with self.assertRaises(ValidationError) as cm1:
+            Relation.objects.clean_multi(build_relations(ryuko, satsuki))
+        self.assertEqual('missing_subject_property', cm1.exception.code)
+
+        # Forbidden ContentType for the symmetrical relation ---
+        with self.assertRaises(ValidationError) as cm2:
+            Relation.objects.clean_multi([
+                Relation(user=user, subject_entity=ryuko, type=rtype2, object_entity=mako),
+            ])
+        self.assertEqual('forbidden_subject_ctype', cm2.exception.code)
+
+        with self.assertNumQueries(0):
+            Relation.objects.clean_multi([])
+
     def test_clean01(self):
         "No constraint."
         create_rtype = RelationType.objects.smart_update_or_create
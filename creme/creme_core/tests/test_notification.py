@@ -9,10 +9,11 @@ from creme.creme_core.core.notification import (
     NotificationContent,
     notification_registry,
 )
-from creme.creme_core.models import FakeDocument, FakeFolder
+from creme.creme_core.models import FakeDocument, FakeFolder, FileRef
 from creme.creme_core.notification import (
     AdministrationChannelType,
     JobsChannelType,
+    MassExportDoneContent,
     MassImportDoneContent,
     RemindersChannelType,
     SystemChannelType,
@@ -202,3 +203,36 @@ class NotificationTestCase(CremeTestCase):
         body = _('The document is deleted')
         self.assertEqual(body, content.get_body(user))
         self.assertEqual(body, content.get_html_body(user))
+
+    def test_mass_export_done(self):
+        user = self.get_root_user()
+        fileref = FileRef.objects.create(
+            user=user, basename='fakecontact.csv', filedata='mass_export/fakecontact.csv',
+        )
+        content = MassExportDoneContent(instance=fileref)
+        self.assertEqual(_('A mass export is done'), content.get_subject(user))
+        self.assertEqual(
+            _(
+                'The mass export is done; the file «%(name)s» can be downloaded '
+                'from the notifications'
+            ) % {'name': 'fakecontact.csv'},
+            content.get_body(user),
+        )
+        self.assertEqual(
+            _(
+                'The mass export is done; <a href="%(url)s">download the file «%(name)s»</a>'
+            ) % {
+                'url': fileref.get_download_absolute_url(),
+                'name': 'fakecontact.csv',
+            },
+            content.get_html_body(user),
+        )
+
+    def test_mass_export_done_error(self):
+        user = self.get_root_user()
+        content = MassExportDoneContent(instance=self.UNUSED_PK)
+        self.assertEqual(_('A mass export is done'), content.get_subject(user))
+
+        body = _('The exported file is deleted')
+        self.assertEqual(body, content.get_body(user))
+        self.assertEqual(body, content.get_html_body(user))
@@ -1122,6 +1122,52 @@ class EntityViewsTestCase(BrickTestCaseMixin, CremeTestCase):
             jresult.messages,
         )
 
+    def test_empty_trash__bulk_deletion(self):
+        "Model without specific deletion logic => deleted in bulk."
+        user = self.login_as_root_and_get()
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user, is_deleted=True)
+        orga1 = create_orga(name='Nerv')
+        orga2 = create_orga(name='Seele')
+        orga3 = create_orga(name='Gehirn')
+
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_linked', 'is linked to'),
+            ('test-object_linked',  'is linked to'),
+            is_internal=True,
+        )[0]
+        Relation.objects.create(
+            user=user, type=rtype, subject_entity=orga3,
+            object_entity=create_orga(name='Neo Tokyo', is_deleted=False),
+        )
+
+        self.assertPOST200(self.EMPTY_TRASH_URL)
+
+        job = self.get_object_or_fail(Job, type_id=trash_cleaner_type.id)
+        # NB: the lines of history are buffered until the commit
+        with self.captureOnCommitCallbacks(execute=True):
+            trash_cleaner_type.execute(job)
+
+        self.assertDoesNotExist(orga1)
+        self.assertDoesNotExist(orga2)
+        self.assertStillExists(orga3)
+        self.assertEqual(2, self.get_object_or_fail(TrashCleaningCommand, job=job).deleted_count)
+
+        jresult = self.get_alone_element(EntityJobResult.objects.filter(job=job))
+        self.assertEqual(orga3.id, jresult.entity_id)
+        self.assertListEqual(
+            [_('Can not be deleted because of links with other entities.')],
+            jresult.messages,
+        )
+
+        self.assertFalse(HistoryLine.objects.filter(type=history.TYPE_DELETION))
+
+        hline = self.get_alone_element(
+            HistoryLine.objects.filter(type=history.TYPE_MASS_DELETION)
+        )
+        self.assertEqual(FakeOrganisation, hline.entity_ctype.model_class())
+        self.assertListEqual([2], hline.modifications)
+
     @staticmethod
     def _build_finish_cleaner_url(job):
         return reverse('creme_core__finish_trash_cleaner', args=(job.id,))
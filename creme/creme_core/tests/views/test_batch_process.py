@@ -1,5 +1,6 @@
 from functools import partial
 from json import dumps as json_dump
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
@@ -17,16 +18,22 @@ from creme.creme_core.core.entity_filter.condition_handler import (
 # Should be a test queue
 from creme.creme_core.core.job import get_queue, job_type_registry
 from creme.creme_core.core.workflow import WorkflowConditions
-from creme.creme_core.creme_jobs.batch_process import batch_process_type
+from creme.creme_core.creme_jobs.batch_process import (
+    _process_range,
+    batch_process_type,
+)
 from creme.creme_core.models import (
+    CremeEntity,
     CremePropertyType,
     EntityFilter,
     EntityJobResult,
     FakeContact,
     FakeOrganisation,
+    HistoryLine,
     Job,
     Workflow,
 )
+from creme.creme_core.models.history import TYPE_EDITION
 
 from ..base import CremeTestCase
 
@@ -68,6 +75,19 @@ class BatchProcessViewsTestCase(CremeTestCase):
     def _execute_job(self, response):
         batch_process_type.execute(self._get_job(response))
 
+    def _create_upper_job(self, user):
+        return Job.objects.create(
+            user=user,
+            type_id=batch_process_type.id,
+            language='en',
+            data={
+                'ctype': self.orga_ct.id,
+                'actions': [
+                    {'field_name': 'name', 'operator_name': 'upper', 'value': ''},
+                ],
+            },
+        )
+
     def test_no_app_perm(self):
         # Not 'creme_core'
         self.login_as_standard(allowed_apps=['documents'])
@@ -753,6 +773,121 @@ class BatchProcessViewsTestCase(CremeTestCase):
         self.assertEqual('Anime',   self.refresh(orga03).name)
         self.assertEqual('Coding',  self.refresh(orga01).name)  # <== Should not be modified again
 
+    def test_chunks(self):
+        user = self.get_root_user()
+        orgas = [
+            FakeOrganisation.objects.create(user=user, name=f'Club #{i}')
+            for i in range(5)
+        ]
+        job = self._create_upper_job(user)
+
+        with patch.object(batch_process_type, 'chunk_size', 2):
+            batch_process_type.execute(job)
+
+        self.assertEqual(Job.STATUS_OK, self.refresh(job).status)
+
+        for orga in orgas:
+            self.assertEqual(orga.name.upper(), self.refresh(orga).name)
+
+        self.assertCountEqual(
+            [orga.id for orga in orgas],
+            EntityJobResult.objects.filter(
+                job=job, messages__isnull=True,
+            ).values_list('entity_id', flat=True),
+        )
+
+    def test_bulk_update(self):
+        "The entities are saved with a bulk UPDATE, but signals are sent."
+        user = self.get_root_user()
+        orga = FakeOrganisation.objects.create(user=user, name='Manga club')
+        FakeOrganisation.objects.filter(id=orga.id).update(
+            modified=self.create_datetime(year=2024, month=1, day=1),
+        )
+        job = self._create_upper_job(user)
+
+        self.assertTrue(batch_process_type._use_bulk_update(FakeOrganisation))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            batch_process_type.execute(job)
+
+        orga = self.refresh(orga)
+        self.assertEqual('MANGA CLUB', orga.name)
+        self.assertEqual('MANGA CLUB', orga.header_filter_search_field)
+        self.assertDatetimesAlmostEqual(now(), orga.modified)
+
+        hline = HistoryLine.objects.filter(entity=orga.id).order_by('-id').first()
+        self.assertEqual(TYPE_EDITION, hline.type)
+        self.assertListEqual(
+            [['name', 'Manga club', 'MANGA CLUB']], hline.modifications,
+        )
+
+    def test_custom_save(self):
+        "The model overrides save() => no bulk UPDATE."
+        user = self.get_root_user()
+        orga = FakeOrganisation.objects.create(user=user, name='Manga club')
+        job = self._create_upper_job(user)
+
+        with patch.object(
+            FakeOrganisation, 'save', autospec=True, side_effect=CremeEntity.save,
+        ) as save_mock:
+            self.assertFalse(batch_process_type._use_bulk_update(FakeOrganisation))
+            batch_process_type.execute(job)
+
+        save_mock.assert_called_once()
+        self.assertEqual('MANGA CLUB', self.refresh(orga).name)
+
+    def test_id_ranges(self):
+        user = self.get_root_user()
+        orgas = [
+            FakeOrganisation.objects.create(user=user, name=f'Club #{i}')
+            for i in range(5)
+        ]
+        job = self._create_upper_job(user)
+        EntityJobResult.objects.create(job=job, real_entity=orgas[0])
+
+        with patch.object(batch_process_type, 'chunk_size', 2):
+            ranges = batch_process_type._get_id_ranges(job, workers=2)
+
+        self.assertListEqual(
+            [(orgas[1].id, orgas[2].id), (orgas[3].id, orgas[4].id)], ranges,
+        )
+
+        # A worker processes at least a full chunk
+        self.assertListEqual(
+            [(orgas[1].id, orgas[4].id)],
+            batch_process_type._get_id_ranges(job, workers=2),
+        )
+
+        # ---
+        batch_process_type._process_entities(job, id_range=ranges[0])
+        self.assertEqual('CLUB #1', self.refresh(orgas[1]).name)
+        self.assertEqual('CLUB #2', self.refresh(orgas[2]).name)
+        self.assertEqual('Club #3', self.refresh(orgas[3]).name)
+
+    @override_settings(BATCH_PROCESS_WORKERS=2)
+    def test_workers(self):
+        user = self.get_root_user()
+        orgas = [
+            FakeOrganisation.objects.create(user=user, name=f'Club #{i}')
+            for i in range(3)
+        ]
+        job = self._create_upper_job(user)
+
+        with patch.object(batch_process_type, 'chunk_size', 2), patch(
+            'creme.creme_core.creme_jobs.batch_process.multiprocessing'
+        ) as mp_mock:
+            batch_process_type.execute(job)
+
+        context = mp_mock.get_context
+        context.assert_called_once_with('spawn')
+
+        pool = context.return_value.Pool.return_value.__enter__.return_value
+        pool.starmap.assert_called_once_with(
+            _process_range,
+            [(job.id, orgas[0].id, orgas[1].id), (job.id, orgas[2].id, orgas[2].id)],
+        )
+        self.assertEqual(Job.STATUS_OK, self.refresh(job).status)
+
     @override_settings(MAX_JOBS_PER_USER=1)
     def test_job_limit(self):
         self.login_as_root()
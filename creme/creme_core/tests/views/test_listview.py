@@ -3,20 +3,24 @@ from datetime import date, timedelta
 from functools import partial
 from json import dumps as json_dump
 from random import shuffle
+from unittest.mock import patch
 from urllib.parse import quote, urlencode
 from xml.etree.ElementTree import tostring as html_tostring
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.core.paginator import Paginator
 from django.db.models import Q
 from django.test.utils import override_settings
 from django.urls import reverse
 # from django.utils.encoding import force_str
 from django.utils.timezone import now
 from django.utils.translation import gettext as _
-from django.utils.translation import pgettext
+from django.utils.translation import ngettext, pgettext
 
 from creme.creme_core.auth.entity_credentials import EntityCredentials
+from creme.creme_core.core.count_cache import entity_count_cache
 from creme.creme_core.core.entity_cell import (
     EntityCellCustomField,
     EntityCellFunctionField,
@@ -29,6 +33,7 @@ from creme.creme_core.core.entity_filter import (
     operators,
 )
 from creme.creme_core.core.function_field import function_field_registry
+from creme.creme_core.core.paginator import FlowPaginator
 from creme.creme_core.gui.listview import ListViewState
 from creme.creme_core.gui.view_tag import ViewTag
 from creme.creme_core.models import (
@@ -3420,6 +3425,122 @@ class ListViewTestCase(CremeTestCase):
         page1_fast = post()
         self.assertHasAttr(page1_fast, 'next_page_info')  # Means fast mode
 
+    @override_settings(
+        FAST_QUERY_MODE_THRESHOLD=100000,
+        LISTVIEW_KEYSET_PAGINATION_THRESHOLD=5,
+        PAGE_SIZES=[10],
+        DEFAULT_PAGE_SIZE_IDX=0,
+    )
+    def test_pagination_keyset(self):
+        "Not fast-mode, but the ordering is indexed => keyset."
+        user = self.login_as_root_and_get()
+        organisations = self._build_orgas(user=user)
+        hf = self._build_hf(
+            EntityCellRegularField.build(model=FakeOrganisation, name='phone'),
+        )
+
+        def post(sort_key, page_info=None):
+            response = self.assertPOST200(
+                self.url,
+                data={
+                    'hfilter': hf.id,
+                    'sort_key': sort_key,
+                    'page': json_dump(page_info) if page_info else '',
+                },
+            )
+            return response.context['page_obj']
+
+        # Index on ('name', 'cremeentity_ptr')
+        page1 = post('regular_field-name')
+        self.assertIsInstance(page1.paginator, FlowPaginator)
+        self.assertEqual(13, page1.paginator.count)
+        self.assertIndex(organisations[0], page1.object_list)
+
+        page2 = post('regular_field-name', page1.next_page_info())
+        self.assertIndex(organisations[10], page2.object_list)
+
+        # No index
+        page = post('regular_field-phone')
+        self.assertIsInstance(page.paginator, Paginator)
+
+        with override_settings(LISTVIEW_KEYSET_PAGINATION_THRESHOLD=None):
+            page = post('regular_field-name')
+        self.assertIsInstance(page.paginator, Paginator)
+
+        with override_settings(LISTVIEW_KEYSET_PAGINATION_THRESHOLD=14):
+            page = post('regular_field-name')
+        self.assertIsInstance(page.paginator, Paginator)
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'creme_count_test': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'creme_count_test',
+            },
+        },
+        LISTVIEW_COUNT_CACHE_ALIAS='creme_count_test',
+    )
+    def test_count_cache(self):
+        user = self.login_as_root_and_get()
+        self.addCleanup(caches['creme_count_test'].clear)
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        create_orga(name='Bebop')
+        create_orga(name='Swordfish')
+
+        def get_count():
+            return self.assertPOST200(self.url).context['page_obj'].paginator.count
+
+        self.assertEqual(2, get_count())
+
+        # NB: the count is not cached when entities of the model have been
+        #     modified in the transaction
+        entity_count_cache._dirty_ctype_ids().clear()
+        self.assertEqual(2, get_count())
+
+        # No signal => the cached count is used
+        FakeOrganisation.objects.filter(name='Swordfish').update(is_deleted=True)
+        self.assertEqual(2, get_count())
+
+        # The cache is invalidated
+        create_orga(name='Red Dragons')
+        create_orga(name='Redtail')
+        self.assertEqual(3, get_count())
+
+    @override_settings(LISTVIEW_APPROXIMATE_COUNT_THRESHOLD=1000)
+    def test_approximate_count(self):
+        user = self.login_as_root_and_get()
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        create_orga(name='Bebop')
+        create_orga(name='Swordfish')
+
+        with patch(
+            'creme.creme_core.views.generic.listview.estimate_count', return_value=2,
+        ):
+            response1 = self.assertPOST200(self.url)
+        self.assertFalse(response1.context['count_is_approximate'])
+        self.assertEqual(2, response1.context['page_obj'].paginator.count)
+
+        with patch(
+            'creme.creme_core.views.generic.listview.estimate_count', return_value=12000,
+        ):
+            response2 = self.assertPOST200(self.url)
+
+        self.assertTrue(response2.context['count_is_approximate'])
+
+        page = response2.context['page_obj']
+        self.assertHasAttr(page, 'next_page_info')  # Means fast mode
+        self.assertEqual(12000, page.paginator.count)
+        self.assertContains(
+            response2,
+            ngettext(
+                'About %(entities_count)s recording',
+                'About %(entities_count)s recordings',
+                12000,
+            ) % {'entities_count': 12000},
+        )
+
     def test_listview_popup_GET(self):
         user = self.login_as_root_and_get()
 
@@ -16,6 +16,7 @@ from django.utils.translation import gettext as _
 from django.utils.translation import pgettext
 from openpyxl import load_workbook
 
+from creme.creme_core.constants import UUID_CHANNEL_JOBS
 from creme.creme_core.core.entity_cell import (
     EntityCellFunctionField,
     EntityCellRegularField,
@@ -25,6 +26,8 @@ from creme.creme_core.core.entity_filter.condition_handler import (
     RegularFieldConditionHandler,
 )
 from creme.creme_core.core.entity_filter.operators import ISTARTSWITH
+from creme.creme_core.core.job import job_type_registry
+from creme.creme_core.creme_jobs import mass_export_type
 from creme.creme_core.gui.history import html_history_registry
 from creme.creme_core.models import (
     CremeProperty,
@@ -40,14 +43,18 @@ from creme.creme_core.models import (
     FieldsConfig,
     FileRef,
     HeaderFilter,
+    Job,
     Language,
+    Notification,
     Relation,
     RelationType,
 )
 from creme.creme_core.models.history import TYPE_EXPORT, HistoryLine
+from creme.creme_core.notification import MassExportDoneContent
 from creme.creme_core.utils.content_type import as_ctype
 from creme.creme_core.utils.queries import QSerializer
 from creme.creme_core.utils.xlrd_utils import XlrdReader
+from creme.creme_core.views.mass_export import MassExport
 
 from ..base import CremeTestCase
 
@@ -249,7 +256,7 @@ class MassExportViewsTestCase(CremeTestCase):
 
         self.assertListEqual(
             [','.join(f'"{hfi.title}"' for hfi in cells)],
-            [force_str(line) for line in response.content.splitlines()],
+            [force_str(line) for line in response.getvalue().splitlines()],
         )
         self.assertFalse(HistoryLine.objects.exclude(id__in=existing_hline_ids))
 
@@ -275,7 +282,7 @@ class MassExportViewsTestCase(CremeTestCase):
         response = self.assertGET200(self._build_contact_dl_url())
 
         # TODO: sort the relations by their verbose_name ??
-        result = response.content.splitlines()
+        result = response.getvalue().splitlines()
         it = (force_str(line) for line in result)
         self.assertEqual(next(it), ','.join(f'"{hfi.title}"' for hfi in hf.cells))
         self.assertEqual(next(it), '"","Black","Jet","Bebop",""')
@@ -319,7 +326,7 @@ class MassExportViewsTestCase(CremeTestCase):
         response = self.assertGET200(self._build_contact_dl_url(doc_type='scsv'))
 
         # TODO: sort the relations by their verbose_name ??
-        it = (force_str(line) for line in response.content.splitlines())
+        it = (force_str(line) for line in response.getvalue().splitlines())
         self.assertEqual(next(it), ';'.join(f'"{hfi.title}"' for hfi in cells))
         self.assertEqual(next(it), '"";"Black";"Jet";"Bebop";""')
         self.assertEqual(next(it), '"";"Spiegel";"Spike";"Bebop/Swordfish";""')
@@ -365,7 +372,7 @@ class MassExportViewsTestCase(CremeTestCase):
         self.assertTrue(user.has_perm_to_view(organisations['Swordfish']))
 
         response = self.assertGET200(self._build_contact_dl_url())
-        result = [*map(force_str, response.content.splitlines())]
+        result = [*map(force_str, response.getvalue().splitlines())]
         self.assertEqual(result[1], '"","Black","Jet","",""')
         self.assertEqual(result[2], '"","Spiegel","Spike","Swordfish",""')
         self.assertEqual(result[3], '"","Wong","Edward","","is a girl"')
@@ -391,7 +398,7 @@ class MassExportViewsTestCase(CremeTestCase):
 
         response = self.assertGET200(self._build_contact_dl_url(hfilter_id=hf.id))
 
-        result = [force_str(line) for line in response.content.splitlines()]
+        result = [force_str(line) for line in response.getvalue().splitlines()]
         self.assertEqual(2, len(result))
         self.assertEqual(
             '"{}","{}"'.format(
@@ -434,7 +441,7 @@ class MassExportViewsTestCase(CremeTestCase):
 
         response = self.assertGET200(self._build_contact_dl_url(hfilter_id=hf.id))
 
-        it = (force_str(line) for line in response.content.splitlines())
+        it = (force_str(line) for line in response.getvalue().splitlines())
         next(it)
 
         self.assertEqual(next(it), '"Black","Jet face","Jet\'s selfie"')
@@ -469,7 +476,7 @@ class MassExportViewsTestCase(CremeTestCase):
             list_url=FakeEmailCampaign.get_lv_absolute_url(),
             hfilter_id=hf.id,
         ))
-        result = [force_str(line) for line in response.content.splitlines()]
+        result = [force_str(line) for line in response.getvalue().splitlines()]
         self.assertEqual(4, len(result))
 
         self.assertEqual(result[1], '"Camp#1","ML#1/ML#2"')
@@ -487,7 +494,7 @@ class MassExportViewsTestCase(CremeTestCase):
 
         response = self.assertGET200(self._build_contact_dl_url())
 
-        it = (force_str(line) for line in response.content.splitlines())
+        it = (force_str(line) for line in response.getvalue().splitlines())
         self.assertEqual(
             next(it),
             ','.join(
@@ -505,7 +512,7 @@ class MassExportViewsTestCase(CremeTestCase):
             self._build_contact_dl_url(extra_q=QSerializer().dumps(Q(last_name='Wong'))),
         )
 
-        result = [force_str(line) for line in response.content.splitlines()]
+        result = [force_str(line) for line in response.getvalue().splitlines()]
         self.assertEqual(2, len(result))
         self.assertEqual('"","Wong","Edward","","is a girl"', result[1])
 
@@ -532,7 +539,7 @@ class MassExportViewsTestCase(CremeTestCase):
             list_url=FakeContact.get_lv_absolute_url(),
             efilter_id=efilter.id
         ))
-        result = [force_str(line) for line in response.content.splitlines()]
+        result = [force_str(line) for line in response.getvalue().splitlines()]
         self.assertEqual(2, len(result))
 
         self.assertEqual('"","Wong","Edward","","is a girl"', result[1])
@@ -690,7 +697,7 @@ class MassExportViewsTestCase(CremeTestCase):
             follow=True,
         )
 
-        lines = {force_str(line) for line in response.content.splitlines()}
+        lines = {force_str(line) for line in response.getvalue().splitlines()}
         self.assertIn('"Bebop","1000"', lines)
         self.assertIn('"Swordfish","20000"', lines)
         self.assertIn('"Redtail",""', lines)
@@ -725,7 +732,7 @@ class MassExportViewsTestCase(CremeTestCase):
             follow=True,
         )
 
-        lines = {force_str(line) for line in response.content.splitlines()}
+        lines = {force_str(line) for line in response.getvalue().splitlines()}
         self.assertIn(f'''"Bebop","{_('Percent')}"''',    lines)
         self.assertIn(f'''"Swordfish","{_('Amount')}"''', lines)
 
@@ -758,7 +765,7 @@ class MassExportViewsTestCase(CremeTestCase):
                 '"123233","Spiegel","Spike"',
             ],
             # NB: slice to remove the header
-            [force_str(line) for line in response.content.splitlines()[1:]],
+            [force_str(line) for line in response.getvalue().splitlines()[1:]],
         )
 
     @override_settings(PAGE_SIZES=[10], DEFAULT_PAGE_SIZE_IDX=0)
@@ -792,7 +799,7 @@ class MassExportViewsTestCase(CremeTestCase):
                 '"123455","Black","Jet"',
             ],
             # NB: slice to remove the header
-            [force_str(line) for line in response.content.splitlines()[1:]],
+            [force_str(line) for line in response.getvalue().splitlines()[1:]],
         )
 
     def test_distinct(self):
@@ -831,7 +838,7 @@ class MassExportViewsTestCase(CremeTestCase):
                 f'"{camp2.name}","{ml1.name}"',
             ],
             # NB: slice to remove the header
-            [force_str(line) for line in response.content.splitlines()[1:]],
+            [force_str(line) for line in response.getvalue().splitlines()[1:]],
         )
 
     def test_no_order(self):
@@ -862,5 +869,154 @@ class MassExportViewsTestCase(CremeTestCase):
         ))
         self.assertListEqual(
             [f'"{l1.name}"', f'"{l2.name}"'],
-            [force_str(line) for line in response.content.splitlines()[1:]],
+            [force_str(line) for line in response.getvalue().splitlines()[1:]],
         )
+
+    def test_csv_streaming(self):
+        user = self.login_as_root_and_get()
+        self._build_hf_n_contacts(user=user)
+        existing_hline_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        response = self.assertGET200(self._build_contact_dl_url())
+        self.assertTrue(response.streaming)
+        self.assertEqual('text/csv', response['Content-Type'])
+        self.assertEqual(
+            'attachment; filename="fakecontact.csv"', response['Content-Disposition'],
+        )
+
+        # The history is created before the content is consumed (the global
+        # user is not available anymore during the streaming)
+        hline = self.get_alone_element(HistoryLine.objects.exclude(id__in=existing_hline_ids))
+        self.assertEqual(TYPE_EXPORT, hline.type)
+        self.assertEqual(4, hline.modifications[0])
+        self.assertEqual(user.username, hline.username)
+
+        lines = response.getvalue().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertEqual(
+            1, HistoryLine.objects.exclude(id__in=existing_hline_ids).count(),
+        )
+
+    def test_csv_streaming__pages(self):
+        "Several pages of entities."
+        user = self.login_as_root_and_get()
+        self._build_hf_n_contacts(user=user)
+
+        class TestMassExport(MassExport):
+            page_size = 3
+
+        request = self.build_request(url=self._build_contact_dl_url(), user=user)
+        view = TestMassExport()
+        view.setup(request)
+        queryset, rows = view.build_rows()
+        self.assertEqual(4, queryset.count())
+        self.assertListEqual(
+            [
+                ['', 'Black',     'Jet',    'Bebop',           ''],
+                ['', 'Spiegel',   'Spike',  'Bebop/Swordfish', ''],
+                ['', 'Valentine', 'Faye',   '',                'is a girl/is beautiful'],
+                ['', 'Wong',      'Edward', '',                'is a girl'],
+            ],
+            [*rows][1:],
+        )
+
+    @override_settings(MASS_EXPORT_JOB_THRESHOLD=4)
+    def test_job(self):
+        user = self.login_as_root_and_get()
+        self._build_hf_n_contacts(user=user)
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+        existing_hline_ids = [*HistoryLine.objects.values_list('id', flat=True)]
+
+        url = self._build_contact_dl_url()
+        response = self.assertGET200(url, follow=True)
+
+        job = self.get_alone_element(Job.objects.filter(type_id=mass_export_type.id))
+        self.assertRedirects(response, job.get_absolute_url())
+        self.assertEqual(user, job.user)
+        self.assertEqual(Job.STATUS_WAIT, job.status)
+        self.assertDictEqual(
+            {'ctype': self.ct.id, 'GET': url.split('?', 1)[1]}, job.data,
+        )
+        self.assertListEqual(
+            [_('Export «{model}»').format(model='Test Contact')],
+            job.description,
+        )
+        self.assertFalse(FileRef.objects.exclude(id__in=existing_fileref_ids))
+        self.assertFalse(HistoryLine.objects.exclude(id__in=existing_hline_ids))
+
+        # NB: the registry sets the global user, like in production
+        job_type_registry(job.id)
+        job = self.refresh(job)
+        self.assertEqual(Job.STATUS_OK, job.status)
+        self.assertIsNone(job.error)
+
+        hline = self.get_alone_element(HistoryLine.objects.exclude(id__in=existing_hline_ids))
+        self.assertEqual(TYPE_EXPORT, hline.type)
+        self.assertEqual(4, hline.modifications[0])
+        self.assertEqual(user.username, hline.username)
+
+        fileref = self.get_alone_element(FileRef.objects.exclude(id__in=existing_fileref_ids))
+        self.assertTrue(fileref.temporary)
+        self.assertEqual('fakecontact.csv', fileref.basename)
+        self.assertEqual(user, fileref.user)
+        self.assertEqual(_('Mass export'), fileref.description)
+
+        fullpath = Path(fileref.filedata.path)
+        self.assertEqual(Path(settings.MEDIA_ROOT, 'mass_export'), fullpath.parent)
+
+        with open(fullpath, 'rb') as f:
+            lines = [force_str(line) for line in f.read().splitlines()]
+        self.assertEqual(5, len(lines))
+        self.assertEqual('"","Black","Jet","Bebop",""', lines[1])
+
+        notif = self.get_object_or_fail(
+            Notification, user=user, channel__uuid=UUID_CHANNEL_JOBS,
+        )
+        self.assertEqual(MassExportDoneContent.id, notif.content_id)
+        self.assertDictEqual({'instance': fileref.id}, notif.content_data)
+        self.assertEqual(_('A mass export is done'), notif.content.get_subject(user))
+
+    @override_settings(MASS_EXPORT_JOB_THRESHOLD=4)
+    def test_job__xlsx(self):
+        user = self.login_as_root_and_get()
+        self._build_hf_n_contacts(user=user)
+        existing_fileref_ids = [*FileRef.objects.values_list('id', flat=True)]
+
+        self.assertGET200(self._build_contact_dl_url(doc_type='xlsx'), follow=True)
+
+        job = self.get_alone_element(Job.objects.filter(type_id=mass_export_type.id))
+        mass_export_type.execute(job)
+        self.assertEqual(Job.STATUS_OK, self.refresh(job).status)
+
+        fileref = self.get_alone_element(FileRef.objects.exclude(id__in=existing_fileref_ids))
+        self.assertEqual('fakecontact.xlsx', fileref.basename)
+
+        wb = load_workbook(filename=fileref.filedata.path, read_only=True)
+        self.assertListEqual(
+            [None, 'Black', 'Jet', 'Bebop', None],
+            [tcell.value for tcell in [*wb.active.rows][1]],
+        )
+
+    @override_settings(MASS_EXPORT_JOB_THRESHOLD=5)
+    def test_job__below_threshold(self):
+        user = self.login_as_root_and_get()
+        self._build_hf_n_contacts(user=user)
+
+        response = self.assertGET200(self._build_contact_dl_url())
+        self.assertTrue(response.streaming)
+        self.assertFalse(Job.objects.filter(type_id=mass_export_type.id))
+
+    @override_settings(MASS_EXPORT_JOB_THRESHOLD=1, MAX_JOBS_PER_USER=1)
+    def test_job__max_jobs(self):
+        user = self.login_as_root_and_get()
+        self._build_hf_n_contacts(user=user)
+
+        Job.objects.create(
+            user=user,
+            type=mass_export_type,
+            data={'ctype': self.ct.id, 'GET': ''},
+        )
+
+        response = self.assertGET200(self._build_contact_dl_url(), follow=True)
+        self.assertRedirects(response, reverse('creme_core__my_jobs'))
+        self.assertEqual(1, Job.objects.filter(type_id=mass_export_type.id).count())
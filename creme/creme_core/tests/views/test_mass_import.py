@@ -1,12 +1,15 @@
+from datetime import timedelta
 from decimal import Decimal
 from functools import partial
 from json import dumps as json_dump
+from unittest.mock import patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.template.defaultfilters import slugify
 from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.encoding import smart_str
+from django.utils.formats import number_format
 from django.utils.timezone import now
 from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
@@ -18,6 +21,7 @@ from creme.creme_core.core.entity_filter import condition_handler
 from creme.creme_core.core.entity_filter.operators import EndsWithOperator
 from creme.creme_core.core.workflow import WorkflowConditions
 from creme.creme_core.creme_jobs import batch_process_type, mass_import_type
+from creme.creme_core.forms.mass_import import ImportForm
 from creme.creme_core.models import (
     CremeProperty,
     CremePropertyType,
@@ -2309,6 +2313,122 @@ class MassImportViewsTestCase(MassImportBaseTestCaseMixin,
         asuka_line = lines[1]
         self.get_object_or_fail(FakeContact, first_name=asuka_line[0], last_name=asuka_line[1])
 
+    def test_chunks(self):
+        "The lines are read by chunks, the related instances are prefetched."
+        user = self.login_as_root_and_get()
+
+        employed = RelationType.objects.smart_update_or_create(
+            ('test-subject_employed_by', 'employed by'),
+            ('test-object_employed_by',  'employs'),
+        )[0]
+
+        create_orga = partial(FakeOrganisation.objects.create, user=user)
+        nerv = create_orga(name='Nerv')
+        seele = create_orga(name='Seele')
+
+        sector1, sector2 = FakeSector.objects.all()[:2]
+
+        lines = [
+            ('Rei',    'Ayanami',   nerv.name,  sector1.title),
+            ('Asuka',  'Langley',   nerv.name,  sector2.title),
+            ('Gendo',  'Ikari',     seele.name, sector1.title),
+            ('Misato', 'Katsuragi', 'Unknown',  'Unknown'),
+            ('Kaji',   'Ryoji',     seele.name, ''),
+        ]
+        doc = self._build_csv_doc(lines, user=user)
+
+        with patch.object(ImportForm, 'lines_chunk_size', 2):
+            response = self.client.post(
+                self._build_import_url(FakeContact), follow=True,
+                data={
+                    **self.lv_import_data,
+                    'document': doc.id,
+                    'user': user.id,
+                    'sector_colselect': 4,
+                    'sector_subfield': 'title',
+                    'sector_defval': '',
+                    'dyn_relations': self._dyn_relations_value(
+                        employed, FakeOrganisation, 3, 'name',
+                    ),
+                },
+            )
+            self.assertNoFormError(response)
+            job = self._execute_job(response)
+
+        results = [*MassImportJobResult.objects.filter(job=job).order_by('id')]
+        self.assertEqual(len(lines), len(results))
+
+        def get_contact(line):
+            return self.get_object_or_fail(
+                FakeContact, first_name=line[0], last_name=line[1],
+            )
+
+        rei = get_contact(lines[0])
+        self.assertEqual(sector1, rei.sector)
+        self.assertHaveRelation(subject=rei, type=employed, object=nerv)
+
+        asuka = get_contact(lines[1])
+        self.assertEqual(sector2, asuka.sector)
+        self.assertHaveRelation(subject=asuka, type=employed, object=nerv)
+
+        gendo = get_contact(lines[2])
+        self.assertEqual(sector1, gendo.sector)
+        self.assertHaveRelation(subject=gendo, type=employed, object=seele)
+
+        # Line-level errors
+        misato = get_contact(lines[3])
+        self.assertIsNone(misato.sector)
+        self.assertHaveNoRelation(subject=misato, type=employed, object=nerv)
+        self.assertEqual(2, len(results[3].messages))
+
+        kaji = get_contact(lines[4])
+        self.assertIsNone(kaji.sector)
+        self.assertHaveRelation(subject=kaji, type=employed, object=seele)
+
+        for result in (*results[:3], results[4]):
+            self.assertIsNone(result.messages)
+
+    def test_progress__throughput(self):
+        user = self.login_as_root_and_get()
+        doc = self._build_csv_doc([('Rei', 'Ayanami')], user=user)
+        response = self.client.post(
+            self._build_import_url(FakeContact), follow=True,
+            data={**self.lv_import_data, 'document': doc.id, 'user': user.id},
+        )
+        self.assertNoFormError(response)
+
+        job = self._get_job(response)
+        self.assertFalse(job.is_finished)
+        self.assertEqual(
+            ngettext(
+                '{count} line has been processed.',
+                '{count} lines have been processed.',
+                0,
+            ).format(count=0),
+            job.progress.label,
+        )
+
+        # We simulate a running job
+        job.last_run = now()
+        create_result = partial(MassImportJobResult.objects.create, job=job)
+        for __ in range(25):
+            create_result()
+
+        with patch(
+            'creme.creme_core.creme_jobs.mass_import.now',
+            return_value=job.last_run + timedelta(seconds=10),
+        ):
+            label = job.progress.label
+
+        self.assertEqual(
+            ngettext(
+                '{count} line has been processed ({throughput} lines/s).',
+                '{count} lines have been processed ({throughput} lines/s).',
+                25,
+            ).format(count=25, throughput=number_format(2.5, decimal_pos=1)),
+            label,
+        )
+
     def _aux_test_dl_errors(self, doc_builder, result_builder, ext, header=False):
         "CSV, no header."
         user = self.login_as_root_and_get()
@@ -50,6 +50,9 @@ class EntityCreationTriggerTestCase(CremeTestCase):
 
         trigger = EntityCreationTrigger(model=FakeContact)
         self.assertEqual(FakeContact, trigger.model)
+        self.assertEqual(
+            ContentType.objects.get_for_model(FakeContact).id, trigger.index_key,
+        )
 
         model_key = 'creme_core.fakecontact'
         serialized = {'type': type_id, 'model': model_key}
@@ -112,6 +115,9 @@ class EntityEditionTriggerTestCase(CremeTestCase):
 
         trigger = EntityEditionTrigger(model=FakeOrganisation)
         self.assertEqual(FakeOrganisation, trigger.model)
+        self.assertEqual(
+            ContentType.objects.get_for_model(FakeOrganisation).id, trigger.index_key,
+        )
         model_key = 'creme_core.fakeorganisation'
         serialized = {'type': type_id, 'model': model_key}
         self.assertDictEqual(serialized, trigger.to_dict())
@@ -181,6 +187,7 @@ class PropertyAddingTriggerTestCase(CremeTestCase):
             entity_model=FakeOrganisation, ptype=str(ptype.uuid),
         )
         self.assertEqual(FakeOrganisation, trigger.entity_model)
+        self.assertEqual(ptype.uuid, trigger.index_key)
 
         with self.assertNumQueries(1):
             self.assertEqual(ptype, trigger.property_type)
@@ -351,6 +358,7 @@ class RelationAddingTriggerTestCase(CremeTestCase):
         )
         self.assertEqual(FakeOrganisation, trigger.subject_model)
         self.assertEqual(FakeContact,      trigger.object_model)
+        self.assertEqual(rtype.id,         trigger.index_key)
 
         with self.assertNumQueries(1):
             self.assertEqual(rtype, trigger.relation_type)
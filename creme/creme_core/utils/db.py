@@ -27,13 +27,16 @@ from collections import defaultdict
 from collections.abc import Iterable, Iterator, Sequence
 from fnmatch import fnmatch
 from functools import lru_cache
+from json import loads as json_load
 from typing import Any, DefaultDict
 
+from django.core.exceptions import EmptyResultSet
 from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.models import (
     ForeignKey,
     ManyToManyField,
     Model,
+    QuerySet,
     prefetch_related_objects,
 )
 
@@ -300,6 +303,33 @@ def is_db_like_case_sensitive() -> bool:  # TODO: idem
     return not CaseSensitivity.objects.filter(text__contains='case').exists()
 
 
+def estimate_count(queryset: QuerySet) -> int | None:
+    """Get the number of rows of a queryset estimated by the planner of the
+    database (the query is not executed, so it's fast even with huge tables,
+    but the result can be very imprecise).
+    @return: An integer, or <None> if the database engine does not give an
+             estimation (currently, only PostgreSQL is managed).
+    """
+    connection = connections[queryset.db]
+
+    if connection.vendor != 'postgresql':
+        return None
+
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json_load(plan)
+
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
 # TODO: accept multiple/iterative order()/proceed() calls ?
 class PreFetcher:
     """Regroup queries on same model (to retrieve instances by their PK)
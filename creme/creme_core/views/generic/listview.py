@@ -35,6 +35,7 @@ from django.views.generic.list import ListView
 import creme.creme_core.gui.listview as lv_gui
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.core import sorter
+from creme.creme_core.core.count_cache import entity_count_cache
 from creme.creme_core.core.entity_cell import EntityCell, EntityCellActions
 from creme.creme_core.core.paginator import FlowPaginator
 from creme.creme_core.forms.listview import ListViewSearchForm
@@ -53,6 +54,7 @@ from creme.creme_core.models.header_filter import (
     HeaderFilterList,
 )
 from creme.creme_core.utils import get_from_GET_or_404, get_from_POST_or_404
+from creme.creme_core.utils.db import estimate_count, get_indexed_ordering
 from creme.creme_core.utils.meta import Order
 from creme.creme_core.utils.queries import QSerializer
 from creme.creme_core.utils.serializers import json_encode
@@ -75,7 +77,8 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
      - Choice of HeaderFilters (i.e. columns of the list).
      - Choice of EntityFilters (i.e. which entities to display).
      - Pagination, with a fast pagination mode when there is a lot of entities
-       Related settings: PAGE_SIZES, DEFAULT_PAGE_SIZE_IDX, FAST_QUERY_MODE_THRESHOLD.
+       Related settings: PAGE_SIZES, DEFAULT_PAGE_SIZE_IDX, FAST_QUERY_MODE_THRESHOLD,
+       LISTVIEW_KEYSET_PAGINATION_THRESHOLD.
      - Ordering: some columns can be used to order the list ; the chosen column
        is used as main order criterion, the model's meta ordering information are used
        as secondary criteria.
@@ -162,7 +165,9 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
 
         self.queryset = None  # We hide voluntarily the class attribute which SHOULD not be used.
         self.count = None
+        self.count_is_approximate = False
         self.fast_mode = None
+        self.keyset_pagination = None
         self.ordering = None  # Idem
 
     def _build(self):
@@ -189,6 +194,7 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
         unordered_queryset, self.count = self.get_unordered_queryset_n_count()
         self.fast_mode = self.get_fast_mode()
         self.ordering = ordering = self.get_ordering()
+        self.keyset_pagination = self.get_keyset_pagination()
         self.queryset = unordered_queryset.order_by(*ordering)
 
     def get(self, request, *args, **kwargs):
@@ -305,6 +311,7 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
         context['is_selection_multiple'] = (self.mode is SelectionMode.MULTIPLE)
         context['buttons'] = self.get_buttons()
         context['page_sizes'] = settings.PAGE_SIZES
+        context['count_is_approximate'] = self.count_is_approximate
 
         # TODO: pass the bulk_update_registry in a list-view context
         #  (see listview_td_action_for_cell)
@@ -373,7 +380,26 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
         return Q()
 
     def get_fast_mode(self) -> bool:
-        return self.count >= settings.FAST_QUERY_MODE_THRESHOLD
+        # NB: the FlowPaginator does not need an exact count
+        return self.count_is_approximate or self.count >= settings.FAST_QUERY_MODE_THRESHOLD
+
+    def get_keyset_pagination(self) -> bool:
+        """Use the keyset pagination (see FlowPaginator) instead of the
+        pagination with OFFSET?
+        The keyset pagination is always used in fast-mode ; otherwise it's used
+        with a big number of entities if the ordering is indexed (the OFFSET of
+        the deep pages are slow, but a keyset is efficient only with an index).
+        """
+        if self.fast_mode:
+            return True
+
+        threshold = settings.LISTVIEW_KEYSET_PAGINATION_THRESHOLD
+
+        return (
+            threshold is not None
+            and self.count >= threshold
+            and get_indexed_ordering(self.model, self.ordering) is not None
+        )
 
     def get_header_filter(self, header_filters: HeaderFilterList) -> HeaderFilter:
         return self.state.set_headerfilter(
@@ -448,7 +474,7 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
                       allow_empty_first_page=True, **kwargs):
         # NB: self.paginator_class is not used...
 
-        if not self.fast_mode:
+        if not self.keyset_pagination:
             paginator = Paginator(
                 queryset,
                 per_page=per_page, orphans=orphans,
@@ -524,27 +550,49 @@ class EntitiesList(base.PermissionsMixin, base.TitleMixin, ListView):
         # If the query does not use the real entities' specific fields to filter,
         # we perform a query on CremeEntity & so we avoid a JOIN.
         if filtered:
-            count = qs.count()
+            count = self.count_entities(qs)
         else:
             model = self.model
             try:
-                count = EntityCredentials.filter_entities(
-                    user,
-                    CremeEntity.objects.filter(
-                        is_deleted=False,
-                        entity_type=ContentType.objects.get_for_model(model),
+                count = self.count_entities(
+                    EntityCredentials.filter_entities(
+                        user,
+                        CremeEntity.objects.filter(
+                            is_deleted=False,
+                            entity_type=ContentType.objects.get_for_model(model),
+                        ),
+                        as_model=model,
                     ),
-                    as_model=model,
-                ).count()
+                )
             except EntityCredentials.FilteringError as e:
                 logger.debug(
                     '%s.get_unordered_queryset_n_count() : fast count is not possible (%s)',
                     type(self).__name__, e,
                 )
-                count = qs.count()
+                count = self.count_entities(qs)
 
         return qs, count
 
+    def count_entities(self, queryset: QuerySet) -> int:
+        """Count the entities of the list.
+        The count is retrieved from a cache if possible (see the setting
+        'LISTVIEW_COUNT_CACHE_ALIAS') ; with huge tables, the estimation of
+        the database's planner is used instead (see the setting
+        'LISTVIEW_APPROXIMATE_COUNT_THRESHOLD' & the attribute "count_is_approximate").
+        @param queryset: Queryset on the model of the list, or on CremeEntity
+               (filtered by ContentType).
+        """
+        threshold = settings.LISTVIEW_APPROXIMATE_COUNT_THRESHOLD
+
+        if threshold is not None:
+            estimation = estimate_count(queryset)
+
+            if estimation is not None and estimation >= threshold:
+                self.count_is_approximate = True
+                return estimation
+
+        return entity_count_cache.count(queryset, model=self.model)
+
     def get_search_field_registry(self) -> lv_gui.ListViewSearchFieldRegistry:
         return self.search_field_registry
 
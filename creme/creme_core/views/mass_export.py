@@ -1,6 +1,6 @@
 ################################################################################
 #    Creme is a free/open-source Customer Relationship Management software
-#    Copyright (C) 2009-2024  Hybird
+#    Copyright (C) 2009-2025  Hybird
 #
 #    This program is free software: you can redistribute it and/or modify
 #    it under the terms of the GNU Affero General Public License as published by
@@ -17,21 +17,34 @@
 ################################################################################
 
 import logging
+from os.path import basename, join
 
+from django.conf import settings
 from django.core.exceptions import BadRequest
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import get_object_or_404, redirect
+from django.template.defaultfilters import slugify
+from django.urls import reverse
 from django.utils.encoding import smart_str
+from django.utils.translation import gettext
 
 from ..backends import export_backend_registry
 from ..core import sorter
 from ..core.paginator import FlowPaginator
+from ..creme_jobs import mass_export_type
 from ..forms.listview import ListViewSearchForm
 from ..gui.listview import search_field_registry
 from ..gui.view_tag import ViewTag
-from ..models import EntityCredentials, EntityFilter, HeaderFilter
+from ..models import (
+    EntityCredentials,
+    EntityFilter,
+    FileRef,
+    HeaderFilter,
+    Job,
+)
 from ..models.history import _HLTEntityExport
 from ..utils import bool_from_str_extended, get_from_GET_or_404
+from ..utils.file_handling import FileCreator
 from ..utils.meta import Order
 from ..utils.queries import QSerializer
 from .generic import base
@@ -39,7 +52,6 @@ from .generic import base
 logger = logging.getLogger(__name__)
 
 
-# TODO: stream response ??
 # TODO: factorise with generic.listview.EntitiesList ?
 class MassExport(base.EntityCTypeRelatedMixin, base.CheckedView):
     ct_id_arg = 'ct_id'
@@ -53,6 +65,9 @@ class MassExport(base.EntityCTypeRelatedMixin, base.CheckedView):
 
     page_size = 1024
 
+    # Sub-directory under settings.MEDIA_ROOT for the files created by the job
+    dir_parts = ('mass_export',)
+
     cell_sorter_registry = sorter.cell_sorter_registry
     query_sorter_class   = sorter.QuerySorter
 
@@ -83,25 +98,34 @@ class MassExport(base.EntityCTypeRelatedMixin, base.CheckedView):
         return self.request.GET.get(self.entityfilter_id_arg)
 
     def get_entity_filter(self):
-        efilter_id = self.get_entity_filter_id()
-
-        return get_object_or_404(
-            EntityFilter.objects
-                        .filter_by_user(self.request.user)
-                        .filter(entity_type=self.get_ctype()),
-            id=efilter_id,
-        ) if efilter_id else None
+        try:
+            efilter = self.entity_filter
+        except AttributeError:
+            efilter_id = self.get_entity_filter_id()
+            self.entity_filter = efilter = get_object_or_404(
+                EntityFilter.objects
+                            .filter_by_user(self.request.user)
+                            .filter(entity_type=self.get_ctype()),
+                id=efilter_id,
+            ) if efilter_id else None
+
+        return efilter
 
     def get_header_filter_id(self):
         return get_from_GET_or_404(self.request.GET, self.headerfilter_id_arg)
 
     def get_header_filter(self):
-        return get_object_or_404(
-            HeaderFilter.objects
-                        .filter_by_user(self.request.user)
-                        .filter(entity_type=self.get_ctype()),
-            id=self.get_header_filter_id(),
-        )
+        try:
+            hfilter = self.header_filter
+        except AttributeError:
+            self.header_filter = hfilter = get_object_or_404(
+                HeaderFilter.objects
+                            .filter_by_user(self.request.user)
+                            .filter(entity_type=self.get_ctype()),
+                id=self.get_header_filter_id(),
+            )
+
+        return hfilter
 
     def get_header_only(self):
         return get_from_GET_or_404(
@@ -160,93 +184,207 @@ class MassExport(base.EntityCTypeRelatedMixin, base.CheckedView):
 
         return sort_info.field_names
 
-    def get(self, request, *args, **kwargs):
-        user = request.user
+    def get_entities_queryset(self, *, model, cells, entity_filter):
+        request = self.request
+        entities_qs = model.objects.filter(is_deleted=False)
+        use_distinct = False
+
+        # ----
+        if entity_filter is not None:
+            entities_qs = entity_filter.filter(entities_qs)
+
+        # ----
+        serialized_extra_q = request.GET.get(self.extra_q_arg)
+        if serialized_extra_q is not None:
+            try:
+                extra_q = QSerializer().loads(serialized_extra_q)
+            except Exception as e:
+                raise BadRequest(f'Invalid extra Q: {e}')
+
+            entities_qs = entities_qs.filter(extra_q)
+            use_distinct = True  # TODO: test + only if needed
+
+        # ----
+        search_form = self.get_search_form(cells=cells)
+        search_q = search_form.search_q
+        if search_q:
+            try:
+                entities_qs = entities_qs.filter(search_q)
+            except Exception as e:
+                logger.exception(
+                    'Error when building the search queryset with Q=%s (%s).',
+                    search_q, e,
+                )
+            else:
+                use_distinct = True  # TODO: test + only if needed
 
-        header_only = self.get_header_only()
-        backend_cls = self.get_backend_class()
-        ct = self.get_ctype()
-        model = ct.model_class()
-        hf = self.get_header_filter()
+        # ----
+        entities_qs = EntityCredentials.filter(request.user, entities_qs)
 
-        cells = self.get_cells(header_filter=hf)
+        if use_distinct:
+            entities_qs = entities_qs.distinct()
 
-        writer = backend_cls()
-        writerow = writer.writerow
+        return entities_qs
+
+    def get_job_threshold(self):
+        return settings.MASS_EXPORT_JOB_THRESHOLD
+
+    def iter_rows(self, *, header_filter, cells, queryset):
+        """Generate the rows of the file; the first one contains the titles of
+        the columns.
+        The entities are retrieved page by page, so the memory usage does not
+        depend on the number of exported entities.
+
+        @param queryset: Entities to export; <None> means "only the header".
+        """
         # Doesn't accept generator expression... ;(
-        writerow([smart_str(cell.title) for cell in cells])
+        yield [smart_str(cell.title) for cell in cells]
+
+        if queryset is None:
+            return
+
+        user = self.request.user
+        model = queryset.model
+        paginator = self.get_paginator(
+            queryset=queryset, ordering=self.get_ordering(model=model, cells=cells),
+        )
+
+        tag = ViewTag.TEXT_PLAIN
+
+        for entities_page in paginator.pages():
+            entities = entities_page.object_list
+
+            header_filter.populate_entities(entities, user)  # Optimisation time !!!
+
+            for entity in entities:
+                line = []
+
+                for cell in cells:
+                    try:
+                        res = cell.render(entity, user, tag=tag)
+                    except Exception as e:
+                        logger.debug('Exception in CSV export: %s', e)
+                        res = ''
 
-        if not header_only:
-            ordering = self.get_ordering(model=model, cells=cells)
+                    line.append(smart_str(res) if res else '')
 
-            entities_qs = model.objects.filter(is_deleted=False)
-            use_distinct = False
+                yield line
 
-            # ----
+    def create_history_line(self, count):
+        """Create the HistoryLine which traces the export.
+        Notice that it is created before the rows are generated; when the
+        response is streamed, the rows are generated after the end of the
+        request (so the global user is not available anymore), & the client
+        can abort the download.
+        """
+        return _HLTEntityExport.create_line(
+            ctype=self.get_ctype(), user=self.request.user, count=count,
+            hfilter=self.get_header_filter(), efilter=self.get_entity_filter(),
+        )
+
+    def build_rows(self):
+        """Retrieve the configuration of the export (errors are raised here,
+        not during the iteration of the rows).
+        @return: A tuple (queryset, rows) ; "queryset" is <None> if only the
+                 header is exported, "rows" is a lazy iterator (see iter_rows()).
+        """
+        ct = self.get_ctype()
+        hf = self.get_header_filter()
+        cells = self.get_cells(header_filter=hf)
+
+        if self.get_header_only():
+            efilter = entities_qs = None
+        else:
             efilter = self.get_entity_filter()
-            if efilter is not None:
-                entities_qs = efilter.filter(entities_qs)
-
-            # ----
-            serialized_extra_q = request.GET.get(self.extra_q_arg)
-            if serialized_extra_q is not None:
-                try:
-                    extra_q = QSerializer().loads(serialized_extra_q)
-                except Exception as e:
-                    raise BadRequest(f'Invalid extra Q: {e}')
-
-                entities_qs = entities_qs.filter(extra_q)
-                use_distinct = True  # TODO: test + only if needed
+            entities_qs = self.get_entities_queryset(
+                model=ct.model_class(), cells=cells, entity_filter=efilter,
+            )
 
-            # ----
-            search_form = self.get_search_form(cells=cells)
-            search_q = search_form.search_q
-            if search_q:
-                try:
-                    entities_qs = entities_qs.filter(search_q)
-                except Exception as e:
-                    logger.exception(
-                        'Error when building the search queryset with Q=%s (%s).',
-                        search_q, e,
-                    )
-                else:
-                    use_distinct = True  # TODO: test + only if needed
+        return entities_qs, self.iter_rows(
+            header_filter=hf, cells=cells, queryset=entities_qs,
+        )
 
-            # ----
-            entities_qs = EntityCredentials.filter(user, entities_qs)
+    def create_job(self):
+        request = self.request
+        user = request.user
 
-            if use_distinct:
-                entities_qs = entities_qs.distinct()
+        if Job.objects.not_finished(user).count() >= settings.MAX_JOBS_PER_USER:
+            return HttpResponseRedirect(reverse('creme_core__my_jobs'))
 
-            paginator = self.get_paginator(queryset=entities_qs, ordering=ordering)
+        job = Job.objects.create(
+            user=user,
+            type=mass_export_type,
+            data={
+                'ctype': self.get_ctype().id,
+                'GET':   request.GET.urlencode(),
+            },
+        )
 
-            total_count = 0
-            tag = ViewTag.TEXT_PLAIN
+        return redirect(job)
 
-            for entities_page in paginator.pages():
-                entities = entities_page.object_list
+    def build_response(self, *, backend, rows, filename):
+        response = backend.stream(rows=rows, filename=filename)
 
-                hf.populate_entities(entities, user)  # Optimisation time !!!
+        if response is None:
+            writerow = backend.writerow
+            for row in rows:
+                writerow(row)
 
-                for entity in entities:
-                    total_count += 1
-                    line = []
+            backend.save(filename, self.request.user)
+            response = backend.response
 
-                    for cell in cells:
-                        try:
-                            res = cell.render(entity, user, tag=tag)
-                        except Exception as e:
-                            logger.debug('Exception in CSV export: %s', e)
-                            res = ''
+        return response
 
-                        line.append(smart_str(res) if res else '')
+    def export_to_fileref(self):
+        """Export the entities in a file stored on the disk (used by the job).
+        @return: A FileRef instance.
+        """
+        backend = self.get_backend_class()()
+        filename = self.get_ctype().model
+        entities_qs, rows = self.build_rows()
+        if entities_qs is not None:
+            self.create_history_line(count=entities_qs.count())
 
-                    writerow(line)
+        response = self.build_response(backend=backend, rows=rows, filename=filename)
 
-            _HLTEntityExport.create_line(
-                ctype=ct, user=user, count=total_count, hfilter=hf, efilter=efilter,
-            )
+        if not response.streaming:
+            fileref = backend.fileref
+            if fileref is None:
+                raise ValueError(
+                    f'The export backend "{backend.id}" does not store its file'
+                )
+
+            return fileref
+
+        name = f'{slugify(filename)}.{backend.id}'
+        path = FileCreator(
+            dir_path=join(settings.MEDIA_ROOT, *self.dir_parts), name=name,
+        ).create()
 
-        writer.save(ct.model, user)
+        with open(path, 'wb') as f:
+            for chunk in response.streaming_content:
+                f.write(chunk)
 
-        return writer.response
+        return FileRef.objects.create(
+            user=self.request.user,
+            basename=name,
+            filedata='{}/{}'.format('/'.join(self.dir_parts), basename(path)),
+            description=gettext('Mass export'),
+        )
+
+    def get(self, request, *args, **kwargs):
+        backend = self.get_backend_class()()
+        entities_qs, rows = self.build_rows()
+
+        if entities_qs is not None:
+            count = entities_qs.count()
+            threshold = self.get_job_threshold()
+
+            if threshold is not None and count >= threshold:
+                return self.create_job()
+
+            self.create_history_line(count=count)
+
+        return self.build_response(
+            backend=backend, rows=rows, filename=self.get_ctype().model,
+        )
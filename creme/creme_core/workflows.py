@@ -22,6 +22,7 @@ import logging
 from typing import Literal
 from uuid import UUID
 
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.db.models import ForeignKey
 from django.utils.html import format_html
@@ -93,6 +94,10 @@ class _EntityTrigger(WorkflowTrigger):
     def description(self):
         return self.description_format.format(model=self._model._meta.verbose_name)
 
+    @property
+    def index_key(self):
+        return ContentType.objects.get_for_model(self._model).id
+
     @property
     def model(self):
         return self._model
@@ -226,6 +231,10 @@ class PropertyAddingTrigger(WorkflowTrigger):
     def entity_model(self) -> type[CremeEntity]:
         return self._entity_model
 
+    @property
+    def index_key(self):
+        return self._ptype_uuid
+
     # TODO: factorise
     @property
     def property_type(self) -> CremePropertyType:
@@ -352,6 +361,10 @@ class RelationAddingTrigger(WorkflowTrigger):
                 error=str(e),
             )
 
+    @property
+    def index_key(self):
+        return self._rtype_id
+
     @property
     def object_model(self) -> type[CremeEntity]:
         return self._object_model
@@ -0,0 +1,258 @@
+################################################################################
+#
+# Copyright (c) 2025 Hybird
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+################################################################################
+
+"""Engine which sends the emails of the campaigns.
+
+The emails of a sending are sent concurrently by several threads, which use
+a pool of SMTP connections (the connections are opened once, & closed at the
+end of the sending). The throughput is limited by a token bucket (instead of
+sleeping periodically) to avoid the emails to be classified as spam.
+The statuses of the emails are saved by chunks with bulk queries, so an
+interrupted sending can be resumed (the emails already sent are ignored).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import SimpleQueue
+from threading import Lock
+from time import monotonic, sleep
+
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import QuerySet
+
+from ..utils import EMailSender
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Rate limiter.
+    A token is consumed by each operation, & the tokens are refilled at a
+    constant rate; the operations can be performed in burst while there are
+    tokens in the bucket. It's thread-safe.
+    """
+    def __init__(self, rate: float | None, capacity: int = 1):
+        """Constructor.
+        @param rate: Number of tokens refilled per second; <None> means "no limit".
+        @param capacity: Maximum number of tokens in the bucket (i.e. size of
+               the bursts).
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f'TokenBucket: the rate must be > 0 (rate={rate})')
+
+        if capacity < 1:
+            raise ValueError(f'TokenBucket: the capacity must be >= 1 (capacity={capacity})')
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = monotonic()
+        self._lock = Lock()
+
+    def acquire(self) -> float:
+        """Take a token, & wait until it's available if the bucket is empty.
+        @return: The waited time (in seconds).
+        """
+        rate = self.rate
+        if rate is None:
+            return 0.0
+
+        with self._lock:
+            now_value = monotonic()
+            tokens = min(
+                self.capacity, self._tokens + (now_value - self._last) * rate,
+            ) - 1
+            self._tokens = tokens
+            self._last = now_value
+
+        # NB: the token is reserved (the counter can be negative), so we can
+        #     sleep without holding the lock.
+        waited = 0.0 if tokens >= 0 else -tokens / rate
+        if waited:
+            sleep(waited)
+
+        return waited
+
+
+class SMTPConnectionPool:
+    """Pool of connections to an SMTP server (i.e. Django's email backends).
+    The connections are opened when they are used the first time, reused by
+    the following emails, & closed by the method 'close()'.
+    """
+    def __init__(self, size: int, **connection_kwargs):
+        """Constructor.
+        @param size: Number of connections.
+        @param connection_kwargs: Arguments for 'django.core.mail.get_connection()'.
+        """
+        if size < 1:
+            raise ValueError(f'SMTPConnectionPool: the size must be >= 1 (size={size})')
+
+        self.connections: list[BaseEmailBackend] = [
+            get_connection(**connection_kwargs) for __ in range(size)
+        ]
+        self._available = available = SimpleQueue()
+
+        for connection in self.connections:
+            available.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[BaseEmailBackend]:
+        "Get an (opened) connection; wait if they are all used by other threads."
+        connection = self._available.get()
+
+        try:
+            try:
+                # NB: if the opening fails, each email will try to open a
+                #     connection & will get the status "sending error".
+                connection.open()
+            except Exception:
+                logger.exception('SMTPConnectionPool: error when opening a connection')
+
+            yield connection
+        finally:
+            self._available.put(connection)
+
+    def close(self) -> None:
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                logger.exception('SMTPConnectionPool: error when closing a connection')
+
+
+class CampaignMailsSender:
+    """Send emails (instances of <emails.models.LightWeightEmail>) with a
+    pool of connections & some threads.
+
+    Notice that the threads do not perform queries; the emails are loaded &
+    saved (with bulk queries) by the calling thread.
+
+    Example:
+        with CampaignMailsSender(email_sender=..., connection_kwargs={...}) as sender:
+            sent_count = sender.send(LightWeightEmail.objects.filter(...))
+    """
+    connection_pool_cls = SMTPConnectionPool
+    rate_limiter_cls = TokenBucket
+
+    # Number of emails loaded, sent & saved together.
+    chunk_size = 256
+
+    def __init__(self, *,
+                 email_sender: EMailSender,
+                 connection_kwargs: dict,
+                 connections: int = 1,
+                 rate: float | None = None,
+                 burst: int = 1,
+                 ):
+        """Constructor.
+        @param email_sender: Instance which builds & sends the messages
+               (the templates/signature/attachments are rendered once by it).
+        @param connection_kwargs: Arguments for 'django.core.mail.get_connection()'.
+        @param connections: Number of SMTP connections (& so of threads).
+        @param rate: Maximum number of emails per second; <None> means no limit.
+        @param burst: Number of emails which can be sent in burst.
+        """
+        self.email_sender = email_sender
+        self.pool = self.connection_pool_cls(size=connections, **connection_kwargs)
+        self.rate_limiter = self.rate_limiter_cls(rate=rate, capacity=burst)
+        self._executor = (
+            ThreadPoolExecutor(max_workers=connections, thread_name_prefix='creme-emails')
+            if connections > 1 else
+            None
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        self.pool.close()
+
+    def _send_one(self, mail) -> bool:
+        self.rate_limiter.acquire()
+
+        with self.pool.connection() as connection:
+            return self.email_sender.send(mail, connection=connection, save=False)
+
+    def _send_chunk(self, mails: Sequence) -> int:
+        errors = []
+
+        def send_one(mail):
+            try:
+                return self._send_one(mail)
+            except Exception as e:
+                # NB: the other emails of the chunk are sent & saved anyway
+                #     (so they are not sent again if the sending is resumed).
+                logger.exception('CampaignMailsSender: error with the email id=%s', mail.pk)
+                errors.append(e)
+
+                return False
+
+        executor = self._executor
+        results = (
+            map(send_one, mails)
+            if executor is None else
+            executor.map(send_one, mails)
+        )
+
+        try:
+            sent_count = sum(results)
+        finally:
+            if mails:
+                type(mails[0])._default_manager.bulk_update(
+                    mails, fields=['status', 'sending_date'],
+                )
+
+        if errors:
+            raise errors[0]
+
+        return sent_count
+
+    def send(self, mails: QuerySet) -> int:
+        """Send some emails & save their new statuses.
+        @param mails: QuerySet on <emails.models.LightWeightEmail> ; the emails
+               are loaded by chunks (the IDs are retrieved first, because the
+               table is updated during the iteration).
+        @return: The number of sent emails.
+        """
+        mail_ids = [*mails.values_list('pk', flat=True)]
+        chunk_size = self.chunk_size
+        sent_count = 0
+
+        for i in range(0, len(mail_ids), chunk_size):
+            sent_count += self._send_chunk(
+                [*mails.filter(pk__in=mail_ids[i:i + chunk_size])]
+            )
+
+        return sent_count
@@ -19,12 +19,13 @@
 from django.db.models.query_utils import Q
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
 
 from creme.creme_core.constants import UUID_CHANNEL_JOBS
-from creme.creme_core.creme_jobs.base import JobType
+from creme.creme_core.creme_jobs.base import JobProgress, JobType
 from creme.creme_core.models import Notification
 
-from ..models import EmailSending
+from ..models import EmailSending, LightWeightEmail
 from ..notification import CampaignSentContent
 
 
@@ -63,6 +64,27 @@ class _CampaignEmailsSendType(JobType):
                     content=CampaignSentContent(instance=campaign),
                 )
 
+    def progress(self, job):
+        # NB: the sendings are resumed if the job has been interrupted, so the
+        #     progress is computed from the statuses of the emails.
+        mails = LightWeightEmail.objects.filter(
+            sending__state=EmailSending.State.IN_PROGRESS,
+        )
+        total = mails.count()
+        if not total:
+            return super().progress(job)
+
+        count = mails.filter(status=LightWeightEmail.Status.SENT).count()
+
+        return JobProgress(
+            percentage=(count * 100) // total,
+            label=ngettext(
+                '{count} email sent out of {total}.',
+                '{count} emails sent out of {total}.',
+                count
+            ).format(count=count, total=total),
+        )
+
     # We have to implement it because it is a PSEUDO_PERIODIC JobType
     def next_wakeup(self, job, now_value):
         qs = EmailSending.objects.exclude(
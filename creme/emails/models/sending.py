@@ -20,10 +20,9 @@ from __future__ import annotations
 
 import logging
 from json import loads as json_load
-from time import sleep
 
 from django.conf import settings
-from django.core.mail import get_connection, send_mail
+from django.core.mail import send_mail
 from django.db import IntegrityError, models
 from django.db.transaction import atomic
 from django.template import Context, Template
@@ -38,6 +37,7 @@ import creme.creme_core.models.fields as core_fields
 from creme.creme_core.models import CremeEntity, CremeModel
 from creme.creme_core.utils.crypto import SymmetricEncrypter
 
+from ..core.sending import CampaignMailsSender
 from ..utils import EMailSender, ImageFromHTMLError, generate_id
 from .mail import ID_LENGTH, _Email
 from .signature import EmailSignature
@@ -199,6 +199,7 @@ class EmailSending(CremeModel):
     save_label     = pgettext_lazy('emails', 'Save the sending')
 
     email_sender_cls = LightWeightEmailSender
+    mails_sender_cls = CampaignMailsSender
 
     class Meta:
         app_label = 'emails'
@@ -248,36 +249,36 @@ class EmailSending(CremeModel):
 
             return self.State.ERROR
 
-        connection = get_connection(
-            host=config_item.host,
-            port=config_item.port,
-            username=config_item.username,
-            password=config_item.password,
-            use_tls=config_item.use_tls,
-        )
-
-        mails_count = 0
-        one_mail_sent = False
+        # NB: the emails are sent at a maximum rate of EMAILCAMPAIGN_SIZE emails
+        #     every EMAILCAMPAIGN_SLEEP_TIME seconds (avoiding the mails to be
+        #     classed as spam).
         SENDING_SIZE = getattr(settings, 'EMAILCAMPAIGN_SIZE', 40)
         SLEEP_TIME = getattr(settings, 'EMAILCAMPAIGN_SLEEP_TIME', 2)
 
-        for mail in LightWeightEmail.objects.filter(sending=self):
-            if sender_obj.send(mail, connection=connection):
-                mails_count += 1
-                one_mail_sent = True
-                logger.debug('Mail sent to %s', mail.recipient)
-
-            if mails_count > SENDING_SIZE:
-                logger.debug('Sending: waiting timeout')
-
-                mails_count = 0
-                sleep(SLEEP_TIME)  # Avoiding the mail to be classed as spam
-
-        if not one_mail_sent:
+        with self.mails_sender_cls(
+            email_sender=sender_obj,
+            connection_kwargs={
+                'host':     config_item.host,
+                'port':     config_item.port,
+                'username': config_item.username,
+                'password': config_item.password,
+                'use_tls':  config_item.use_tls,
+            },
+            connections=getattr(settings, 'EMAILCAMPAIGN_CONNECTIONS', 1),
+            rate=SENDING_SIZE / SLEEP_TIME if SLEEP_TIME else None,
+            burst=max(SENDING_SIZE, 1),
+        ) as mails_sender:
+            # NB: the emails already sent (the sending has been interrupted)
+            #     are ignored.
+            sent_count = mails_sender.send(self.unsent_mails)
+
+        logger.debug('Sending: %s mail(s) sent', sent_count)
+
+        # NB: a resumed sending is OK if some emails have been sent before the
+        #     interruption.
+        if not sent_count and not self.mails_set.filter(status=_Email.Status.SENT).exists():
             return self.State.ERROR
 
-        # TODO: close the connection ??
-
     @property
     def unsent_mails(self):
         Status = _Email.Status
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 
 from creme.creme_core.tests.base import CremeTestCase
+from creme.emails.core.sending import SMTPConnectionPool, TokenBucket
 from creme.emails.core.validators import TemplateVariablesValidator
 
 
@@ -57,3 +60,85 @@ class ValidatorsTestCase(CremeTestCase):
             _('You can use variables: {}').format('{{name}} {{nick_name}}'),
             v.help_text,
         )
+
+
+class TokenBucketTestCase(CremeTestCase):
+    def test_no_limit(self):
+        bucket = TokenBucket(rate=None)
+
+        with patch('creme.emails.core.sending.sleep') as sleep_mock:
+            for __ in range(100):
+                self.assertEqual(0, bucket.acquire())
+
+        sleep_mock.assert_not_called()
+
+    def test_rate(self):
+        with patch('creme.emails.core.sending.monotonic', return_value=100.0) as monotonic_mock:
+            bucket = TokenBucket(rate=10, capacity=2)
+
+            with patch('creme.emails.core.sending.sleep') as sleep_mock:
+                # Burst
+                self.assertEqual(0, bucket.acquire())
+                self.assertEqual(0, bucket.acquire())
+                sleep_mock.assert_not_called()
+
+                # Empty bucket
+                self.assertAlmostEqual(0.1, bucket.acquire())
+                sleep_mock.assert_called_once()
+                self.assertAlmostEqual(0.1, sleep_mock.call_args.args[0])
+
+                # The reserved token is consumed
+                self.assertAlmostEqual(0.2, bucket.acquire())
+
+                # Refilled
+                monotonic_mock.return_value = 101.0
+                self.assertEqual(0, bucket.acquire())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=10, capacity=0)
+
+
+class SMTPConnectionPoolTestCase(CremeTestCase):
+    def test_pool(self):
+        pool = SMTPConnectionPool(size=2, host='smtp.mydomain.org', port=25)
+
+        connections = pool.connections
+        self.assertEqual(2, len(connections))
+        self.assertNotEqual(connections[0], connections[1])
+        self.assertDictEqual(
+            {'host': 'smtp.mydomain.org', 'port': 25, 'fail_silently': False},
+            connections[0].kwargs,
+        )
+
+        with pool.connection() as connection1:
+            self.assertIs(connections[0], connection1)
+
+            with pool.connection() as connection2:
+                self.assertIs(connections[1], connection2)
+
+        # The connections are reused
+        with pool.connection() as connection3:
+            self.assertIn(connection3, connections)
+
+        with patch.object(connections[0], 'close') as close_mock1:
+            with patch.object(connections[1], 'close') as close_mock2:
+                pool.close()
+
+        close_mock1.assert_called_once()
+        close_mock2.assert_called_once()
+
+    def test_open_error(self):
+        pool = SMTPConnectionPool(size=1)
+
+        with patch.object(pool.connections[0], 'open', side_effect=OSError('Refused')):
+            with self.assertLogs('creme.emails.core.sending', level='ERROR'):
+                with pool.connection() as connection:
+                    self.assertIs(pool.connections[0], connection)
+
+    def test_size_error(self):
+        with self.assertRaises(ValueError):
+            SMTPConnectionPool(size=0)
@@ -1,6 +1,7 @@
 from copy import deepcopy
 from datetime import timedelta
 from functools import partial
+from unittest.mock import patch
 
 from django import forms
 from django.conf import settings
@@ -18,7 +19,7 @@ from django.utils.timezone import (
     now,
 )
 from django.utils.translation import gettext as _
-from django.utils.translation import pgettext
+from django.utils.translation import ngettext, pgettext
 
 from creme.creme_core.constants import UUID_CHANNEL_JOBS
 # Should be a test queue
@@ -49,6 +50,7 @@ from ..bricks import (
     SendingHTMLBodyBrick,
     SendingsBrick,
 )
+from ..core.sending import CampaignMailsSender
 from ..creme_jobs import campaign_emails_send_type
 from ..forms.sending import SendingConfigField
 from ..models import (
@@ -1655,6 +1657,133 @@ class SendingsTestCase(BrickTestCaseMixin, _EmailsTestCase):
         self.assertEqual(EmailSending.State.ERROR, self.refresh(sending).state)
         # TODO: error in job results
 
+    @skipIfCustomContact
+    @override_settings(EMAILCAMPAIGN_CONNECTIONS=3, EMAILCAMPAIGN_SLEEP_TIME=0)
+    def test_job04(self):
+        "Several connections + resumed sending + progress."
+        user = self.login_as_root_and_get()
+        job = self._get_job()
+        self.assertIsNone(job.type.progress(job).percentage)
+
+        item = EmailSendingConfigItem.objects.create(
+            name='Config #1',
+            host='smail.mydomain.org',
+            username='jet@mydomain.org',
+            password='c0w|3OY B3b0P',
+        )
+        camp = EmailCampaign.objects.create(user=user, name='Camp #001')
+        sending = EmailSending.objects.create(
+            config_item=item,
+            sender='vicious@reddragons.mrs',
+            campaign=camp,
+            type=EmailSending.Type.IMMEDIATE,
+            sending_date=now(),
+            subject='Subject',
+            body='Hello {{first_name}}',
+            state=EmailSending.State.IN_PROGRESS,
+        )
+
+        mails = []
+        for i in range(7):
+            mail = LightWeightEmail(
+                sending=sending,
+                sender=sending.sender,
+                recipient=f'hunter{i}@bebop.com',
+                body=f'{{"first_name": "Hunter #{i}"}}',
+            )
+            mail.genid_n_save()
+            mails.append(mail)
+
+        # The job has been interrupted after the first email
+        LightWeightEmail.objects.filter(id=mails[0].id).update(
+            status=LightWeightEmail.Status.SENT,
+        )
+
+        progress = job.type.progress(job)
+        self.assertEqual(14, progress.percentage)
+        self.assertEqual(
+            ngettext(
+                '{count} email sent out of {total}.',
+                '{count} emails sent out of {total}.',
+                1
+            ).format(count=1, total=7),
+            progress.label,
+        )
+
+        with patch(
+            'creme.emails.core.sending.get_connection',
+            wraps=django_mail.get_connection,
+        ) as get_connection_mock:
+            self._send_mails(job)
+
+        self.assertEqual(EmailSending.State.DONE, self.refresh(sending).state)
+
+        # One connection per thread (they are reused by the following emails)
+        self.assertEqual(3, get_connection_mock.call_count)
+
+        messages = django_mail.outbox
+        self.assertCountEqual(
+            [f'hunter{i}@bebop.com' for i in range(1, 7)],
+            [recipient for message in messages for recipient in message.recipients()],
+        )
+        message3 = next(message for message in messages if message.to == ['hunter3@bebop.com'])
+        self.assertEqual(
+            'Hello Hunter #3',
+            message3.attachments[0].get_payload(0).get_payload(0).get_payload(),
+        )
+
+        self.assertFalse(sending.unsent_mails.exists())
+        self.assertDatetimesAlmostEqual(now(), self.refresh(mails[1]).sending_date)
+
+    @override_settings(EMAILCAMPAIGN_CONNECTIONS=2, EMAILCAMPAIGN_SLEEP_TIME=0)
+    def test_send_mails__error(self):
+        "An unexpected error with an email does not avoid the other emails to be saved."
+        user = self.get_root_user()
+        item = EmailSendingConfigItem.objects.create(
+            name='Config #1',
+            host='smail.mydomain.org',
+            username='jet@mydomain.org',
+            password='c0w|3OY B3b0P',
+        )
+        camp = EmailCampaign.objects.create(user=user, name='Camp #001')
+        sending = EmailSending.objects.create(
+            config_item=item,
+            sender='vicious@reddragons.mrs',
+            campaign=camp,
+            type=EmailSending.Type.IMMEDIATE,
+            sending_date=now(),
+            subject='Subject',
+            body='Hello',
+            state=EmailSending.State.IN_PROGRESS,
+        )
+
+        mails = []
+        for i in range(3):
+            mail = LightWeightEmail(
+                sending=sending,
+                sender=sending.sender,
+                recipient=f'hunter{i}@bebop.com',
+            )
+            mail.genid_n_save()
+            mails.append(mail)
+
+        original_send_one = CampaignMailsSender._send_one
+
+        def send_one(this, mail):
+            if mail.id == mails[1].id:
+                raise OSError('Attachment cannot be read')
+
+            return original_send_one(this, mail)
+
+        with patch.object(CampaignMailsSender, '_send_one', send_one):
+            with self.assertLogs('creme.emails.core.sending', level='ERROR'):
+                with self.assertRaises(OSError):
+                    sending.send_mails()
+
+        self.assertEqual(LightWeightEmail.Status.SENT,     self.refresh(mails[0]).status)
+        self.assertEqual(LightWeightEmail.Status.NOT_SENT, self.refresh(mails[1]).status)
+        self.assertEqual(LightWeightEmail.Status.SENT,     self.refresh(mails[2]).status)
+
     def test_refresh_job01(self):
         "Restore campaign with sending which has to be sent."
         user = self.login_as_root_and_get()
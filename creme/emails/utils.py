@@ -209,6 +209,7 @@ class EMailSender:
         self._body = body
         self._body_html = body_html
         self._attachments = [*attachments]
+        self._attachment_files: list[tuple[str, bytes]] | None = None
         self._signature_renderer = None
 
         if signature:
@@ -224,9 +225,36 @@ class EMailSender:
     def _process_bodies(self, mail):
         return self._body, self._body_html
 
-    def send(self, mail, connection=None):
+    def _get_attachment_files(self) -> list[tuple[str, bytes]]:
+        """Get the names & contents of the attachments.
+        The files are read once, & then shared by all the sent emails.
+        """
+        files = self._attachment_files
+
+        if files is None:
+            MEDIA_ROOT = settings.MEDIA_ROOT
+            files = []
+
+            for attachment in self._attachments:
+                path = join(MEDIA_ROOT, attachment.filedata.name)
+
+                with open(path, 'rb') as f:
+                    files.append((basename(path), f.read()))
+
+            # NB: the list is shared only when it's complete (the emails can
+            #     be sent by several threads, see core.sending.CampaignMailsSender).
+            self._attachment_files = files
+
+        return files
+
+    def send(self, mail, connection=None, *, save=True):
         """Send the email & update its status.
         @param mail: Object with a class inheriting <emails.models.mail._Email>.
+        @param connection: Email backend used to send the email
+               (see 'django.core.mail.get_connection()').
+        @param save: If <False>, the status of the email is updated but the
+               instance is not saved (the caller can save several emails with
+               a bulk query).
         @return True means 'OK mail was sent successfully'.
         """
         ok = False
@@ -270,9 +298,8 @@ class EMailSender:
 
             msg.attach(related_part)
 
-            MEDIA_ROOT = settings.MEDIA_ROOT
-            for attachment in self._attachments:
-                msg.attach_file(join(MEDIA_ROOT, attachment.filedata.name))
+            for filename, content in self._get_attachment_files():
+                msg.attach(filename, content)
 
             try:
                 msg.send()
@@ -284,6 +311,7 @@ class EMailSender:
                 mail.sending_date = now()
                 ok = True
 
-            mail.save()
+            if save:
+                mail.save()
 
         return ok
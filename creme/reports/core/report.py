@@ -19,14 +19,18 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Iterable, Iterator
+from collections.abc import Iterable, Iterator, Sequence
 from typing import TYPE_CHECKING
 from uuid import UUID
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
-from django.db.models import ForeignKey, ManyToManyField
+from django.db.models import (
+    ForeignKey,
+    ManyToManyField,
+    prefetch_related_objects,
+)
 from django.utils.formats import number_format
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
@@ -49,6 +53,8 @@ if TYPE_CHECKING:
     from django.db.models import Field, Model, QuerySet
     from django.db.models.aggregates import Aggregate
 
+    from creme.creme_core.models import EntityFilter
+
     from ..models import Field as ReportField  # TODO: rename model ??
 
 # TODO: use Window/Frame to compute aggregate ?
@@ -94,7 +100,7 @@ class ReportHand:
         report = self._report_field.sub_report
 
         if report.filter is not None:
-            related_entities = report.filter.filter(related_entities)
+            related_entities = report.filter.filter(related_entities, user=user)
 
         return related_entities
 
@@ -203,6 +209,26 @@ class ReportHand:
     def _related_model_value_extractor(self, instance: Model):
         return instance
 
+    def _populate_sub_report(self, entities: Sequence[CremeEntity], user) -> None:
+        "Populate the columns of the sub-report for the given related entities."
+        sub_report = self._report_field.sub_report
+
+        if sub_report is not None and entities:
+            for column in sub_report.columns:
+                column.populate_entities(entities, user)
+
+    def populate_entities(self, entities: Sequence[CremeEntity], user) -> None:
+        """Retrieve the data needed to compute the values for several entities
+        with grouped queries ; it avoids to perform queries for each entity when
+        get_value() is called.
+        Child classes should override this method (the default implementation
+        does nothing).
+
+        @param entities: Instances of CremeEntity (a page of lines of the report).
+        @param user: Instance of <contrib.auth.get_user_model()>.
+        """
+        pass
+
     # TODO: property ??
     def get_linkable_ctypes(self) -> Iterable[ContentType] | None:
         """Return the ContentTypes which are compatible, in order to link a sub-report.
@@ -354,11 +380,13 @@ class RHForeignKey(RHRegularField):
         self._linked2entity: bool = issubclass(fk_model, CremeEntity)
         qs = fk_model.objects.all()
         sub_report = report_field.sub_report
+        self._efilter: EntityFilter | None = None
 
         if sub_report:
-            efilter = sub_report.filter
-            if efilter:
-                qs = efilter.filter(qs)
+            # NB: the filter is applied in _get_queryset(), with the user
+            #     (the lines can be generated after the end of the request,
+            #     when the global user has been cleared).
+            self._efilter = sub_report.filter
         else:
             # Small optimization: only used by _get_value_no_subreport()
             if len(field_info) > 1:
@@ -371,33 +399,69 @@ class RHForeignKey(RHRegularField):
                 self._value_extractor = lambda fk_instance, user: str(fk_instance)
 
         self._qs = qs
+        # Cache filled by populate_entities(); the values are <None> for the
+        # instances which are excluded by the filter of the sub-report.
+        self._fk_instances: dict[int, Model | None] = {}
         super().__init__(
             report_field,
             support_subreport=True,
             title=str(fk_field.verbose_name) if sub_report else None,
         )
 
+    def _get_queryset(self, user) -> QuerySet:
+        "Get the instances which can be referenced (filter of the sub-report)."
+        efilter = self._efilter
+
+        return self._qs if efilter is None else efilter.filter(self._qs, user=user)
+
     # NB: cannot rename to _get_related_instances() because forbidden entities
     #     are filtered instead of outputting '??'
-    def _get_fk_instance(self, entity: CremeEntity) -> CremeEntity | None:
+    def _get_fk_instance(self, entity: CremeEntity, user) -> CremeEntity | None:
+        fk_id = getattr(entity, self._fk_attr_name)
+        if fk_id is None:
+            return None
+
         try:
-            rel_entity = self._qs.get(pk=getattr(entity, self._fk_attr_name))
+            return self._fk_instances[fk_id]
+        except KeyError:
+            pass
+
+        try:
+            rel_entity = self._get_queryset(user).get(pk=fk_id)
         except ObjectDoesNotExist:
             rel_entity = None
 
         return rel_entity
 
+    def populate_entities(self, entities, user):
+        # NB: the cache is scoped to the current page of entities (the values
+        #     of a previous fetch must not be used).
+        self._fk_instances = {}
+
+        attr_name = self._fk_attr_name
+        fk_ids = {getattr(entity, attr_name) for entity in entities}
+        fk_ids.discard(None)
+
+        instances = {
+            instance.pk: instance
+            for instance in self._get_queryset(user).filter(pk__in=fk_ids)
+        }
+        # NB: the size of the cache is bounded by the size of a page
+        self._fk_instances = {fk_id: instances.get(fk_id) for fk_id in fk_ids}
+
+        self._populate_sub_report([*instances.values()], user)
+
     def _get_value_flattened_subreport(self, entity, user, scope):
-        fk_entity = self._get_fk_instance(entity)
+        fk_entity = self._get_fk_instance(entity, user)
 
         if fk_entity is not None:  # TODO: test
             return self._generate_flattened_report((fk_entity,), user, scope)
 
     def _get_value_extended_subreport(self, entity, user, scope):
-        return [self._handle_report_values(self._get_fk_instance(entity), user, scope)]
+        return [self._handle_report_values(self._get_fk_instance(entity, user), user, scope)]
 
     def _get_value_no_subreport(self, entity, user, scope):
-        fk_instance = self._get_fk_instance(entity)
+        fk_instance = self._get_fk_instance(entity, user)
 
         if fk_instance is not None:
             if self._linked2entity and not user.has_perm_to_view(fk_instance):
@@ -432,6 +496,14 @@ class RHManyToManyField(RHRegularField):
     def _get_related_instances(self, entity, user):
         return getattr(entity, self._field_info[0].name).all()
 
+    def populate_entities(self, entities, user):
+        m2m_field = self._field_info[0]
+
+        # NB: the related entities are filtered (credentials, filter of the
+        #     sub-report) with a query anyway, so the prefetching is useless.
+        if not issubclass(m2m_field.remote_field.model, CremeEntity):
+            prefetch_related_objects(entities, m2m_field.name)
+
     def get_linkable_ctypes(self):
         m2m_model = self._field_info[0].remote_field.model
 
@@ -456,6 +528,9 @@ class RHCustomField(ReportHand):
 
         super().__init__(report_field, title=cf.name)
 
+    def populate_entities(self, entities, user):
+        CremeEntity.populate_custom_values(entities, [self._cfield])
+
     def _get_value_single_on_allowed(self, entity, user, scope):
         cvalue = entity.get_custom_value(self._cfield)
         # TODO: use a EntityCellCustomField & remove __str__ methods of CustomFieldValue models ?
@@ -495,6 +570,12 @@ class RHRelation(ReportHand):
             relations__object_entity=entity.id,
         )
 
+    def populate_entities(self, entities, user):
+        # NB: the sub-report case uses a query for each entity (the related
+        #     entities are used as scope of the sub-report -- see aggregates).
+        if not self._report_field.sub_report:
+            CremeEntity.populate_relations(entities, [self._rtype.id])
+
     # TODO: add a feature in base class to retrieved efficiently real entities ??
     # TODO: extract algorithm that retrieve efficiently real entity from
     #       CremeEntity.get_related_entities()
@@ -534,6 +615,9 @@ class RHFunctionField(ReportHand):
 
         super().__init__(report_field, title=str(funcfield.verbose_name))
 
+    def populate_entities(self, entities, user):
+        self._funcfield.populate_entities(entities, user)
+
     def _get_value_single_on_allowed(self, entity, user, scope):
         return self._funcfield(entity, user).render(tag=ViewTag.TEXT_PLAIN)
 
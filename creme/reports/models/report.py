@@ -20,7 +20,7 @@ from __future__ import annotations
 
 import logging
 import warnings
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator, Sequence
 from itertools import chain
 from typing import TYPE_CHECKING, Type
 
@@ -34,6 +34,7 @@ from django.utils.translation import gettext_lazy as _
 from creme.creme_core.auth.entity_credentials import EntityCredentials
 from creme.creme_core.core.entity_filter import EF_REGULAR
 from creme.creme_core.core.field_tags import FieldTag
+from creme.creme_core.core.paginator import FlowPaginator
 from creme.creme_core.models import (
     CremeEntity,
     CremeModel,
@@ -45,7 +46,7 @@ from creme.creme_core.models.fields import EntityCTypeForeignKey
 from ..constants import EF_REPORTS
 
 if TYPE_CHECKING:
-    from ..core.report import ReportHand
+    from ..core.report import ExpandableLine, ReportHand
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,9 @@ class AbstractReport(CremeEntity):
     creation_label = _('Create a report')
     save_label     = _('Save the report')
 
+    # Number of entities retrieved by query when the lines are generated
+    fetch_page_size: int = 256
+
     _columns: list[Field] | None = None
 
     class Meta:
@@ -143,45 +147,100 @@ class AbstractReport(CremeEntity):
 
         return {*asc_reports}
 
+    @staticmethod
+    def _get_fetch_ordering(model: type[CremeEntity]) -> list[str]:
+        """Get a stable ordering (natural ordering of the model, then the ID) in
+        order to retrieve the entities page by page (see FlowPaginator).
+        """
+        ordering = [*model._meta.ordering]
+        prefix = '-' if ordering and ordering[0].startswith('-') else ''
+        ordering.append(prefix + model._meta.pk.attname)
+
+        return ordering
+
     # TODO: move 'user' as first argument + no default value ?
     def _fetch(self,
                limit_to: int | None = None,
                extra_q: models.Q | None = None,
                user=None) -> Iterator[list]:
+        # NB: the user is passed explicitly to the filters, because the lines
+        #     can be generated lazily (streamed export) after the end of the
+        #     request, when the global user has been cleared.
+        filter_user = user
         user = user or get_user_model()(is_superuser=True)
+        model = self.ct.model_class()
         entities = EntityCredentials.filter(
-            user,
-            self.ct.get_all_objects_for_this_type(is_deleted=False),
+            user, model._default_manager.filter(is_deleted=False),
         )
 
         if self.filter is not None:
-            entities = self.filter.filter(entities)
+            entities = self.filter.filter(entities, user=filter_user)
 
         if extra_q is not None:
             entities = entities.filter(extra_q)
 
         if limit_to:
             entities = entities[:limit_to]
+            pages: Iterable[Sequence[CremeEntity]] = [[*entities]]
+        else:
+            # NB: the entities are retrieved by chunks (with a KEYSET pagination)
+            #     to get a bounded memory usage with big tables.
+            ordering = self._get_fetch_ordering(model)
+            pages = (
+                page.object_list
+                for page in FlowPaginator(
+                    queryset=entities.order_by(*ordering),
+                    key=ordering[0],
+                    per_page=self.fetch_page_size,
+                ).pages()
+            )
 
         fields = self.filtered_columns
 
-        for entity in entities:
-            yield [
-                field.get_value(entity, scope=entities, user=user)
-                for field in fields
-            ]
+        for page_entities in pages:
+            # Optimisation: the values of the columns are retrieved with
+            #               grouped queries for the whole page.
+            for field in fields:
+                field.populate_entities(page_entities, user)
+
+            for entity in page_entities:
+                yield [
+                    # NB: the scope is the whole set of entities (see aggregates)
+                    field.get_value(entity, scope=entities, user=user)
+                    for field in fields
+                ]
+
+    def fetch_expandable_lines(self,
+                               limit_to: int | None = None,
+                               extra_q: models.Q | None = None,
+                               user=None) -> Iterator[ExpandableLine]:
+        """Generate the lines of the report (one line per entity) lazily.
+        The entities are retrieved by pages, so this method can be used with
+        big tables (the memory usage is bounded).
+        """
+        from ..core.report import ExpandableLine  # Lazy loading
+
+        for values in self._fetch(limit_to=limit_to, extra_q=extra_q, user=user):
+            yield ExpandableLine(values)
+
+    def iter_lines(self,
+                   extra_q: models.Q | None = None,
+                   user=None) -> Iterator[list[str]]:
+        """Generate the lines of the report lazily (contrarily to
+        fetch_all_lines() which builds a list), with the expanded sub-reports.
+        It's useful to stream a big report.
+        """
+        for line in self.fetch_expandable_lines(extra_q=extra_q, user=user):
+            yield from line.get_lines()
 
-    # TODO: transform into generator (--> StreamResponse)
     def fetch_all_lines(self,
                         limit_to: int | None = None,
                         extra_q: models.Q | None = None,
                         user=None) -> list[list[str]]:
-        from ..core.report import ExpandableLine  # Lazy loading
-
         lines = []
 
-        for values in self._fetch(limit_to=limit_to, extra_q=extra_q, user=user):
-            lines.extend(ExpandableLine(values).get_lines())
+        for line in self.fetch_expandable_lines(limit_to=limit_to, extra_q=extra_q, user=user):
+            lines.extend(line.get_lines())
 
             if limit_to is not None and len(lines) >= limit_to:  # Meh
                 break  # TODO: test
@@ -312,6 +371,14 @@ class Field(CremeModel):
         hand = self.hand
         return hand.get_value(entity, user, scope) if hand else '??'
 
+    def populate_entities(self, entities: Sequence[CremeEntity], user) -> None:
+        """Retrieve the data needed by get_value() for several entities with
+        grouped queries (see ReportHand.populate_entities()).
+        """
+        hand = self.hand
+        if hand:
+            hand.populate_entities(entities, user)
+
     @property
     def model(self) -> Type[CremeEntity]:
         return self.report.ct.model_class()
@@ -184,6 +184,37 @@ class ReportHandTestCase(CremeTestCase):
             hand.get_value(entity=aria, user=user, scope=FakeContact.objects.all())
         )
 
+    def test_regular_field_fk__populate(self):
+        "The cache of instances does not contain the values of a previous page."
+        user = self.get_root_user()
+        rfield = Field(
+            report=Report(user=user, ct=FakeContact), type=RFT_FIELD, name='sector',
+        )
+        hand = RHRegularField(rfield)
+
+        sector1, sector2 = FakeSector.objects.all()[:2]
+        create_contact = partial(FakeContact.objects.create, user=user, last_name='Stark')
+        aria = create_contact(first_name='Aria', sector=sector1)
+        sansa = create_contact(first_name='Sansa', sector=sector2)
+
+        scope = FakeContact.objects.all()
+        hand.populate_entities([aria], user)
+
+        with self.assertNumQueries(0):
+            value1 = hand.get_value(entity=aria, user=user, scope=scope)
+        self.assertEqual(str(sector1), value1)
+
+        sector1.title = 'Swordsman'
+        sector1.save()
+
+        hand.populate_entities([sansa], user)
+        self.assertEqual(
+            str(sector2), hand.get_value(entity=sansa, user=user, scope=scope),
+        )
+        self.assertEqual(
+            'Swordsman', hand.get_value(entity=aria, user=user, scope=scope),
+        )
+
     def test_regular_field_fk02(self):
         "Related to entity."
         rfield = Field(report=Report(ct=FakeContact), type=RFT_FIELD, name='image')
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from datetime import date, datetime
 from decimal import Decimal
 from functools import partial
@@ -5,7 +6,8 @@ from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils.encoding import smart_str
 from django.utils.formats import get_format, number_format
@@ -48,6 +50,7 @@ from creme.creme_core.models import (
     FakePosition,
     FieldsConfig,
     HeaderFilter,
+    Language,
     Relation,
     RelationType,
 )
@@ -1533,7 +1536,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
                 _('Name'), _('Owner user'), rt.predicate, _('Properties'),
             ),
             # response.content.decode(),
-            response.text,
+            response.getvalue().decode(),
         )
 
     def test_report_csv__no_filter(self):
@@ -1548,7 +1551,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         )
 
         # content = (s for s in response.content.decode().split('\r\n') if s)
-        content = (s for s in response.text.split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(
             smart_str('"{}","{}","{}","{}"'.format(
                 _('Last name'), _('Owner user'), _('owns'), _('Properties'),
@@ -1564,6 +1567,55 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         with self.assertRaises(StopIteration):
             next(content)
 
+    def test_report_csv__streaming(self):
+        user = self.login_as_root_and_get()
+
+        self._create_persons(user=user)
+        report = self._create_contacts_report(user=user, name='trinita')
+        response = self.assertGET200(
+            self._build_export_url(report), data={'doc_type': 'csv'},
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            'attachment; filename="trinita.csv"', response['Content-Disposition'],
+        )
+        self.assertEqual(
+            4, len([s for s in response.getvalue().decode().split('\r\n') if s]),
+        )
+
+    def test_report_csv__streaming__current_user(self):
+        "The filter uses the current user, & the lines are generated after the view."
+        user = self.login_as_root_and_get()
+        other_user = self.create_user()
+
+        self._create_persons(user=user)
+        FakeContact.objects.create(user=other_user, last_name='Ikari', first_name='Shinji')
+
+        efilter = EntityFilter.objects.smart_update_or_create(
+            'test-filter_mycontacts', 'My contacts', FakeContact,
+            is_custom=True,
+            conditions=[
+                condition_handler.RegularFieldConditionHandler.build_condition(
+                    model=FakeContact,
+                    operator=operators.EQUALS,
+                    field_name='user',
+                    values=['__currentuser__'],
+                ),
+            ],
+        )
+        report = self._create_simple_contacts_report(user=user, efilter=efilter)
+        response = self.assertGET200(
+            self._build_export_url(report), data={'doc_type': 'csv'},
+        )
+        self.assertTrue(response.streaming)
+
+        # NB: the content is generated here (the global user has been cleared)
+        content = [s for s in response.getvalue().decode().split('\r\n') if s]
+        self.assertListEqual(
+            [f'"{_("Last name")}"', '"Ayanami"', '"Katsuragi"', '"Langley"'],
+            content,
+        )
+
     def test_report_csv__date_filter__custom(self):
         "With date filter."
         user = self.login_as_root_and_get()
@@ -1582,7 +1634,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         )
 
         # content = [s for s in response.content.decode().split('\r\n') if s]
-        content = [s for s in response.text.split('\r\n') if s]
+        content = [s for s in response.getvalue().decode().split('\r\n') if s]
         self.assertEqual(3, len(content))
 
         self.assertEqual(f'"Ayanami","{user}","","Kawaii"', content[1])
@@ -1609,7 +1661,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         )
 
         # content1 = [s for s in response1.content.decode().split('\r\n') if s]
-        content1 = [s for s in response1.text.split('\r\n') if s]
+        content1 = [s for s in response1.getvalue().decode().split('\r\n') if s]
         self.assertEqual(2, len(content1))
         self.assertEqual(f'"Baby","{user}","",""', content1[1])
 
@@ -1627,7 +1679,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         )
 
         # content2 = [s for s in response2.content.decode().split('\r\n') if s]
-        content2 = [s for s in response2.text.split('\r\n') if s]
+        content2 = [s for s in response2.getvalue().decode().split('\r\n') if s]
         self.assertEqual(2, len(content2))
         self.assertEqual(f'"Baby","{user}","",""', content2[1])
 
@@ -1681,7 +1733,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         response = self.assertGET200(self._build_export_url(report), data={'doc_type': 'csv'})
 
         # content = (s for s in response.content.decode().split('\r\n') if s)
-        content = (s for s in response.text.split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(smart_str('"{}"'.format(_('Last name'))), next(content))
 
         self.assertEqual('"Ayanami"',   next(content))
@@ -1707,7 +1759,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         response = self.assertGET200(self._build_export_url(report), data={'doc_type': 'csv'})
 
         # content = (s for s in response.content.decode().split('\r\n') if s)
-        content = (s for s in response.text.split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(smart_str('"{}"'.format(_('Last name'))), next(content))
 
         self.assertEqual('"Ayanami"',   next(content))
@@ -1733,7 +1785,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         response = self.assertGET200(self._build_export_url(report), data={'doc_type': 'csv'})
 
         # content = (s for s in response.content.decode().split('\r\n') if s)
-        content = (s for s in response.text.split('\r\n') if s)
+        content = (s for s in response.getvalue().decode().split('\r\n') if s)
         self.assertEqual(
             smart_str('"{}","is an employee of"'.format(_('Last name'))),
             next(content),
@@ -1764,7 +1816,7 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
         )
 
         # content = [s for s in response.content.decode().split('\r\n') if s]
-        content = [s for s in response.text.split('\r\n') if s]
+        content = [s for s in response.getvalue().decode().split('\r\n') if s]
         self.assertEqual(2, len(content))
         self.assertEqual('"{}"'.format(_('Last name')), content[0])
         self.assertEqual(f'"{osaka.last_name}"',        content[1])
@@ -2615,6 +2667,96 @@ class ReportTestCase(BrickTestCaseMixin, BaseReportsTestCase):
             report.fetch_all_lines(),
         )
 
+    def test_fetch_by_pages(self):
+        user = self.login_as_root_and_get()
+
+        create_contact = partial(FakeContact.objects.create, user=user)
+        for i in range(5):
+            create_contact(last_name=f'Mister {i}')
+
+        # Same last names => the ID is used to get a stable order
+        create_contact(last_name='Mister 2', first_name='Second')
+        create_contact(last_name='Mister 2', first_name='Third')
+
+        report = self._create_simple_contacts_report(user=user, name='Contacts report')
+        report.fetch_page_size = 2
+
+        expected = [
+            [ln]
+            for ln in FakeContact.objects
+                                 .filter(is_deleted=False)
+                                 .order_by('last_name', 'first_name', 'id')
+                                 .values_list('last_name', flat=True)
+        ]
+        self.assertEqual(7, len(expected))
+        self.assertListEqual(expected, report.fetch_all_lines())
+
+        lines = report.iter_lines()
+        self.assertIsInstance(lines, Iterator)
+        self.assertListEqual(expected, [*lines])
+
+        elines = [*report.fetch_expandable_lines(limit_to=3)]
+        self.assertEqual(3, len(elines))
+        self.assertListEqual(expected[0], elines[0].get_lines()[0])
+
+    def test_fetch__populate(self):
+        "The number of queries does not depend on the number of entities."
+        user = self.login_as_root_and_get()
+
+        rtype = RelationType.objects.smart_update_or_create(
+            ('test-subject_loves', 'loves'),
+            ('test-object_loves',  'is loved by'),
+        )[0]
+        cfield = CustomField.objects.create(
+            content_type=FakeContact, name='Size', field_type=CustomField.INT,
+        )
+        language = Language.objects.create(name='Japanese')
+        img = FakeImage.objects.create(user=user, name='Face')
+        orga = FakeOrganisation.objects.create(user=user, name='Nerv')
+
+        report = Report.objects.create(user=user, name='Contacts', ct=FakeContact)
+        create_field = partial(Field.objects.create, report=report, selected=False)
+        create_field(name='last_name',         type=RFT_FIELD,    order=1)
+        create_field(name='image__name',       type=RFT_FIELD,    order=2)
+        create_field(name='languages',         type=RFT_FIELD,    order=3)
+        create_field(name=str(cfield.uuid),    type=RFT_CUSTOM,   order=4)
+        create_field(name=rtype.id,            type=RFT_RELATION, order=5)
+        create_field(name='get_pretty_properties', type=RFT_FUNCTION, order=6)
+
+        def create_contacts(count):
+            for i in range(count):
+                contact = FakeContact.objects.create(
+                    user=user, last_name=f'Contact #{i}', image=img,
+                )
+                contact.languages.set([language])
+                CustomFieldInteger.objects.create(custom_field=cfield, entity=contact, value=i)
+                Relation.objects.create(
+                    user=user, subject_entity=contact, type=rtype, object_entity=orga,
+                )
+
+        def count_queries():
+            fresh_report = self.refresh(report)
+            fresh_report.fetch_page_size = 10
+            fresh_report.columns  # NB: build the hands before counting
+
+            with CaptureQueriesContext(connection) as ctxt:
+                lines = fresh_report.fetch_all_lines()
+
+            return lines, len(ctxt.captured_queries)
+
+        create_contacts(2)
+        count_queries()  # NB: fill the caches (FieldsConfig...)
+        lines1, queries_count1 = count_queries()
+        self.assertListEqual(
+            ['Contact #0', img.name, language.name, '0', orga.name, ''],
+            lines1[0],
+        )
+
+        create_contacts(6)
+        lines2, queries_count2 = count_queries()
+        self.assertEqual(8, len(lines2))
+        self.assertEqual(queries_count1, queries_count2)
+
     # @override_settings(USE_L10N=True)
     @override_language('en')
     def test_fetch_field_02(self):
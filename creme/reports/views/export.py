@@ -133,26 +133,36 @@ class Export(generic.base.EntityRelatedMixin, generic.CheckedView):
 
         return form
 
+    def iter_rows(self, *, report, extra_q):
+        "Generate the rows of the file (the first one contains the titles)."
+        yield [
+            smart_str(column.title) for column in report.get_children_fields_flat()
+        ]
+
+        for line in report.iter_lines(extra_q=extra_q, user=self.request.user):
+            yield [smart_str(value) for value in line]
+
     def get(self, request, *args, **kwargs):
-        user = request.user
         report = self.get_related_entity()
         form = self.get_form(report=report, request=request)
 
-        q_filter = form.get_q()
         writer = form.get_backend()
 
         if writer is None:
             raise ConflictError('Unknown extension')
 
-        writerow = writer.writerow
+        rows = self.iter_rows(report=report, extra_q=form.get_q())
+        filename = smart_str(report.name)
 
-        writerow([
-            smart_str(column.title) for column in report.get_children_fields_flat()
-        ])
+        # NB: the CSV backends stream the rows (the report is never entirely in memory)
+        response = writer.stream(rows=rows, filename=filename)
 
-        for line in report.fetch_all_lines(extra_q=q_filter, user=user):
-            writerow([smart_str(value) for value in line])
+        if response is None:
+            writerow = writer.writerow
+            for row in rows:
+                writerow(row)
 
-        writer.save(smart_str(report.name), user)
+            writer.save(filename, request.user)
+            response = writer.response
 
-        return writer.response
+        return response
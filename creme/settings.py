@@ -75,6 +75,108 @@ DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 # - the paginator only allows to go to the next & the previous pages (& the main query is faster).
 FAST_QUERY_MODE_THRESHOLD = 100000
 
+# When this number of entities is reached in a list-view, & if the ordering of
+# the list corresponds to a DB-index (see the command "creme_index_advisor"),
+# the keyset pagination is used (like in fast-mode: only the next & the previous
+# pages are available) ; it avoids the SQL's OFFSET which is slow for the deep
+# pages of big tables.
+# <None> means that the keyset pagination is only used in fast-mode.
+LISTVIEW_KEYSET_PAGINATION_THRESHOLD = 1000
+
+# When the number of entities of a list-view estimated by the database reaches
+# this number, the estimation is displayed instead of the exact number (which
+# can be long to compute with huge tables), & the fast-mode is used.
+# Currently, only PostgreSQL gives an estimation.
+# <None> means that the number of entities is always exact.
+LISTVIEW_APPROXIMATE_COUNT_THRESHOLD = None
+
+# When the number of entities exported by a list-view (CSV, XLSX...) reaches
+# this number, the export is performed by a job (the user gets a notification
+# with a link to the file when it's ready) instead of blocking the request.
+# Notice that the CSV files are streamed, so a big export does not use a lot of
+# memory, but it can take a long time.
+# <None> means that the exports are always performed by the view.
+MASS_EXPORT_JOB_THRESHOLD = None
+
+# CACHE ########################################################################
+# The configuration models (fields configuration, custom-fields, setting values,
+# search configuration...) are cached during each request. They can be cached
+# between the requests too, in the Django's cache which alias (see 'CACHES') is
+# given here ; <None> means that this cache is disabled.
+# The cached data are invalidated when the configuration is modified.
+# BEWARE: the default cache of Django is a local-memory one, which is not shared
+#         between processes ; if you run several processes (it's generally the
+#         case in production), you must use a shared backend, like Redis.
+# Example:
+#   CACHES = {
+#       'default': {
+#           'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+#       },
+#       'creme_config': {
+#           'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#           'LOCATION': 'redis://@localhost:6379/1',
+#       },
+#   }
+#   CONFIG_CACHE_ALIAS = 'creme_config'
+CONFIG_CACHE_ALIAS = None
+
+# Lifetime (in seconds) of the cached configuration (None means "forever").
+CONFIG_CACHE_TIMEOUT = 3600
+
+# The numbers of entities displayed by the list-views (for a filter, a search &
+# the credentials of a user) can be cached too, in the Django's cache which
+# alias is given here ; <None> means that this cache is disabled.
+# The cached numbers of a type of entity are invalidated when an entity of
+# this type is created/modified/deleted (notice that the methods which do not
+# send the signals, like 'QuerySet.update()', do not invalidate them).
+LISTVIEW_COUNT_CACHE_ALIAS = None
+
+# Lifetime (in seconds) of the cached numbers of entities.
+LISTVIEW_COUNT_CACHE_TIMEOUT = 300
+
+# Some statistics about the executions of the Workflows (number of executions,
+# duration...) can be collected & displayed in the configuration of the
+# Workflows. They are stored in the Django's cache which alias is given here ;
+# <None> means that the statistics are disabled.
+# BEWARE: use a shared backend (like Redis) if you run several processes.
+WORKFLOW_STATS_CACHE_ALIAS = None
+
+# CACHE [END] ##################################################################
+
+# SEARCH #######################################################################
+# The global search can use an index, which stores the normalized values of the
+# searchable fields (see the search configuration) in a dedicated table; it's
+# a lot faster than the search without index when there are lots of entities.
+# <None> means that the index is not used. Available backends:
+#  - 'creme.creme_core.core.search_index.SearchIndexBackend': works with all
+#    the DB engines; with PostgreSQL a trigram index is used (the extension
+#    "pg_trgm" is installed by the migrations if the DB user has the
+#    permission to do it).
+#  - 'creme.creme_core.core.search_index.SQLiteSearchIndexBackend': uses a
+#    FTS5 table; it needs SQLite >= 3.34.
+# BEWARE: the index must be built with the command "creme_search_index" (after
+#         the activation of the index, & after each modification of the search
+#         configuration) ; the fields which have not been indexed are searched
+#         without the index.
+SEARCH_INDEX_BACKEND = None
+
+# SEARCH [END] #################################################################
+
+# CREDENTIALS ##################################################################
+# The entities accepted by the filters used by the credentials of the roles can
+# be stored in a dedicated table, which is kept up-to-date when the entities
+# are modified ; the filtering of the entities by the credentials (list-views,
+# bricks...) is then faster when the filters use complex conditions
+# (relationships, custom-fields...) & there are lots of entities.
+# BEWARE: the filters must be materialized with the command
+#         "creme_materialize_filters" (after the activation, & after the
+#         modification of the roles & of the users) ; the filters which are not
+#         materialized are used dynamically. The option "--check" of this
+#         command compares the stored entities with the filters' conditions.
+MATERIALIZED_CREDENTIALS_FILTERS = False
+
+# CREDENTIALS [END] ############################################################
+
 # JOBS #########################################################################
 # Maximum number of not finished jobs each user can have at the same time.
 #  When this number is reached for a user, he must wait one of his
@@ -122,6 +224,34 @@ PSEUDO_PERIOD = 1  # In hours
 #           have to indicate the parent directory.
 JOBMANAGER_BROKER = 'redis://@localhost:6379/0'
 
+# Number of worker processes used by the job scheduler to run the system jobs
+# (reminders, cleaners...). The workers initialise Django only once, so
+# short jobs are run faster than in a new process each time.
+# 0 means that the pool is not used (each job is run in its own process).
+# Notice that user jobs are always run in their own process.
+JOBMANAGER_POOL_SIZE = 0
+
+# A worker of the pool is replaced by a new one after having run this number
+# of jobs (it avoids the memory leaks to accumulate). 0 means "no limit".
+JOBMANAGER_POOL_MAX_JOBS_PER_WORKER = 100
+
+# Several job schedulers (command "creme_job_manager") can run at the same
+# time, on one or several machines, in order to share the jobs. Each scheduler
+# (i.e. "node") is registered in the DB & regularly updates its heartbeat; a
+# node must get the lease of a job to run it, so a job is not run by several
+# nodes at the same time.
+# This is the duration (in seconds) after which a node which has not updated
+# its heartbeat is considered as dead (its leases are released).
+# Notice that the broker must be shared by the nodes (i.e. "redis" type).
+# 0 means that only one scheduler is used.
+JOBMANAGER_LEASE_DURATION = 0
+
+# Number of worker processes used by a batch process (job which modifies the
+# entities in bulk) ; the entities are split in ranges of IDs which are
+# processed concurrently. 1 means that the entities are processed by the
+# process of the job itself.
+BATCH_PROCESS_WORKERS = 1
+
 
 # AUTHENTICATION ###############################################################
 
@@ -1371,6 +1501,16 @@ BILLING_EXPORTERS = [
     #   https://wkhtmltopdf.org/  => uses Qt WebKit
 ]
 
+# The files generated by the exporters (PDF...) are reused when the same user
+# exports again an unmodified document with the same exporter (until the files
+# are removed by the job "Temporary files cleaner").
+BILLING_EXPORT_CACHE = True
+
+# Number of worker processes used by the job which exports the documents of a
+# filter in a ZIP file. 1 means that the documents are exported by the process
+# of the job itself.
+BILLING_BULK_EXPORT_WORKERS = 1
+
 # OPPORTUNITIES ----------------------------------------------------------------
 OPPORTUNITIES_OPPORTUNITY_MODEL = 'opportunities.Opportunity'
 OPPORTUNITIES_OPPORTUNITY_FORCE_NOT_CUSTOM = False
@@ -1395,10 +1535,17 @@ EMAILS_TEMPLATE_FORCE_NOT_CUSTOM = False
 EMAILS_EMAIL_FORCE_NOT_CUSTOM    = False
 EMAILS_MLIST_FORCE_NOT_CUSTOM    = False
 
-# Emails are sent by chunks, and sleep between 2 chunks.
+# The emails of the campaigns are sent at a maximum rate of EMAILCAMPAIGN_SIZE
+# emails every EMAILCAMPAIGN_SLEEP_TIME seconds (bursts of EMAILCAMPAIGN_SIZE
+# emails are allowed) ; it avoids the emails to be classified as spam.
+# EMAILCAMPAIGN_SLEEP_TIME = 0 means "no limit".
 EMAILCAMPAIGN_SIZE = 40
 EMAILCAMPAIGN_SLEEP_TIME = 2
 
+# Number of SMTP connections (& of threads) used to send concurrently the
+# emails of a campaign's sending.
+EMAILCAMPAIGN_CONNECTIONS = 1
+
 # Sketch -----------------------------------------------------------------------
 SKETCH_ENABLE_DEMO_BRICKS = False
 